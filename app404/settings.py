@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 import environ
 
@@ -112,6 +113,36 @@ JWT_REFRESH_TTL_SECONDS = env("JWT_REFRESH_TTL_SECONDS")
 JWT_COOKIE_SECURE = env.bool("JWT_COOKIE_SECURE", default=False)
 JWT_COOKIE_SAMESITE = env("JWT_COOKIE_SAMESITE", default="Lax")
 
+# Per-process cache of authenticated users for core.middleware.JWTAuthenticationMiddleware
+# (size 0 disables it). Revocation is immediate in the process that handled it,
+# other workers pick it up within the TTL.
+JWT_PRINCIPAL_CACHE_SIZE = env.int("JWT_PRINCIPAL_CACHE_SIZE", default=1024)
+JWT_PRINCIPAL_CACHE_TTL_SECONDS = env.int("JWT_PRINCIPAL_CACHE_TTL_SECONDS", default=30)
+
+# How team apps verify the caller (core.identity.verify_request):
+# "auto"/"local" check the JWT in-process; "http" calls CORE_BASE_URL/api/auth/verify/ (separate services)
+CORE_AUTH_VERIFY = env("CORE_AUTH_VERIFY", default="auto")
+
+# core.geo_cache: map-service results keyed on coordinates rounded to PRECISION decimals (4 ≈ 11 m).
+# In-process LRU of MEMORY_SIZE entries backed by a SQLite file at PATH (outside the tree by default; empty disables it); TTL 0 disables caching.
+GEO_CACHE = {
+    "PATH": env("GEO_CACHE_PATH", default=str(Path(tempfile.gettempdir()) / "app404-geo-cache.sqlite3")),
+    "PRECISION": env.int("GEO_CACHE_PRECISION", default=4),
+    "TTL_SECONDS": env.int("GEO_CACHE_TTL_SECONDS", default=24 * 3600),
+    "MEMORY_SIZE": env.int("GEO_CACHE_MEMORY_SIZE", default=2048),
+}
+
+# Shared HTTP transport for team13.neshan (pooled session, retries with jitter, per-endpoint circuit breaker)
+NESHAN_HTTP = {
+    "retries": env.int("NESHAN_HTTP_RETRIES", default=2),
+    "failure_threshold": env.int("NESHAN_HTTP_FAILURE_THRESHOLD", default=5),
+    "reset_timeout": env.int("NESHAN_HTTP_RESET_TIMEOUT_SECONDS", default=30),
+}
+
+# Django cache shared by every web worker and Celery process (e.g. redis://redis:6379/1); team2 keeps its
+# top-articles ranking and reindex lock here. The local-memory default is per process and only fits a single runserver.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 CORS_ALLOW_CREDENTIALS = True
 
 if DEBUG:
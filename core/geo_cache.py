@@ -0,0 +1,224 @@
+"""
+Coordinate-quantized cache for map-service lookups (routing, reverse geocoding).
+
+Keys are built from coordinates rounded to GEO_CACHE["PRECISION"] decimals
+(4 ≈ 11 m) plus the travel mode and request options, so repeated clicks on
+the same landmark pair share one upstream call. Lookups go through an
+in-process LRU, then a local SQLite file shared by the workers on the host;
+both tiers expire entries after the TTL. Concurrent misses for the same key
+are coalesced: one caller fetches, the others wait for its result.
+Failed lookups (fetch returned None) are never stored.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+DEFAULTS = {
+    "PATH": None,
+    "PRECISION": 4,
+    "TTL_SECONDS": 24 * 3600,
+    "MEMORY_SIZE": 2048,
+}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class GeoResultCache:
+    def __init__(self, path=None, precision=4, ttl=24 * 3600, maxsize=2048, clock=time.time):
+        self.path = path
+        self.precision = precision
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = dict.fromkeys(
+            ("memory_hits", "disk_hits", "misses", "coalesced", "stored", "upstream_ms", "saved_ms"), 0
+        )
+        if path:
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS geo_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "fetch_ms REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    # -- keys ------------------------------------------------------------
+
+    def quantize(self, lat, lng):
+        return f"{round(float(lat), self.precision):.{self.precision}f},{round(float(lng), self.precision):.{self.precision}f}"
+
+    def key(self, kind, points, mode="", **options):
+        """Stable key for `kind` (e.g. "direction") over (lat, lng) points, a travel mode and extra options."""
+        raw = json.dumps(
+            [kind, [self.quantize(lat, lng) for lat, lng in points], mode, sorted(options.items())],
+            ensure_ascii=False, default=str,
+        )
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # -- tiers -----------------------------------------------------------
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def _memory_set(self, key, value, fetch_ms, expires_at):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (value, fetch_ms, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _disk_get(self, key, now):
+        if not self.path:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT value, fetch_ms, expires_at FROM geo_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def _disk_set(self, key, value, fetch_ms, expires_at):
+        if not self.path:
+            return
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO geo_cache (key, value, fetch_ms, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), fetch_ms, expires_at),
+            )
+        except sqlite3.Error:
+            pass
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+
+    # -- API -------------------------------------------------------------
+
+    def get_or_fetch(self, key, fetch):
+        """Cached value for `key`, or fetch() (at most one concurrent call per key). Values must be JSON-serializable."""
+        if self.ttl <= 0:
+            return fetch()
+        now = self._clock()
+        entry = self._memory_get(key, now)
+        if entry is not None:
+            self._count(memory_hits=1, saved_ms=entry[1])
+            return entry[0]
+        entry = self._disk_get(key, now)
+        if entry is not None:
+            self._memory_set(key, *entry)
+            self._count(disk_hits=1, saved_ms=entry[1])
+            return entry[0]
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+        if not leader:
+            call.done.wait()
+            self._count(coalesced=1)
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            started = time.perf_counter()
+            call.value = fetch()
+            fetch_ms = (time.perf_counter() - started) * 1000
+            self._count(misses=1, upstream_ms=fetch_ms)
+            if call.value is not None:
+                expires_at = self._clock() + self.ttl
+                self._memory_set(key, call.value, fetch_ms, expires_at)
+                self._disk_set(key, call.value, fetch_ms, expires_at)
+                self._count(stored=1)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._memory)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"] + counters["coalesced"]
+        hits = lookups - counters["misses"]
+        counters["upstream_ms"] = round(counters["upstream_ms"], 1)
+        counters["saved_ms"] = round(counters["saved_ms"], 1)
+        return {**counters, "memory_size": size, "hit_rate": round(hits / lookups, 3) if lookups else None}
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        if self.path:
+            self._connection().execute("DELETE FROM geo_cache")
+
+    def purge_expired(self):
+        """Drop expired rows from the disk tier; returns how many were removed."""
+        if not self.path:
+            return 0
+        return self._connection().execute("DELETE FROM geo_cache WHERE expires_at <= ?", (self._clock(),)).rowcount
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_geo_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                conf = {**DEFAULTS, **getattr(settings, "GEO_CACHE", {})}
+                _cache = GeoResultCache(
+                    path=conf["PATH"],
+                    precision=conf["PRECISION"],
+                    ttl=conf["TTL_SECONDS"],
+                    maxsize=conf["MEMORY_SIZE"],
+                )
+    return _cache
+
+
+def set_geo_cache(cache):
+    """Swap the process-wide cache (tests / benchmarks); None rebuilds it from settings."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,128 @@
+"""
+Identity verification shared by core and the team apps.
+
+verify_request(request) answers "who is calling?" for any request. By default
+the access_token JWT is checked in-process with core.jwt_utils, and the user
+is looked up through the principal cache. The result is stored on the request,
+so later permission checks and context processors reuse it. The HTTP call to
+core's /api/auth/verify/ is used only when CORE_AUTH_VERIFY is "http", i.e.
+when the app runs as a separate service that cannot read core's users.
+"""
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from jwt import ExpiredSignatureError, InvalidTokenError
+
+from core.jwt_utils import decode_token
+from core.principal_cache import get_principal_cache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def get_token(request):
+    token = request.COOKIES.get("access_token")
+    if not token:
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            token = auth.split(" ", 1)[1].strip()
+    return token or None
+
+
+def authenticate_token(token):
+    """Return (user, payload) for a valid access token, or (None, None) if it is bad, expired or revoked."""
+    try:
+        payload = decode_token(token)
+    except (ExpiredSignatureError, InvalidTokenError):
+        return None, None
+    if payload.get("type") != "access":
+        return None, None
+
+    user_id = payload.get("sub")
+    tv = payload.get("tv")
+    cache = get_principal_cache()
+    user = cache.get(user_id, tv)
+    if user is None:
+        user = get_user_model().objects.filter(id=user_id, is_active=True).first()
+        if not user or user.token_version != tv:
+            return None, None
+        cache.set(user)
+    return user, payload
+
+
+def user_info(user):
+    """Same fields core's /api/auth/verify/ returns as X-User-* headers."""
+    return {
+        "id": str(user.pk),
+        "email": user.email,
+        "first_name": user.first_name or "",
+        "last_name": user.last_name or "",
+        "age": user.age,
+    }
+
+
+def verify_mode():
+    mode = getattr(settings, "CORE_AUTH_VERIFY", "auto")
+    if mode == "auto":
+        return "local" if apps.is_installed("core") else "http"
+    return mode
+
+
+def verify_request(request):
+    """User info dict for the caller, or None. Computed at most once per request."""
+    # DRF wraps the HttpRequest; memoize on the underlying one so views and permissions share it
+    request = getattr(request, "_request", request)
+    cached = getattr(request, "_core_identity", _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    if verify_mode() == "http":
+        identity = _verify_via_http(request)
+    else:
+        identity = _verify_locally(request)
+    request._core_identity = identity
+    return identity
+
+
+def _verify_locally(request):
+    # JWTAuthenticationMiddleware has usually resolved the user already
+    user = getattr(request, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        return user_info(user)
+
+    token = get_token(request)
+    if not token:
+        return None
+    user, _ = authenticate_token(token)
+    return user_info(user) if user else None
+
+
+def _verify_via_http(request):
+    import requests
+
+    token = get_token(request)
+    if not token:
+        return None
+    base_url = (getattr(settings, "CORE_BASE_URL", None) or "").rstrip("/")
+    try:
+        resp = requests.get(
+            f"{base_url}/api/auth/verify/",
+            cookies={"access_token": token},
+            timeout=getattr(settings, "CORE_AUTH_TIMEOUT_SECONDS", 2),
+        )
+    except requests.RequestException as e:
+        logger.debug("Core auth request failed: %s", e)
+        return None
+    if resp.status_code != 200:
+        return None
+    age = resp.headers.get("X-User-Age", "")
+    return {
+        "id": resp.headers.get("X-User-Id"),
+        "email": resp.headers.get("X-User-Email"),
+        "first_name": resp.headers.get("X-User-First-Name", ""),
+        "last_name": resp.headers.get("X-User-Last-Name", ""),
+        "age": int(age) if age.isdigit() else None,
+    }
@@ -0,0 +1,48 @@
+"""
+Incremental readers for large JSON fixture files.
+
+iter_json_array yields the elements of a top-level JSON array one at a time
+(or the lines of a .jsonl file), so loaders never hold the whole decoded
+document in memory. Used by the team13 bulk importer and the team4 fixture
+loaders.
+"""
+import json
+
+
+def iter_json_array(path, read_size=1 << 16):
+    """Yield (index, element) pairs (1-based) from a JSON array or JSON Lines file."""
+    if str(path).endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    yield n, json.loads(line)
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(read_size).lstrip("﻿ \t\r\n")
+        if not buf.startswith("["):
+            raise ValueError(f"{path}: expected a JSON array")
+        buf, eof, n = buf[1:], False, 0
+        while True:
+            buf = buf.lstrip(" \t\r\n,")
+            if buf.startswith("]"):
+                return
+            if not buf and eof:
+                raise ValueError(f"{path}: unterminated JSON array")
+            try:
+                item, end = decoder.raw_decode(buf)
+                # An element that ends exactly at the buffer edge may be cut short (e.g. a number).
+                complete = eof or end < len(buf)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                more = f.read(read_size)
+                eof = not more
+                buf += more
+                continue
+            n += 1
+            yield n, item
+            buf = buf[end:]
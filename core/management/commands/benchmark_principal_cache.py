@@ -0,0 +1,53 @@
+# Requests/sec on an authenticated endpoint (/api/auth/me/) through the full middleware stack,
+# with JWTAuthenticationMiddleware's principal cache disabled vs enabled.
+# The benchmark user is created inside a transaction that is rolled back at the end.
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+
+from core.jwt_utils import create_access_token
+from core.principal_cache import PrincipalCache, set_principal_cache
+
+
+class Command(BaseCommand):
+    help = "Benchmark authenticated requests/sec with and without the JWT principal cache (default DB, e.g. SQLite)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per mode.")
+        parser.add_argument("--path", default="/api/auth/me/")
+
+    def _run(self, client, path, n):
+        for _ in range(50):
+            client.get(path, HTTP_HOST="localhost")
+        t0 = time.perf_counter()
+        for _ in range(n):
+            response = client.get(path, HTTP_HOST="localhost")
+        elapsed = time.perf_counter() - t0
+        if response.status_code != 200:
+            self.stderr.write(f"Unexpected status {response.status_code} for {path}")
+        return n / elapsed, elapsed / n * 1000
+
+    def handle(self, *args, **options):
+        n = max(1, options["requests"])
+        path = options["path"]
+        self.stdout.write(f"database vendor: {connection.vendor}")
+
+        header = f"{'mode':>10} {'req/s':>10} {'ms/req':>8} {'user queries':>13}"
+        self.stdout.write(header)
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(email="benchmark-principal@example.com", password=None)
+                client = Client()
+                client.cookies["access_token"] = create_access_token(user)
+
+                for label, cache in (("no cache", PrincipalCache(maxsize=0)), ("cache", PrincipalCache())):
+                    set_principal_cache(cache)
+                    rps, ms = self._run(client, path, n)
+                    queries = "1/req" if not cache.enabled else f"{cache.misses} total"
+                    self.stdout.write(f"{label:>10} {rps:>10.0f} {ms:>8.3f} {queries:>13}")
+                transaction.set_rollback(True)
+        finally:
+            set_principal_cache(None)
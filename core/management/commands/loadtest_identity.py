@@ -0,0 +1,90 @@
+# Load test for team-app identity checks: the same authenticated team13 page is requested with
+# CORE_AUTH_VERIFY="http" (every request calls core's /api/auth/verify/ over HTTP, the old behaviour)
+# and with in-process JWT verification (core.identity). Core runs in a background thread on an
+# ephemeral port so the requests it receives can be counted.
+import statistics
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from core.jwt_utils import create_access_token
+from core.principal_cache import set_principal_cache
+
+LOADTEST_EMAIL = "loadtest-identity@example.com"
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class _CountingApp:
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.count += 1
+        return self.app(environ, start_response)
+
+
+class Command(BaseCommand):
+    help = "Compare end-to-end latency and core request volume for HTTP vs in-process identity verification."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="Requests per mode.")
+        parser.add_argument("--path", default="/team13/", help="Authenticated team page to request.")
+
+    def _run(self, client, path, n):
+        timings = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            response = client.get(path, HTTP_HOST="localhost")
+            timings.append((time.perf_counter() - t0) * 1000)
+        if response.status_code != 200:
+            self.stderr.write(f"Unexpected status {response.status_code} for {path}")
+        timings.sort()
+        return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+    def handle(self, *args, **options):
+        n = max(1, options["requests"])
+        path = options["path"]
+
+        core_app = _CountingApp(WSGIHandler())
+        server = make_server("127.0.0.1", 0, core_app, server_class=_ThreadingWSGIServer, handler_class=_QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        core_url = f"http://127.0.0.1:{server.server_port}"
+
+        # Committed so core's server thread can see it. Reused between runs rather than deleted:
+        # deleting a core user cascades into team tables that live in other databases.
+        User = get_user_model()
+        user = User.objects.filter(email=LOADTEST_EMAIL).first() or User.objects.create_user(email=LOADTEST_EMAIL)
+        try:
+            client = Client()
+            client.cookies["access_token"] = create_access_token(user)
+            # Warm up templates and URL resolving before timing
+            client.get(path, HTTP_HOST="localhost")
+
+            self.stdout.write(f"{'mode':>8} {'p50 ms':>8} {'p95 ms':>8} {'core reqs':>10}")
+            for mode in ("http", "local"):
+                set_principal_cache(None)
+                with override_settings(CORE_AUTH_VERIFY=mode, CORE_BASE_URL=core_url):
+                    before = core_app.count
+                    p50, p95 = self._run(client, path, n)
+                    self.stdout.write(f"{mode:>8} {p50:>8.2f} {p95:>8.2f} {core_app.count - before:>10}")
+        finally:
+            server.shutdown()
+            server.server_close()
+            set_principal_cache(None)
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+
+class PrincipalCache:
+    """
+    Per-process LRU of user snapshots for JWTAuthenticationMiddleware.
+
+    Each entry holds the concrete field values of an active user (including
+    token_version) for `ttl` seconds, so a request whose token carries the
+    cached version can be authenticated without a User query. Entries are
+    evicted on logout / user save in this process (see invalidate_principal);
+    other processes converge within `ttl`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, user_id, token_version):
+        """Return a fresh User built from the snapshot, or None on a miss / version mismatch."""
+        if not self.enabled:
+            return None
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None or entry[0]["token_version"] != token_version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            values = entry[0]
+
+        # A new instance per request: views mutate and save request.user
+        User = get_user_model()
+        return User.from_db(User.objects.db, list(values), list(values.values()))
+
+    def set(self, user):
+        if not self.enabled:
+            return
+        values = {field.attname: getattr(user, field.attname) for field in user._meta.concrete_fields}
+        with self._lock:
+            self._entries[str(user.pk)] = (values, self._clock() + self.ttl)
+            self._entries.move_to_end(str(user.pk))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_principal_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PrincipalCache(
+                    maxsize=getattr(settings, "JWT_PRINCIPAL_CACHE_SIZE", 1024),
+                    ttl=getattr(settings, "JWT_PRINCIPAL_CACHE_TTL_SECONDS", 30),
+                )
+    return _cache
+
+
+def set_principal_cache(cache):
+    """Swap the process-wide cache (tests / benchmarks); None rebuilds it from settings."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def invalidate_principal(user_id):
+    """Evict a user now and again once the surrounding transaction commits."""
+    cache = get_principal_cache()
+    cache.invalidate(user_id)
+    transaction.on_commit(lambda: cache.invalidate(user_id))
+
+
+def revoke_tokens(user):
+    """Bump token_version so every issued access/refresh token stops validating."""
+    user.token_version += 1
+    user.save(update_fields=["token_version"])
+    invalidate_principal(user.pk)
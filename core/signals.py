@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.principal_cache import invalidate_principal
+
+User = get_user_model()
+
+
+# Any change to a user (password, is_active, token_version, admin edits)
+# drops its cached principal in this process
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_principal(sender, instance, **kwargs):
+    invalidate_principal(instance.pk)
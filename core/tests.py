@@ -1,6 +1,14 @@
-from django.test import TestCase
+from unittest.mock import Mock, patch
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.contrib.auth import get_user_model
 
+from core.geo_cache import GeoResultCache
+from core.jwt_utils import create_access_token
+from core.json_stream import iter_json_array
+from core.identity import verify_request
+from core.principal_cache import PrincipalCache, get_principal_cache, revoke_tokens, set_principal_cache
+
 User = get_user_model()
 
 class AuthFlowTests(TestCase):
@@ -22,3 +30,202 @@ class AuthFlowTests(TestCase):
         # logout
         res3 = self.client.post("/api/auth/logout/", data="{}", content_type="application/json")
         self.assertEqual(res3.status_code, 200)
+
+
+class PrincipalCacheTests(TestCase):
+    def setUp(self):
+        set_principal_cache(None)
+        self.addCleanup(set_principal_cache, None)
+        self.user = User.objects.create_user(email="c@test.com", password="pass1234")
+        self.client.cookies["access_token"] = create_access_token(self.user)
+
+    def test_repeat_requests_skip_user_query(self):
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        with self.assertNumQueries(0):
+            res = self.client.get("/api/auth/me/")
+        self.assertEqual(res.json()["user"]["email"], "c@test.com")
+        self.assertEqual(get_principal_cache().stats()["hits"], 1)
+
+    def test_logout_revokes_cached_token_immediately(self):
+        old_token = self.client.cookies["access_token"].value
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        self.client.post("/api/auth/logout/", data="{}", content_type="application/json")
+
+        self.client.cookies["access_token"] = old_token
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+    def test_user_changes_evict_the_snapshot(self):
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        self.user.set_password("new-pass-5678")
+        self.user.save()
+        self.assertEqual(get_principal_cache().stats()["size"], 0)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        set_principal_cache(PrincipalCache(ttl=30, clock=lambda: now[0]))
+        self.client.get("/api/auth/me/")
+        # Revoked behind the cache's back (e.g. by another worker)
+        User.objects.filter(pk=self.user.pk).update(token_version=5)
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+
+        now[0] += 31
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = PrincipalCache(maxsize=1)
+        other = User.objects.create_user(email="d@test.com", password="pass1234")
+        cache.set(self.user)
+        cache.set(other)
+        self.assertIsNone(cache.get(self.user.pk, 0))
+        cached = cache.get(other.pk, 0)
+        self.assertEqual(cached.email, "d@test.com")
+        self.assertIsNot(cached, other)
+
+
+class IdentityVerificationTests(TestCase):
+    def setUp(self):
+        set_principal_cache(None)
+        self.addCleanup(set_principal_cache, None)
+        self.user = User.objects.create_user(email="e@test.com", password="pass1234", first_name="E", age=30)
+        self.token = create_access_token(self.user)
+
+    def _request(self, token=None):
+        request = RequestFactory().get("/team13/")
+        if token:
+            request.COOKIES["access_token"] = token
+        return request
+
+    def test_local_verification_is_memoized_on_the_request(self):
+        request = self._request(self.token)
+        with patch("requests.get") as http_get:
+            with self.assertNumQueries(1):
+                identity = verify_request(request)
+                self.assertIs(verify_request(request), identity)
+        http_get.assert_not_called()
+        self.assertEqual(identity["id"], str(self.user.pk))
+        self.assertEqual((identity["email"], identity["age"]), ("e@test.com", 30))
+
+    def test_invalid_or_revoked_tokens_are_rejected(self):
+        self.assertIsNone(verify_request(self._request()))
+        self.assertIsNone(verify_request(self._request("not-a-jwt")))
+        revoke_tokens(self.user)
+        self.assertIsNone(verify_request(self._request(self.token)))
+
+    @override_settings(CORE_AUTH_VERIFY="http", CORE_BASE_URL="http://core:8000")
+    def test_http_mode_calls_core_once_per_request(self):
+        headers = {"X-User-Id": str(self.user.pk), "X-User-Email": "e@test.com", "X-User-Age": "30"}
+        request = self._request(self.token)
+        with patch("requests.get", return_value=Mock(status_code=200, headers=headers)) as http_get:
+            verify_request(request)
+            identity = verify_request(request)
+        http_get.assert_called_once()
+        self.assertEqual(http_get.call_args.args[0], "http://core:8000/api/auth/verify/")
+        self.assertEqual(identity["age"], 30)
+
+    @override_settings(CORE_BASE_URL="http://core:8000")
+    def test_team13_user_info_is_resolved_in_process(self):
+        from team13.core_auth import get_current_user_info
+
+        with patch("requests.get") as http_get:
+            info = get_current_user_info(self._request(self.token))
+        http_get.assert_not_called()
+        self.assertEqual(info["email"], "e@test.com")
+
+
+class GeoResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = f"{tmp.name}/geo.sqlite3"
+        self.now = 1000.0
+
+    def _cache(self, **kwargs):
+        return GeoResultCache(path=self.path, clock=lambda: self.now, **kwargs)
+
+    def test_nearby_coordinates_share_an_entry(self):
+        cache = self._cache(precision=4)
+        fetch = Mock(return_value={"distance": 12.5})
+        for lat, lng in ((35.70001, 51.40002), (35.70004, 51.39998), (35.69996, 51.4)):
+            key = cache.key("direction", [(lat, lng), (35.8, 51.5)], "car", avoidTrafficZone="false")
+            self.assertEqual(cache.get_or_fetch(key, fetch), {"distance": 12.5})
+        fetch.assert_called_once()
+        self.assertNotEqual(key, cache.key("direction", [(35.7, 51.4), (35.8, 51.5)], "motorcycle", avoidTrafficZone="false"))
+        stats = cache.stats()
+        self.assertEqual((stats["misses"], stats["memory_hits"], stats["hit_rate"]), (1, 2, 0.667))
+
+    def test_disk_tier_survives_a_new_process_until_ttl(self):
+        key = self._cache().key("reverse", [(35.7, 51.4)])
+        self._cache(ttl=60).get_or_fetch(key, lambda: {"address": "تهران"})
+
+        fresh = self._cache(ttl=60)
+        self.assertEqual(fresh.get_or_fetch(key, Mock(side_effect=AssertionError)), {"address": "تهران"})
+        self.assertEqual(fresh.stats()["disk_hits"], 1)
+
+        self.now += 61
+        self.assertEqual(self._cache(ttl=60).get_or_fetch(key, lambda: {"address": "new"}), {"address": "new"})
+        self.assertEqual(fresh.get_or_fetch(key, Mock(side_effect=AssertionError)), {"address": "new"})
+
+    def test_failures_are_not_cached(self):
+        cache = self._cache()
+        fetch = Mock(side_effect=[None, {"ok": True}])
+        self.assertIsNone(cache.get_or_fetch("k", fetch))
+        self.assertEqual(cache.get_or_fetch("k", fetch), {"ok": True})
+        self.assertEqual(cache.stats()["stored"], 1)
+
+    def test_concurrent_misses_are_coalesced(self):
+        import threading
+        import time
+
+        cache = GeoResultCache()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"eta": 15}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", slow_fetch))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"eta": 15}] * 8)
+        stats = cache.stats()
+        self.assertEqual(stats["coalesced"] + stats["memory_hits"], 7)
+
+
+class JsonStreamTests(SimpleTestCase):
+    def _write(self, name, text):
+        import os
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_array_elements_split_across_reads(self):
+        import json
+
+        items = [{"id": i, "name": "نام " * i, "score": 12345.678 * i} for i in range(50)] + [7, "x", None]
+        path = self._write("items.json", json.dumps(items, ensure_ascii=False, indent=2))
+        for read_size in (1, 7, 64, 1 << 16):
+            self.assertEqual([item for _, item in iter_json_array(path, read_size=read_size)], items)
+
+    def test_json_lines_and_invalid_input(self):
+        path = self._write("items.jsonl", '{"a": 1}\n\n{"a": 2}\n')
+        self.assertEqual(list(iter_json_array(path)), [(1, {"a": 1}), (3, {"a": 2})])
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array(self._write("object.json", '{"a": 1}')))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(self._write("truncated.json", '[{"a": 1}, {"a": ')))
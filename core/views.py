@@ -9,6 +9,7 @@ from django.contrib.auth.password_validation import validate_password
 
 from core.jwt_utils import create_access_token, create_refresh_token, decode_token
 from core.auth import api_login_required
+from core.principal_cache import revoke_tokens
 
 User = get_user_model()
 
@@ -175,8 +176,7 @@ def logout_api(request):
 
     user = getattr(request, "user", None)
     if user and getattr(user, "is_authenticated", False):
-        user.token_version += 1
-        user.save(update_fields=["token_version"])
+        revoke_tokens(user)
 
     resp = JsonResponse({"ok": True})
     _clear_auth_cookies(resp, settings)
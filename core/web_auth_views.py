@@ -5,6 +5,7 @@ from django.conf import settings
 
 from core.jwt_utils import create_access_token, create_refresh_token
 from core.views import _set_auth_cookies  # reuse same cookie logic
+from core.principal_cache import revoke_tokens
 
 User = get_user_model()
 
@@ -75,8 +76,7 @@ def signup_page(request):
 @require_http_methods(["GET", "POST"])
 def logout_page(request):
     if getattr(request, "user", None) is not None and request.user.is_authenticated:
-        request.user.token_version += 1
-        request.user.save(update_fields=["token_version"])
+        revoke_tokens(request.user)
 
     resp = redirect("home")
     resp.delete_cookie("access_token", path="/")
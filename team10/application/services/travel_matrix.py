@@ -0,0 +1,200 @@
+"""
+Travel matrix between the facilities of one trip plan.
+
+The planner asks for travel info between the same facilities over and over:
+every meal slot compares the current location against every restaurant, and
+every day ends with a return to the hotel. Asking the facilities service per
+pair costs two facility lookups each time (two HTTP calls with the Team 4 client).
+
+TravelMatrix takes the coordinates the planner already has (hotel, restaurants,
+attractions), computes the full origin x destination distance matrix in one
+vectorized NumPy pass, and memoizes the resulting TravelInfo for the rest of
+the plan. Facilities referenced only by ID are fetched once. A TravelInfoCache
+can be shared between runs to reuse results until they expire.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ...domain.models.facility import Facility
+from ...infrastructure.models.travel_info import TravelInfo
+from ...infrastructure.ports.facilities_service_port import FacilitiesServicePort
+
+EARTH_RADIUS_KM = 6371.0
+
+FacilityRef = Union[Facility, int]
+
+
+def haversine_matrix_km(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """Great-circle distances between two sets of points.
+
+    Args:
+        origins: Array of shape (n, 2) with (latitude, longitude) in degrees.
+        destinations: Array of shape (m, 2) with (latitude, longitude) in degrees.
+
+    Returns:
+        Array of shape (n, m) with distances in kilometers.
+    """
+    origins = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    destinations = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+    lat1 = origins[:, 0][:, None]
+    lon1 = origins[:, 1][:, None]
+    lat2 = destinations[:, 0][None, :]
+    lon2 = destinations[:, 1][None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    a = np.clip(a, 0.0, 1.0)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class TravelInfoCache:
+    """Thread-safe TravelInfo cache keyed by (from_facility_id, to_facility_id).
+
+    Entries expire after ttl_seconds. When max_entries is reached the expired
+    entries are dropped first, then the oldest ones.
+    """
+
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[float, TravelInfo]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, from_facility_id: int, to_facility_id: int) -> Optional[TravelInfo]:
+        """Return the cached TravelInfo for the pair, or None if missing or expired."""
+        key = (from_facility_id, to_facility_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, info = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return info
+
+    def set(self, info: TravelInfo) -> None:
+        """Store a TravelInfo until the cache TTL elapses."""
+        if self.ttl_seconds <= 0:
+            return
+        key = (info.from_facility_id, info.to_facility_id)
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl_seconds, info)
+            if len(self._entries) > self.max_entries:
+                self._evict(now)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class TravelMatrix:
+    """Memoized travel information between the facilities of one trip plan.
+
+    Create one per _create_trip_plan run, register the facilities the plan may
+    visit, then use distances_from / get_travel_info instead of calling
+    FacilitiesServicePort.get_travel_info per pair.
+    """
+
+    def __init__(
+        self,
+        facilities_service: FacilitiesServicePort,
+        facilities: Iterable[Facility] = (),
+        cache: Optional[TravelInfoCache] = None,
+    ):
+        self._facilities_service = facilities_service
+        self._cache = cache
+        self._index: Dict[int, int] = {}
+        self._coords: List[Tuple[float, float]] = []
+        self._missing_ids: set = set()
+        self._distances: Optional[np.ndarray] = None
+        self._travel_info: Dict[Tuple[int, int], TravelInfo] = {}
+        self.add_facilities(facilities)
+
+    def __contains__(self, facility_id: int) -> bool:
+        return facility_id in self._index
+
+    def add_facilities(self, facilities: Iterable[Facility]) -> None:
+        """Register facilities whose coordinates are already known."""
+        for facility in facilities:
+            if facility is None or facility.id is None or facility.id in self._index:
+                continue
+            self._index[facility.id] = len(self._coords)
+            self._coords.append((facility.latitude, facility.longitude))
+            self._distances = None
+
+    def add_facility_ids(self, facility_ids: Iterable[int]) -> None:
+        """Register facilities by ID, fetching each unknown one once from the facilities service."""
+        for facility_id in facility_ids:
+            if facility_id in self._index or facility_id in self._missing_ids:
+                continue
+            facility = self._facilities_service.get_facility_by_id(facility_id)
+            if facility is None:
+                self._missing_ids.add(facility_id)
+            else:
+                self.add_facilities([facility])
+
+    def _matrix(self) -> np.ndarray:
+        if self._distances is None:
+            coords = np.array(self._coords, dtype=float).reshape(-1, 2)
+            self._distances = haversine_matrix_km(coords, coords)
+        return self._distances
+
+    def _resolve(self, facility: FacilityRef) -> int:
+        if isinstance(facility, Facility):
+            self.add_facilities([facility])
+            return facility.id
+        self.add_facility_ids([facility])
+        return facility
+
+    def distances_from(self, origin: FacilityRef, destinations: List[FacilityRef]) -> np.ndarray:
+        """Distances in kilometers from origin to each destination, in order.
+
+        Pairs involving a facility with unknown coordinates fall back to the
+        facilities service estimate.
+        """
+        origin_id = self._resolve(origin)
+        destination_ids = [self._resolve(d) for d in destinations]
+        if origin_id in self._index and all(d in self._index for d in destination_ids):
+            columns = [self._index[d] for d in destination_ids]
+            return self._matrix()[self._index[origin_id], columns]
+        return np.array(
+            [self.get_travel_info(origin_id, d).distance_km for d in destination_ids],
+            dtype=float,
+        )
+
+    def get_travel_info(self, from_facility: FacilityRef, to_facility: FacilityRef) -> TravelInfo:
+        """Travel information between two facilities, computed once per pair."""
+        from_id = self._resolve(from_facility)
+        to_id = self._resolve(to_facility)
+        key = (from_id, to_id)
+        info = self._travel_info.get(key)
+        if info is not None:
+            return info
+
+        info = self._cache.get(from_id, to_id) if self._cache is not None else None
+        if info is None:
+            if from_id in self._index and to_id in self._index:
+                distance_km = float(self._matrix()[self._index[from_id], self._index[to_id]])
+                info = self._facilities_service.travel_info_for_distance(from_id, to_id, distance_km)
+            else:
+                info = self._facilities_service.get_travel_info(from_id, to_id)
+            if self._cache is not None:
+                self._cache.set(info)
+        self._travel_info[key] = info
+        return info
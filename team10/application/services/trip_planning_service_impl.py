@@ -19,6 +19,7 @@ from ...infrastructure.ports.facilities_service_port import FacilitiesServicePor
 from ...infrastructure.ports.recommendation_service_port import RecommendationServicePort
 from ...infrastructure.models.recommended_place import RecommendedPlace
 from .trip_planning_service import TripPlanningService
+from .travel_matrix import TravelInfoCache, TravelMatrix
 
 
 @dataclass
@@ -61,15 +62,20 @@ class TripPlanningServiceImpl(TripPlanningService):
     DINNER_END = 21
     LATEST_RETURN = 23  # Latest time user can stay out
 
+    # Builds the per-plan travel matrix (see travel_matrix.TravelMatrix)
+    travel_matrix_class = TravelMatrix
+
     def __init__(
         self,
         facilities_service: FacilitiesServicePort,
         recommendation_service: RecommendationServicePort,
         wiki_service: WikiServicePort,
+        travel_cache: Optional[TravelInfoCache] = None,
     ):
         self._facilities_service = facilities_service
         self._recommendation_service = recommendation_service
         self._wiki_service = wiki_service
+        self._travel_cache = travel_cache
 
     def create_initial_trip(self, requirements_data: dict, user_id: str) -> TripModel:
         """Create an initial trip based on user requirements.
@@ -227,6 +233,13 @@ class TripPlanningServiceImpl(TripPlanningService):
         attractions = self._get_attractions_from_recommendations(
             recommended_places, region_id, preferences
         )
+
+        # Distances between every facility this plan can visit, computed once
+        travel_matrix = self.travel_matrix_class(
+            self._facilities_service,
+            [hotel, *restaurants, *(facility for facility, _ in attractions)],
+            cache=self._travel_cache,
+        )
         
         # Track visited places to avoid duplicates
         visited_place_ids = set()
@@ -263,6 +276,7 @@ class TripPlanningServiceImpl(TripPlanningService):
                 visited_place_ids=visited_place_ids,
                 current_facility=current_facility,
                 preferences=preferences,
+                travel_matrix=travel_matrix,
                 is_golden_hour=True  # Morning is golden hour for high-priority activities
             )
             
@@ -271,13 +285,11 @@ class TripPlanningServiceImpl(TripPlanningService):
 
             # Lunch (12:30 - 14:00)
             lunch_restaurant = self._select_restaurant_near_facility(
-                restaurants, current_facility, budget_level
+                restaurants, current_facility, budget_level, travel_matrix
             )
             if lunch_restaurant:
                 # Calculate travel time to restaurant
-                travel_info = self._facilities_service.get_travel_info(
-                    current_facility.id, lunch_restaurant.id
-                )
+                travel_info = travel_matrix.get_travel_info(current_facility, lunch_restaurant)
                 lunch_start = current_date.replace(hour=12, minute=30)
                 
                 lunch_plan = DailyPlan.objects.create(
@@ -331,6 +343,7 @@ class TripPlanningServiceImpl(TripPlanningService):
                 visited_place_ids=visited_place_ids,
                 current_facility=current_facility,
                 preferences=preferences,
+                travel_matrix=travel_matrix,
                 is_golden_hour=False
             )
             
@@ -339,13 +352,11 @@ class TripPlanningServiceImpl(TripPlanningService):
 
             # Dinner (19:00 - 20:30)
             dinner_restaurant = self._select_restaurant_near_facility(
-                restaurants, current_facility, budget_level
+                restaurants, current_facility, budget_level, travel_matrix
             )
             if dinner_restaurant and dinner_restaurant.id != (lunch_restaurant.id if lunch_restaurant else None):
                 # Calculate travel time to restaurant
-                travel_info = self._facilities_service.get_travel_info(
-                    current_facility.id, dinner_restaurant.id
-                )
+                travel_info = travel_matrix.get_travel_info(current_facility, dinner_restaurant)
                 dinner_start = current_date.replace(hour=19, minute=0)
                 
                 dinner_plan = DailyPlan.objects.create(
@@ -380,9 +391,7 @@ class TripPlanningServiceImpl(TripPlanningService):
                 
                 # If not at hotel, add transfer to hotel for dinner
                 if current_facility.id != hotel.id:
-                    travel_info = self._facilities_service.get_travel_info(
-                        current_facility.id, hotel.id
-                    )
+                    travel_info = travel_matrix.get_travel_info(current_facility, hotel)
                     
                     hotel_dinner_plan = DailyPlan.objects.create(
                         trip=trip,
@@ -437,6 +446,7 @@ class TripPlanningServiceImpl(TripPlanningService):
                     visited_place_ids=visited_place_ids,
                     current_facility=current_facility,
                     preferences=preferences,
+                    travel_matrix=travel_matrix,
                     is_golden_hour=False,
                     is_optional=True
                 )
@@ -445,9 +455,7 @@ class TripPlanningServiceImpl(TripPlanningService):
 
             # Return to hotel at end of day for sleeping (if not already at hotel)
             if current_facility.id != hotel.id:
-                travel_info = self._facilities_service.get_travel_info(
-                    current_facility.id, hotel.id
-                )
+                travel_info = travel_matrix.get_travel_info(current_facility, hotel)
                 
                 # Determine return time based on last activity
                 if evening_activity:
@@ -572,6 +580,7 @@ class TripPlanningServiceImpl(TripPlanningService):
         visited_place_ids: set,
         current_facility: Facility,
         preferences: List[str],
+        travel_matrix: TravelMatrix,
         is_golden_hour: bool = False,
         is_optional: bool = False
     ) -> Tuple[Optional[Facility], int, set]:
@@ -587,6 +596,7 @@ class TripPlanningServiceImpl(TripPlanningService):
             visited_place_ids: Set of already visited place IDs
             current_facility: Current location facility
             preferences: User preference tags
+            travel_matrix: Travel info memoized for the current plan
             is_golden_hour: If True, prefer high-scored attractions
             is_optional: If True, skip if no suitable attraction
             
@@ -634,9 +644,7 @@ class TripPlanningServiceImpl(TripPlanningService):
             return None, attraction_index, visited_place_ids
 
         # Calculate travel time from current location
-        travel_info = self._facilities_service.get_travel_info(
-            current_facility.id, selected_attraction.id
-        )
+        travel_info = travel_matrix.get_travel_info(current_facility, selected_attraction)
         
         # Adjust start time to account for travel
         actual_start = current_date.replace(hour=start_hour, minute=0) + timedelta(minutes=travel_info.duration_minutes)
@@ -692,7 +700,8 @@ class TripPlanningServiceImpl(TripPlanningService):
         self,
         restaurants: List[Facility],
         current_facility: Facility,
-        budget_level: str
+        budget_level: str,
+        travel_matrix: TravelMatrix
     ) -> Optional[Facility]:
         """Select a restaurant near the current facility matching budget.
         
@@ -705,6 +714,7 @@ class TripPlanningServiceImpl(TripPlanningService):
             restaurants: List of available restaurants
             current_facility: Current location
             budget_level: Target budget level
+            travel_matrix: Travel info memoized for the current plan
             
         Returns:
             Selected restaurant or None
@@ -713,13 +723,11 @@ class TripPlanningServiceImpl(TripPlanningService):
             return None
 
         # Calculate distances and filter by budget
+        distances = travel_matrix.distances_from(current_facility, restaurants)
         restaurant_distances = []
-        for restaurant in restaurants:
-            travel_info = self._facilities_service.get_travel_info(
-                current_facility.id, restaurant.id
-            )
+        for restaurant, distance_km in zip(restaurants, distances):
             matches_budget = self._cost_to_budget_level(restaurant.cost, 'RESTAURANT') == budget_level
-            restaurant_distances.append((restaurant, travel_info.distance_km, matches_budget))
+            restaurant_distances.append((restaurant, round(float(distance_km), 2), matches_budget))
 
         # Sort by: budget match first, then distance
         restaurant_distances.sort(key=lambda x: (not x[2], x[1]))
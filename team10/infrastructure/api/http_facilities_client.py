@@ -188,26 +188,7 @@ class HttpFacilitiesClient(FacilitiesServicePort):
                 estimated_cost=200000.0,
             )
         distance_km = self._haversine_km(from_f.latitude, from_f.longitude, to_f.latitude, to_f.longitude)
-        if distance_km <= 1.0:
-            transport_mode = TransportMode.WALKING
-            duration_minutes = max(5, int(distance_km * 12))
-            estimated_cost = 0.0
-        elif distance_km <= 10.0:
-            transport_mode = TransportMode.TAXI
-            duration_minutes = max(5, int(distance_km * 3))
-            estimated_cost = 100000.0 + distance_km * 30000
-        else:
-            transport_mode = TransportMode.DRIVING
-            duration_minutes = max(5, int(distance_km * 2))
-            estimated_cost = distance_km * 15000
-        return TravelInfo(
-            from_facility_id=from_facility_id,
-            to_facility_id=to_facility_id,
-            distance_km=round(distance_km, 2),
-            duration_minutes=duration_minutes,
-            transport_mode=transport_mode,
-            estimated_cost=float(int(estimated_cost)),
-        )
+        return self.travel_info_for_distance(from_facility_id, to_facility_id, distance_km)
 
     @staticmethod
     def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
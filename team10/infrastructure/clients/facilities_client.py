@@ -584,7 +584,12 @@ class MockFacilitiesClient(FacilitiesServicePort):
             from_facility.latitude, from_facility.longitude,
             to_facility.latitude, to_facility.longitude
         )
-        
+        return self.travel_info_for_distance(from_facility_id, to_facility_id, distance_km)
+
+    def travel_info_for_distance(
+        self, from_facility_id: int, to_facility_id: int, distance_km: float
+    ) -> TravelInfo:
+        """Build travel information for a known distance (walking up to 3 km)."""
         # Determine transport mode, duration, and cost based on distance
         if distance_km <= 1.0:
             transport_mode = TransportMode.WALKING
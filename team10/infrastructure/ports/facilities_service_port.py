@@ -5,7 +5,7 @@ from datetime import datetime
 from ..models.region import Region
 from ..models.search_criteria import SearchCriteria
 from ..models.facility_cost_estimate import FacilityCostEstimate
-from ..models.travel_info import TravelInfo
+from ..models.travel_info import TravelInfo, TransportMode
 from ...domain.models.facility import Facility
 
 
@@ -116,3 +116,41 @@ class FacilitiesServicePort(ABC):
             TravelInfo with distance, time, transport mode, and cost.
         """
         pass
+
+    def travel_info_for_distance(
+        self, from_facility_id: int, to_facility_id: int, distance_km: float
+    ) -> TravelInfo:
+        """Build travel information for a known straight-line distance.
+
+        get_travel_info implementations and the planner's TravelMatrix share this
+        so that both produce the same transport mode, duration, and cost for a pair.
+        Clients with different pricing rules override it.
+
+        Args:
+            from_facility_id: The starting facility ID.
+            to_facility_id: The destination facility ID.
+            distance_km: Distance between the two facilities in kilometers.
+
+        Returns:
+            TravelInfo with distance, time, transport mode, and cost.
+        """
+        if distance_km <= 1.0:
+            transport_mode = TransportMode.WALKING
+            duration_minutes = max(5, int(distance_km * 12))
+            estimated_cost = 0.0
+        elif distance_km <= 10.0:
+            transport_mode = TransportMode.TAXI
+            duration_minutes = max(5, int(distance_km * 3))
+            estimated_cost = 100000.0 + distance_km * 30000
+        else:
+            transport_mode = TransportMode.DRIVING
+            duration_minutes = max(5, int(distance_km * 2))
+            estimated_cost = distance_km * 15000
+        return TravelInfo(
+            from_facility_id=from_facility_id,
+            to_facility_id=to_facility_id,
+            distance_km=round(distance_km, 2),
+            duration_minutes=duration_minutes,
+            transport_mode=transport_mode,
+            estimated_cost=float(int(estimated_cost)),
+        )
@@ -0,0 +1,156 @@
+"""
+Benchmark trip plan generation against a local stand-in for the Team 4 facilities API.
+
+Compares the per-pair travel lookups the planner used to make
+(FacilitiesServicePort.get_travel_info for every pair) with the memoized TravelMatrix.
+The generated plan is rolled back, so the team10 database is left untouched.
+"""
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from team10.application.services.travel_matrix import TravelMatrix
+from team10.application.services.trip_planning_service_impl import TripPlanningServiceImpl
+from team10.infrastructure.api.http_facilities_client import HttpFacilitiesClient
+from team10.infrastructure.clients.recommendation_client import MockRecommendationClient
+from team10.infrastructure.clients.wiki_client import MockWikiClient
+from team10.infrastructure.models.recommended_place import RecommendedPlace
+from team10.models import Trip, TripRequirements
+
+# Around Isfahan
+CENTER = (32.6546, 51.6680)
+FACILITY_PATH = re.compile(r"^/team4/api/facilities/(\d+)/$")
+
+
+class PerPairTravelMatrix(TravelMatrix):
+    """Previous planner behaviour: every lookup goes to the facilities service."""
+
+    def get_travel_info(self, from_facility, to_facility):
+        from_id = getattr(from_facility, "id", from_facility)
+        to_id = getattr(to_facility, "id", to_facility)
+        return self._facilities_service.get_travel_info(from_id, to_id)
+
+    def distances_from(self, origin, destinations):
+        return np.array([self.get_travel_info(origin, d).distance_km for d in destinations], dtype=float)
+
+
+def _synthetic_places(n_hotels, n_restaurants, n_attractions, rng):
+    places = {}
+    counts = (("hotel", n_hotels), ("restaurant", n_restaurants), ("museum", n_attractions))
+    fac_id = 1
+    for category, count in counts:
+        for _ in range(count):
+            places[fac_id] = {
+                "fac_id": fac_id,
+                "name_fa": f"{category} {fac_id}",
+                "category": category,
+                "price_tier": rng.choice(["budget", "moderate", "expensive"]),
+                "location": {
+                    "type": "Point",
+                    "coordinates": [CENTER[1] + rng.uniform(-0.1, 0.1), CENTER[0] + rng.uniform(-0.1, 0.1)],
+                },
+            }
+            fac_id += 1
+    return places
+
+
+def _start_stand_in(places, latency_ms):
+    """Serve the Team 4 endpoints the HTTP facilities client uses, from memory."""
+    counter = {"requests": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, payload, status=200):
+            counter["requests"] += 1
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            match = FACILITY_PATH.match(self.path)
+            if match and int(match.group(1)) in places:
+                self._reply(places[int(match.group(1))])
+            else:
+                self._reply({"detail": "not found"}, status=404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            data = json.loads(self.rfile.read(length) or b"{}")
+            category = data.get("category")
+            results = [p for p in places.values() if not category or p["category"] == category]
+            self._reply({"count": len(results), "results": results})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counter
+
+
+class Command(BaseCommand):
+    help = "Benchmark trip plan generation (per-pair travel lookups vs TravelMatrix) against a local Team 4 stand-in."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=5)
+        parser.add_argument("--restaurants", type=int, default=50)
+        parser.add_argument("--attractions", type=int, default=20)
+        parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial latency per stand-in request.")
+        parser.add_argument("--seed", type=int, default=10)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        places = _synthetic_places(3, options["restaurants"], options["attractions"], rng)
+        server, counter = _start_stand_in(places, options["latency_ms"])
+        recommended = [
+            RecommendedPlace(place_id=str(p["fac_id"]), score=rng.random())
+            for p in places.values() if p["category"] == "museum"
+        ]
+        start = timezone.make_aware(datetime(2030, 1, 1))
+        end = start + timedelta(days=options["days"])
+
+        try:
+            self.stdout.write(f"{'mode':>10} {'seconds':>9} {'requests':>9} {'transfers':>10}")
+            for label, matrix_class in (("per-pair", PerPairTravelMatrix), ("matrix", TravelMatrix)):
+                service = TripPlanningServiceImpl(
+                    facilities_service=HttpFacilitiesClient(base_url=f"http://127.0.0.1:{server.server_port}"),
+                    recommendation_service=MockRecommendationClient(),
+                    wiki_service=MockWikiClient(),
+                )
+                service.travel_matrix_class = matrix_class
+                counter["requests"] = 0
+                with transaction.atomic(using="team10"):
+                    requirements = TripRequirements.objects.create(
+                        user_id="benchmark", start_at=start, end_at=end, destination_name="اصفهان", region_id="2"
+                    )
+                    trip = Trip.objects.create(user_id="benchmark", requirements=requirements, destination_name="اصفهان")
+                    t0 = time.perf_counter()
+                    service._create_trip_plan(
+                        trip=trip,
+                        start_date=start,
+                        end_date=end,
+                        region_id="2",
+                        budget_level="MODERATE",
+                        preferences=["history"],
+                        recommended_places=recommended,
+                    )
+                    elapsed = time.perf_counter() - t0
+                    transfers = trip.transfer_plans.count()
+                    transaction.set_rollback(True, using="team10")
+                self.stdout.write(f"{label:>10} {elapsed:>9.3f} {counter['requests']:>9} {transfers:>10}")
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -9,6 +9,7 @@ from .infrastructure.clients.facilities_client import MockFacilitiesClient
 from .infrastructure.clients.recommendation_client import MockRecommendationClient
 from .infrastructure.clients.wiki_client import MockWikiClient
 from .application.services.trip_planning_service_impl import TripPlanningServiceImpl
+from .application.services.travel_matrix import TravelInfoCache
 
 # Singleton infrastructure service instances
 facilities_service = MockFacilitiesClient()
@@ -20,6 +21,8 @@ trip_planning_service = TripPlanningServiceImpl(
     facilities_service=facilities_service,
     recommendation_service=recommendation_service,
     wiki_service=wiki_service,
+    # Travel info between facilities is reused across trips for 15 minutes
+    travel_cache=TravelInfoCache(ttl_seconds=900),
 )
 
 __all__ = [
@@ -1,6 +1,138 @@
-from django.test import TestCase
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from .application.services.travel_matrix import TravelInfoCache, TravelMatrix
+from .application.services.trip_planning_service_impl import TripPlanningServiceImpl
+from .infrastructure.api.http_facilities_client import HttpFacilitiesClient
+from .infrastructure.clients.facilities_client import MockFacilitiesClient
+from .infrastructure.clients.recommendation_client import MockRecommendationClient
+from .infrastructure.clients.wiki_client import MockWikiClient
+from .models import Trip, TripRequirements
+
 
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team10/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+class TravelMatrixTests(SimpleTestCase):
+    def setUp(self):
+        self.client_ = MockFacilitiesClient()
+        self.facilities = (
+            self.client_.get_hotels_in_region("2") + self.client_.get_restaurants_in_region("2")
+        )
+
+    def test_matches_client_travel_info(self):
+        matrix = TravelMatrix(self.client_, self.facilities)
+        for origin in self.facilities:
+            for destination in self.facilities:
+                self.assertEqual(
+                    matrix.get_travel_info(origin, destination),
+                    self.client_.get_travel_info(origin.id, destination.id),
+                )
+
+    def test_matches_http_client_policy(self):
+        http_client = HttpFacilitiesClient()
+        by_id = {f.id: f for f in self.facilities}
+        matrix = TravelMatrix(http_client, self.facilities)
+        with mock.patch.object(http_client, "get_facility_by_id", side_effect=by_id.get):
+            for origin in self.facilities:
+                for destination in self.facilities:
+                    self.assertEqual(
+                        matrix.get_travel_info(origin, destination),
+                        http_client.get_travel_info(origin.id, destination.id),
+                    )
+
+    def test_distances_from_is_vectorized_row(self):
+        matrix = TravelMatrix(self.client_, self.facilities)
+        origin = self.facilities[0]
+        distances = matrix.distances_from(origin, self.facilities)
+        self.assertEqual(len(distances), len(self.facilities))
+        for destination, distance in zip(self.facilities, distances):
+            expected = self.client_.get_travel_info(origin.id, destination.id).distance_km
+            self.assertAlmostEqual(float(distance), expected, places=2)
+
+    def test_unknown_ids_are_fetched_once(self):
+        hotel = self.facilities[0]
+        with mock.patch.object(
+            self.client_, "get_facility_by_id", wraps=self.client_.get_facility_by_id
+        ) as get_facility:
+            matrix = TravelMatrix(self.client_)
+            for _ in range(3):
+                matrix.get_travel_info(hotel.id, self.facilities[1].id)
+                matrix.distances_from(hotel.id, [f.id for f in self.facilities])
+        self.assertEqual(get_facility.call_count, len(self.facilities))
+
+    def test_missing_facility_falls_back_to_service(self):
+        matrix = TravelMatrix(self.client_, self.facilities)
+        info = matrix.get_travel_info(self.facilities[0], 999999)
+        self.assertEqual(info, self.client_.get_travel_info(self.facilities[0].id, 999999))
+
+
+class TravelInfoCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.client_ = MockFacilitiesClient()
+        self.hotel, self.restaurant = (
+            self.client_.get_hotels_in_region("2")[0], self.client_.get_restaurants_in_region("2")[0]
+        )
+
+    def test_shared_between_matrices(self):
+        cache = TravelInfoCache(ttl_seconds=60)
+        TravelMatrix(self.client_, [self.hotel, self.restaurant], cache=cache).get_travel_info(
+            self.hotel, self.restaurant
+        )
+        with mock.patch.object(self.client_, "travel_info_for_distance") as compute:
+            info = TravelMatrix(self.client_, cache=cache).get_travel_info(self.hotel, self.restaurant)
+        compute.assert_not_called()
+        self.assertEqual(info, self.client_.get_travel_info(self.hotel.id, self.restaurant.id))
+
+    def test_entries_expire(self):
+        cache = TravelInfoCache(ttl_seconds=60)
+        cache.set(self.client_.get_travel_info(self.hotel.id, self.restaurant.id))
+        self.assertIsNotNone(cache.get(self.hotel.id, self.restaurant.id))
+        with mock.patch("team10.application.services.travel_matrix.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get(self.hotel.id, self.restaurant.id))
+        self.assertEqual(len(cache), 0)
+
+    def test_max_entries(self):
+        cache = TravelInfoCache(ttl_seconds=60, max_entries=2)
+        for to_id in (1, 2, 3):
+            cache.set(self.client_.travel_info_for_distance(self.hotel.id, to_id, 1.0))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(self.hotel.id, 1))
+        self.assertIsNotNone(cache.get(self.hotel.id, 3))
+
+
+class TripPlanTravelLookupTests(TestCase):
+    databases = {"default", "team10"}
+
+    def test_plan_does_not_call_travel_info_per_pair(self):
+        facilities = MockFacilitiesClient()
+        service = TripPlanningServiceImpl(facilities, MockRecommendationClient(), MockWikiClient())
+        start = datetime(2030, 1, 1)
+        end = start + timedelta(days=3)
+        requirements = TripRequirements.objects.create(
+            user_id="u1", start_at=start, end_at=end, destination_name="اصفهان", region_id="2"
+        )
+        trip = Trip.objects.create(user_id="u1", requirements=requirements, destination_name="اصفهان")
+        recommended = MockRecommendationClient().get_recommendations(
+            user_id="u1", region_id="2", destination="اصفهان", season=mock.Mock(value="WINTER")
+        )
+
+        with mock.patch.object(facilities, "get_travel_info", wraps=facilities.get_travel_info) as travel_info:
+            service._create_trip_plan(
+                trip=trip, start_date=start, end_date=end, region_id="2",
+                budget_level="MODERATE", preferences=["history"], recommended_places=recommended,
+            )
+
+        travel_info.assert_not_called()
+        transfers = list(trip.transfer_plans.all())
+        self.assertTrue(transfers)
+        for transfer in transfers:
+            expected = facilities.get_travel_info(transfer.from_facility_id, transfer.to_facility_id)
+            self.assertAlmostEqual(float(transfer.distance_km), expected.distance_km, places=2)
+            self.assertEqual(transfer.duration_minutes, expected.duration_minutes)
@@ -2,27 +2,32 @@
 """
 Trip Generator - Main algorithm for creating trips
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import date, timedelta, time, datetime
 from decimal import Decimal
 
 # Django imports
 from data.models import Trip, TripDay, TripItem
+from data.repository import TripRepository
 from django.contrib.auth.models import User
+from django.db.models import Sum
 
 # Local imports
 from .helpers import DestinationSuggester
-from externalServices.grpc.services.facility_client import FacilityClient
+from externalServices.grpc.services.registry import get_facility_client
 
 
 class TripGenerator:
     """
     Main algorithm for generating trip plans
+
+    The whole plan (trip, days, items) is built in memory first and then
+    written with TripRepository.create_with_days in one transaction.
     """
 
     def __init__(self):
         self.suggester = DestinationSuggester()
-        self.facility_client = FacilityClient()
+        self.facility_client = get_facility_client()
 
     def generate(
             self,
@@ -58,8 +63,8 @@ class TripGenerator:
         if not suggested_places:
             raise ValueError("No places found for the given criteria")
 
-        # 3. Create Trip object
-        trip = Trip.objects.create(
+        # 3. Build Trip object (saved together with its days and items in step 6)
+        trip = Trip(
             title=f"سفر به {city or province}",
             province=province,
             city=city,
@@ -70,16 +75,17 @@ class TripGenerator:
             daily_available_hours=daily_available_hours,
             travel_style=travel_style,
             generation_strategy='MIXED',
-            status='DRAFT',
+            status='FINALIZED',
             user_id=user_id,
         )
 
-        # 4. Generate days
+        # 4. Generate days in memory
         current_date = start_date
         place_index = 0
+        days = []
 
         for day_index in range(1, duration_days + 1):
-            place_index = self._generate_day(
+            trip_day, items, place_index = self._generate_day(
                 trip=trip,
                 day_index=day_index,
                 date=current_date,
@@ -87,15 +93,17 @@ class TripGenerator:
                 budget_level=budget_level,
                 place_index=place_index
             )
+            days.append((trip_day, items))
             current_date += timedelta(days=1)
 
         # 5. Calculate total cost
-        self._calculate_trip_cost(trip)
-
-        trip.status = 'FINALIZED'
-        trip.save()
+        trip.total_estimated_cost = sum(
+            (item.estimated_cost for _, items in days for item in items),
+            Decimal('0.00')
+        )
 
-        return trip
+        # 6. Save trip, days and items
+        return TripRepository.create_with_days(trip, days)
 
     def _generate_day(
             self,
@@ -105,20 +113,20 @@ class TripGenerator:
             suggested_places: List[Dict],
             budget_level: str,
             place_index: int
-    ) -> int:
+    ) -> Tuple[TripDay, List[TripItem], int]:
         """
-        Generate items for one day
+        Generate items for one day (unsaved)
 
         Returns:
-            Updated place_index for next day
+            (TripDay, its TripItems, updated place_index for next day)
         """
 
-        # Create TripDay
-        trip_day = TripDay.objects.create(
+        trip_day = TripDay(
             trip=trip,
             day_index=day_index,
             specific_date=date
         )
+        items = []
 
         current_time = time(9, 0)  # Start at 9 AM
         sort_order = 0
@@ -128,6 +136,7 @@ class TripGenerator:
         breakfast = self._find_place(suggested_places, category='DINING', place_index=place_index, used_ids=used_place_ids)
         if breakfast:
             current_time = self._add_item(
+                items=items,
                 trip_day=trip_day,
                 place_data=breakfast,
                 start_time=current_time,
@@ -148,6 +157,7 @@ class TripGenerator:
         )
         if morning_place:
             current_time = self._add_item(
+                items=items,
                 trip_day=trip_day,
                 place_data=morning_place,
                 start_time=current_time,
@@ -163,6 +173,7 @@ class TripGenerator:
         lunch = self._find_place(suggested_places, category='DINING', place_index=place_index, used_ids=used_place_ids)
         if lunch:
             current_time = self._add_item(
+                items=items,
                 trip_day=trip_day,
                 place_data=lunch,
                 start_time=current_time,
@@ -183,6 +194,7 @@ class TripGenerator:
         )
         if afternoon_place:
             current_time = self._add_item(
+                items=items,
                 trip_day=trip_day,
                 place_data=afternoon_place,
                 start_time=current_time,
@@ -198,6 +210,7 @@ class TripGenerator:
         dinner = self._find_place(suggested_places, category='DINING', place_index=place_index, used_ids=used_place_ids)
         if dinner:
             current_time = self._add_item(
+                items=items,
                 trip_day=trip_day,
                 place_data=dinner,
                 start_time=current_time,
@@ -214,6 +227,7 @@ class TripGenerator:
         hotel = self._find_place(suggested_places, category='STAY', place_index=place_index, used_ids=used_place_ids)
         if hotel:
             self._add_item(
+                items=items,
                 trip_day=trip_day,
                 place_data=hotel,
                 start_time=current_time,
@@ -222,10 +236,11 @@ class TripGenerator:
                 sort_order=sort_order
             )
 
-        return place_index
+        return trip_day, items, place_index
 
     def _add_item(
             self,
+            items: List[TripItem],
             trip_day: TripDay,
             place_data: Dict,
             start_time: time,
@@ -234,7 +249,7 @@ class TripGenerator:
             sort_order: int
     ) -> time:
         """
-        Add a TripItem to a TripDay
+        Append an unsaved TripItem for trip_day to items
 
         Returns:
             End time of this item (for next item's start)
@@ -247,8 +262,7 @@ class TripGenerator:
         # Calculate duration in minutes
         duration_minutes = int(duration_hours * 60)
 
-        # Create TripItem
-        TripItem.objects.create(
+        items.append(TripItem(
             day=trip_day,
             item_type=item_type,
             place_ref_id=place_data['id'],
@@ -264,7 +278,7 @@ class TripGenerator:
             price_tier=place_data.get('price_tier', 'FREE'),
             estimated_cost=Decimal(str(place_data.get('entry_fee', 0))),
             main_image_url=place_data.get('images', [''])[0] if place_data.get('images') else ''
-        )
+        ))
 
         return end_time
 
@@ -315,12 +329,10 @@ class TripGenerator:
         return filtered[0]
 
     def _calculate_trip_cost(self, trip: Trip):
-        """Calculate total cost for the trip"""
-        total = Decimal('0.00')
-
-        for day in trip.days.all():
-            for item in day.items.all():
-                total += item.estimated_cost
+        """Recalculate total cost for a saved trip"""
+        total = TripItem.objects.filter(day__trip=trip).aggregate(
+            total=Sum('estimated_cost')
+        )['total']
 
-        trip.total_estimated_cost = total
+        trip.total_estimated_cost = total or Decimal('0.00')
         trip.save(update_fields=['total_estimated_cost'])
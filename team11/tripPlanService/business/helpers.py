@@ -3,8 +3,7 @@ import logging
 from typing import List, Dict, Optional
 
 # External services - will be implemented by Mohammad Hossein
-from externalServices.grpc.services.facility_client import FacilityClient
-from externalServices.grpc.services.recommendation_client import RecommendationClient
+from externalServices.grpc.services.registry import get_facility_client, get_recommendation_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +14,8 @@ class DestinationSuggester:
     """
 
     def __init__(self):
-        self.facility_client = FacilityClient()
-        self.recom_client = RecommendationClient()
+        self.facility_client = get_facility_client()
+        self.recom_client = get_recommendation_client()
 
     def get_destinations(
             self,
@@ -108,7 +107,7 @@ class AlternativesProvider:
 
 
     def __init__(self):
-        self.facility_client = FacilityClient()
+        self.facility_client = get_facility_client()
 
     def get_alternatives(
             self,
@@ -168,7 +167,8 @@ class AlternativesProvider:
         #         original['lng']
         #     )
 
-        return alternatives[:max_results]
+        # Copies: callers annotate alternatives (recommendation_reason, distance)
+        return [dict(p) for p in alternatives[:max_results]]
 
     def _rank_by_distance(
             self,
@@ -190,7 +190,8 @@ class AlternativesProvider:
             c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
             return R * c
 
-        # Calculate distance for each place
+        # Calculate distance for each place (on copies, shared places are read-only)
+        places = [dict(place) for place in places]
         for place in places:
             if place.get('lat') and place.get('lng'):
                 place['distance'] = haversine(
@@ -210,7 +211,7 @@ class AvailabilityChecker:
     """
 
     def __init__(self):
-        self.facility_client = FacilityClient()
+        self.facility_client = get_facility_client()
 
     def check_place_availability(
             self,
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
 import secrets
@@ -13,9 +13,9 @@ from data.models import (
     ShareLink, Vote, TripReview, UserMedia
 )
 
-from externalServices.grpc.services.facility_client import FacilityClient
-from externalServices.grpc.services.recommendation_client import RecommendationClient
-from externalServices.grpc.services.wiki_client import WikiClient
+from externalServices.grpc.services.registry import (
+    get_facility_client, get_recommendation_client, get_wiki_client
+)
 
 class TripService:
     """Business logic for Trip operations"""
@@ -33,6 +33,30 @@ class TripService:
     @staticmethod
     def create_trip(user_id: Optional[str], data: Dict[str, Any]) -> Trip:
         """Create a new trip with validation"""
+        TripService._validate_trip_data(data)
+
+        trip_data = {**data}
+        if user_id:
+            trip_data['user_id'] = user_id
+
+        return TripRepository.create(trip_data)
+
+    @staticmethod
+    def create_trips(trips_data: List[Tuple[Optional[str], Dict[str, Any]]]) -> List[Trip]:
+        """
+        Create many trips in one transaction.
+
+        Every entry is validated before anything is written, so one invalid
+        trip rejects the whole batch.
+        """
+        trips = []
+        for user_id, data in trips_data:
+            TripService._validate_trip_data(data)
+            trips.append(Trip(**data, user_id=user_id or None))
+        return TripRepository.bulk_create(trips)
+
+    @staticmethod
+    def _validate_trip_data(data: Dict[str, Any]) -> None:
         if not data.get('title'):
             raise ValueError("Trip title is required")
         if not data.get('province'):
@@ -42,12 +66,6 @@ class TripService:
         if not data.get('duration_days') or data['duration_days'] < 1:
             raise ValueError("Duration must be at least 1 day")
 
-        trip_data = {**data}
-        if user_id:
-            trip_data['user_id'] = user_id
-
-        return TripRepository.create(trip_data)
-
     @staticmethod
     def update_trip(trip_id: int, data: Dict[str, Any]) -> Optional[Trip]:
         """Update trip information"""
@@ -69,59 +87,60 @@ class TripService:
         if not original:
             return None
 
-        new_trip_data = {
-            'user_id': user_id,
-            'copied_from_trip_id': trip_id,
-            'title': f"{original.title} (Copy)",
-            'province': original.province,
-            'city': original.city,
-            'start_date': original.start_date,
-            'end_date': original.end_date,
-            'duration_days': original.duration_days,
-            'budget_level': original.budget_level,
-            'daily_available_hours': original.daily_available_hours,
-            'travel_style': original.travel_style,
-            'generation_strategy': original.generation_strategy,
-            'density': original.density,
-            'interests': original.interests,
-            'total_estimated_cost': original.total_estimated_cost,
-        }
-
-        new_trip = TripRepository.create(new_trip_data)
+        new_trip = Trip(
+            user_id=user_id,
+            copied_from_trip_id=trip_id,
+            title=f"{original.title} (Copy)",
+            province=original.province,
+            city=original.city,
+            start_date=original.start_date,
+            end_date=original.end_date,
+            duration_days=original.duration_days,
+            budget_level=original.budget_level,
+            daily_available_hours=original.daily_available_hours,
+            travel_style=original.travel_style,
+            generation_strategy=original.generation_strategy,
+            density=original.density,
+            interests=original.interests,
+            total_estimated_cost=original.total_estimated_cost,
+        )
 
-        # Deep copy: duplicate days and items
-        for day in original.days.all().order_by('day_index'):
-            new_day = TripDayRepository.create({
-                'trip_id': new_trip.trip_id,
-                'day_index': day.day_index,
-                'specific_date': day.specific_date,
-                'start_geo_location': day.start_geo_location,
-            })
+        # Deep copy: duplicate days and items (days/items are already prefetched)
+        days = []
+        for day in sorted(original.days.all(), key=lambda d: d.day_index):
+            new_day = TripDay(
+                day_index=day.day_index,
+                specific_date=day.specific_date,
+                start_geo_location=day.start_geo_location,
+            )
+            new_items = [
+                TripItem(
+                    item_type=item.item_type,
+                    place_ref_id=item.place_ref_id,
+                    title=item.title,
+                    category=item.category,
+                    address_summary=item.address_summary,
+                    lat=item.lat,
+                    lng=item.lng,
+                    wiki_summary=item.wiki_summary,
+                    wiki_link=item.wiki_link,
+                    main_image_url=item.main_image_url,
+                    start_time=item.start_time,
+                    end_time=item.end_time,
+                    duration_minutes=item.duration_minutes,
+                    sort_order=item.sort_order,
+                    is_locked=False,  # Unlock copied items
+                    price_tier=item.price_tier,
+                    estimated_cost=item.estimated_cost,
+                    transport_mode_to_next=item.transport_mode_to_next,
+                    travel_time_to_next=item.travel_time_to_next,
+                    travel_distance_to_next=item.travel_distance_to_next,
+                )
+                for item in sorted(day.items.all(), key=lambda i: i.sort_order)
+            ]
+            days.append((new_day, new_items))
 
-            for item in day.items.all().order_by('sort_order'):
-                TripItemRepository.create({
-                    'day_id': new_day.day_id,
-                    'item_type': item.item_type,
-                    'place_ref_id': item.place_ref_id,
-                    'title': item.title,
-                    'category': item.category,
-                    'address_summary': item.address_summary,
-                    'lat': item.lat,
-                    'lng': item.lng,
-                    'wiki_summary': item.wiki_summary,
-                    'wiki_link': item.wiki_link,
-                    'main_image_url': item.main_image_url,
-                    'start_time': item.start_time,
-                    'end_time': item.end_time,
-                    'duration_minutes': item.duration_minutes,
-                    'sort_order': item.sort_order,
-                    'is_locked': False,  # Unlock copied items
-                    'price_tier': item.price_tier,
-                    'estimated_cost': item.estimated_cost,
-                    'transport_mode_to_next': item.transport_mode_to_next,
-                    'travel_time_to_next': item.travel_time_to_next,
-                    'travel_distance_to_next': item.travel_distance_to_next,
-                })
+        new_trip = TripRepository.create_with_days(new_trip, days)
 
         return TripRepository.get_by_id(new_trip.trip_id)
 
@@ -302,6 +321,26 @@ class TripItemService:
         item_data = {**data, 'day_id': day_id}
         return TripItemRepository.create(item_data)
 
+    @staticmethod
+    def create_items_bulk(day_id: int, items_data: List[Dict[str, Any]]) -> Tuple[List[TripItem], List[Dict[str, Any]]]:
+        """
+        Create many items for a day with one INSERT
+
+        Items failing validation are skipped and reported as
+        {"index": ..., "error": ...}; the rest are created.
+        """
+        valid = []
+        errors = []
+        for idx, data in enumerate(items_data):
+            if not data.get('place_ref_id'):
+                errors.append({"index": idx, "error": "Place reference ID is required"})
+            elif not data.get('title'):
+                errors.append({"index": idx, "error": "Item title is required"})
+            else:
+                valid.append(data)
+
+        return TripItemRepository.bulk_create_for_day(day_id, valid), errors
+
     @staticmethod
     def update_item(item_id: int, data: Dict[str, Any]) -> Optional[TripItem]:
         """Update a trip item with time validation"""
@@ -505,18 +544,28 @@ class MediaService:
 
 
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 # Import the mocked clients
 # Note: Place these files in your project and adjust import paths as needed
 
 logger = logging.getLogger(__name__)
 
-# Initialize mocked clients (singleton instances)
-recommendation_client = RecommendationClient(use_mocks=True)
-facility_client = FacilityClient(use_mocks=True)
-wiki_client = WikiClient()
+# Mocked clients are process-wide singletons, created lazily by the registry
+# (externalServices.grpc.services.registry.warm_up() creates them up front)
 
 class SuggestionService:
+    # Per-region enrichment (facility search + wiki) runs on a bounded pool;
+    # deadlines are per call, in seconds
+    FANOUT_WORKERS = 8
+    SEARCH_TIMEOUT = 2.0
+    WIKI_TIMEOUT = 1.0
+
+    _executor = None
+    _executor_lock = threading.Lock()
 
     @staticmethod
     def generate_destination_suggestions(season, budget_level, travel_style, interests):
@@ -551,6 +600,10 @@ class SuggestionService:
         else:
             persian_travel_style = travel_style_map.get(travel_style, 'تاریخی')
 
+        recommendation_client = get_recommendation_client()
+        facility_client = get_facility_client()
+        wiki_client = get_wiki_client()
+
         # Step 1: Get recommended regions from RecommendationClient
         logger.info(
             f"Getting region suggestions for season={season}, budget={budget_level}, interests={effective_interests}")
@@ -563,114 +616,201 @@ class SuggestionService:
         # Take top 3 regions
         top_regions = regions[:3]
 
+        # Map interests to categories for better filtering
+        interest_to_categories = {
+            'تاریخی': ['HISTORICAL', 'CULTURAL'],
+            'فرهنگی': ['CULTURAL', 'HISTORICAL'],
+            'طبیعت': ['NATURAL'],
+            'خانوادگی': ['RECREATIONAL', 'NATURAL', 'DINING'],
+            'مذهبی': ['RELIGIOUS'],
+            'ماجراجویی': ['NATURAL', 'RECREATIONAL'],
+            'شهری': ['CULTURAL', 'DINING', 'STAY'],
+            'غذا': ['DINING']
+        }
+
+        # Get preferred categories based on interests
+        preferred_categories = []
+        if interests:
+            for interest in interests:
+                preferred_categories.extend(interest_to_categories.get(interest, []))
+
+        # Remove duplicates while preserving order
+        if preferred_categories:
+            seen = set()
+            preferred_categories = [x for x in preferred_categories if not (x in seen or seen.add(x))]
+
+        # Steps 2 and 6 for all regions at once (facility search, then wiki for the first place)
+        enrichments = SuggestionService._fetch_region_enrichments(
+            top_regions,
+            facility_client=facility_client,
+            wiki_client=wiki_client,
+            categories=preferred_categories if preferred_categories else None,
+            budget_level=budget_level
+        )
+
+        # Ordered merge: suggestions keep the region ranking
         suggestions = []
 
-        for region in top_regions:
+        for region, (places, wiki_info) in zip(top_regions, enrichments):
             try:
                 province = region['province']
 
-                # Map interests to categories for better filtering
-                interest_to_categories = {
-                    'تاریخی': ['HISTORICAL', 'CULTURAL'],
-                    'فرهنگی': ['CULTURAL', 'HISTORICAL'],
-                    'طبیعت': ['NATURAL'],
-                    'خانوادگی': ['RECREATIONAL', 'NATURAL', 'DINING'],
-                    'مذهبی': ['RELIGIOUS'],
-                    'ماجراجویی': ['NATURAL', 'RECREATIONAL'],
-                    'شهری': ['CULTURAL', 'DINING', 'STAY'],
-                    'غذا': ['DINING']
-                }
-
-                # Get preferred categories based on interests
-                preferred_categories = []
-                if interests:
-                    for interest in interests:
-                        preferred_categories.extend(interest_to_categories.get(interest, []))
-
-                # Remove duplicates while preserving order
-                if preferred_categories:
-                    seen = set()
-                    preferred_categories = [x for x in preferred_categories if not (x in seen or seen.add(x))]
-
-                # Step 2: Get places in this region from FacilityClient
-                logger.info(f"Searching for places in {province} with categories {preferred_categories}")
-                places = facility_client.search_places(
-                    province=province,
-                    categories=preferred_categories if preferred_categories else None,
-                    budget_level=budget_level,
-                    limit=5
-                )
-
                 if not places:
                     logger.warning(f"No places found for province: {province}")
                     continue
 
-                # Step 3: Get highlights (top 2-3 attractions)
-                highlights = [place['title'] for place in places[:3]]
-
-                # Step 4: Calculate estimated cost based on budget level and places
-                estimated_cost = SuggestionService.calculate_estimated_cost(budget_level, places)
+                suggestions.append(SuggestionService._build_suggestion(
+                    region=region,
+                    places=places,
+                    wiki_info=wiki_info,
+                    season=season,
+                    budget_level=budget_level,
+                    interests=interests,
+                    persian_travel_style=persian_travel_style
+                ))
 
-                # Step 5: Determine recommended duration
-                duration_days = SuggestionService.calculate_duration(len(places))
+            except Exception as e:
+                logger.error(f"Error processing region {region.get('region_name')}: {str(e)}", exc_info=True)
+                continue
 
-                # Step 6: Get description from WikiClient and region data
-                description = region.get('description', f"استان {province} یکی از مقاصد گردشگری محبوب ایران است.")
-                images = [region.get('image_url', 'https://example.com/placeholder.jpg')]
+        return suggestions
 
-                # Try to enrich with wiki data for the first place
-                if places:
-                    first_place_id = places[0]['id']
-                    wiki_info = wiki_client.get_place_info(first_place_id)
-                    if wiki_info and wiki_info.get('description'):
-                        # Combine region description with place description
-                        description = f"{region.get('description', '')} {wiki_info['description'][:150]}..."
-                        if wiki_info.get('images'):
-                            images.extend(wiki_info['images'][:2])
-
-                # Step 7: Generate reason based on interests and region characteristics
-                reason = SuggestionService.generate_reason(
-                    province=province,
-                    interests=interests,
-                    travel_style=persian_travel_style,
-                    places=places
-                )
+    @classmethod
+    def _get_executor(cls):
+        """Shared bounded pool for the per-region external calls"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=cls.FANOUT_WORKERS,
+                        thread_name_prefix='suggestions'
+                    )
+        return cls._executor
+
+    @classmethod
+    def _fetch_region_enrichments(cls, regions, facility_client, wiki_client, categories, budget_level):
+        """
+        Run facility search and wiki lookup for every region concurrently
 
-                # Step 8: Map season back to English for response
-                season_reverse_map = {
-                    'بهار': 'spring',
-                    'تابستان': 'summer',
-                    'پاییز': 'fall',
-                    'زمستان': 'winter'
-                }
-
-                best_seasons = region.get('best_seasons', [season])
-                best_season_english = season_reverse_map.get(
-                    best_seasons[0] if best_seasons else season,
-                    'spring'
-                )
+        Each search_places call gets SEARCH_TIMEOUT seconds and each
+        get_place_info call WIKI_TIMEOUT seconds from the moment it is started.
+        - search timed out / failed: (None, None), the region is skipped
+        - wiki timed out / failed: (places, None), region description only
 
-                # Build comprehensive suggestion
-                suggestion = {
-                    'city': province,  # Using province as main city
-                    'province': province,
-                    'score': region['match_score'],
-                    'reason': reason,
-                    'highlights': highlights,
-                    'best_season': best_season_english,
-                    'estimated_cost': str(estimated_cost),
-                    'duration_days': duration_days,
-                    'description': description,
-                    'images': images[:3]  # Limit to 3 images
-                }
-
-                suggestions.append(suggestion)
+        Returns:
+            List of (places, wiki_info) in the order of `regions`
+        """
+        executor = cls._get_executor()
+        results = [(None, None)] * len(regions)
+
+        searches = {}
+        for index, region in enumerate(regions):
+            future = executor.submit(
+                facility_client.search_places,
+                province=region['province'],
+                categories=categories,
+                budget_level=budget_level,
+                limit=5
+            )
+            searches[future] = (index, time.monotonic() + cls.SEARCH_TIMEOUT)
+
+        wiki_lookups = {}
+        pending = set(searches)
+        while pending:
+            now = time.monotonic()
+            for future in [f for f in pending if searches[f][1] <= now]:
+                pending.discard(future)
+                logger.warning(f"search_places timed out for province: {regions[searches[future][0]]['province']}")
+            if not pending:
+                break
+
+            next_deadline = min(searches[f][1] for f in pending)
+            done, pending = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = searches[future][0]
+                try:
+                    places = future.result()
+                except Exception as e:
+                    logger.error(f"search_places failed for province {regions[index]['province']}: {e}")
+                    continue
+                results[index] = (places, None)
+                if places:
+                    wiki_future = executor.submit(wiki_client.get_place_info, places[0]['id'])
+                    wiki_lookups[index] = (wiki_future, time.monotonic() + cls.WIKI_TIMEOUT)
 
+        for index, (wiki_future, deadline) in wiki_lookups.items():
+            try:
+                wiki_info = wiki_future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                logger.warning(f"get_place_info timed out for province: {regions[index]['province']}")
+                continue
             except Exception as e:
-                logger.error(f"Error processing region {region.get('region_name')}: {str(e)}", exc_info=True)
+                logger.error(f"get_place_info failed for province {regions[index]['province']}: {e}")
                 continue
+            results[index] = (results[index][0], wiki_info)
 
-        return suggestions
+        return results
+
+    @staticmethod
+    def _build_suggestion(region, places, wiki_info, season, budget_level, interests, persian_travel_style):
+        """Suggestion dict for one region from its places and (optional) wiki info"""
+        province = region['province']
+
+        # Step 3: Get highlights (top 2-3 attractions)
+        highlights = [place['title'] for place in places[:3]]
+
+        # Step 4: Calculate estimated cost based on budget level and places
+        estimated_cost = SuggestionService.calculate_estimated_cost(budget_level, places)
+
+        # Step 5: Determine recommended duration
+        duration_days = SuggestionService.calculate_duration(len(places))
+
+        # Step 6: Get description from WikiClient and region data
+        description = region.get('description', f"استان {province} یکی از مقاصد گردشگری محبوب ایران است.")
+        images = [region.get('image_url', 'https://example.com/placeholder.jpg')]
+
+        # Enrich with wiki data for the first place
+        if wiki_info and wiki_info.get('description'):
+            # Combine region description with place description
+            description = f"{region.get('description', '')} {wiki_info['description'][:150]}..."
+            if wiki_info.get('images'):
+                images.extend(wiki_info['images'][:2])
+
+        # Step 7: Generate reason based on interests and region characteristics
+        reason = SuggestionService.generate_reason(
+            province=province,
+            interests=interests,
+            travel_style=persian_travel_style,
+            places=places
+        )
+
+        # Step 8: Map season back to English for response
+        season_reverse_map = {
+            'بهار': 'spring',
+            'تابستان': 'summer',
+            'پاییز': 'fall',
+            'زمستان': 'winter'
+        }
+
+        best_seasons = region.get('best_seasons', [season])
+        best_season_english = season_reverse_map.get(
+            best_seasons[0] if best_seasons else season,
+            'spring'
+        )
+
+        # Build comprehensive suggestion
+        return {
+            'city': province,  # Using province as main city
+            'province': province,
+            'score': region['match_score'],
+            'reason': reason,
+            'highlights': highlights,
+            'best_season': best_season_english,
+            'estimated_cost': str(estimated_cost),
+            'duration_days': duration_days,
+            'description': description,
+            'images': images[:3]  # Limit to 3 images
+        }
 
     @staticmethod
     def calculate_estimated_cost(budget_level, places):
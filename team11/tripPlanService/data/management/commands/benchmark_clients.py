@@ -0,0 +1,92 @@
+"""
+Django management command to benchmark external client start-up cost and memory.
+
+Compares the previous behaviour (every FacilityClient / RecommendationClient
+construction rebuilt its mock data and place index) with the shared registry
+clients, for the objects one trip generation request creates
+(TripGenerator -> DestinationSuggester).
+
+Usage:
+    python manage.py benchmark_clients --requests 200 --live 20
+"""
+
+import gc
+import resource
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from business.generators import TripGenerator
+from externalServices.grpc.services import registry
+from externalServices.grpc.services.facility_client import FacilityClient
+from externalServices.grpc.services.place_catalogue import PlaceCatalogue
+from externalServices.grpc.services.recommendation_client import RecommendationClient
+
+
+def _rss_kb():
+    """Current resident set size in KB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _unshared_request():
+    """Client data one request built before the registry existed"""
+    objects = []
+    # TripGenerator, DestinationSuggester: FacilityClient each; DestinationSuggester: RecommendationClient
+    for _ in range(2):
+        places = FacilityClient._build_mock_places()
+        objects.append((places, PlaceCatalogue(places)))
+    objects.append(RecommendationClient._build_mock_data())
+    return objects
+
+
+def _shared_request():
+    return TripGenerator()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark external client start-up time and memory (per-request vs shared registry clients)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests to simulate')
+        parser.add_argument('--live', type=int, default=20, help='Requests kept alive at once (concurrency)')
+
+    def _measure(self, label, build, requests, live):
+        started = time.perf_counter()
+        for _ in range(requests):
+            build()
+        per_request_ms = (time.perf_counter() - started) * 1000 / requests
+
+        gc.collect()
+        rss_before = _rss_kb()
+        tracemalloc.start()
+        kept = [build() for _ in range(live)]
+        held_kb = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+        rss_after = _rss_kb()
+        del kept
+
+        self.stdout.write(
+            f'{label:>10} {per_request_ms:>14.3f} {held_kb:>16.1f} {rss_after - rss_before:>14}'
+        )
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        live = options['live']
+
+        registry.reset()
+        timings = registry.warm_up()
+        self.stdout.write(self.style.SUCCESS('Cold warm-up (first build in this process):'))
+        for name, seconds in timings.items():
+            self.stdout.write(f'  {name:<15} {seconds * 1000:8.2f} ms')
+        self.stdout.write(f'  RSS after warm-up: {_rss_kb()} KB\n')
+
+        self.stdout.write(
+            f'{"mode":>10} {"ms/request":>14} {f"KB held x{live}":>16} {"RSS delta KB":>14}'
+        )
+        self._measure('unshared', _unshared_request, requests, live)
+        self._measure('shared', _shared_request, requests, live)
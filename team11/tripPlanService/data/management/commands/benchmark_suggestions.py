@@ -0,0 +1,74 @@
+"""
+Django management command to benchmark destination suggestion latency.
+
+Runs SuggestionService.generate_destination_suggestions against local stubs
+that add a fixed delay to every facility / wiki call (standing in for gRPC
+round trips), once with a single worker (the previous sequential behaviour)
+and once with the concurrent fan-out.
+
+Usage:
+    python manage.py benchmark_suggestions --delay-ms 50 --runs 10
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+
+from business.services import SuggestionService
+from externalServices.grpc.services.registry import (
+    get_facility_client, get_recommendation_client, get_wiki_client
+)
+
+
+class DelayedClient:
+    """Forwards to a real (mock) client after a fixed delay per call"""
+
+    def __init__(self, client, delay):
+        self._client = client
+        self._delay = delay
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def delayed(*args, **kwargs):
+            time.sleep(self._delay)
+            return method(*args, **kwargs)
+
+        return delayed
+
+
+class Command(BaseCommand):
+    help = 'Benchmark destination suggestions (sequential vs concurrent region enrichment) against delayed stubs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delay-ms', type=float, default=50.0, help='Delay per facility/wiki call')
+        parser.add_argument('--runs', type=int, default=10)
+
+    def _run(self, workers, delay, runs):
+        facility_client = DelayedClient(get_facility_client(), delay)
+        wiki_client = DelayedClient(get_wiki_client(), delay)
+        timings = []
+        with patch.object(SuggestionService, '_executor', ThreadPoolExecutor(max_workers=workers)), \
+                patch('business.services.get_facility_client', return_value=facility_client), \
+                patch('business.services.get_wiki_client', return_value=wiki_client):
+            for _ in range(runs):
+                started = time.perf_counter()
+                suggestions = SuggestionService.generate_destination_suggestions(
+                    'بهار', 'MEDIUM', 'FAMILY', ['تاریخی', 'طبیعت']
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+            SuggestionService._executor.shutdown(wait=False)
+        return timings, len(suggestions)
+
+    def handle(self, *args, **options):
+        delay = options['delay_ms'] / 1000
+        runs = options['runs']
+        get_recommendation_client()
+
+        self.stdout.write(f'{"mode":>12} {"median ms":>10} {"max ms":>8} {"suggestions":>12}')
+        for label, workers in (('sequential', 1), ('concurrent', SuggestionService.FANOUT_WORKERS)):
+            timings, count = self._run(workers, delay, runs)
+            self.stdout.write(f'{label:>12} {statistics.median(timings):>10.1f} {max(timings):>8.1f} {count:>12}')
@@ -1,7 +1,8 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from django.db import transaction
 from django.db.models import QuerySet, Prefetch, Q
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from .models import (
     Trip, TripDay, TripItem, ItemDependency,
@@ -25,6 +26,20 @@ class TripRepository:
 
         return queryset
 
+    @staticmethod
+    def get_page_after(after_trip_id: int = 0, page_size: int = 100,
+                       user_id: Optional[str] = None, status: Optional[str] = None) -> List[Trip]:
+        """
+        Keyset page of trips ordered by trip_id, starting after `after_trip_id`.
+
+        Each page is a `trip_id > last` range scan on the primary key, so
+        deep pages cost the same as the first one (unlike OFFSET).
+        """
+        queryset = TripRepository.get_all(user_id, status)
+        if after_trip_id:
+            queryset = queryset.filter(trip_id__gt=after_trip_id)
+        return list(queryset.order_by('trip_id')[:page_size])
+
     @staticmethod
     def get_by_id(trip_id: int) -> Optional[Trip]:
         """Fetch a single trip with all related data"""
@@ -53,6 +68,41 @@ class TripRepository:
         trip.save()
         return trip
 
+    @staticmethod
+    def create_with_days(trip: Trip, days: List[Tuple[TripDay, List[TripItem]]]) -> Trip:
+        """
+        Save an unsaved trip together with its unsaved days and items.
+
+        Writes one INSERT for the trip, one bulk INSERT for all days and one
+        bulk INSERT for all items, inside a single transaction.
+        """
+        with transaction.atomic():
+            trip.save()
+            for day, _ in days:
+                day.trip = trip
+            TripDay.objects.bulk_create([day for day, _ in days])
+
+            items = []
+            for day, day_items in days:
+                for item in day_items:
+                    item.day = day
+                    items.append(item)
+            TripItem.objects.bulk_create(items)
+        return trip
+
+    @staticmethod
+    def bulk_create(trips: List[Trip]) -> List[Trip]:
+        """
+        Insert many unsaved trips with one bulk INSERT inside a transaction.
+
+        bulk_create skips Trip.save(), so end_date is filled in here.
+        """
+        for trip in trips:
+            if not trip.end_date and trip.start_date and trip.duration_days:
+                trip.end_date = trip.start_date + timedelta(days=trip.duration_days - 1)
+        with transaction.atomic():
+            return Trip.objects.bulk_create(trips)
+
     @staticmethod
     def delete(trip_id: int) -> bool:
         """Delete a trip"""
@@ -141,6 +191,12 @@ class TripItemRepository:
         """Create a new trip item"""
         return TripItem.objects.create(**data)
 
+    @staticmethod
+    def bulk_create_for_day(day_id: int, items_data: List[Dict[str, Any]]) -> List[TripItem]:
+        """Create multiple items for a day in one INSERT"""
+        items = [TripItem(**{**data, 'day_id': day_id}) for data in items_data]
+        return TripItem.objects.bulk_create(items)
+
     @staticmethod
     def update(item_id: int, data: Dict[str, Any]) -> Optional[TripItem]:
         """Update a trip item"""
@@ -5,8 +5,7 @@ from infrastructure.grpc_clients import facility_pb2_grpc as facility
 from infrastructure.grpc_clients import wiki_pb2_grpc as wiki
 from infrastructure.grpc_clients import recom_pb2_grpc as recom
 
-
-import grpc
+from externalServices.grpc.client.channel_pool import close_channel_pool, get_aio_channel_pool, get_channel_pool
 
 TRIP_PLAN_GRPC_URL = os.getenv("TRIP_PLAN_GRPC_URL", "localhost:59007")
 FACILITY_GRPC_URL = os.getenv("FACILITY_GRPC_URL", "localhost:59007")
@@ -15,28 +14,46 @@ RECOM_GRPC_URL = os.getenv("RECOM_GRPC_URL", "localhost:59007")
 
 
 class Clients:
+    """
+    Stubs on pooled, reused channels (one channel per target, see channel_pool.py)
+
+    get_*_client: blocking stubs; get_*_aio_client: grpc.aio stubs for code
+    running on an event loop (call them from inside the loop).
+    """
 
     @staticmethod
     def get_trip_plan_client():
-        channel = grpc.insecure_channel(TRIP_PLAN_GRPC_URL)
-        stub = pb2_grpc.TripServiceStub(channel)
-        return stub
+        return get_channel_pool().get_stub(TRIP_PLAN_GRPC_URL, pb2_grpc.TripServiceStub)
 
     @staticmethod
     def get_facility_client():
-        channel = grpc.insecure_channel(FACILITY_GRPC_URL)
-        stub = facility.FacilityServiceStub(channel)
-        return stub
+        return get_channel_pool().get_stub(FACILITY_GRPC_URL, facility.FacilityServiceStub)
 
     @staticmethod
     def get_wiki_client():
-        channel = grpc.insecure_channel(WIKI_PLAN_GRPC_URL)
-        stub = wiki.WikiServiceStub(channel)
-        return stub
+        return get_channel_pool().get_stub(WIKI_PLAN_GRPC_URL, wiki.WikiServiceStub)
 
     @staticmethod
     def get_recom_client():
-        channel = grpc.insecure_channel(RECOM_GRPC_URL)
-        stub = recom.RecommendationServiceStub(channel)
-        return stub
+        return get_channel_pool().get_stub(RECOM_GRPC_URL, recom.RecommendationServiceStub)
+
+    @staticmethod
+    def get_trip_plan_aio_client():
+        return get_aio_channel_pool().get_stub(TRIP_PLAN_GRPC_URL, pb2_grpc.TripServiceStub)
+
+    @staticmethod
+    def get_facility_aio_client():
+        return get_aio_channel_pool().get_stub(FACILITY_GRPC_URL, facility.FacilityServiceStub)
 
+    @staticmethod
+    def get_wiki_aio_client():
+        return get_aio_channel_pool().get_stub(WIKI_PLAN_GRPC_URL, wiki.WikiServiceStub)
+
+    @staticmethod
+    def get_recom_aio_client():
+        return get_aio_channel_pool().get_stub(RECOM_GRPC_URL, recom.RecommendationServiceStub)
+
+    @staticmethod
+    def close(grace=5.0):
+        """Gracefully close the pooled channels (e.g. on server shutdown)"""
+        close_channel_pool(grace)
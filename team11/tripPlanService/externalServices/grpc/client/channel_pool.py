@@ -0,0 +1,400 @@
+"""
+Pooled gRPC channels for the outbound clients (Clients.get_*_client)
+
+One channel per target is kept open and shared by every call:
+- keepalive options (DEFAULT_CHANNEL_OPTIONS) keep the HTTP/2 connection warm
+- at most `max_concurrent_streams` calls in flight per target; extra calls
+  wait for a slot (until their own deadline, then StreamLimitExceeded)
+- stubs are cached per channel
+- a channel whose calls have failed with UNAVAILABLE for longer than
+  `unhealthy_after` seconds (no successful call in between) is replaced on
+  the next lookup; check_health() probes a target explicitly
+- close(grace) waits for in-flight calls before closing the channels
+
+AioChannelPool is the grpc.aio variant (one pool per event loop, see
+get_aio_channel_pool) for code running on an asyncio loop.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Optional, Type
+
+import grpc
+import grpc.aio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL_OPTIONS = (
+    ('grpc.keepalive_time_ms', int(os.getenv('GRPC_KEEPALIVE_TIME_MS', '30000'))),
+    ('grpc.keepalive_timeout_ms', int(os.getenv('GRPC_KEEPALIVE_TIMEOUT_MS', '10000'))),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.max_reconnect_backoff_ms', 10000),
+)
+MAX_CONCURRENT_STREAMS = int(os.getenv('GRPC_MAX_CONCURRENT_STREAMS', '100'))
+UNHEALTHY_AFTER_SECONDS = float(os.getenv('GRPC_UNHEALTHY_AFTER_SECONDS', '30'))
+# Waiting time for a stream slot when the call itself has no deadline
+STREAM_SLOT_TIMEOUT_SECONDS = 30.0
+
+
+class ChannelPoolError(Exception):
+    """Base error of the channel pools"""
+
+
+class StreamLimitExceeded(ChannelPoolError):
+    """No stream slot became free for the target before the call's deadline"""
+
+
+class _StreamLimiter:
+    """Counts in-flight calls of one channel and caps them"""
+
+    def __init__(self, max_streams: int):
+        self.max_streams = max_streams
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: Optional[float]):
+        deadline = time.monotonic() + (STREAM_SLOT_TIMEOUT_SECONDS if timeout is None else timeout)
+        with self._condition:
+            while self.in_flight >= self.max_streams:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise StreamLimitExceeded(f'{self.max_streams} streams already in flight')
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def wait_idle(self, timeout: Optional[float]) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self.in_flight == 0, timeout)
+
+
+class _ChannelHealth:
+    """Tracks since when calls on a channel have been failing with UNAVAILABLE"""
+
+    def __init__(self):
+        self.failing_since: Optional[float] = None
+
+    def record(self, code: Optional[grpc.StatusCode]):
+        if code == grpc.StatusCode.UNAVAILABLE:
+            if self.failing_since is None:
+                self.failing_since = time.monotonic()
+        elif code is not None:
+            self.failing_since = None
+
+    def is_healthy(self, unhealthy_after: float) -> bool:
+        return self.failing_since is None or time.monotonic() - self.failing_since < unhealthy_after
+
+
+def _call_code(call) -> Optional[grpc.StatusCode]:
+    try:
+        return call.code()
+    except Exception:
+        return None
+
+
+class _StreamLimitInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """Holds a stream slot from the start of a call until it completes"""
+
+    def __init__(self, limiter: _StreamLimiter, health: _ChannelHealth):
+        self._limiter = limiter
+        self._health = health
+
+    def _intercept(self, continuation, client_call_details, request):
+        self._limiter.acquire(client_call_details.timeout)
+        released = threading.Event()
+
+        def release(call=None):
+            if not released.is_set():
+                released.set()
+                self._limiter.release()
+                if call is not None:
+                    self._health.record(_call_code(call))
+
+        try:
+            call = continuation(client_call_details, request)
+        except BaseException:
+            release()
+            raise
+        call.add_done_callback(release)
+        return call
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return self._intercept(continuation, client_call_details, request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return self._intercept(continuation, client_call_details, request)
+
+
+class _PooledChannel:
+
+    def __init__(self, target: str, channel_factory: Callable, options, max_streams: int):
+        self.target = target
+        self.raw_channel = channel_factory(target, options=options)
+        self.limiter = _StreamLimiter(max_streams)
+        self.health = _ChannelHealth()
+        self.channel = grpc.intercept_channel(self.raw_channel, _StreamLimitInterceptor(self.limiter, self.health))
+        self.stubs: Dict[type, object] = {}
+
+    def close(self, grace: Optional[float]):
+        if not self.limiter.wait_idle(grace):
+            logger.warning(f"Closing gRPC channel to {self.target} with {self.limiter.in_flight} calls in flight")
+        self.raw_channel.close()
+
+
+class ChannelPool:
+    """Thread-safe pool of insecure gRPC channels keyed by target"""
+
+    def __init__(
+            self,
+            options=DEFAULT_CHANNEL_OPTIONS,
+            max_concurrent_streams: int = MAX_CONCURRENT_STREAMS,
+            unhealthy_after: float = UNHEALTHY_AFTER_SECONDS,
+            channel_factory: Callable = grpc.insecure_channel
+    ):
+        self.options = tuple(options)
+        self.max_concurrent_streams = max_concurrent_streams
+        self.unhealthy_after = unhealthy_after
+        self._channel_factory = channel_factory
+        self._lock = threading.Lock()
+        self._channels: Dict[str, _PooledChannel] = {}
+        self._closed = False
+
+    def _entry(self, target: str) -> _PooledChannel:
+        retired = None
+        with self._lock:
+            if self._closed:
+                raise ChannelPoolError('Channel pool is closed')
+            entry = self._channels.get(target)
+            if entry is not None and not entry.health.is_healthy(self.unhealthy_after):
+                logger.warning(f"gRPC channel to {target} keeps failing with UNAVAILABLE; reconnecting")
+                retired = entry
+                entry = None
+            if entry is None:
+                entry = _PooledChannel(target, self._channel_factory, self.options, self.max_concurrent_streams)
+                self._channels[target] = entry
+        if retired is not None:
+            # Calls still running on the old channel may finish first
+            threading.Thread(target=retired.close, args=(self.unhealthy_after,), daemon=True).start()
+        return entry
+
+    def get_channel(self, target: str) -> grpc.Channel:
+        """Shared channel to target (stream-limited)"""
+        return self._entry(target).channel
+
+    def get_stub(self, target: str, stub_class: Type):
+        """Stub of stub_class on the shared channel to target, created once per channel"""
+        entry = self._entry(target)
+        stub = entry.stubs.get(stub_class)
+        if stub is None:
+            stub = entry.stubs.setdefault(stub_class, stub_class(entry.channel))
+        return stub
+
+    def check_health(self, target: str, timeout: float = 1.0) -> bool:
+        """Wait up to timeout for the channel to target to be READY"""
+        entry = self._entry(target)
+        ready = grpc.channel_ready_future(entry.raw_channel)
+        try:
+            ready.result(timeout=timeout)
+            entry.health.record(grpc.StatusCode.OK)
+            return True
+        except grpc.FutureTimeoutError:
+            ready.cancel()
+            entry.health.record(grpc.StatusCode.UNAVAILABLE)
+            return False
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                target: {
+                    'healthy': entry.health.is_healthy(self.unhealthy_after),
+                    'in_flight': entry.limiter.in_flight,
+                    'max_concurrent_streams': entry.limiter.max_streams,
+                    'stubs': len(entry.stubs),
+                }
+                for target, entry in self._channels.items()
+            }
+
+    def close(self, grace: Optional[float] = 5.0):
+        """Stop handing out channels, wait up to grace seconds for in-flight calls, close everything"""
+        with self._lock:
+            self._closed = True
+            entries = list(self._channels.values())
+            self._channels.clear()
+        for entry in entries:
+            entry.close(grace)
+
+
+# ----------------------------------------------------------------------
+# grpc.aio variant
+# ----------------------------------------------------------------------
+
+class _AioStreamLimitInterceptor(grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor):
+    """asyncio version of _StreamLimitInterceptor (one per channel)"""
+
+    def __init__(self, max_streams: int, health: _ChannelHealth):
+        self.max_streams = max_streams
+        self.in_flight = 0
+        self._health = health
+        self._semaphore = asyncio.Semaphore(max_streams)
+
+    def _release(self, call=None):
+        self.in_flight -= 1
+        self._semaphore.release()
+        if call is not None:
+            self._health.record(_call_code(call))
+
+    async def _intercept(self, continuation, client_call_details, request):
+        timeout = client_call_details.timeout
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(),
+                STREAM_SLOT_TIMEOUT_SECONDS if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            raise StreamLimitExceeded(f'{self.max_streams} streams already in flight') from None
+        self.in_flight += 1
+        try:
+            call = await continuation(client_call_details, request)
+        except BaseException:
+            self._release()
+            raise
+        call.add_done_callback(self._release)
+        return call
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        return await self._intercept(continuation, client_call_details, request)
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        return await self._intercept(continuation, client_call_details, request)
+
+
+class _AioPooledChannel:
+
+    def __init__(self, target: str, options, max_streams: int):
+        self.target = target
+        self.health = _ChannelHealth()
+        self.limiter = _AioStreamLimitInterceptor(max_streams, self.health)
+        self.channel = grpc.aio.insecure_channel(target, options=options, interceptors=[self.limiter])
+        self.stubs: Dict[type, object] = {}
+
+
+class AioChannelPool:
+    """grpc.aio channels keyed by target; use from a single event loop"""
+
+    def __init__(
+            self,
+            options=DEFAULT_CHANNEL_OPTIONS,
+            max_concurrent_streams: int = MAX_CONCURRENT_STREAMS,
+            unhealthy_after: float = UNHEALTHY_AFTER_SECONDS
+    ):
+        self.options = tuple(options)
+        self.max_concurrent_streams = max_concurrent_streams
+        self.unhealthy_after = unhealthy_after
+        self._channels: Dict[str, _AioPooledChannel] = {}
+        self._retired = set()
+        self._closed = False
+
+    def _entry(self, target: str) -> _AioPooledChannel:
+        if self._closed:
+            raise ChannelPoolError('Channel pool is closed')
+        entry = self._channels.get(target)
+        if entry is not None and not entry.health.is_healthy(self.unhealthy_after):
+            logger.warning(f"gRPC aio channel to {target} keeps failing with UNAVAILABLE; reconnecting")
+            task = asyncio.get_running_loop().create_task(entry.channel.close(self.unhealthy_after))
+            self._retired.add(task)
+            task.add_done_callback(self._retired.discard)
+            entry = None
+        if entry is None:
+            entry = _AioPooledChannel(target, self.options, self.max_concurrent_streams)
+            self._channels[target] = entry
+        return entry
+
+    def get_channel(self, target: str) -> grpc.aio.Channel:
+        return self._entry(target).channel
+
+    def get_stub(self, target: str, stub_class: Type):
+        entry = self._entry(target)
+        stub = entry.stubs.get(stub_class)
+        if stub is None:
+            stub = entry.stubs[stub_class] = stub_class(entry.channel)
+        return stub
+
+    async def check_health(self, target: str, timeout: float = 1.0) -> bool:
+        entry = self._entry(target)
+        try:
+            await asyncio.wait_for(entry.channel.channel_ready(), timeout)
+            entry.health.record(grpc.StatusCode.OK)
+            return True
+        except asyncio.TimeoutError:
+            entry.health.record(grpc.StatusCode.UNAVAILABLE)
+            return False
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            target: {
+                'state': entry.channel.get_state(try_to_connect=False).name,
+                'healthy': entry.health.is_healthy(self.unhealthy_after),
+                'in_flight': entry.limiter.in_flight,
+                'max_concurrent_streams': entry.limiter.max_streams,
+                'stubs': len(entry.stubs),
+            }
+            for target, entry in self._channels.items()
+        }
+
+    async def close(self, grace: Optional[float] = 5.0):
+        """Close every channel; in-flight calls get up to grace seconds to finish"""
+        self._closed = True
+        entries = list(self._channels.values())
+        self._channels.clear()
+        await asyncio.gather(*(entry.channel.close(grace) for entry in entries))
+        if self._retired:
+            await asyncio.gather(*self._retired, return_exceptions=True)
+
+
+# ----------------------------------------------------------------------
+# Process-wide pools
+# ----------------------------------------------------------------------
+
+_pool: Optional[ChannelPool] = None
+_pool_lock = threading.Lock()
+_aio_pools: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AioChannelPool]' = weakref.WeakKeyDictionary()
+
+
+def get_channel_pool() -> ChannelPool:
+    """Channel pool shared by the synchronous clients (closed at interpreter exit)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ChannelPool()
+                atexit.register(_pool.close, 1.0)
+    return _pool
+
+
+def get_aio_channel_pool() -> AioChannelPool:
+    """AioChannelPool of the running event loop"""
+    loop = asyncio.get_running_loop()
+    pool = _aio_pools.get(loop)
+    if pool is None:
+        pool = _aio_pools[loop] = AioChannelPool()
+    return pool
+
+
+def close_channel_pool(grace: Optional[float] = 5.0):
+    """Close the shared synchronous pool (a new one is created on next use)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        atexit.unregister(pool.close)
+        pool.close(grace)
@@ -0,0 +1,471 @@
+"""
+Two-tier cache for external service calls (Facility / Recommendation / Wiki)
+
+    @cached_call('facility.search_places', unordered=('categories',))
+    def search_places(self, province=None, ...):
+
+Lookup order for a call:
+1. in-process LRU (per worker)
+2. shared backend: MongoDB collection `external_api_cache` with a TTL index
+   (same document shape as team11 MongoAPICache), or an in-memory dict
+3. the wrapped method (the upstream call)
+
+- Keys are derived from the normalized call arguments (positional and
+  keyword calls match, defaults applied, dict keys and `unordered`
+  arguments sorted).
+- Entries are fresh for `ttl` seconds, then served stale for up to
+  `stale_ttl` more seconds while one background refresh runs
+  (stale-while-revalidate).
+- Identical concurrent misses are coalesced: one thread calls upstream,
+  the others wait for its result.
+- Cached values are frozen (see frozen.py); list results are returned as
+  new lists of the frozen items.
+- None results and upstream errors are never cached. If the backend fails
+  it is skipped for BACKEND_RETRY_SECONDS and calls go upstream.
+
+Counters: get_api_cache().stats()
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .frozen import freeze
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'BACKEND': 'memory',          # 'mongo', 'memory' or None (LRU only)
+    'LRU_SIZE': 2048,
+    'TTL_SECONDS': 3600,
+    'STALE_SECONDS': 600,
+    'COLLECTION': 'external_api_cache',
+}
+
+BACKEND_RETRY_SECONDS = 30
+
+
+def _thaw(value: Any) -> Any:
+    """Frozen value -> plain dicts/lists (BSON/JSON friendly)"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _normalize(value: Any, unordered: bool = False) -> Any:
+    if isinstance(value, Mapping):
+        return {str(key): _normalize(item) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (set, frozenset)):
+        unordered = True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_normalize(item) for item in value]
+        if unordered:
+            items.sort(key=lambda item: json.dumps(item, sort_keys=True, ensure_ascii=False, default=str))
+        return items
+    return value
+
+
+def make_cache_key(namespace: str, arguments: Dict[str, Any], unordered: Iterable[str] = ()) -> str:
+    """Stable key for a call: namespace + hash of the normalized arguments"""
+    unordered = set(unordered)
+    normalized = {
+        name: _normalize(value, unordered=name in unordered)
+        for name, value in sorted(arguments.items())
+    }
+    digest = hashlib.sha256(
+        json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    ).hexdigest()
+    return f'{namespace}:{digest}'
+
+
+class CacheEntry:
+    __slots__ = ('value', 'fresh_until', 'expires_at')
+
+    def __init__(self, value: Any, fresh_until: float, expires_at: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+
+
+# ----------------------------------------------------------------------
+# Shared backends (second tier)
+# ----------------------------------------------------------------------
+
+class InMemoryCacheBackend:
+    """
+    Dict backed stand-in for the Mongo cache (tests, local runs)
+
+    Backends return entries even past expires_at; TwoTierCache checks it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._documents: Dict[str, Tuple[Any, float, float]] = {}
+
+    def get(self, cache_key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            document = self._documents.get(cache_key)
+        if document is None:
+            return None
+        return CacheEntry(*document)
+
+    def set(self, cache_key: str, payload: Any, fresh_until: float, expires_at: float):
+        with self._lock:
+            self._documents[cache_key] = (_thaw(payload), fresh_until, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+
+class MongoCacheBackend:
+    """
+    MongoDB collection with a TTL index on `expires_at`
+
+    Documents: cache_key, payload, fetched_at, fresh_until, expires_at, is_stale.
+    `expires_at` includes the stale window, so Mongo only removes an entry
+    once it can no longer be served at all.
+    """
+
+    def __init__(self, collection=None, collection_name: str = 'external_api_cache'):
+        self._collection = collection
+        self._collection_name = collection_name
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _get_collection(self):
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    if self._collection is None:
+                        self._collection = self._connect()[self._collection_name]
+                    self._collection.create_index('expires_at', expireAfterSeconds=0)
+                    self._collection.create_index('cache_key', unique=True)
+                    self._ready = True
+        return self._collection
+
+    @staticmethod
+    def _connect():
+        from django.conf import settings
+        from pymongo import MongoClient
+
+        mongo = settings.MONGODB_SETTINGS
+        client = MongoClient(
+            host=mongo['host'],
+            port=mongo['port'],
+            username=mongo.get('username'),
+            password=mongo.get('password'),
+            authSource=mongo.get('authentication_source', 'admin'),
+            serverSelectionTimeoutMS=500,
+        )
+        return client[mongo['db']]
+
+    def get(self, cache_key: str) -> Optional[CacheEntry]:
+        document = self._get_collection().find_one({'cache_key': cache_key})
+        if not document:
+            return None
+        expires_at = document['expires_at'].replace(tzinfo=timezone.utc).timestamp()
+        fresh_until = document.get('fresh_until')
+        if document.get('is_stale') or fresh_until is None:
+            fresh_until = 0.0
+        else:
+            fresh_until = fresh_until.replace(tzinfo=timezone.utc).timestamp()
+        return CacheEntry(document.get('payload'), fresh_until, expires_at)
+
+    def set(self, cache_key: str, payload: Any, fresh_until: float, expires_at: float):
+        self._get_collection().update_one(
+            {'cache_key': cache_key},
+            {
+                '$set': {
+                    'cache_key': cache_key,
+                    'payload': _thaw(payload),
+                    'fetched_at': datetime.now(timezone.utc),
+                    'fresh_until': datetime.fromtimestamp(fresh_until, timezone.utc),
+                    'expires_at': datetime.fromtimestamp(expires_at, timezone.utc),
+                    'is_stale': False
+                }
+            },
+            upsert=True
+        )
+
+    def clear(self):
+        self._get_collection().delete_many({})
+
+
+# ----------------------------------------------------------------------
+# Two-tier cache
+# ----------------------------------------------------------------------
+
+class _Flight:
+    """One in-progress upstream call that other callers can wait for"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class TwoTierCache:
+    """In-process LRU in front of a shared TTL backend"""
+
+    COUNTERS = (
+        'local_hits', 'backend_hits', 'stale_hits', 'misses',
+        'coalesced', 'refreshes', 'upstream_calls', 'upstream_errors', 'backend_errors'
+    )
+
+    def __init__(
+            self,
+            backend=None,
+            lru_size: int = 2048,
+            ttl: float = 3600,
+            stale_ttl: float = 600,
+            refresh_executor: Optional[ThreadPoolExecutor] = None,
+            clock: Callable[[], float] = time.time
+    ):
+        self.backend = backend
+        self.lru_size = lru_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._lru: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._refresh_executor = refresh_executor
+        self._backend_retry_at = 0.0
+        self._counters = dict.fromkeys(self.COUNTERS, 0)
+
+    # -- counters ------------------------------------------------------
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['lru_entries'] = len(self._lru)
+        lookups = stats['local_hits'] + stats['backend_hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_ratio'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        stats['backend'] = type(self.backend).__name__ if self.backend is not None else None
+        return stats
+
+    def clear(self):
+        """Drop the LRU (and the backend entries) and reset the counters"""
+        with self._lock:
+            self._lru.clear()
+            self._counters = dict.fromkeys(self.COUNTERS, 0)
+        if self.backend is not None:
+            self._backend_call('clear')
+
+    # -- tiers ---------------------------------------------------------
+
+    def _lru_get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return entry
+
+    def _lru_set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _backend_call(self, method: str, *args):
+        if self.backend is None or self._clock() < self._backend_retry_at:
+            return None
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception:
+            logger.warning("External API cache backend failed; skipping it for %ss",
+                           BACKEND_RETRY_SECONDS, exc_info=True)
+            self._count('backend_errors')
+            self._backend_retry_at = self._clock() + BACKEND_RETRY_SECONDS
+            return None
+
+    # -- loading -------------------------------------------------------
+
+    def _load(self, key: str, loader: Callable[[], Any], ttl: float) -> Any:
+        """Call upstream once per key at a time; concurrent callers share the result"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self._counters['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            self._count('upstream_calls')
+            value = loader()
+            if value is not None:
+                value = freeze(value)
+                now = self._clock()
+                entry = CacheEntry(value, now + ttl, now + ttl + self.stale_ttl)
+                self._lru_set(key, entry)
+                self._backend_call('set', key, value, entry.fresh_until, entry.expires_at)
+            flight.value = value
+            return value
+        except BaseException as exc:
+            self._count('upstream_errors')
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh(self, key: str, loader: Callable[[], Any], ttl: float):
+        """Revalidate a stale entry in the background (at most one refresh per key)"""
+        with self._lock:
+            if key in self._flights:
+                return
+        self._count('refreshes')
+
+        def run():
+            try:
+                self._load(key, loader, ttl)
+            except Exception:
+                logger.warning("Background refresh failed for %s", key, exc_info=True)
+
+        executor = self._refresh_executor
+        if executor is None:
+            threading.Thread(target=run, daemon=True).start()
+        else:
+            executor.submit(run)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        ttl = self.ttl if ttl is None else ttl
+        now = self._clock()
+
+        entry = self._lru_get(key)
+        tier = 'local_hits'
+        if entry is None:
+            entry = self._backend_call('get', key)
+            tier = 'backend_hits'
+            if entry is not None and entry.expires_at <= now:
+                entry = None
+            if entry is not None:
+                entry = CacheEntry(freeze(entry.value), entry.fresh_until, entry.expires_at)
+                self._lru_set(key, entry)
+
+        if entry is None:
+            self._count('misses')
+            return self._load(key, loader, ttl)
+
+        if entry.fresh_until <= now:
+            self._count('stale_hits')
+            self._refresh(key, loader, ttl)
+        else:
+            self._count(tier)
+        return entry.value
+
+
+# ----------------------------------------------------------------------
+# Process-wide cache and decorator
+# ----------------------------------------------------------------------
+
+_cache: Optional[TwoTierCache] = None
+_cache_lock = threading.Lock()
+
+
+def _settings() -> Dict[str, Any]:
+    options = dict(DEFAULT_SETTINGS)
+    try:
+        from django.conf import settings
+        if settings.configured:
+            options.update(getattr(settings, 'EXTERNAL_API_CACHE', {}))
+    except ImportError:
+        pass
+    return options
+
+
+def _build_cache() -> TwoTierCache:
+    options = _settings()
+    backend_name = options['BACKEND']
+    if backend_name == 'mongo':
+        backend = MongoCacheBackend(collection_name=options['COLLECTION'])
+    elif backend_name == 'memory':
+        backend = InMemoryCacheBackend()
+    else:
+        backend = None
+    return TwoTierCache(
+        backend=backend,
+        lru_size=options['LRU_SIZE'],
+        ttl=options['TTL_SECONDS'],
+        stale_ttl=options['STALE_SECONDS'],
+    )
+
+
+def get_api_cache() -> TwoTierCache:
+    """Process-wide cache used by @cached_call (built from settings.EXTERNAL_API_CACHE)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _build_cache()
+    return _cache
+
+
+def set_api_cache(cache: Optional[TwoTierCache]):
+    """Replace the process-wide cache (None: rebuild from settings on next use)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def cached_call(namespace: str, ttl: Optional[float] = None, unordered: Iterable[str] = ()):
+    """
+    Cache a client method through get_api_cache()
+
+    The key covers the namespace, the client's base_url and every argument
+    of the call (after defaults are applied). `unordered` names list arguments
+    whose order does not matter (e.g. categories).
+    """
+    unordered = tuple(unordered)
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self', None)
+            arguments['__scope__'] = getattr(self, 'base_url', '')
+            key = make_cache_key(namespace, arguments, unordered)
+
+            value = get_api_cache().get_or_load(key, lambda: method(self, *args, **kwargs), ttl)
+            if isinstance(value, tuple):
+                return list(value)
+            return value
+
+        wrapper.uncached = method
+        return wrapper
+
+    return decorator
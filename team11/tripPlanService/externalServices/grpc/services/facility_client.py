@@ -3,7 +3,12 @@ Facility Service Client - Fully Mocked with Real Iranian Places
 """
 
 import logging
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Mapping, Optional, Tuple
+
+from .api_cache import cached_call
+from .frozen import freeze
+from .place_catalogue import PlaceCatalogue
 
 logger = logging.getLogger(__name__)
 
@@ -12,19 +17,36 @@ class FacilityClient:
     """
     Fully mocked client with real places from all Iranian provinces
     Each province has at least 3 samples with real locations
+
+    The mock places are built once per process (shared_mock_places) and are
+    read-only; use registry.get_facility_client() for the shared instance.
     """
 
+    _shared_mock_places: Optional[Tuple[Mapping, ...]] = None
+    _shared_lock = threading.Lock()
+
     def __init__(self, base_url: str = 'http://localhost:8000/team4/api', use_mocks: bool = True):
         self.base_url = base_url.rstrip('/')
         self.use_mocks = use_mocks
         logger.info("FacilityClient initialized in FULL MOCK mode with real Iranian places")
 
-        # Initialize all mock data
-        self._initialize_mock_data()
-
-    def _initialize_mock_data(self):
+        # Shared read-only mock data
+        self.mock_places = self.shared_mock_places()
+        self.catalogue = PlaceCatalogue(self.mock_places, fetch_by_ids=self._fetch_places_by_ids)
+
+    @classmethod
+    def shared_mock_places(cls) -> Tuple[Mapping, ...]:
+        """Mock places of this process, built and frozen on first use"""
+        if cls._shared_mock_places is None:
+            with cls._shared_lock:
+                if cls._shared_mock_places is None:
+                    cls._shared_mock_places = freeze(cls._build_mock_places())
+        return cls._shared_mock_places
+
+    @staticmethod
+    def _build_mock_places() -> List[Dict]:
         """Initialize comprehensive mock data for all Iranian provinces"""
-        self.mock_places = [
+        return [
             # Tehran Province
             {
                 'id': 'place_tehran_001',
@@ -2757,6 +2779,7 @@ class FacilityClient:
             },
         ]
 
+    @cached_call('facility.search_places', unordered=('categories',))
     def search_places(
             self,
             province: str = None,
@@ -2770,58 +2793,29 @@ class FacilityClient:
         """
         logger.info(f"Searching places - Province: {province}, City: {city}, Categories: {categories}, Budget: {budget_level}")
 
-        # Start with all places
-        filtered_places = self.mock_places.copy()
-
-        # Filter by province (case-insensitive, partial match)
-        if province:
-            filtered_places = [
-                p for p in filtered_places
-                if province.lower() in p['province'].lower()
-            ]
-
-        # Filter by city/location (case-insensitive, partial match)
-        if city:
-            filtered_places = [
-                p for p in filtered_places
-                if city.lower() in p['location'].lower()
-            ]
-
-        # Filter by categories
-        if categories:
-            temp_places = [
-                p for p in filtered_places
-                if p['category'] in categories
-            ]
-
-            if temp_places:
-                filtered_places = temp_places
-
-        # Filter by budget level
-        if budget_level:
-            budget_map = {
-                'ECONOMY': ['FREE', 'BUDGET'],
-                'MEDIUM': ['BUDGET', 'MODERATE'],
-                'LUXURY': ['MODERATE', 'EXPENSIVE', 'LUXURY'],
-                'UNLIMITED': ['FREE', 'BUDGET', 'MODERATE', 'EXPENSIVE', 'LUXURY']
-            }
-            allowed_tiers = budget_map.get(budget_level, ['MODERATE'])
-            filtered_places = [
-                p for p in filtered_places
-                if p['price_tier'] in allowed_tiers
-            ]
-
-        logger.info(f"Found {len(filtered_places)} places after filtering")
-
-        # Return limited results
-        return filtered_places[:limit]
+        places = self.catalogue.search(
+            province=province,
+            city=city,
+            categories=categories,
+            budget_level=budget_level,
+            limit=limit
+        )
 
+        logger.info(f"Found {len(places)} places after filtering")
+        return places
+
+    @cached_call('facility.get_place_by_id')
     def get_place_by_id(self, place_id: str) -> Optional[Dict]:
         """Get detailed information about a specific place"""
-        for place in self.mock_places:
-            if place['id'] == place_id:
-                return place
-        return None
+        return self.catalogue.get(place_id)
+
+    def _fetch_places_by_ids(self, place_ids: List[str]) -> List[Dict]:
+        """
+        Backend lookup for ids missing from the catalogue (read-through).
+        The mock catalogue is complete, so there is nothing to fetch;
+        a real Team 4 backend (GetPlaceByIds) plugs in here.
+        """
+        return []
 
     def check_availability(
             self,
@@ -0,0 +1,28 @@
+"""
+Read-only views of the mock client data
+
+The mock catalogues are built once per process and shared by every client
+instance (see registry.py), so nothing may modify them in place:
+- dicts become MappingProxyType
+- lists become tuples
+
+Code that needs to add fields to a shared place/region must copy it first
+(dict(place) or place.copy()).
+
+A MappingProxyType is taken as already frozen and returned as is, so
+freezing a result made of shared places keeps the same place objects.
+"""
+
+from types import MappingProxyType
+from typing import Any
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists to read-only mappings/tuples"""
+    if isinstance(value, MappingProxyType):
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
@@ -0,0 +1,188 @@
+"""
+Indexed in-memory place catalogue used by FacilityClient
+
+Places are indexed once when they are loaded:
+- by id (hash map)
+- by lower-cased province and city/location (inverted indexes)
+- by category and price tier (inverted indexes)
+- by budget level (precomputed union of the allowed price tiers)
+
+A search is then a set intersection over place positions. Results keep the
+catalogue order and are the stored dicts themselves (no list copy).
+
+The catalogue can also sit in front of a remote facility backend as a
+read-through cache: pass `fetch_by_ids` and missing ids are fetched once
+and upserted.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# Allowed price tiers for each budget level (same rules as the old linear filter)
+BUDGET_TIERS = {
+    'ECONOMY': ['FREE', 'BUDGET'],
+    'MEDIUM': ['BUDGET', 'MODERATE'],
+    'LUXURY': ['MODERATE', 'EXPENSIVE', 'LUXURY'],
+    'UNLIMITED': ['FREE', 'BUDGET', 'MODERATE', 'EXPENSIVE', 'LUXURY']
+}
+DEFAULT_BUDGET_TIERS = ['MODERATE']
+
+# Cap on memoized substring lookups (province/city queries typed by users)
+MAX_MATCH_CACHE = 1024
+
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or '').lower()
+
+
+class PlaceCatalogue:
+    """
+    Indexed place dictionaries (same shape as FacilityClient mock places)
+    """
+
+    def __init__(
+            self,
+            places: Iterable[Dict] = (),
+            fetch_by_ids: Optional[Callable[[List[str]], List[Dict]]] = None
+    ):
+        self._fetch_by_ids = fetch_by_ids
+        self._lock = threading.RLock()
+        self._places: List[Dict] = []
+        self._position_by_id: Dict[str, int] = {}
+        self._by_province: Dict[str, Set[int]] = {}
+        self._by_location: Dict[str, Set[int]] = {}
+        self._by_category: Dict[str, Set[int]] = {}
+        self._by_tier: Dict[str, Set[int]] = {}
+        self._by_budget: Dict[str, Set[int]] = {}
+        self._match_cache: Dict[tuple, Set[int]] = {}
+        self.upsert(places)
+
+    def __len__(self) -> int:
+        return len(self._position_by_id)
+
+    def __iter__(self):
+        return iter(self._places)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def upsert(self, places: Iterable[Dict]):
+        """Add places or replace existing ones (matched by id)"""
+        with self._lock:
+            for place in places:
+                place_id = str(place['id'])
+                position = self._position_by_id.get(place_id)
+                if position is None:
+                    position = len(self._places)
+                    self._places.append(place)
+                    self._position_by_id[place_id] = position
+                else:
+                    self._unindex(position)
+                    self._places[position] = place
+                self._index(position, place)
+            self._match_cache.clear()
+
+    def _index(self, position: int, place: Dict):
+        self._by_province.setdefault(_normalize(place.get('province')), set()).add(position)
+        self._by_location.setdefault(_normalize(place.get('location')), set()).add(position)
+        self._by_category.setdefault(place.get('category'), set()).add(position)
+        tier = place.get('price_tier')
+        self._by_tier.setdefault(tier, set()).add(position)
+        for budget_level, tiers in BUDGET_TIERS.items():
+            if tier in tiers:
+                self._by_budget.setdefault(budget_level, set()).add(position)
+
+    def _unindex(self, position: int):
+        for index in (self._by_province, self._by_location, self._by_category,
+                      self._by_tier, self._by_budget):
+            for positions in index.values():
+                positions.discard(position)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, place_id: str) -> Optional[Dict]:
+        """Place by id; missing ids go through fetch_by_ids when configured"""
+        position = self._position_by_id.get(str(place_id))
+        if position is not None:
+            return self._places[position]
+        if self._fetch_by_ids is None:
+            return None
+        found = self.get_many([place_id])
+        return found[0] if found else None
+
+    def get_many(self, place_ids: List[str]) -> List[Dict]:
+        """Places for the given ids (input order, unknown ids skipped)"""
+        missing = [str(pid) for pid in place_ids if str(pid) not in self._position_by_id]
+        if missing and self._fetch_by_ids is not None:
+            fetched = self._fetch_by_ids(missing)
+            if fetched:
+                self.upsert(fetched)
+        return [
+            self._places[self._position_by_id[str(pid)]]
+            for pid in place_ids
+            if str(pid) in self._position_by_id
+        ]
+
+    def _substring_match(self, index_name: str, index: Dict[str, Set[int]], query: str) -> Set[int]:
+        """Union of positions whose indexed value contains the query (case-insensitive)"""
+        key = (index_name, query)
+        matched = self._match_cache.get(key)
+        if matched is None:
+            needle = _normalize(query)
+            matched = set()
+            for value, positions in index.items():
+                if needle in value:
+                    matched |= positions
+            if len(self._match_cache) >= MAX_MATCH_CACHE:
+                self._match_cache.clear()
+            self._match_cache[key] = matched
+        return matched
+
+    def search(
+            self,
+            province: Optional[str] = None,
+            city: Optional[str] = None,
+            categories: Optional[List[str]] = None,
+            budget_level: Optional[str] = None,
+            limit: int = 20
+    ) -> List[Dict]:
+        """
+        Filter places; same semantics as the previous linear scan:
+        - province / city: case-insensitive substring match
+        - categories: ignored if none of the matching places has them
+        - budget_level: allowed price tiers from BUDGET_TIERS
+        """
+        with self._lock:
+            candidates: Optional[Set[int]] = None
+
+            if province:
+                candidates = set(self._substring_match('province', self._by_province, province))
+            if city:
+                matched = self._substring_match('location', self._by_location, city)
+                candidates = set(matched) if candidates is None else candidates & matched
+
+            if categories:
+                in_categories = set()
+                for category in categories:
+                    in_categories |= self._by_category.get(category, set())
+                narrowed = in_categories if candidates is None else candidates & in_categories
+                if narrowed:
+                    candidates = narrowed
+
+            if budget_level:
+                if budget_level in BUDGET_TIERS:
+                    allowed = self._by_budget.get(budget_level, set())
+                else:
+                    allowed = set()
+                    for tier in DEFAULT_BUDGET_TIERS:
+                        allowed |= self._by_tier.get(tier, set())
+                candidates = set(allowed) if candidates is None else candidates & allowed
+
+            if candidates is None:
+                return self._places[:limit]
+
+            places = self._places
+            return [places[position] for position in sorted(candidates)[:limit]]
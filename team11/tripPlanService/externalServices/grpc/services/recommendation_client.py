@@ -2,9 +2,13 @@
 Recommendation Service Client - Fully Mocked with Comprehensive Iranian Data
 """
 import logging
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Mapping, Optional, Tuple
 import random
 
+from .api_cache import cached_call
+from .frozen import freeze
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,21 +16,37 @@ class RecommendationClient:
     """
     Fully mocked client for recommendation service
     Provides intelligent scoring and region suggestions based on Iranian provinces
+
+    Regions and travel style preferences are built once per process and are
+    read-only; use registry.get_recommendation_client() for the shared instance.
     """
 
+    _shared_mock_data: Optional[Tuple[Tuple[Mapping, ...], Mapping]] = None
+    _shared_lock = threading.Lock()
+
     def __init__(self, base_url: str = 'http://localhost:8000/api', use_mocks: bool = True):
         self.base_url = base_url.rstrip('/')
         self.use_mocks = use_mocks
         logger.info("RecommendationClient initialized in FULL MOCK mode")
 
-        # Initialize mock data
-        self._initialize_mock_data()
+        # Shared read-only mock data
+        self.regions, self.travel_style_preferences = self.shared_mock_data()
 
-    def _initialize_mock_data(self):
+    @classmethod
+    def shared_mock_data(cls) -> Tuple[Tuple[Mapping, ...], Mapping]:
+        """(regions, travel_style_preferences) of this process, built and frozen on first use"""
+        if cls._shared_mock_data is None:
+            with cls._shared_lock:
+                if cls._shared_mock_data is None:
+                    cls._shared_mock_data = freeze(cls._build_mock_data())
+        return cls._shared_mock_data
+
+    @staticmethod
+    def _build_mock_data() -> Tuple[List[Dict], Dict]:
         """Initialize comprehensive mock data for Iranian provinces"""
 
         # Region data for all Iranian provinces
-        self.regions = [
+        regions = [
             # Popular tourist provinces
             {
                 'region_id': 'reg_isfahan',
@@ -341,7 +361,7 @@ class RecommendationClient:
         ]
 
         # Travel style preferences for scoring
-        self.travel_style_preferences = {
+        travel_style_preferences = {
             'تاریخی': {
                 'preferred_categories': ['HISTORICAL', 'CULTURAL', 'RELIGIOUS'],
                 'weight': 1.5
@@ -372,6 +392,8 @@ class RecommendationClient:
             }
         }
 
+        return regions, travel_style_preferences
+
     def get_scored_places(
             self,
             candidate_place_ids: List[str],
@@ -429,6 +451,7 @@ class RecommendationClient:
 
         return scores
 
+    @cached_call('recommendation.get_suggested_regions', unordered=('interests',))
     def get_suggested_regions(
             self,
             budget_limit: str,
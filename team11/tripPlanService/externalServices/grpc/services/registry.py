@@ -0,0 +1,89 @@
+"""
+Process-wide registry of the external service clients
+
+Constructing FacilityClient / RecommendationClient / WikiClient used to rebuild
+their mock catalogues (and the place indexes) every time, and the business
+helpers construct clients per request. The registry hands out one lazily
+created instance of each client per process instead.
+
+- get_facility_client / get_recommendation_client / get_wiki_client:
+  shared instance, created on first use (thread-safe)
+- warm_up(): create all clients up front, e.g. from a gunicorn post_fork hook
+  or at process start, so the first request does not pay for it
+- reset(): drop the instances (tests)
+
+The shared data is read-only (see frozen.py); copy a place before adding
+fields to it.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .facility_client import FacilityClient
+from .recommendation_client import RecommendationClient
+from .wiki_client import WikiClient
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_instances: Dict[str, object] = {}
+
+CLIENT_FACTORIES: Dict[str, Callable[[], object]] = {
+    'facility': lambda: FacilityClient(use_mocks=True),
+    'recommendation': lambda: RecommendationClient(use_mocks=True),
+    'wiki': WikiClient,
+}
+
+
+def _get(name: str):
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = CLIENT_FACTORIES[name]()
+                _instances[name] = instance
+    return instance
+
+
+def get_facility_client() -> FacilityClient:
+    """Shared FacilityClient of this process"""
+    return _get('facility')
+
+
+def get_recommendation_client() -> RecommendationClient:
+    """Shared RecommendationClient of this process"""
+    return _get('recommendation')
+
+
+def get_wiki_client() -> WikiClient:
+    """Shared WikiClient of this process"""
+    return _get('wiki')
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Create every client now instead of on the first request
+
+    Returns:
+        Seconds spent per client (0 for clients that already existed)
+    """
+    timings = {}
+    for name in CLIENT_FACTORIES:
+        started = time.perf_counter()
+        _get(name)
+        timings[name] = time.perf_counter() - started
+    logger.info("External clients warmed up: %s",
+                ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items()))
+    return timings
+
+
+def reset(name: Optional[str] = None):
+    """Drop one (or all) shared instances; the next get_* call creates a new one"""
+    with _lock:
+        if name is None:
+            _instances.clear()
+        else:
+            _instances.pop(name, None)
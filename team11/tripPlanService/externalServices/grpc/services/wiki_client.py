@@ -2,7 +2,11 @@
 Wikipedia/Knowledge Base Client - Fully Mocked with Comprehensive Iranian Places Data
 """
 import logging
-from typing import Dict, Optional, List
+import threading
+from typing import Dict, Mapping, Optional, List
+
+from .api_cache import cached_call
+from .frozen import freeze
 
 logger = logging.getLogger(__name__)
 
@@ -11,16 +15,32 @@ class WikiClient:
     """
     Fully mocked client for fetching place information
     Contains detailed Wikipedia-style information for Iranian tourist destinations
+
+    The wiki data is built once per process and is read-only;
+    use registry.get_wiki_client() for the shared instance.
     """
 
+    _shared_wiki_data: Optional[Mapping] = None
+    _shared_lock = threading.Lock()
+
     def __init__(self):
         logger.info("WikiClient initialized in FULL MOCK mode")
-        self._initialize_wiki_data()
-
-    def _initialize_wiki_data(self):
+        self.wiki_data = self.shared_wiki_data()
+
+    @classmethod
+    def shared_wiki_data(cls) -> Mapping:
+        """Wiki data of this process, built and frozen on first use"""
+        if cls._shared_wiki_data is None:
+            with cls._shared_lock:
+                if cls._shared_wiki_data is None:
+                    cls._shared_wiki_data = freeze(cls._build_wiki_data())
+        return cls._shared_wiki_data
+
+    @staticmethod
+    def _build_wiki_data() -> Dict[str, Dict]:
         """Initialize comprehensive Wikipedia-style data for Iranian places"""
 
-        self.wiki_data = {
+        return {
             # Tehran Province
             'place_tehran_001': {
                 'title': 'برج میلاد',
@@ -420,6 +440,7 @@ class WikiClient:
             }
         }
 
+    @cached_call('wiki.get_place_info')
     def get_place_info(self, place_id: str) -> Optional[Dict]:
         """
         Get detailed information about a place
@@ -0,0 +1,21 @@
+"""
+Gunicorn settings for tripPlanService
+
+Usage:
+    gunicorn -c gunicorn.conf.py tripPlanService.wsgi
+
+Every worker creates the shared external clients (mock catalogues and place
+indexes) right after it is forked, so its first request does not pay for it.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:2004')
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+
+
+def post_fork(server, worker):
+    from externalServices.grpc.services.registry import warm_up
+
+    timings = warm_up()
+    server.log.info("Worker %s warmed up external clients in %.1fms",
+                    worker.pid, sum(timings.values()) * 1000)
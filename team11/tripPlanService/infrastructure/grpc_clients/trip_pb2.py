@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\ntrip.proto\x12\x04trip\"\x07\n\x05\x45mpty\"(\n\x11\x43reateTripRequest\x12\x13\n\x0b\x64\x65stination\x18\x01 \x01(\t\"/\n\x0cTripResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65stination\x18\x02 \x01(\t\"\'\n\x04Trip\x12\n\n\x02id\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65stination\x18\x02 \x01(\t\"-\n\x10TripListResponse\x12\x19\n\x05trips\x18\x01 \x03(\x0b\x32\n.trip.Trip2z\n\x0bTripService\x12\x39\n\nCreateTrip\x12\x17.trip.CreateTripRequest\x1a\x12.trip.TripResponse\x12\x30\n\tListTrips\x12\x0b.trip.Empty\x1a\x16.trip.TripListResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\ntrip.proto\x12\x04trip\"\x07\n\x05\x45mpty\"\x9f\x01\n\x11\x43reateTripRequest\x12\x13\n\x0b\x64\x65stination\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x12\n\nstart_date\x18\x03 \x01(\t\x12\x15\n\rduration_days\x18\x04 \x01(\x05\x12\x14\n\x0c\x62udget_level\x18\x05 \x01(\t\x12\x14\n\x0ctravel_style\x18\x06 \x01(\t\x12\x0f\n\x07user_id\x18\x07 \x01(\t\"/\n\x0cTripResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65stination\x18\x02 \x01(\t\"\x82\x01\n\x04Trip\x12\n\n\x02id\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65stination\x18\x02 \x01(\t\x12\r\n\x05title\x18\x03 \x01(\t\x12\x12\n\nstart_date\x18\x04 \x01(\t\x12\x15\n\rduration_days\x18\x05 \x01(\x05\x12\x0e\n\x06status\x18\x06 \x01(\t\x12\x0f\n\x07user_id\x18\x07 \x01(\t\"-\n\x10TripListResponse\x12\x19\n\x05trips\x18\x01 \x03(\x0b\x32\n.trip.Trip\"]\n\x10ListTripsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x11\n\tpage_size\x18\x03 \x01(\x05\x12\x15\n\rafter_trip_id\x18\x04 \x01(\x03\"A\n\x17\x42\x61tchCreateTripsRequest\x12&\n\x05trips\x18\x01 \x03(\x0b\x32\x17.trip.CreateTripRequest\"5\n\x18\x42\x61tchCreateTripsResponse\x12\x19\n\x05trips\x18\x01 \x03(\x0b\x32\n.trip.Trip2\x82\x02\n\x0bTripService\x12\x39\n\nCreateTrip\x12\x17.trip.CreateTripRequest\x1a\x12.trip.TripResponse\x12\x30\n\tListTrips\x12\x0b.trip.Empty\x1a\x16.trip.TripListResponse\x12\x33\n\x0bStreamTrips\x12\x16.trip.ListTripsRequest\x1a\n.trip.Trip0\x01\x12Q\n\x10\x42\x61tchCreateTrips\x12\x1d.trip.BatchCreateTripsRequest\x1a\x1e.trip.BatchCreateTripsResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -23,14 +23,20 @@ if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_EMPTY']._serialized_start=20
   _globals['_EMPTY']._serialized_end=27
-  _globals['_CREATETRIPREQUEST']._serialized_start=29
-  _globals['_CREATETRIPREQUEST']._serialized_end=69
-  _globals['_TRIPRESPONSE']._serialized_start=71
-  _globals['_TRIPRESPONSE']._serialized_end=118
-  _globals['_TRIP']._serialized_start=120
-  _globals['_TRIP']._serialized_end=159
-  _globals['_TRIPLISTRESPONSE']._serialized_start=161
-  _globals['_TRIPLISTRESPONSE']._serialized_end=206
-  _globals['_TRIPSERVICE']._serialized_start=208
-  _globals['_TRIPSERVICE']._serialized_end=330
+  _globals['_CREATETRIPREQUEST']._serialized_start=30
+  _globals['_CREATETRIPREQUEST']._serialized_end=189
+  _globals['_TRIPRESPONSE']._serialized_start=191
+  _globals['_TRIPRESPONSE']._serialized_end=238
+  _globals['_TRIP']._serialized_start=241
+  _globals['_TRIP']._serialized_end=371
+  _globals['_TRIPLISTRESPONSE']._serialized_start=373
+  _globals['_TRIPLISTRESPONSE']._serialized_end=418
+  _globals['_LISTTRIPSREQUEST']._serialized_start=420
+  _globals['_LISTTRIPSREQUEST']._serialized_end=513
+  _globals['_BATCHCREATETRIPSREQUEST']._serialized_start=515
+  _globals['_BATCHCREATETRIPSREQUEST']._serialized_end=580
+  _globals['_BATCHCREATETRIPSRESPONSE']._serialized_start=582
+  _globals['_BATCHCREATETRIPSRESPONSE']._serialized_end=635
+  _globals['_TRIPSERVICE']._serialized_start=638
+  _globals['_TRIPSERVICE']._serialized_end=896
 # @@protoc_insertion_point(module_scope)
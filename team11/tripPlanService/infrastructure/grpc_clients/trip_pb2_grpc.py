@@ -49,6 +49,16 @@ class TripServiceStub(object):
                 request_serializer=trip__pb2.Empty.SerializeToString,
                 response_deserializer=trip__pb2.TripListResponse.FromString,
                 _registered_method=True)
+        self.StreamTrips = channel.unary_stream(
+                '/trip.TripService/StreamTrips',
+                request_serializer=trip__pb2.ListTripsRequest.SerializeToString,
+                response_deserializer=trip__pb2.Trip.FromString,
+                _registered_method=True)
+        self.BatchCreateTrips = channel.unary_unary(
+                '/trip.TripService/BatchCreateTrips',
+                request_serializer=trip__pb2.BatchCreateTripsRequest.SerializeToString,
+                response_deserializer=trip__pb2.BatchCreateTripsResponse.FromString,
+                _registered_method=True)
 
 
 class TripServiceServicer(object):
@@ -66,6 +76,20 @@ class TripServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamTrips(self, request, context):
+        """Pages through trips ordered by id; resume with after_trip_id
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchCreateTrips(self, request, context):
+        """All trips are created in one transaction, or none are
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TripServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -79,6 +103,16 @@ def add_TripServiceServicer_to_server(servicer, server):
                     request_deserializer=trip__pb2.Empty.FromString,
                     response_serializer=trip__pb2.TripListResponse.SerializeToString,
             ),
+            'StreamTrips': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTrips,
+                    request_deserializer=trip__pb2.ListTripsRequest.FromString,
+                    response_serializer=trip__pb2.Trip.SerializeToString,
+            ),
+            'BatchCreateTrips': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchCreateTrips,
+                    request_deserializer=trip__pb2.BatchCreateTripsRequest.FromString,
+                    response_serializer=trip__pb2.BatchCreateTripsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'trip.TripService', rpc_method_handlers)
@@ -143,3 +177,57 @@ class TripService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamTrips(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/trip.TripService/StreamTrips',
+            trip__pb2.ListTripsRequest.SerializeToString,
+            trip__pb2.Trip.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchCreateTrips(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/trip.TripService/BatchCreateTrips',
+            trip__pb2.BatchCreateTripsRequest.SerializeToString,
+            trip__pb2.BatchCreateTripsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -7,22 +7,107 @@ os.environ.setdefault(
 )
 
 django.setup()
-from presentation.grpc.services.TripServicer import TripServicer
+from presentation.grpc.services.TripServicer import TripServicer, AsyncTripServicer
+import asyncio
+import logging
 import grpc
+import grpc.aio
 from concurrent import futures
+from django.conf import settings
 
 from infrastructure.grpc_clients import trip_pb2_grpc as pb2_grpc
+from externalServices.grpc.services.registry import warm_up
+from externalServices.grpc.client.Clients import Clients
+from presentation.grpc.server.metrics import (
+    AioLatencyInterceptor, LatencyInterceptor, get_latency_registry
+)
 
+logger = logging.getLogger(__name__)
 
 
+def _config(**overrides):
+    config = {
+        'MODE': 'aio',
+        'ADDRESS': '[::]:50051',
+        'MAX_WORKERS': 10,
+        'MAX_CONCURRENT_RPCS': 200,
+        'DB_WORKERS': 10,
+        'METRICS_LOG_INTERVAL': 300,
+    }
+    config.update(getattr(settings, 'GRPC_SERVER', {}))
+    config.update(overrides)
+    return config
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+
+def build_server(address=None, max_workers=None, max_concurrent_rpcs=None):
+    """Thread-pool server: one worker thread per in-flight RPC"""
+    config = _config()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers or config['MAX_WORKERS']),
+        interceptors=[LatencyInterceptor()],
+        maximum_concurrent_rpcs=max_concurrent_rpcs or config['MAX_CONCURRENT_RPCS'],
+    )
     pb2_grpc.add_TripServiceServicer_to_server(TripServicer(), server)
-    server.add_insecure_port("[::]:50051")
+    port = server.add_insecure_port(address or config['ADDRESS'])
+    return server, port
+
+
+def build_aio_server(address=None, max_concurrent_rpcs=None, db_workers=None):
+    """
+    grpc.aio server: RPCs are coroutines on one event loop, ORM calls run
+    on a pool of `db_workers` threads. Returns (server, port, servicer);
+    call servicer.close() after the server has stopped.
+    """
+    config = _config()
+    server = grpc.aio.server(
+        interceptors=[AioLatencyInterceptor()],
+        maximum_concurrent_rpcs=max_concurrent_rpcs or config['MAX_CONCURRENT_RPCS'],
+    )
+    servicer = AsyncTripServicer(db_workers=db_workers or config['DB_WORKERS'])
+    pb2_grpc.add_TripServiceServicer_to_server(servicer, server)
+    port = server.add_insecure_port(address or config['ADDRESS'])
+    return server, port, servicer
+
+
+async def _log_metrics_periodically(interval):
+    while True:
+        await asyncio.sleep(interval)
+        get_latency_registry().log_summary()
+
+
+async def serve_aio():
+    config = _config()
+    server, port, servicer = build_aio_server()
+    warm_up()
+    await server.start()
+    print(f"gRPC (aio) running on port {port}...")
+    metrics_task = asyncio.create_task(_log_metrics_periodically(config['METRICS_LOG_INTERVAL']))
+    try:
+        await server.wait_for_termination()
+    finally:
+        metrics_task.cancel()
+        await server.stop(5)
+        servicer.close()
+        get_latency_registry().log_summary()
+        # Let outbound calls on the pooled channels finish before exiting
+        Clients.close()
+
+
+def serve():
+    if _config()['MODE'] == 'aio':
+        asyncio.run(serve_aio())
+        return
+
+    server, port = build_server()
+    warm_up()
     server.start()
-    print("gRPC running on port 50051...")
-    server.wait_for_termination()
+    print(f"gRPC running on port {port}...")
+    try:
+        server.wait_for_termination()
+    finally:
+        get_latency_registry().log_summary()
+        # Let outbound calls on the pooled channels finish before exiting
+        Clients.close()
 
 
 if __name__ == "__main__":
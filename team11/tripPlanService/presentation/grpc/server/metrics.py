@@ -0,0 +1,205 @@
+"""
+Per-RPC latency histograms for the trip gRPC server.
+
+LatencyInterceptor (sync server) and AioLatencyInterceptor (grpc.aio server)
+time every call, from the moment the handler starts until the unary response
+is returned or the response stream is exhausted, and record it into a
+fixed-bucket histogram keyed by the full method name.
+"""
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import grpc
+import grpc.aio
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds; the last bucket catches everything above
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram (same shape as a Prometheus histogram)"""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._sum_ms = 0.0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ms: float, ok: bool = True) -> None:
+        index = bisect.bisect_left(self.buckets_ms, elapsed_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum_ms += elapsed_ms
+            if not ok:
+                self._errors += 1
+
+    def _quantile(self, counts, total, q):
+        # Upper bound of the bucket holding the q-th observation
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets_ms + (float('inf'),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total_ms = self._sum_ms
+            errors = self._errors
+        total = sum(counts)
+        labels = [f'le_{bound:g}' for bound in self.buckets_ms] + ['le_inf']
+        return {
+            'count': total,
+            'errors': errors,
+            'sum_ms': round(total_ms, 3),
+            'mean_ms': round(total_ms / total, 3) if total else 0.0,
+            'p50_ms': self._quantile(counts, total, 0.5) if total else 0.0,
+            'p95_ms': self._quantile(counts, total, 0.95) if total else 0.0,
+            'p99_ms': self._quantile(counts, total, 0.99) if total else 0.0,
+            'buckets': dict(zip(labels, counts)),
+        }
+
+
+class RpcLatencyRegistry:
+    """One LatencyHistogram per RPC method"""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, method: str) -> LatencyHistogram:
+        histogram = self._histograms.get(method)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(method, LatencyHistogram(self.buckets_ms))
+        return histogram
+
+    def observe(self, method: str, started: float, ok: bool = True) -> None:
+        self.histogram(method).observe((time.perf_counter() - started) * 1000, ok)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {method: histogram.snapshot() for method, histogram in sorted(histograms.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def log_summary(self, level: int = logging.INFO) -> None:
+        for method, stats in self.snapshot().items():
+            logger.log(
+                level,
+                f"{method}: count={stats['count']} errors={stats['errors']} "
+                f"mean={stats['mean_ms']}ms p50<={stats['p50_ms']}ms "
+                f"p95<={stats['p95_ms']}ms p99<={stats['p99_ms']}ms"
+            )
+
+
+_registry = RpcLatencyRegistry()
+
+
+def get_latency_registry() -> RpcLatencyRegistry:
+    return _registry
+
+
+def _wrap_handler(handler, wrap_unary, wrap_stream):
+    """Rebuild a method handler with its behaviour wrapped for timing"""
+    if handler is None:
+        return None
+    if handler.unary_unary:
+        return grpc.unary_unary_rpc_method_handler(
+            wrap_unary(handler.unary_unary),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    if handler.unary_stream:
+        return grpc.unary_stream_rpc_method_handler(
+            wrap_stream(handler.unary_stream),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    # Client-streaming RPCs are not used by TripService; pass them through
+    return handler
+
+
+class LatencyInterceptor(grpc.ServerInterceptor):
+    """Records per-RPC latency on the thread-pool server"""
+
+    def __init__(self, registry: Optional[RpcLatencyRegistry] = None):
+        self.registry = registry or get_latency_registry()
+
+    def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        registry = self.registry
+
+        def wrap_unary(behavior):
+            def timed(request, context):
+                started = time.perf_counter()
+                ok = False
+                try:
+                    response = behavior(request, context)
+                    ok = context.code() in (None, grpc.StatusCode.OK)
+                    return response
+                finally:
+                    registry.observe(method, started, ok)
+            return timed
+
+        def wrap_stream(behavior):
+            def timed(request, context):
+                started = time.perf_counter()
+                ok = False
+                try:
+                    yield from behavior(request, context)
+                    ok = context.code() in (None, grpc.StatusCode.OK)
+                finally:
+                    registry.observe(method, started, ok)
+            return timed
+
+        return _wrap_handler(continuation(handler_call_details), wrap_unary, wrap_stream)
+
+
+class AioLatencyInterceptor(grpc.aio.ServerInterceptor):
+    """Records per-RPC latency on the grpc.aio server"""
+
+    def __init__(self, registry: Optional[RpcLatencyRegistry] = None):
+        self.registry = registry or get_latency_registry()
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        registry = self.registry
+
+        def wrap_unary(behavior):
+            async def timed(request, context):
+                started = time.perf_counter()
+                ok = False
+                try:
+                    response = await behavior(request, context)
+                    ok = context.code() in (None, grpc.StatusCode.OK)
+                    return response
+                finally:
+                    registry.observe(method, started, ok)
+            return timed
+
+        def wrap_stream(behavior):
+            async def timed(request, context):
+                started = time.perf_counter()
+                ok = False
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                    ok = context.code() in (None, grpc.StatusCode.OK)
+                finally:
+                    registry.observe(method, started, ok)
+            return timed
+
+        return _wrap_handler(await continuation(handler_call_details), wrap_unary, wrap_stream)
@@ -1,24 +1,169 @@
-import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+import grpc
+from django.db import close_old_connections
+from django.utils import timezone
 
 from infrastructure.grpc_clients import trip_pb2 as pb2
 from infrastructure.grpc_clients import trip_pb2_grpc as pb2_grpc
 from business.services import TripService
-from externalServices.rest.TripPlanClient import TripPlanClient
+from data.models import BudgetLevelChoices, TravelStyleChoices
+from data.repository import TripRepository
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 1000
+
+
+def _trip_data(request) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Map a CreateTripRequest onto Trip fields, with the same defaults as TripCreateSerializer"""
+    if not request.destination:
+        raise ValueError("Destination is required")
+    if request.budget_level and request.budget_level not in BudgetLevelChoices.values:
+        raise ValueError(f"Invalid budget_level: {request.budget_level}")
+    if request.travel_style and request.travel_style not in TravelStyleChoices.values:
+        raise ValueError(f"Invalid travel_style: {request.travel_style}")
+    try:
+        start_date = date.fromisoformat(request.start_date) if request.start_date else timezone.localdate()
+    except ValueError:
+        raise ValueError(f"Invalid start_date: {request.start_date}")
+
+    return request.user_id or None, {
+        'title': request.title or f'Trip to {request.destination}',
+        'province': request.destination,
+        'start_date': start_date,
+        'duration_days': request.duration_days or 3,
+        'budget_level': request.budget_level or BudgetLevelChoices.MEDIUM,
+        'travel_style': request.travel_style or TravelStyleChoices.SOLO,
+        'daily_available_hours': 8,
+        'generation_strategy': 'MIXED',
+    }
+
+
+def _to_message(trip) -> pb2.Trip:
+    return pb2.Trip(
+        id=str(trip.trip_id),
+        destination=trip.province,
+        title=trip.title,
+        start_date=trip.start_date.isoformat() if trip.start_date else '',
+        duration_days=trip.duration_days,
+        status=trip.status,
+        user_id=trip.user_id or '',
+    )
+
+
+def _page_size(request) -> int:
+    return max(1, min(request.page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def _create(request):
+    user_id, data = _trip_data(request)
+    return TripService.create_trip(user_id, data)
+
+
+def _batch_create(request):
+    if len(request.trips) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} trips per batch")
+    return TripService.create_trips([_trip_data(trip) for trip in request.trips])
+
 
 class TripServicer(pb2_grpc.TripServiceServicer):
+    """Servicer for the thread-pool grpc.server"""
 
     def CreateTrip(self, request, context):
-        trip = TripService.create_trip(request.destination)
+        try:
+            trip = _create(request)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         return pb2.TripResponse(
-            id=str(trip.id),
-            destination=trip.destination
+            id=str(trip.trip_id),
+            destination=trip.province
         )
 
     def ListTrips(self, request, context):
-        trips = TripService.get_trips()
+        trips = TripRepository.get_all().order_by('trip_id')
+        return pb2.TripListResponse(
+            trips=[_to_message(t) for t in trips]
+        )
+
+    def StreamTrips(self, request, context):
+        page_size = _page_size(request)
+        after_trip_id = request.after_trip_id
+        while context.is_active():
+            page = TripRepository.get_page_after(after_trip_id, page_size, request.user_id, request.status)
+            for trip in page:
+                yield _to_message(trip)
+            if len(page) < page_size:
+                return
+            after_trip_id = page[-1].trip_id
+
+    def BatchCreateTrips(self, request, context):
+        try:
+            trips = _batch_create(request)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return pb2.BatchCreateTripsResponse(trips=[_to_message(t) for t in trips])
+
+
+class AsyncTripServicer(pb2_grpc.TripServiceServicer):
+    """
+    Servicer for the grpc.aio server.
+
+    The ORM is synchronous, so every query runs on a bounded thread pool
+    (`db_workers`); the event loop keeps accepting and streaming while
+    queries are in flight.
+    """
+
+    def __init__(self, db_workers: int = 10):
+        self._db_executor = ThreadPoolExecutor(max_workers=db_workers, thread_name_prefix='trip-grpc-db')
+
+    async def _db(self, fn, *args):
+        def run():
+            close_old_connections()
+            try:
+                return fn(*args)
+            finally:
+                close_old_connections()
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, run)
+
+    def close(self):
+        self._db_executor.shutdown(wait=True)
+
+    async def CreateTrip(self, request, context):
+        try:
+            trip = await self._db(_create, request)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return pb2.TripResponse(
+            id=str(trip.trip_id),
+            destination=trip.province
+        )
+
+    async def ListTrips(self, request, context):
+        trips = await self._db(lambda: list(TripRepository.get_all().order_by('trip_id')))
         return pb2.TripListResponse(
-            trips=[
-                pb2.Trip(id=str(t.id), destination=t.destination)
-                for t in trips
-            ]
+            trips=[_to_message(t) for t in trips]
         )
+
+    async def StreamTrips(self, request, context):
+        page_size = _page_size(request)
+        after_trip_id = request.after_trip_id
+        while True:
+            page = await self._db(
+                TripRepository.get_page_after, after_trip_id, page_size, request.user_id, request.status
+            )
+            for trip in page:
+                yield _to_message(trip)
+            if len(page) < page_size:
+                return
+            after_trip_id = page[-1].trip_id
+
+    async def BatchCreateTrips(self, request, context):
+        try:
+            trips = await self._db(_batch_create, request)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return pb2.BatchCreateTripsResponse(trips=[_to_message(t) for t in trips])
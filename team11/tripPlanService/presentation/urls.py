@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import test, ok, TripViewSet, TripDayViewSet, TripItemViewSet, suggest_destinations, get_trip_cost_breakdown
+from .views import test, ok, external_cache_stats, TripViewSet, TripDayViewSet, TripItemViewSet, suggest_destinations, get_trip_cost_breakdown
 
 router = DefaultRouter()
 router.register(r'trips', TripViewSet, basename='trip')
@@ -10,6 +10,7 @@ router.register(r'items', TripItemViewSet, basename='item')
 urlpatterns = [
     path("test/", test),
     path("trip-plan/trips", ok),
+    path("external-cache/stats/", external_cache_stats, name='external-cache-stats'),
     path(
         'days/<int:pk>/items/bulk/',
         TripDayViewSet.as_view({'post': 'create_items_bulk'}),
@@ -56,6 +56,13 @@ def ok(request):
     })
 
 
+def external_cache_stats(request):
+    """Hit/miss counters of the external API cache (this worker)"""
+    from externalServices.grpc.services.api_cache import get_api_cache
+
+    return JsonResponse(get_api_cache().stats())
+
+
 def _check_trip_ownership(request, trip) -> bool:
     """
     Check if the current user owns the trip.
@@ -828,12 +835,12 @@ class TripDayViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create items
-        created_items = []
+        # Validate every item, then create the valid ones in one INSERT
+        valid_data = []
+        valid_indexes = []
         errors = []
 
         for idx, item_data in enumerate(items_data):
-            # Validate each item
             serializer = TripItemCreateSerializer(data=item_data)
 
             if not serializer.is_valid():
@@ -843,18 +850,13 @@ class TripDayViewSet(viewsets.ViewSet):
                 })
                 continue
 
-            try:
-                # Create item
-                item = TripItemService.create_item(
-                    int(pk),
-                    serializer.validated_data
-                )
-                created_items.append(item)
-            except ValueError as e:
-                errors.append({
-                    "index": idx,
-                    "error": str(e)
-                })
+            valid_data.append(serializer.validated_data)
+            valid_indexes.append(idx)
+
+        created_items, create_errors = TripItemService.create_items_bulk(int(pk), valid_data)
+        for error in create_errors:
+            errors.append({**error, "index": valid_indexes[error["index"]]})
+        errors.sort(key=lambda e: e["index"])
 
         # Return response
         response_data = {
@@ -1186,9 +1188,9 @@ class TripItemViewSet(viewsets.ViewSet):
 
         try:
             # Get new place details from Facility Service
-            from externalServices.grpc.services.facility_client import FacilityClient
+            from externalServices.grpc.services.registry import get_facility_client
 
-            facility_client = FacilityClient()
+            facility_client = get_facility_client()
             new_place_data = facility_client.get_place_by_id(new_place_id)
 
             if not new_place_data:
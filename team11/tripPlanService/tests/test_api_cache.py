@@ -0,0 +1,212 @@
+"""
+Tests for the two-tier external API cache (LRU + Mongo/in-memory TTL backend).
+"""
+import threading
+import time
+from unittest import skipUnless
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase, Client
+
+from externalServices.grpc.services.api_cache import (
+    InMemoryCacheBackend, MongoCacheBackend, TwoTierCache,
+    get_api_cache, make_cache_key, set_api_cache
+)
+from externalServices.grpc.services.facility_client import FacilityClient
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+
+class FakeClock:
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class InlineExecutor:
+    """Runs background refreshes synchronously"""
+
+    def submit(self, fn):
+        fn()
+
+
+def _cache(backend=None, **kwargs):
+    kwargs.setdefault('clock', FakeClock())
+    kwargs.setdefault('refresh_executor', InlineExecutor())
+    return TwoTierCache(backend=backend, ttl=60, stale_ttl=30, **kwargs)
+
+
+class TestCacheKeys(SimpleTestCase):
+
+    def test_normalized_arguments_share_a_key(self):
+        a = make_cache_key('ns', {'province': 'اصفهان', 'categories': ['NATURAL', 'DINING']}, unordered=['categories'])
+        b = make_cache_key('ns', {'categories': ['DINING', 'NATURAL'], 'province': 'اصفهان'}, unordered=['categories'])
+        self.assertEqual(a, b)
+
+    def test_different_arguments_differ(self):
+        base = {'province': 'اصفهان', 'limit': 20}
+        self.assertNotEqual(make_cache_key('ns', base), make_cache_key('ns', {**base, 'limit': 5}))
+        self.assertNotEqual(make_cache_key('ns', base), make_cache_key('other', base))
+        self.assertNotEqual(
+            make_cache_key('ns', {'interests': ['a', 'b']}),
+            make_cache_key('ns', {'interests': ['b', 'a']}),
+        )
+
+
+class TestTwoTierCache(SimpleTestCase):
+
+    def test_local_hit_after_miss(self):
+        cache = _cache()
+        loader = MagicMock(return_value=[{'id': '1'}])
+        self.assertEqual(cache.get_or_load('k', loader), ({'id': '1'},))
+        self.assertEqual(cache.get_or_load('k', loader), ({'id': '1'},))
+        loader.assert_called_once()
+        stats = cache.stats()
+        self.assertEqual((stats['misses'], stats['local_hits']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_values_are_frozen(self):
+        cache = _cache()
+        value = cache.get_or_load('k', lambda: {'images': ['a']})
+        with self.assertRaises(TypeError):
+            value['title'] = 'x'
+        self.assertEqual(value['images'], ('a',))
+
+    def test_lru_evicts_oldest(self):
+        cache = _cache(lru_size=2)
+        for key in ('a', 'b', 'c'):
+            cache.get_or_load(key, lambda: key)
+        loader = MagicMock(return_value='a2')
+        self.assertEqual(cache.get_or_load('a', loader), 'a2')
+        loader.assert_called_once()
+
+    def test_backend_shared_between_workers(self):
+        backend = InMemoryCacheBackend()
+        clock = FakeClock()
+        _cache(backend, clock=clock).get_or_load('k', lambda: {'id': '1'})
+
+        other_worker = _cache(backend, clock=clock)
+        loader = MagicMock()
+        self.assertEqual(dict(other_worker.get_or_load('k', loader)), {'id': '1'})
+        loader.assert_not_called()
+        self.assertEqual(other_worker.stats()['backend_hits'], 1)
+
+    def test_stale_while_revalidate(self):
+        clock = FakeClock()
+        cache = _cache(InMemoryCacheBackend(), clock=clock)
+        cache.get_or_load('k', lambda: 'v1')
+
+        clock.now += 70  # past ttl, inside the stale window
+        self.assertEqual(cache.get_or_load('k', lambda: 'v2'), 'v1')
+        self.assertEqual(cache.get_or_load('k', MagicMock()), 'v2')
+        stats = cache.stats()
+        self.assertEqual((stats['stale_hits'], stats['refreshes'], stats['local_hits']), (1, 1, 1))
+
+        clock.now += 200  # past ttl + stale window
+        self.assertEqual(cache.get_or_load('k', lambda: 'v3'), 'v3')
+
+    def test_concurrent_misses_are_coalesced(self):
+        cache = _cache()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(5)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        while cache.stats()['coalesced'] < 7:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+
+    def test_none_and_errors_are_not_cached(self):
+        cache = _cache()
+        self.assertIsNone(cache.get_or_load('k', lambda: None))
+        with self.assertRaises(ValueError):
+            cache.get_or_load('k', MagicMock(side_effect=ValueError))
+        self.assertEqual(cache.get_or_load('k', lambda: 'v'), 'v')
+        self.assertEqual(cache.stats()['upstream_errors'], 1)
+
+    def test_backend_failure_falls_back_to_upstream(self):
+        backend = MagicMock()
+        backend.get.side_effect = ConnectionError
+        cache = _cache(backend)
+        with self.assertLogs('externalServices.grpc.services.api_cache', 'WARNING'):
+            self.assertEqual(cache.get_or_load('k', lambda: 'v'), 'v')
+        self.assertEqual(cache.get_or_load('k2', lambda: 'v2'), 'v2')
+        self.assertEqual(backend.get.call_count, 1)
+        self.assertEqual(cache.stats()['backend_errors'], 1)
+
+
+@skipUnless(mongomock, 'mongomock is not installed')
+class TestMongoCacheBackend(SimpleTestCase):
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.external_api_cache
+        self.backend = MongoCacheBackend(collection=self.collection)
+
+    def test_round_trip(self):
+        # mongomock applies the TTL index with the real clock
+        clock = FakeClock(float(int(time.time())))
+        cache = _cache(self.backend, clock=clock)
+        cache.get_or_load('k', lambda: [{'id': '1', 'images': ('a',)}])
+
+        document = self.collection.find_one({'cache_key': 'k'})
+        self.assertEqual(document['payload'], [{'id': '1', 'images': ['a']}])
+        self.assertIn('expires_at_1', self.collection.index_information())
+
+        entry = self.backend.get('k')
+        self.assertEqual(entry.fresh_until, clock.now + 60)
+        self.assertEqual(entry.expires_at, clock.now + 90)
+
+    def test_marked_stale_documents_are_revalidated(self):
+        clock = FakeClock(time.time())
+        _cache(self.backend, clock=clock).get_or_load('k', lambda: 'v1')
+        self.collection.update_one({'cache_key': 'k'}, {'$set': {'is_stale': True}})
+
+        cache = _cache(self.backend, clock=clock)
+        self.assertEqual(cache.get_or_load('k', lambda: 'v2'), 'v1')
+        self.assertEqual(self.collection.find_one({'cache_key': 'k'})['payload'], 'v2')
+
+
+class TestCachedClients(SimpleTestCase):
+
+    def setUp(self):
+        set_api_cache(_cache(InMemoryCacheBackend()))
+        self.addCleanup(set_api_cache, None)
+
+    def test_search_places_is_cached(self):
+        client = FacilityClient()
+        expected = FacilityClient.search_places.uncached(client, province='فارس', categories=['HISTORICAL'])
+
+        first = client.search_places(province='فارس', categories=['HISTORICAL'])
+        second = client.search_places('فارس', categories=['HISTORICAL'])
+
+        self.assertEqual([p['id'] for p in first], [p['id'] for p in expected])
+        self.assertIsInstance(second, list)
+        self.assertEqual([p['id'] for p in second], [p['id'] for p in expected])
+        self.assertEqual(get_api_cache().stats()['local_hits'], 1)
+
+    def test_stats_endpoint(self):
+        FacilityClient().get_place_by_id('place_missing')
+        response = Client().get('/api/external-cache/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['misses'], 1)
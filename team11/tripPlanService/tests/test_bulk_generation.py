@@ -0,0 +1,196 @@
+"""
+Tests for the build-in-memory-then-flush write path.
+
+TripGenerator.generate, TripService.copy_trip and TripDayViewSet.create_items_bulk
+write whole plans with bulk INSERTs, so their query count must not grow with
+the number of days or items.
+"""
+import json
+from datetime import date, time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from data.models import Trip, TripDay, TripItem
+from business.generators import TripGenerator
+from business.services import TripService
+from presentation.views import TripDayViewSet
+
+# SAVEPOINT, INSERT trip, INSERT days, INSERT items, RELEASE SAVEPOINT
+PLAN_WRITE_QUERIES = 5
+
+
+def _suggested_places():
+    places = [
+        {'id': f'dining_{i}', 'title': f'رستوران {i}', 'category': 'DINING', 'entry_fee': 300000}
+        for i in range(4)
+    ]
+    places += [
+        {'id': f'hist_{i}', 'title': f'بنای تاریخی {i}', 'category': 'HISTORICAL', 'entry_fee': 150000,
+         'lat': 32.65, 'lng': 51.67, 'images': ['https://example.com/a.jpg']}
+        for i in range(6)
+    ]
+    places += [
+        {'id': f'stay_{i}', 'title': f'هتل {i}', 'category': 'STAY', 'entry_fee': 2000000}
+        for i in range(2)
+    ]
+    return places
+
+
+def _generator():
+    gen = TripGenerator.__new__(TripGenerator)
+    gen.suggester = MagicMock()
+    gen.suggester.get_destinations.return_value = _suggested_places()
+    gen.facility_client = MagicMock()
+    return gen
+
+
+class TestTripGeneratorBulkWrite(TestCase):
+
+    def _generate(self, days):
+        start = date(2026, 6, 1)
+        return _generator().generate(
+            province='اصفهان',
+            city='اصفهان',
+            start_date=start,
+            end_date=date(2026, 6, days),
+            user_id='user-1',
+        )
+
+    def test_query_count_is_constant(self):
+        for days in (3, 7):
+            with CaptureQueriesContext(connection) as ctx:
+                self._generate(days)
+            self.assertEqual(len(ctx), PLAN_WRITE_QUERIES, [q['sql'] for q in ctx])
+
+    def test_generated_plan_is_saved(self):
+        trip = self._generate(3)
+        trip.refresh_from_db()
+        self.assertEqual(trip.status, 'FINALIZED')
+        self.assertEqual(trip.user_id, 'user-1')
+        self.assertEqual(
+            list(trip.days.values_list('day_index', 'specific_date')),
+            [(1, date(2026, 6, 1)), (2, date(2026, 6, 2)), (3, date(2026, 6, 3))],
+        )
+        items = TripItem.objects.filter(day__trip=trip)
+        self.assertEqual(items.count(), 18)
+        self.assertEqual(
+            list(items.filter(day__day_index=1).values_list('sort_order', flat=True)),
+            [0, 1, 2, 3, 4, 5],
+        )
+        self.assertEqual(items.filter(item_type='STAY').count(), 3)
+
+    def test_total_cost_matches_items(self):
+        trip = self._generate(3)
+        expected = sum(TripItem.objects.filter(day__trip=trip).values_list('estimated_cost', flat=True))
+        trip.refresh_from_db()
+        self.assertEqual(trip.total_estimated_cost, expected)
+        self.assertGreater(trip.total_estimated_cost, Decimal('0'))
+
+
+class TestCopyTripBulkWrite(TestCase):
+
+    def setUp(self):
+        self.trip = Trip.objects.create(
+            user_id='user-1',
+            title='سفر اصفهان',
+            province='اصفهان',
+            start_date=date(2026, 3, 21),
+            duration_days=3,
+            budget_level='MEDIUM',
+            daily_available_hours=10,
+            travel_style='COUPLE',
+            generation_strategy='MIXED',
+        )
+
+    def _add_days(self, count, items_per_day):
+        for day_index in range(1, count + 1):
+            day = TripDay.objects.create(
+                trip=self.trip, day_index=day_index, specific_date=date(2026, 3, 20 + day_index)
+            )
+            for sort_order in range(items_per_day):
+                TripItem.objects.create(
+                    day=day,
+                    place_ref_id=f'place_{day_index}_{sort_order}',
+                    title='مکان',
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    duration_minutes=60,
+                    sort_order=sort_order,
+                    is_locked=True,
+                )
+
+    def _copy_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            copied = TripService.copy_trip(self.trip.trip_id, 'user-2')
+        return copied, len(ctx)
+
+    def test_query_count_does_not_grow_with_plan(self):
+        self._add_days(1, 1)
+        _, small = self._copy_queries()
+        TripDay.objects.filter(trip=self.trip).delete()
+        self._add_days(3, 5)
+        copied, large = self._copy_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(TripItem.objects.filter(day__trip=copied).count(), 15)
+        self.assertFalse(TripItem.objects.filter(day__trip=copied, is_locked=True).exists())
+
+
+class TestCreateItemsBulk(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        trip = Trip.objects.create(
+            title='سفر شیراز',
+            province='فارس',
+            start_date=date(2026, 4, 1),
+            duration_days=1,
+            budget_level='MEDIUM',
+            daily_available_hours=10,
+            travel_style='SOLO',
+            generation_strategy='MIXED',
+        )
+        self.day = TripDay.objects.create(trip=trip, day_index=1, specific_date=date(2026, 4, 1))
+
+    def _item(self, n, **overrides):
+        return {
+            'item_type': 'VISIT',
+            'place_ref_id': f'place_{n}',
+            'title': f'مکان {n}',
+            'start_time': '09:00:00',
+            'end_time': '10:00:00',
+            'duration_minutes': 60,
+            'sort_order': n,
+            **overrides,
+        }
+
+    def _post(self, items):
+        request = self.factory.post(
+            f'/api/trip-days/{self.day.day_id}/items/bulk/',
+            data=json.dumps({'items': items}),
+            content_type='application/json'
+        )
+        view = TripDayViewSet.as_view({'post': 'create_items_bulk'})
+        return view(request, pk=self.day.day_id)
+
+    def test_items_are_inserted_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._post([self._item(n) for n in range(10)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_count'], 10)
+        inserts = [q for q in ctx if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.day.items.count(), 10)
+
+    def test_invalid_items_are_reported_by_index(self):
+        response = self._post([self._item(0), self._item(1, title=''), self._item(2)])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['created_count'], 2)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1])
+        self.assertEqual(
+            list(self.day.items.values_list('place_ref_id', flat=True)),
+            ['place_0', 'place_2'],
+        )
@@ -0,0 +1,157 @@
+"""
+Tests for the pooled gRPC channels behind Clients.get_*_client.
+"""
+import threading
+import time
+from concurrent import futures
+from unittest import IsolatedAsyncioTestCase
+
+import grpc
+import grpc.aio
+from django.test import SimpleTestCase
+
+from externalServices.grpc.client.channel_pool import (
+    AioChannelPool, ChannelPool, ChannelPoolError, StreamLimitExceeded
+)
+from infrastructure.grpc_clients import trip_pb2 as pb2
+from infrastructure.grpc_clients import trip_pb2_grpc as pb2_grpc
+
+
+class SlowTripServicer(pb2_grpc.TripServiceServicer):
+    """ListTrips waits for `release`; tracks how many calls run at once"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def CreateTrip(self, request, context):
+        return pb2.TripResponse(id='1', destination=request.destination)
+
+    def ListTrips(self, request, context):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.release.wait(5)
+        with self.lock:
+            self.active -= 1
+        return pb2.TripListResponse(trips=[pb2.Trip(id='1', destination='اصفهان')])
+
+
+class TestChannelPool(SimpleTestCase):
+
+    def setUp(self):
+        self.servicer = SlowTripServicer()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+        pb2_grpc.add_TripServiceServicer_to_server(self.servicer, self.server)
+        self.target = f'localhost:{self.server.add_insecure_port("localhost:0")}'
+        self.server.start()
+        self.addCleanup(self.server.stop, None)
+        self.pool = ChannelPool(max_concurrent_streams=2)
+        self.addCleanup(self.pool.close, 0)
+
+    def test_channel_and_stub_are_reused(self):
+        stub = self.pool.get_stub(self.target, pb2_grpc.TripServiceStub)
+        self.assertIs(self.pool.get_stub(self.target, pb2_grpc.TripServiceStub), stub)
+        self.assertIs(self.pool.get_channel(self.target), self.pool.get_channel(self.target))
+        self.assertIsNot(self.pool.get_channel('localhost:1'), self.pool.get_channel(self.target))
+
+        self.assertEqual(stub.CreateTrip(pb2.CreateTripRequest(destination='یزد')).destination, 'یزد')
+        self.assertEqual(len(stub.ListTrips(pb2.Empty()).trips), 1)
+        self.assertTrue(self.pool.check_health(self.target))
+        self.assertEqual(self.pool.stats()[self.target]['in_flight'], 0)
+
+    def test_concurrent_streams_are_capped_per_target(self):
+        stub = self.pool.get_stub(self.target, pb2_grpc.TripServiceStub)
+        self.servicer.release.clear()
+        threads = [threading.Thread(target=stub.ListTrips, args=(pb2.Empty(),)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.3)
+        self.assertEqual(self.servicer.active, 2)
+        self.assertEqual(self.pool.stats()[self.target]['in_flight'], 2)
+
+        self.servicer.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.servicer.max_active, 2)
+        self.assertEqual(self.pool.stats()[self.target]['in_flight'], 0)
+
+    def test_waiting_for_a_slot_respects_the_deadline(self):
+        stub = self.pool.get_stub(self.target, pb2_grpc.TripServiceStub)
+        self.servicer.release.clear()
+        threads = [threading.Thread(target=stub.ListTrips, args=(pb2.Empty(),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        with self.assertRaises(StreamLimitExceeded):
+            stub.ListTrips(pb2.Empty(), timeout=0.1)
+        self.servicer.release.set()
+        for thread in threads:
+            thread.join()
+
+    def test_failing_channel_is_replaced(self):
+        pool = ChannelPool(unhealthy_after=0)
+        self.addCleanup(pool.close, 0)
+        channel = pool.get_channel('localhost:1')
+        self.assertFalse(pool.check_health('localhost:1', timeout=0.2))
+        replaced = pool.get_channel('localhost:1')
+        self.assertIsNot(replaced, channel)
+        self.assertIs(pool.get_channel('localhost:1'), replaced)
+
+    def test_unavailable_calls_mark_the_channel_unhealthy(self):
+        pool = ChannelPool(unhealthy_after=60)
+        self.addCleanup(pool.close, 0)
+        stub = pool.get_stub('localhost:1', pb2_grpc.TripServiceStub)
+        with self.assertRaises(grpc.RpcError):
+            stub.ListTrips(pb2.Empty(), timeout=1)
+        self.assertIsNotNone(pool._channels['localhost:1'].health.failing_since)
+
+        stub = pool.get_stub(self.target, pb2_grpc.TripServiceStub)
+        stub.ListTrips(pb2.Empty())
+        self.assertTrue(pool.stats()[self.target]['healthy'])
+
+    def test_close_waits_for_in_flight_calls(self):
+        stub = self.pool.get_stub(self.target, pb2_grpc.TripServiceStub)
+        self.servicer.release.clear()
+        result = {}
+        thread = threading.Thread(target=lambda: result.setdefault('trips', stub.ListTrips(pb2.Empty()).trips))
+        thread.start()
+        time.sleep(0.2)
+        threading.Timer(0.2, self.servicer.release.set).start()
+
+        self.pool.close(grace=5)
+        thread.join()
+        self.assertEqual(len(result['trips']), 1)
+        with self.assertRaises(ChannelPoolError):
+            self.pool.get_channel(self.target)
+
+
+class TestAioChannelPool(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = grpc.aio.server()
+        pb2_grpc.add_TripServiceServicer_to_server(SlowTripServicer(), self.server)
+        self.target = f'localhost:{self.server.add_insecure_port("localhost:0")}'
+        await self.server.start()
+        self.pool = AioChannelPool(max_concurrent_streams=2)
+
+    async def asyncTearDown(self):
+        await self.pool.close(0)
+        await self.server.stop(None)
+
+    async def test_stub_is_reused_and_calls_work(self):
+        stub = self.pool.get_stub(self.target, pb2_grpc.TripServiceStub)
+        self.assertIs(self.pool.get_stub(self.target, pb2_grpc.TripServiceStub), stub)
+
+        response = await stub.CreateTrip(pb2.CreateTripRequest(destination='شیراز'))
+        self.assertEqual(response.destination, 'شیراز')
+        self.assertTrue(await self.pool.check_health(self.target))
+        self.assertEqual(self.pool.stats()[self.target]['in_flight'], 0)
+
+    async def test_closed_pool_refuses_new_channels(self):
+        await self.pool.close(0)
+        with self.assertRaises(ChannelPoolError):
+            self.pool.get_channel(self.target)
@@ -0,0 +1,96 @@
+"""
+Tests for the process-wide external client registry and the shared read-only mock data.
+"""
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from business.generators import TripGenerator
+from business.helpers import AlternativesProvider
+from externalServices.grpc.services import registry
+from externalServices.grpc.services.facility_client import FacilityClient
+from externalServices.grpc.services.recommendation_client import RecommendationClient
+from externalServices.grpc.services.wiki_client import WikiClient
+
+
+class TestClientRegistry(SimpleTestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_same_instance_per_process(self):
+        self.assertIs(registry.get_facility_client(), registry.get_facility_client())
+        self.assertIs(registry.get_recommendation_client(), registry.get_recommendation_client())
+        self.assertIs(registry.get_wiki_client(), registry.get_wiki_client())
+
+    def test_concurrent_first_use_creates_one_instance(self):
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        def worker(results):
+            barrier.wait()
+            results.append(registry.get_facility_client())
+
+        results = []
+        with patch.dict(registry.CLIENT_FACTORIES, {'facility': factory}):
+            threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(client) for client in results}), 1)
+
+    def test_warm_up_and_reset(self):
+        timings = registry.warm_up()
+        self.assertEqual(set(timings), {'facility', 'recommendation', 'wiki'})
+        facility_client = registry.get_facility_client()
+
+        registry.reset('facility')
+        self.assertIsNot(registry.get_facility_client(), facility_client)
+
+    def test_business_objects_use_shared_clients(self):
+        generator = TripGenerator()
+        self.assertIs(generator.facility_client, registry.get_facility_client())
+        self.assertIs(generator.suggester.facility_client, registry.get_facility_client())
+        self.assertIs(generator.suggester.recom_client, registry.get_recommendation_client())
+
+
+class TestSharedMockData(SimpleTestCase):
+
+    def test_instances_share_data(self):
+        self.assertIs(FacilityClient().mock_places, FacilityClient().mock_places)
+        self.assertIs(RecommendationClient().regions, RecommendationClient().regions)
+        self.assertIs(WikiClient().wiki_data, WikiClient().wiki_data)
+
+    def test_data_is_read_only(self):
+        place = FacilityClient().mock_places[0]
+        with self.assertRaises(TypeError):
+            place['title'] = 'changed'
+        with self.assertRaises(AttributeError):
+            place['images'].append('https://example.com/x.jpg')
+        with self.assertRaises(TypeError):
+            RecommendationClient().regions[0]['base_score'] = 0
+        with self.assertRaises(TypeError):
+            WikiClient().wiki_data['default'] = {}
+
+    def test_alternatives_are_copies(self):
+        client = registry.get_facility_client()
+        original = client.search_places(province='اصفهان', limit=1)[0]
+        alternatives = AlternativesProvider().get_alternatives(
+            original_place_id=original['id'],
+            province='اصفهان',
+            city=None,
+            category=original['category'],
+        )
+
+        self.assertTrue(alternatives)
+        alternatives[0]['recommendation_reason'] = 'test'
+        self.assertNotIn('recommendation_reason', client.get_place_by_id(alternatives[0]['id']))
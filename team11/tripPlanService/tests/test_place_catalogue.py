@@ -0,0 +1,76 @@
+"""
+Tests for the indexed place catalogue behind FacilityClient.search_places / get_place_by_id.
+"""
+import itertools
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from externalServices.grpc.services.facility_client import FacilityClient
+from externalServices.grpc.services.place_catalogue import BUDGET_TIERS, PlaceCatalogue
+
+
+def _linear_search(places, province=None, city=None, categories=None, budget_level=None, limit=20):
+    """The filter search_places used before the catalogue was indexed."""
+    filtered = list(places)
+    if province:
+        filtered = [p for p in filtered if province.lower() in p['province'].lower()]
+    if city:
+        filtered = [p for p in filtered if city.lower() in p['location'].lower()]
+    if categories:
+        temp = [p for p in filtered if p['category'] in categories]
+        if temp:
+            filtered = temp
+    if budget_level:
+        allowed = BUDGET_TIERS.get(budget_level, ['MODERATE'])
+        filtered = [p for p in filtered if p['price_tier'] in allowed]
+    return filtered[:limit]
+
+
+class TestPlaceCatalogue(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.facility_client = FacilityClient()
+
+    def test_search_matches_linear_filter(self):
+        provinces = [None, 'تهران', 'اصفهان', 'خراسان', 'فارس', 'ناموجود']
+        cities = [None, 'شیراز', 'مشهد', 'کاشان']
+        categories = [None, ['HISTORICAL'], ['DINING', 'NATURAL'], ['UNKNOWN']]
+        budgets = [None, 'ECONOMY', 'MEDIUM', 'LUXURY', 'UNLIMITED', 'OTHER']
+        for province, city, cats, budget in itertools.product(provinces, cities, categories, budgets):
+            for limit in (5, 50):
+                expected = _linear_search(self.facility_client.mock_places, province, city, cats, budget, limit)
+                actual = self.facility_client.search_places(
+                    province=province, city=city, categories=cats, budget_level=budget, limit=limit
+                )
+                self.assertEqual(
+                    [p['id'] for p in actual], [p['id'] for p in expected],
+                    (province, city, cats, budget, limit)
+                )
+
+    def test_get_place_by_id(self):
+        place = self.facility_client.mock_places[10]
+        self.assertIs(self.facility_client.get_place_by_id(place['id']), place)
+        self.assertIsNone(self.facility_client.get_place_by_id('place_missing'))
+
+    def test_read_through_fetches_missing_once(self):
+        remote = {'id': '101', 'title': 'Remote', 'category': 'HISTORICAL', 'province': 'تهران',
+                  'location': 'تهران', 'price_tier': 'FREE'}
+        fetch = MagicMock(return_value=[remote])
+        catalogue = PlaceCatalogue(self.facility_client.mock_places[:3], fetch_by_ids=fetch)
+
+        self.assertIs(catalogue.get('101'), remote)
+        self.assertIs(catalogue.get('101'), remote)
+        fetch.assert_called_once_with(['101'])
+        self.assertIn('101', [p['id'] for p in catalogue.search(province='تهران', budget_level='ECONOMY')])
+
+    def test_upsert_replaces_existing_place(self):
+        catalogue = PlaceCatalogue(self.facility_client.mock_places[:3])
+        updated = {**self.facility_client.mock_places[0], 'price_tier': 'LUXURY'}
+        catalogue.upsert([updated])
+        self.assertEqual(len(catalogue), 3)
+        self.assertIs(catalogue.get(updated['id']), updated)
+        self.assertNotIn(updated['id'], [p['id'] for p in catalogue.search(budget_level='ECONOMY')])
+        self.assertIn(updated['id'], [p['id'] for p in catalogue.search(budget_level='LUXURY')])
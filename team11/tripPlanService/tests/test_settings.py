@@ -64,3 +64,4 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 JWT_SECRET = 'test-jwt-secret'
 JWT_ALGORITHM = 'HS256'
+EXTERNAL_API_CACHE = {'BACKEND': 'memory'}
@@ -0,0 +1,88 @@
+"""
+Tests for the concurrent per-region enrichment in SuggestionService.generate_destination_suggestions.
+"""
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from business.services import SuggestionService
+
+
+REGIONS = [
+    {'region_id': f'r{i}', 'region_name': f'region {i}', 'province': province,
+     'description': f'توضیحات {province}', 'match_score': 90 - i, 'image_url': f'https://example.com/{i}.jpg',
+     'best_seasons': ['بهار']}
+    for i, province in enumerate(['اصفهان', 'فارس', 'یزد'])
+]
+
+
+class StubRecommendationClient:
+
+    def get_suggested_regions(self, budget_limit, season, interests=None):
+        return list(REGIONS)
+
+
+class DelayedFacilityClient:
+
+    def __init__(self, delay=0.0, slow_provinces=(), slow_delay=0.0):
+        self.delay = delay
+        self.slow_provinces = slow_provinces
+        self.slow_delay = slow_delay
+
+    def search_places(self, province=None, city=None, categories=None, budget_level=None, limit=20):
+        time.sleep(self.slow_delay if province in self.slow_provinces else self.delay)
+        return [
+            {'id': f'{province}_{i}', 'title': f'{province} {i}', 'category': 'HISTORICAL',
+             'entry_fee': 100000, 'rating': 4.6}
+            for i in range(4)
+        ]
+
+
+class DelayedWikiClient:
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def get_place_info(self, place_id):
+        time.sleep(self.delay)
+        return {'description': f'ویکی {place_id}', 'images': [f'https://example.com/{place_id}.jpg']}
+
+
+class TestSuggestionFanOut(SimpleTestCase):
+
+    def _suggest(self, facility_client, wiki_client, **overrides):
+        overrides.setdefault('FANOUT_WORKERS', SuggestionService.FANOUT_WORKERS)
+        with patch('business.services.get_recommendation_client', return_value=StubRecommendationClient()), \
+                patch('business.services.get_facility_client', return_value=facility_client), \
+                patch('business.services.get_wiki_client', return_value=wiki_client), \
+                patch.multiple(SuggestionService, **overrides):
+            return SuggestionService.generate_destination_suggestions('بهار', 'MEDIUM', 'SOLO', ['تاریخی'])
+
+    def test_regions_are_enriched_concurrently_and_in_order(self):
+        started = time.perf_counter()
+        suggestions = self._suggest(DelayedFacilityClient(delay=0.2), DelayedWikiClient(delay=0.2))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual([s['province'] for s in suggestions], ['اصفهان', 'فارس', 'یزد'])
+        self.assertEqual(suggestions[0]['images'][1], 'https://example.com/اصفهان_0.jpg')
+        self.assertIn('ویکی اصفهان_0', suggestions[0]['description'])
+        # sequential: 3 x (0.2 + 0.2) = 1.2s
+        self.assertLess(elapsed, 0.8)
+
+    def test_region_with_slow_search_is_dropped(self):
+        with self.assertLogs('business.services', 'WARNING') as logs:
+            suggestions = self._suggest(
+                DelayedFacilityClient(slow_provinces=('فارس',), slow_delay=0.5),
+                DelayedWikiClient(),
+                SEARCH_TIMEOUT=0.2
+            )
+        self.assertEqual([s['province'] for s in suggestions], ['اصفهان', 'یزد'])
+        self.assertTrue(any('search_places timed out' in line for line in logs.output))
+
+    def test_slow_wiki_keeps_region_without_enrichment(self):
+        with self.assertLogs('business.services', 'WARNING'):
+            suggestions = self._suggest(DelayedFacilityClient(), DelayedWikiClient(delay=0.5), WIKI_TIMEOUT=0.1)
+        self.assertEqual([s['province'] for s in suggestions], ['اصفهان', 'فارس', 'یزد'])
+        self.assertEqual(suggestions[0]['description'], 'توضیحات اصفهان')
+        self.assertEqual(suggestions[0]['images'], ['https://example.com/0.jpg'])
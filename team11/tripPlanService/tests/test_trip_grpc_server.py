@@ -0,0 +1,165 @@
+"""
+Tests for the trip gRPC server: aio and thread-pool modes, StreamTrips keyset
+paging, BatchCreateTrips and the per-RPC latency histograms.
+
+Servers run in-process on an ephemeral port; RPC handlers query the ORM from
+worker threads, so these are TransactionTestCases (data must be committed to
+be visible outside the test thread).
+"""
+import asyncio
+from datetime import date
+
+import grpc
+import grpc.aio
+from django.test import SimpleTestCase, TransactionTestCase
+
+from data.models import Trip
+from infrastructure.grpc_clients import trip_pb2 as pb2
+from infrastructure.grpc_clients import trip_pb2_grpc as pb2_grpc
+from presentation.grpc.server.grpc_server import build_aio_server, build_server
+from presentation.grpc.server.metrics import LatencyHistogram, get_latency_registry
+
+
+def _make_trips(count, user_id='user-1', status='ACTIVE'):
+    return Trip.objects.bulk_create([
+        Trip(title=f'Trip {i}', province='اصفهان', start_date=date(2025, 4, 1), duration_days=2,
+             budget_level='MEDIUM', daily_available_hours=8, travel_style='SOLO',
+             generation_strategy='MIXED', user_id=user_id, status=status)
+        for i in range(count)
+    ])
+
+
+class TestAioTripServer(TransactionTestCase):
+
+    def setUp(self):
+        get_latency_registry().reset()
+
+    def _run(self, scenario):
+        async def main():
+            server, port, servicer = build_aio_server('localhost:0', db_workers=4)
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel(f'localhost:{port}') as channel:
+                    return await scenario(pb2_grpc.TripServiceStub(channel))
+            finally:
+                await server.stop(None)
+                servicer.close()
+        return asyncio.run(main())
+
+    def test_stream_trips_pages_through_all_trips(self):
+        _make_trips(25)
+        _make_trips(3, user_id='user-2')
+
+        async def scenario(stub):
+            return [trip async for trip in stub.StreamTrips(pb2.ListTripsRequest(user_id='user-1', page_size=10))]
+
+        trips = self._run(scenario)
+        ids = [int(t.id) for t in trips]
+        self.assertEqual(len(trips), 25)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual({t.user_id for t in trips}, {'user-1'})
+        self.assertEqual(trips[0].destination, 'اصفهان')
+        self.assertEqual(trips[0].start_date, '2025-04-01')
+
+    def test_stream_trips_clamps_negative_page_size(self):
+        _make_trips(3)
+
+        async def scenario(stub):
+            return [trip async for trip in stub.StreamTrips(pb2.ListTripsRequest(page_size=-5))]
+
+        self.assertEqual(len(self._run(scenario)), 3)
+
+    def test_stream_trips_resumes_after_cursor(self):
+        created = _make_trips(6)
+        cursor = created[2].trip_id
+
+        async def scenario(stub):
+            request = pb2.ListTripsRequest(after_trip_id=cursor, page_size=2)
+            return [int(trip.id) async for trip in stub.StreamTrips(request)]
+
+        self.assertEqual(self._run(scenario), [t.trip_id for t in created[3:]])
+
+    def test_batch_create_trips_in_one_transaction(self):
+        async def scenario(stub):
+            request = pb2.BatchCreateTripsRequest(trips=[
+                pb2.CreateTripRequest(destination='یزد', start_date='2025-05-01', duration_days=4, user_id='u'),
+                pb2.CreateTripRequest(destination='شیراز', travel_style='FAMILY'),
+            ])
+            return await stub.BatchCreateTrips(request)
+
+        response = self._run(scenario)
+        self.assertEqual([t.destination for t in response.trips], ['یزد', 'شیراز'])
+        self.assertTrue(all(t.id for t in response.trips))
+        trip = Trip.objects.get(trip_id=int(response.trips[0].id))
+        self.assertEqual(trip.end_date, date(2025, 5, 4))
+        self.assertEqual(trip.title, 'Trip to یزد')
+        self.assertEqual(Trip.objects.get(trip_id=int(response.trips[1].id)).travel_style, 'FAMILY')
+
+    def test_invalid_batch_creates_nothing(self):
+        async def scenario(stub):
+            request = pb2.BatchCreateTripsRequest(trips=[
+                pb2.CreateTripRequest(destination='یزد'),
+                pb2.CreateTripRequest(destination='شیراز', budget_level='CHEAP'),
+            ])
+            with self.assertRaises(grpc.aio.AioRpcError) as error:
+                await stub.BatchCreateTrips(request)
+            return error.exception.code()
+
+        self.assertEqual(self._run(scenario), grpc.StatusCode.INVALID_ARGUMENT)
+        self.assertEqual(Trip.objects.count(), 0)
+
+    def test_latency_histograms_are_recorded_per_rpc(self):
+        _make_trips(3)
+
+        async def scenario(stub):
+            await stub.CreateTrip(pb2.CreateTripRequest(destination='کرمان'))
+            await stub.ListTrips(pb2.Empty())
+            [trip async for trip in stub.StreamTrips(pb2.ListTripsRequest())]
+            with self.assertRaises(grpc.aio.AioRpcError):
+                await stub.CreateTrip(pb2.CreateTripRequest())
+
+        self._run(scenario)
+        stats = get_latency_registry().snapshot()
+        self.assertEqual(stats['/trip.TripService/CreateTrip']['count'], 2)
+        self.assertEqual(stats['/trip.TripService/CreateTrip']['errors'], 1)
+        self.assertEqual(stats['/trip.TripService/ListTrips']['count'], 1)
+        self.assertEqual(stats['/trip.TripService/StreamTrips']['count'], 1)
+        self.assertEqual(sum(stats['/trip.TripService/StreamTrips']['buckets'].values()), 1)
+
+
+class TestSyncTripServer(TransactionTestCase):
+
+    def setUp(self):
+        get_latency_registry().reset()
+        self.server, port = build_server('localhost:0', max_workers=4)
+        self.server.start()
+        self.addCleanup(self.server.stop, None)
+        channel = grpc.insecure_channel(f'localhost:{port}')
+        self.addCleanup(channel.close)
+        self.stub = pb2_grpc.TripServiceStub(channel)
+
+    def test_create_list_and_stream(self):
+        response = self.stub.CreateTrip(pb2.CreateTripRequest(destination='تبریز'))
+        self.assertEqual(response.destination, 'تبریز')
+        _make_trips(4)
+
+        self.assertEqual(len(self.stub.ListTrips(pb2.Empty()).trips), 5)
+        streamed = list(self.stub.StreamTrips(pb2.ListTripsRequest(page_size=2)))
+        self.assertEqual([t.id for t in streamed], [str(t.trip_id) for t in Trip.objects.order_by('trip_id')])
+
+        stats = get_latency_registry().snapshot()
+        self.assertEqual(stats['/trip.TripService/StreamTrips']['count'], 1)
+        self.assertEqual(stats['/trip.TripService/CreateTrip']['errors'], 0)
+
+
+class TestLatencyHistogram(SimpleTestCase):
+
+    def test_quantiles_use_bucket_upper_bounds(self):
+        histogram = LatencyHistogram(buckets_ms=(10, 100))
+        for elapsed in (1, 2, 3, 50, 500):
+            histogram.observe(elapsed)
+        stats = histogram.snapshot()
+        self.assertEqual(stats['buckets'], {'le_10': 3, 'le_100': 1, 'le_inf': 1})
+        self.assertEqual(stats['p50_ms'], 10)
+        self.assertEqual(stats['p99_ms'], float('inf'))
+        self.assertEqual(stats['count'], 5)
@@ -114,6 +114,27 @@ MONGODB_SETTINGS = {
     'authentication_source': 'admin',
 }
 
+# Two-tier cache for external service calls (in-process LRU + Mongo TTL collection)
+# BACKEND: 'mongo', 'memory' or None (LRU only)
+EXTERNAL_API_CACHE = {
+    'BACKEND': config('TEAM11_API_CACHE_BACKEND', default='mongo'),
+    'LRU_SIZE': int(config('TEAM11_API_CACHE_LRU_SIZE', default='2048')),
+    'TTL_SECONDS': int(config('TEAM11_API_CACHE_TTL', default='3600')),
+    'STALE_SECONDS': int(config('TEAM11_API_CACHE_STALE', default='600')),
+    'COLLECTION': 'external_api_cache',
+}
+
+# Trip gRPC server (presentation/grpc/server/grpc_server.py)
+# MODE: 'aio' (grpc.aio event loop + ORM thread pool) or 'sync' (thread per RPC)
+GRPC_SERVER = {
+    'MODE': config('TEAM11_GRPC_MODE', default='aio'),
+    'ADDRESS': config('TEAM11_GRPC_ADDRESS', default='[::]:50051'),
+    'MAX_WORKERS': int(config('TEAM11_GRPC_MAX_WORKERS', default='10')),
+    'MAX_CONCURRENT_RPCS': int(config('TEAM11_GRPC_MAX_CONCURRENT_RPCS', default='200')),
+    'DB_WORKERS': int(config('TEAM11_GRPC_DB_WORKERS', default='10')),
+    'METRICS_LOG_INTERVAL': int(config('TEAM11_GRPC_METRICS_LOG_INTERVAL', default='300')),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
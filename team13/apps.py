@@ -43,3 +43,6 @@ class Team13Config(AppConfig):
     def ready(self):
         from django.db.models.signals import post_migrate
         post_migrate.connect(_ensure_team13_default_admin, sender=self)
+
+        from .place_listing import connect_signals
+        connect_signals()
@@ -0,0 +1,528 @@
+# بارگذاری انبوه و جریانی (streaming) داده‌های team13 از CSV و JSON.
+# به‌جای get_or_create / update_or_create ردیف‌به‌ردیف (چند کوئری برای هر ردیف)، ورودی در تکه‌های
+# chunk_size ردیفی خوانده می‌شود؛ برای هر تکه:
+#   - کلیدهای موجود (و والدهای ارجاع‌شده مثل place_id) با یک کوئری IN پیدا می‌شوند؛
+#   - نوشتن با bulk_create(update_conflicts=True) یا در نبود پشتیبانی، bulk_create + bulk_update؛
+#   - همه در یک تراکنش برای همان تکه؛ پس از commit، نقطهٔ بازیابی (checkpoint) در فایل JSON ذخیره می‌شود
+#     تا اجرای دوباره از همان‌جا ادامه دهد. چون نوشتن upsert است، تکرار یک تکه بی‌خطر است
+#     (به‌جز route_logs که کلید طبیعی ندارد).
+# حالت dry_run فقط اعتبارسنجی می‌کند و تعداد ردیف‌های جدید/به‌روزشونده/نامعتبر را گزارش می‌دهد.
+
+import csv
+import json
+import os
+import uuid
+from collections import OrderedDict
+from datetime import time
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.json_stream import iter_json_array
+
+TEAM13_DB = "team13"
+DEFAULT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 20
+
+# شناسهٔ قطعی مکان از روی شناسهٔ منبع تا اجرای دوباره تکراری نسازد (همان مقادیر load_temp_data)
+NAMESPACE_HOTEL = uuid.uuid5(uuid.NAMESPACE_URL, "https://team13/place/hotel")
+NAMESPACE_HOSPITAL = uuid.uuid5(uuid.NAMESPACE_URL, "https://team13/place/hospital")
+NAMESPACE_RESTAURANT = uuid.uuid5(uuid.NAMESPACE_URL, "https://team13/place/restaurant")
+
+HOTEL_AMENITY_NAMES = {
+    1: "پارکینگ",
+    2: "وای‌فای",
+    3: "استخر",
+    4: "سالن ورزش",
+    5: "رستوران",
+    6: "کافی‌شاپ",
+    7: "اینترنت",
+    8: "تهویه",
+    9: "صبحانه",
+    10: "استقبال ۲۴ ساعته",
+    11: "صبحانه",
+}
+RESTAURANT_PRICE_TIERS = {"expensive": 150000, "moderate": 70000, "low": 30000}
+
+
+# ---------------------------------------------------------------------------
+# تبدیل مقادیر
+# ---------------------------------------------------------------------------
+
+def _int_or_none(value):
+    return int(value) if value not in (None, "") else None
+
+
+def _dt(value):
+    dt = parse_datetime(value) if value else None
+    if value and dt is None:
+        raise ValueError(f"invalid datetime {value!r}")
+    if dt and timezone.is_naive(dt) and settings.USE_TZ:
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def _time_or_none(value):
+    if not value or ":" not in value:
+        return None
+    parts = value.strip().split(":")
+    return time(int(parts[0]), int(parts[1]) if len(parts) > 1 else 0)
+
+
+# ---------------------------------------------------------------------------
+# جدول‌ها: کلید یکتا، والدها و تبدیل ردیف CSV
+# ---------------------------------------------------------------------------
+
+class TableSpec:
+    """
+    key: attnameهای کلید یکتا (None یعنی کلید طبیعی ندارد و فقط درج می‌شود).
+    parents: {attname: نام جدول والد} که وجودشان در هر تکه با یک کوئری IN بررسی می‌شود.
+    after_insert: فیلدهایی (auto_now_add) که bulk_create بازنویسی می‌کند و پس از درج دوباره ست می‌شوند.
+    """
+
+    def __init__(self, model_name, key, parse_csv=None, parents=None, after_insert=()):
+        self.model_name = model_name
+        self.key = key
+        self.parse_csv = parse_csv
+        self.parents = parents or {}
+        self.after_insert = after_insert
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model("team13", self.model_name)
+
+
+def _csv_place(row):
+    return {
+        "place_id": uuid.UUID(row["place_id"]),
+        "type": row["type"],
+        "city": row.get("city", ""),
+        "address": row.get("address", ""),
+        "latitude": float(row["latitude"]),
+        "longitude": float(row["longitude"]),
+    }
+
+
+def _csv_event(row):
+    return {
+        "event_id": uuid.UUID(row["event_id"]),
+        "start_at": _dt(row["start_at"]),
+        "end_at": _dt(row["end_at"]),
+        "city": row.get("city", ""),
+        "address": row.get("address", ""),
+        "latitude": float(row["latitude"]),
+        "longitude": float(row["longitude"]),
+    }
+
+
+# ترتیب جدول‌ها = ترتیب نوشتن (والد پیش از فرزند)
+TABLES = OrderedDict([
+    ("places", TableSpec("Place", ("place_id",), _csv_place)),
+    ("place_translations", TableSpec(
+        "PlaceTranslation", ("place_id", "lang"),
+        lambda row: {
+            "place_id": uuid.UUID(row["place_id"]),
+            "lang": row["lang"],
+            "name": row.get("name", ""),
+            "description": row.get("description", ""),
+        },
+        parents={"place_id": "places"},
+    )),
+    ("events", TableSpec("Event", ("event_id",), _csv_event)),
+    ("event_translations", TableSpec(
+        "EventTranslation", ("event_id", "lang"),
+        lambda row: {
+            "event_id": uuid.UUID(row["event_id"]),
+            "lang": row["lang"],
+            "title": row.get("title", ""),
+            "description": row.get("description", ""),
+        },
+        parents={"event_id": "events"},
+    )),
+    ("images", TableSpec(
+        "Image", ("image_id",),
+        lambda row: {
+            "image_id": uuid.UUID(row["image_id"]),
+            "target_type": row["target_type"],
+            "target_id": uuid.UUID(row["target_id"]),
+            "image_url": row["image_url"],
+        },
+    )),
+    ("comments", TableSpec(
+        "Comment", ("comment_id",),
+        lambda row: {
+            "comment_id": uuid.UUID(row["comment_id"]),
+            "target_type": row["target_type"],
+            "target_id": uuid.UUID(row["target_id"]),
+            "rating": _int_or_none(row.get("rating")),
+            "created_at": _dt(row.get("created_at")),
+        },
+        after_insert=("created_at",),
+    )),
+    ("hotel_details", TableSpec(
+        "HotelDetails", ("place_id",),
+        lambda row: {
+            "place_id": uuid.UUID(row["place_id"]),
+            "stars": _int_or_none(row.get("stars")),
+            "price_range": row.get("price_range", ""),
+        },
+        parents={"place_id": "places"},
+    )),
+    ("restaurant_details", TableSpec(
+        "RestaurantDetails", ("place_id",),
+        lambda row: {
+            "place_id": uuid.UUID(row["place_id"]),
+            "cuisine": row.get("cuisine", ""),
+            "avg_price": _int_or_none(row.get("avg_price")),
+        },
+        parents={"place_id": "places"},
+    )),
+    ("museum_details", TableSpec(
+        "MuseumDetails", ("place_id",),
+        lambda row: {
+            "place_id": uuid.UUID(row["place_id"]),
+            "open_at": _time_or_none(row.get("open_at")),
+            "close_at": _time_or_none(row.get("close_at")),
+            "ticket_price": _int_or_none(row.get("ticket_price")),
+        },
+        parents={"place_id": "places"},
+    )),
+    ("place_amenities", TableSpec(
+        "PlaceAmenity", ("place_id", "amenity_name"),
+        lambda row: {"place_id": uuid.UUID(row["place_id"]), "amenity_name": row["amenity_name"]},
+        parents={"place_id": "places"},
+    )),
+    ("route_logs", TableSpec(
+        "RouteLog", None,
+        lambda row: {
+            "source_place_id": uuid.UUID(row["source_place_id"]),
+            "destination_place_id": uuid.UUID(row["destination_place_id"]),
+            "travel_mode": row["travel_mode"],
+            "user_id": uuid.UUID(row["user_id"]) if row.get("user_id") else None,
+            "created_at": _dt(row.get("created_at")),
+        },
+        parents={"source_place_id": "places", "destination_place_id": "places"},
+        after_insert=("created_at",),
+    )),
+])
+
+
+# ---------------------------------------------------------------------------
+# تبدیل رکوردهای JSON (hotels/hospitals/restaurants) به ردیف جدول‌ها
+# ---------------------------------------------------------------------------
+
+def _location(item):
+    loc = item.get("location") or {}
+    lat, lng = loc.get("latitude"), loc.get("longitude")
+    if lat is None or lng is None:
+        raise ValueError("missing location")
+    return float(lat), float(lng)
+
+
+def _place_rows(place_id, place_type, item, lat, lng, default_fa, default_en):
+    city = (item.get("city_name_fa") or item.get("city") or "").strip()[:255]
+    return [
+        ("places", {
+            "place_id": place_id,
+            "type": place_type,
+            "city": city,
+            "address": (item.get("address") or "").strip(),
+            "latitude": lat,
+            "longitude": lng,
+        }),
+        ("place_translations", {
+            "place_id": place_id,
+            "lang": "fa",
+            "name": ((item.get("name_fa") or "").strip() or default_fa)[:255],
+            "description": (item.get("description_fa") or "").strip(),
+        }),
+        ("place_translations", {
+            "place_id": place_id,
+            "lang": "en",
+            "name": ((item.get("name_en") or "").strip() or default_en)[:255],
+            "description": (item.get("description_en") or "").strip(),
+        }),
+    ]
+
+
+def hotel_rows(item):
+    if item.get("hotel_id") is None:
+        raise ValueError("missing hotel_id")
+    lat, lng = _location(item)
+    place_id = uuid.uuid5(NAMESPACE_HOTEL, str(item["hotel_id"]))
+    try:
+        stars = int(item["stars"]) if item.get("stars") is not None else None
+    except (TypeError, ValueError):
+        stars = None
+    rows = _place_rows(place_id, "hotel", item, lat, lng, "هتل", "Hotel")
+    rows.append(("hotel_details", {
+        "place_id": place_id,
+        "stars": stars,
+        "price_range": (item.get("price_tier") or "").strip()[:64],
+    }))
+    amenity_ids = item.get("amenities") or []
+    if isinstance(amenity_ids, list):
+        for aid in amenity_ids:
+            name = HOTEL_AMENITY_NAMES.get(aid) or f"amenity_{aid}"
+            rows.append(("place_amenities", {"place_id": place_id, "amenity_name": name[:128]}))
+    return rows
+
+
+def hospital_rows(item):
+    lat, lng = _location(item)
+    name_fa = (item.get("name_fa") or "").strip() or "بیمارستان"
+    place_id = uuid.uuid5(NAMESPACE_HOSPITAL, f"{name_fa}|{lat}|{lng}")
+    return _place_rows(place_id, "hospital", item, lat, lng, "بیمارستان", "Hospital")
+
+
+def restaurant_rows(item):
+    if item.get("id") is None:
+        raise ValueError("missing id")
+    lat, lng = _location(item)
+    place_id = uuid.uuid5(NAMESPACE_RESTAURANT, str(item["id"]))
+    price_tier = (item.get("price_tier") or "").strip().lower()
+    rows = _place_rows(place_id, "food", item, lat, lng, "رستوران", "Restaurant")
+    rows.append(("restaurant_details", {
+        "place_id": place_id,
+        "cuisine": "",
+        "avg_price": RESTAURANT_PRICE_TIERS.get(price_tier) if price_tier else None,
+    }))
+    return rows
+
+
+JSON_ADAPTERS = {"hotels": hotel_rows, "hospitals": hospital_rows, "restaurants": restaurant_rows}
+
+
+# ---------------------------------------------------------------------------
+# خواندن جریانی ورودی
+# ---------------------------------------------------------------------------
+
+def iter_csv_rows(path):
+    """(شمارهٔ خط، ردیف dict) بدون بارگذاری کل فایل."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+# ---------------------------------------------------------------------------
+# نقطهٔ بازیابی
+# ---------------------------------------------------------------------------
+
+class Checkpoint:
+    """پیشرفت هر منبع ({مسیر: {rows, done}}) در یک فایل JSON؛ با جایگزینی اتمیک نوشته می‌شود."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.sources = {}
+        if path and os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.sources = json.load(f).get("sources", {})
+
+    def get(self, source):
+        return self.sources.get(source, {"rows": 0, "done": False})
+
+    def save(self, source, rows, done=False):
+        self.sources[source] = {"rows": rows, "done": done}
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+
+# ---------------------------------------------------------------------------
+# بارگذار
+# ---------------------------------------------------------------------------
+
+class BulkImporter:
+    def __init__(self, db=TEAM13_DB, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, checkpoint_path=None, log=None):
+        self.db = db
+        self.chunk_size = max(1, chunk_size)
+        self.dry_run = dry_run
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.log = log or (lambda message: None)
+        self.stats = OrderedDict()
+        self.errors = []
+        self.error_count = 0
+        # در dry_run هیچ چیز نوشته نمی‌شود؛ کلیدهای معتبر دیده‌شده برای بررسی والدها نگه داشته می‌شوند
+        self._seen = {}
+        self.written = False
+
+    # -- منابع ---------------------------------------------------------------
+
+    def import_csv_dir(self, data_dir):
+        """همهٔ فایل‌های <table>.csv موجود در پوشه به ترتیب TABLES."""
+        for table in TABLES:
+            path = os.path.join(data_dir, f"{table}.csv")
+            if os.path.isfile(path):
+                self.import_csv(path, table)
+        return self.report()
+
+    def import_csv(self, path, table):
+        spec = TABLES[table]
+        return self._run(path, iter_csv_rows(path), lambda row: [(table, spec.parse_csv(row))])
+
+    def import_json(self, path, kind):
+        return self._run(path, iter_json_array(path), JSON_ADAPTERS[kind])
+
+    def import_records(self, source, rows, to_rows):
+        """منبع دلخواه: rows = (شماره، رکورد)، to_rows(رکورد) → [(table, values), ...]."""
+        return self._run(source, iter(rows), to_rows)
+
+    def finish(self):
+        """بازسازی PlaceListing یک‌بار در پایان (سیگنال‌ها برای bulk_create اجرا نمی‌شوند)."""
+        if self.written and not self.dry_run:
+            from .place_listing import rebuild_place_listings
+            return rebuild_place_listings(self.db)
+        return 0
+
+    def report(self):
+        return {"tables": dict(self.stats), "errors": self.error_count, "first_errors": list(self.errors)}
+
+    # -- اجرای تکه‌ای ---------------------------------------------------------
+
+    def _error(self, source, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{os.path.basename(str(source))}:{line}: {message}")
+
+    def _run(self, source, rows, to_rows):
+        state = self.checkpoint.get(str(source))
+        if state["done"]:
+            self.log(f"{source}: already imported (checkpoint), skipping")
+            return self.report()
+        done = state["rows"]
+        if done:
+            self.log(f"{source}: resuming after {done} rows")
+        rows = islice(rows, done, None)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            grouped = OrderedDict((table, []) for table in TABLES)
+            for line, record in chunk:
+                try:
+                    for table, values in to_rows(record):
+                        grouped[table].append((line, values))
+                except (KeyError, ValueError, TypeError, AttributeError) as e:
+                    self._error(source, line, f"{type(e).__name__}: {e}")
+            self._write_chunk(source, grouped)
+            done += len(chunk)
+            if not self.dry_run:
+                self.checkpoint.save(str(source), done)
+        if not self.dry_run:
+            self.checkpoint.save(str(source), done, done=True)
+        self.log(f"{source}: {done} rows")
+        return self.report()
+
+    def _write_chunk(self, source, grouped):
+        with transaction.atomic(using=self.db):
+            for table, rows in grouped.items():
+                if rows:
+                    self._write_table(source, table, TABLES[table], rows)
+
+    def _stat(self, table):
+        return self.stats.setdefault(table, {"created": 0, "updated": 0, "invalid": 0})
+
+    def _existing_parents(self, table, ids):
+        spec = TABLES[table]
+        pk = spec.key[0]
+        found = set(spec.model.objects.using(self.db).filter(**{f"{pk}__in": ids}).values_list(pk, flat=True))
+        return found | (self._seen.get(table, set()) & ids)
+
+    def _write_table(self, source, table, spec, rows):
+        stat = self._stat(table)
+        model = spec.model
+
+        # والدها: یک کوئری IN برای هر ستون ارجاع
+        for attname, parent in spec.parents.items():
+            known = self._existing_parents(parent, {values[attname] for _, values in rows})
+            valid = []
+            for line, values in rows:
+                if values[attname] in known:
+                    valid.append((line, values))
+                else:
+                    stat["invalid"] += 1
+                    self._error(source, line, f"{attname}={values[attname]} does not exist in {parent}")
+            rows = valid
+        if not rows:
+            return
+
+        if spec.key is None:
+            stat["created"] += len(rows)
+            if not self.dry_run:
+                self._insert(spec, [model(**values) for _, values in rows])
+            return
+
+        # یک ردیف برای هر کلید (آخرین مقدار برنده است)
+        by_key = OrderedDict()
+        for _, values in rows:
+            by_key[tuple(values[k] for k in spec.key)] = values
+        existing = self._existing_keys(spec, by_key)
+        stat["updated"] += len(existing)
+        stat["created"] += len(by_key) - len(existing)
+        if len(spec.key) == 1:
+            self._seen.setdefault(table, set()).update(k[0] for k in by_key)
+        if self.dry_run:
+            return
+
+        # فقط ستون‌هایی که ورودی واقعاً دارد به‌روز می‌شوند؛ بقیه (مثل is_approved یا body) دست‌نخورده می‌مانند
+        provided = set.intersection(*(set(values) for values in by_key.values()))
+        update_fields = [
+            f.name for f in model._meta.concrete_fields
+            if f.attname in provided
+            and f.attname not in spec.key and not f.primary_key and f.attname not in spec.after_insert
+        ]
+        objs = [model(**values) for values in by_key.values()]
+        features = connections[self.db].features
+        if not update_fields:
+            self._insert(spec, [obj for key, obj in zip(by_key, objs) if key not in existing])
+        elif features.supports_update_conflicts:
+            kwargs = {"update_conflicts": True, "update_fields": update_fields}
+            if features.supports_update_conflicts_with_target:
+                kwargs["unique_fields"] = [model._meta.get_field(k).name for k in spec.key]
+            self._insert(spec, objs, **kwargs)
+        else:
+            new, old = [], []
+            for key, obj in zip(by_key, objs):
+                if key in existing:
+                    obj.pk = existing[key]
+                    old.append(obj)
+                else:
+                    new.append(obj)
+            self._insert(spec, new)
+            model.objects.using(self.db).bulk_update(old, update_fields, batch_size=self.chunk_size)
+        self.written = True
+
+    def _existing_keys(self, spec, by_key):
+        """{key: pk} برای کلیدهای موجود با یک کوئری IN روی ستون اول کلید."""
+        first = spec.key[0]
+        qs = spec.model.objects.using(self.db).filter(**{f"{first}__in": {k[0] for k in by_key}})
+        found = {}
+        for row in qs.values_list(*spec.key, "pk"):
+            key = tuple(row[:-1])
+            if key in by_key:
+                found[key] = row[-1]
+        return found
+
+    def _insert(self, spec, objs, **kwargs):
+        if not objs:
+            return
+        # auto_now_add در bulk_create مقدار ورودی را با اکنون جایگزین می‌کند؛ بعد از درج دوباره ست می‌شود
+        preserved = [(obj, {f: getattr(obj, f) for f in spec.after_insert}) for obj in objs] if spec.after_insert else []
+        spec.model.objects.using(self.db).bulk_create(objs, batch_size=self.chunk_size, **kwargs)
+        self.written = True
+        fixes = []
+        for obj, values in preserved:
+            if obj.pk is not None and all(v is not None for v in values.values()):
+                for field, value in values.items():
+                    setattr(obj, field, value)
+                fixes.append(obj)
+        if fixes:
+            spec.model.objects.using(self.db).bulk_update(fixes, list(spec.after_insert), batch_size=self.chunk_size)
@@ -1,7 +1,9 @@
 # یکپارچه‌سازی با احراز هویت Core — مرحله ۶
-# در صورت تنظیم CORE_BASE_URL، وضعیت کاربر از /api/auth/me گرفته می‌شود؛ وگرنه از request.user همین سرور.
+# وقتی اپ core در همین پروسه نصب است، توکن JWT به‌صورت محلی (core.identity) بررسی می‌شود؛
+# فقط وقتی team13 جدا از Core مستقر شده و CORE_BASE_URL تنظیم شده، وضعیت کاربر از /api/auth/me گرفته می‌شود.
 
 import logging
+from django.apps import apps
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
@@ -11,16 +13,25 @@ def get_current_user_info(request):
     """
     وضعیت کاربر جاری را برمی‌گرداند تا در UI (ورود/خروج، نام کاربر) استفاده شود.
 
-    - اگر CORE_BASE_URL تنظیم شده باشد: درخواست GET به CORE_BASE_URL/api/auth/me/
+    - اگر اپ core در همین پروسه نصب باشد: core.identity.verify_request (بررسی محلی JWT،
+      بدون درخواست HTTP؛ نتیجه روی خود request نگه داشته می‌شود).
+    - اگر core نصب نباشد و CORE_BASE_URL تنظیم شده باشد: درخواست GET به CORE_BASE_URL/api/auth/me/
       با ارسال کوکی‌های درخواست فعلی؛ در صورت موفقیت خروجی user از JSON.
     - در غیر این صورت: از request.user (همان سرور) استفاده می‌شود.
 
     خروجی در صورت احراز هویت موفق: dict با کلیدهای email, first_name, last_name, age
     در غیر این صورت: None
     """
+    if apps.is_installed("core"):
+        from core.identity import verify_request
+        return verify_request(request)
+
     base_url = getattr(settings, "CORE_BASE_URL", None) or ""
     if base_url:
-        return _fetch_user_from_core(request, base_url.rstrip("/"))
+        # یک بار برای هر درخواست (context processor ممکن است چند بار صدا زده شود)
+        if not hasattr(request, "_team13_core_user"):
+            request._team13_core_user = _fetch_user_from_core(request, base_url.rstrip("/"))
+        return request._team13_core_user
     return _user_from_request(request)
 
 
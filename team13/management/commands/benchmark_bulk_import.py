@@ -0,0 +1,141 @@
+# بنچمارک بارگذار انبوه (team13.bulk_import) روی دادهٔ مصنوعی CSV (پیش‌فرض ۱۰۰هزار ردیف:
+# places + دو ترجمه + hotel_details برای هر مکان) در یک دیتابیس SQLite موقت، نه دیتابیس team13.
+# سه حالت: درج اولیه، اجرای دوباره (همه upsert)، و حلقهٔ قدیمی get_or_create/update_or_create روی زیرمجموعه.
+import csv
+import os
+import tempfile
+import time
+import uuid
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from team13.bulk_import import DEFAULT_CHUNK_SIZE, BulkImporter
+from team13.place_listing import suspend_listing_updates
+
+BENCH_DB = "team13_bulk_benchmark"
+
+
+def _write_csvs(directory, places):
+    ids = [uuid.UUID(int=i + 1) for i in range(places)]
+    with open(os.path.join(directory, "places.csv"), "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["place_id", "type", "city", "address", "latitude", "longitude"])
+        for i, pid in enumerate(ids):
+            w.writerow([pid, "hotel", "تهران", f"خیابان {i}", 35.6 + (i % 1000) * 1e-4, 51.3 + (i // 1000) * 1e-4])
+    with open(os.path.join(directory, "place_translations.csv"), "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["place_id", "lang", "name", "description"])
+        for i, pid in enumerate(ids):
+            w.writerow([pid, "fa", f"هتل {i}", ""])
+            w.writerow([pid, "en", f"Hotel {i}", ""])
+    with open(os.path.join(directory, "hotel_details.csv"), "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["place_id", "stars", "price_range"])
+        for i, pid in enumerate(ids):
+            w.writerow([pid, 1 + i % 5, "mid"])
+    return places * 4
+
+
+def _legacy_load(directory, db, limit):
+    """همان حلقهٔ ردیف‌به‌ردیف loaddata_team13_csv پیش از bulk_import (برای مقایسه)."""
+    from team13.models import HotelDetails, Place, PlaceTranslation
+
+    rows = 0
+    with open(os.path.join(directory, "places.csv"), encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if rows >= limit:
+                return rows
+            Place.objects.using(db).get_or_create(
+                place_id=uuid.UUID(row["place_id"]),
+                defaults={
+                    "type": row["type"],
+                    "city": row["city"],
+                    "address": row["address"],
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                },
+            )
+            rows += 1
+    with open(os.path.join(directory, "place_translations.csv"), encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if rows >= limit:
+                return rows
+            place = Place.objects.using(db).get(place_id=uuid.UUID(row["place_id"]))
+            PlaceTranslation.objects.using(db).update_or_create(
+                place=place, lang=row["lang"], defaults={"name": row["name"], "description": row["description"]}
+            )
+            rows += 1
+    with open(os.path.join(directory, "hotel_details.csv"), encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if rows >= limit:
+                return rows
+            place = Place.objects.using(db).get(place_id=uuid.UUID(row["place_id"]))
+            HotelDetails.objects.using(db).update_or_create(
+                place=place, defaults={"stars": int(row["stars"]), "price_range": row["price_range"]}
+            )
+            rows += 1
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Measure rows/sec of the chunked team13 bulk importer vs the old row-by-row loader on synthetic CSVs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="Total synthetic rows (4 per place).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--legacy-rows", type=int, default=5000, help="Rows to run through the old loader.")
+
+    def _setup_db(self, path):
+        conf = dict(connections.settings["team13"])
+        conf["NAME"] = path
+        connections.settings[BENCH_DB] = conf
+        with connections[BENCH_DB].schema_editor() as editor:
+            for model in apps.get_app_config("team13").get_models():
+                editor.create_model(model)
+
+    def _teardown_db(self):
+        connections[BENCH_DB].close()
+        del connections[BENCH_DB]
+        del connections.settings[BENCH_DB]
+
+    def _reset(self):
+        with connections[BENCH_DB].cursor() as cursor:
+            for model in reversed(list(apps.get_app_config("team13").get_models())):
+                cursor.execute(f"DELETE FROM {model._meta.db_table}")
+
+    def _run_importer(self, directory, chunk_size):
+        importer = BulkImporter(db=BENCH_DB, chunk_size=chunk_size)
+        started = time.perf_counter()
+        with suspend_listing_updates():
+            importer.import_csv_dir(directory)
+        elapsed = time.perf_counter() - started
+        return elapsed, importer
+
+    def handle(self, *args, **options):
+        places = max(1, options["rows"] // 4)
+        with tempfile.TemporaryDirectory() as tmp:
+            total = _write_csvs(tmp, places)
+            self._setup_db(os.path.join(tmp, "bench.sqlite3"))
+            try:
+                self.stdout.write(f"{'mode':>22} {'rows':>8} {'seconds':>8} {'rows/s':>9}")
+
+                elapsed, importer = self._run_importer(tmp, options["chunk_size"])
+                self.stdout.write(f"{'bulk (insert)':>22} {total:>8} {elapsed:>8.2f} {total / elapsed:>9.0f}")
+
+                elapsed, importer = self._run_importer(tmp, options["chunk_size"])
+                self.stdout.write(f"{'bulk (re-run, upsert)':>22} {total:>8} {elapsed:>8.2f} {total / elapsed:>9.0f}")
+
+                started = time.perf_counter()
+                listings = importer.finish()
+                self.stdout.write(f"{'listing rebuild':>22} {listings:>8} {time.perf_counter() - started:>8.2f}")
+
+                self._reset()
+                started = time.perf_counter()
+                with suspend_listing_updates():
+                    done = _legacy_load(tmp, BENCH_DB, min(options["legacy_rows"], total))
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{'row-by-row (subset)':>22} {done:>8} {elapsed:>8.2f} {done / elapsed:>9.0f}")
+            finally:
+                self._teardown_db()
@@ -0,0 +1,66 @@
+# بازپخش کلیک‌های مسیریابی کاربران روی چند جفت مکان پرتکرار (با لرزش چندمتری مختصات)
+# در برابر سرور آزمایشی نشان: بدون کش در برابر core.geo_cache (حافظه + SQLite).
+# خروجی: تعداد درخواست به نشان، نرخ برخورد کش، زمان صرفه‌جویی‌شده و p50/p95 هر فراخوانی.
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core.geo_cache import GeoResultCache, set_geo_cache
+from team13.neshan import fetch_route_eta
+from team13.neshan.stub_server import StubNeshanServer
+from team13.neshan.transport import NeshanTransport, set_transport
+
+
+class Command(BaseCommand):
+    help = "Replay repeated route lookups against a stub Neshan server with and without the coordinate cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--pairs", type=int, default=25, help="Distinct landmark pairs users click on.")
+        parser.add_argument("--delay-ms", type=float, default=40.0, help="Stub upstream latency.")
+        parser.add_argument("--jitter-m", type=float, default=4.0, help="Click jitter around each landmark (metres).")
+        parser.add_argument("--precision", type=int, default=4)
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        jitter = options["jitter_m"] / 111_000
+        pairs = [
+            ((rng.uniform(35.6, 35.8), rng.uniform(51.2, 51.6)), (rng.uniform(35.6, 35.8), rng.uniform(51.2, 51.6)))
+            for _ in range(max(1, options["pairs"]))
+        ]
+        clicks = []
+        for _ in range(max(1, options["requests"])):
+            (a_lat, a_lng), (b_lat, b_lng) = rng.choice(pairs)
+            clicks.append(tuple(v + rng.uniform(-jitter, jitter) for v in (a_lat, a_lng, b_lat, b_lng)))
+
+        self.stdout.write(f"{'mode':>8} {'upstream':>9} {'hit rate':>9} {'saved ms':>10} {'p50 ms':>8} {'p95 ms':>8}")
+        with tempfile.TemporaryDirectory() as tmp, override_settings(NESHAN_API_KEY_SERVICE="benchmark"):
+            for mode in ("no cache", "cache"):
+                cache = GeoResultCache(
+                    path=f"{tmp}/geo.sqlite3" if mode == "cache" else None,
+                    precision=options["precision"],
+                    ttl=3600 if mode == "cache" else 0,
+                )
+                set_geo_cache(cache)
+                with StubNeshanServer(delay=options["delay_ms"] / 1000) as stub:
+                    set_transport(NeshanTransport(base_url=stub.url))
+                    timings = []
+                    try:
+                        for a_lat, a_lng, b_lat, b_lng in clicks:
+                            t0 = time.perf_counter()
+                            fetch_route_eta(a_lng, a_lat, b_lng, b_lat)
+                            timings.append((time.perf_counter() - t0) * 1000)
+                    finally:
+                        set_transport(None)
+                        set_geo_cache(None)
+                    timings.sort()
+                    stats = cache.stats()
+                    hit_rate = f"{stats['hit_rate']:.1%}" if mode == "cache" else "-"
+                    self.stdout.write(
+                        f"{mode:>8} {stub.requests:>9} {hit_rate:>9} {stats['saved_ms']:>10.0f} "
+                        f"{statistics.median(timings):>8.2f} {timings[max(0, int(len(timings) * 0.95) - 1)]:>8.2f}"
+                    )
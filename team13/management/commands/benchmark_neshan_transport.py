@@ -0,0 +1,63 @@
+# مقایسهٔ زمان فراخوانی مسیریابی نشان روی سرور آزمایشی محلی (StubNeshanServer):
+# requests.get بدون Session (رفتار قبلی ماژول‌ها) در برابر NeshanTransport مشترک.
+# دو سناریو: نشان سالم (تأخیر ثابت) و نشان از دسترس خارج (همهٔ پاسخ‌ها 503).
+# روی localhost دست‌دادن TLS وجود ندارد، پس صرفه‌جویی واقعی اتصال در محیط عملیاتی بیشتر است.
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from team13.neshan.config import NESHAN_DIRECTION_PATH
+from team13.neshan.stub_server import StubNeshanServer
+from team13.neshan.transport import NeshanTransport
+
+PARAMS = {"type": "car", "origin": "35.7,51.4", "destination": "35.8,51.5"}
+
+
+def _bare_get(url):
+    import requests
+
+    try:
+        return requests.get(url, params=PARAMS, headers={"Api-Key": "bench"}, timeout=15)
+    except requests.RequestException:
+        return None
+
+
+class Command(BaseCommand):
+    help = "Benchmark bare requests.get vs the pooled Neshan transport against a local stub server."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="Calls per mode and scenario.")
+        parser.add_argument("--delay-ms", type=float, default=5.0, help="Stub server latency per request.")
+
+    def _run(self, call, n):
+        timings = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        return sum(timings), statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+    def handle(self, *args, **options):
+        n = max(1, options["requests"])
+        delay = options["delay_ms"] / 1000.0
+
+        self.stdout.write(f"{'scenario':>9} {'mode':>10} {'total ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'upstream':>9} {'conns':>6}")
+        for scenario in ("healthy", "outage"):
+            for mode in ("bare", "transport"):
+                with StubNeshanServer(delay=delay) as stub:
+                    if scenario == "outage":
+                        stub.fail_next(n * 10, status=503)
+                    if mode == "bare":
+                        url = f"{stub.url}{NESHAN_DIRECTION_PATH}"
+                        call = lambda: _bare_get(url)  # noqa: E731
+                    else:
+                        transport = NeshanTransport(base_url=stub.url)
+                        call = lambda: transport.get("direction", NESHAN_DIRECTION_PATH, "bench", params=PARAMS)  # noqa: E731
+                    total, p50, p95 = self._run(call, n)
+                    if mode == "transport":
+                        transport.close()
+                    self.stdout.write(
+                        f"{scenario:>9} {mode:>10} {total:>10.1f} {p50:>8.2f} {p95:>8.2f} {stub.requests:>9} {stub.connections:>6}"
+                    )
@@ -0,0 +1,100 @@
+# مقایسهٔ زمان جستجوی شعاعی/نزدیک‌ترین: اسکن کامل (مسیر قدیمی views) در برابر ایندکس شبکه‌ای spatial_index
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from team13.spatial_index import PlaceGridIndex, haversine_km
+
+# محدودهٔ تقریبی ایران برای نقاط مصنوعی
+LAT_RANGE = (25.0, 40.0)
+LNG_RANGE = (44.0, 63.5)
+TYPES = ["hospital", "food", "hotel", "museum", "entertainment", "pharmacy", "clinic", "fire_station"]
+
+
+def _synthetic_rows(n, rng):
+    return [
+        (str(uuid.UUID(int=rng.getrandbits(128))), rng.choice(TYPES), rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE))
+        for _ in range(n)
+    ]
+
+
+def _full_scan_radius(rows, lat, lng, radius_km):
+    found = []
+    for place_id, place_type, p_lat, p_lng in rows:
+        d = haversine_km(lat, lng, p_lat, p_lng)
+        if d <= radius_km:
+            found.append((place_id, place_type, d))
+    found.sort(key=lambda item: item[2])
+    return found
+
+
+def _full_scan_nearest(rows, lat, lng, radius_km):
+    best = None
+    best_d = float("inf")
+    for place_id, place_type, p_lat, p_lng in rows:
+        d = haversine_km(lat, lng, p_lat, p_lng)
+        if d <= radius_km and d < best_d:
+            best_d = d
+            best = (place_id, place_type, d)
+    return [best] if best else []
+
+
+class Command(BaseCommand):
+    help = "Benchmark full-scan vs grid-indexed radius and nearest-place queries on synthetic places (no DB access)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated synthetic place counts.")
+        parser.add_argument("--queries", type=int, default=20, help="Number of random query points per size.")
+        parser.add_argument("--radius-km", type=float, default=10.0, help="Radius for places-in-radius queries.")
+        parser.add_argument("--nearest-km", type=float, default=5.0, help="Radius for nearest-place queries.")
+        parser.add_argument("--seed", type=int, default=13)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        n_queries = max(1, options["queries"])
+        radius_km = options["radius_km"]
+        nearest_km = options["nearest_km"]
+        rng = random.Random(options["seed"])
+
+        header = f"{'places':>10} {'build s':>8} {'scan r ms':>10} {'index r ms':>11} {'scan nn ms':>11} {'index nn ms':>12} {'speedup r':>10}"
+        self.stdout.write(header)
+        for n in sizes:
+            rows = _synthetic_rows(n, rng)
+            points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(n_queries)]
+
+            t0 = time.perf_counter()
+            index = PlaceGridIndex()
+            index.load(rows)
+            build_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            scan_results = [_full_scan_radius(rows, lat, lng, radius_km) for lat, lng in points]
+            scan_r = (time.perf_counter() - t0) / n_queries * 1000
+
+            t0 = time.perf_counter()
+            index_results = [index.query_radius(lat, lng, radius_km) for lat, lng in points]
+            index_r = (time.perf_counter() - t0) / n_queries * 1000
+
+            t0 = time.perf_counter()
+            scan_nn = [_full_scan_nearest(rows, lat, lng, nearest_km) for lat, lng in points]
+            scan_n = (time.perf_counter() - t0) / n_queries * 1000
+
+            t0 = time.perf_counter()
+            index_nn = [index.nearest(lat, lng, k=1, max_km=nearest_km) for lat, lng in points]
+            index_n = (time.perf_counter() - t0) / n_queries * 1000
+
+            for a, b in zip(scan_results, index_results):
+                if [x[0] for x in a] != [x[0] for x in b]:
+                    self.stderr.write(f"Mismatch in radius results at n={n}")
+                    break
+            for a, b in zip(scan_nn, index_nn):
+                if [x[0] for x in a] != [x[0] for x in b]:
+                    self.stderr.write(f"Mismatch in nearest results at n={n}")
+                    break
+
+            speedup = scan_r / index_r if index_r else float("inf")
+            self.stdout.write(
+                f"{n:>10} {build_s:>8.2f} {scan_r:>10.2f} {index_r:>11.3f} {scan_n:>11.2f} {index_n:>12.3f} {speedup:>9.0f}x"
+            )
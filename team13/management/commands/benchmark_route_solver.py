@@ -0,0 +1,59 @@
+# بنچمارک حل‌کنندهٔ محلی TSP (route_solver): زمان ساخت ماتریس فاصلهٔ برداری و حل ترتیب بازدید
+# برای ۱۰، ۵۰ و ۲۰۰ نقطه؛ کیفیت در برابر نزدیک‌ترین همسایهٔ تنها و برای n کوچک در برابر جواب دقیق (Held-Karp).
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from team13.route_solver import (
+    EXACT_MAX_POINTS,
+    _nearest_neighbour,
+    distance_matrix_km,
+    solve_exact,
+    solve_tsp,
+    tour_length,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the local TSP solver (matrix build, solve time, gap vs nearest-neighbour and exact)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,50,200", help="Comma-separated waypoint counts.")
+        parser.add_argument("--trials", type=int, default=5)
+        parser.add_argument("--budget", type=float, default=0.5, help="Solver time budget in seconds.")
+        parser.add_argument("--exact-size", type=int, default=10, help="Also compare against the exact solution at this n.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(11)
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        exact_n = min(options["exact_size"], EXACT_MAX_POINTS)
+        if exact_n not in sizes:
+            sizes.insert(0, exact_n)
+
+        self.stdout.write(
+            f"{'n':>5} {'matrix ms':>10} {'solve ms':>9} {'NN km':>9} {'2opt+oropt km':>14} {'vs NN':>7} {'vs exact':>9}"
+        )
+        for n in sizes:
+            matrix_ms, solve_ms, nn_len, opt_len, gaps = [], [], [], [], []
+            for _ in range(max(1, options["trials"])):
+                points = [(rng.uniform(35.55, 35.80), rng.uniform(51.20, 51.60)) for _ in range(n)]
+                t0 = time.perf_counter()
+                dist = distance_matrix_km(points, road_factor=1.3)
+                matrix_ms.append((time.perf_counter() - t0) * 1000)
+
+                t0 = time.perf_counter()
+                order = solve_tsp(dist, time_budget=options["budget"])
+                solve_ms.append((time.perf_counter() - t0) * 1000)
+                nn_len.append(tour_length(dist, _nearest_neighbour(dist)))
+                opt_len.append(tour_length(dist, order))
+                if n <= EXACT_MAX_POINTS:
+                    gaps.append(opt_len[-1] / tour_length(dist, solve_exact(dist)) - 1)
+
+            nn, opt = statistics.mean(nn_len), statistics.mean(opt_len)
+            exact = f"{max(gaps):+.2%}" if gaps else "-"
+            self.stdout.write(
+                f"{n:>5} {statistics.mean(matrix_ms):>10.2f} {statistics.mean(solve_ms):>9.1f} {nn:>9.1f} {opt:>14.1f} "
+                f"{opt / nn - 1:>+7.1%} {exact:>9}"
+            )
@@ -0,0 +1,15 @@
+# بازسازی کامل مدل خواندنی PlaceListing (مثلاً پس از نوشتن مستقیم SQL یا QuerySet.update روی مکان‌ها)
+from django.core.management.base import BaseCommand
+
+from team13.place_listing import TEAM13_DB, rebuild_place_listings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the team13_place_listings read model from places, translations, details and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=TEAM13_DB)
+
+    def handle(self, *args, **options):
+        count = rebuild_place_listings(options["database"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} place listings"))
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.27 on 2026-10-16 23:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Avg, Count
+
+
+def backfill_place_listings(apps, schema_editor):
+    """پر کردن اولیهٔ team13_place_listings از روی مکان‌های موجود (منطق team13/place_listing.py)."""
+    from team13.place_listing import price_level_for
+
+    db = schema_editor.connection.alias
+    Place = apps.get_model("team13", "Place")
+    PlaceTranslation = apps.get_model("team13", "PlaceTranslation")
+    PlaceListing = apps.get_model("team13", "PlaceListing")
+    Comment = apps.get_model("team13", "Comment")
+
+    names = {}
+    for place_id, lang, name in PlaceTranslation.objects.using(db).values_list("place_id", "lang", "name"):
+        names.setdefault(place_id, {})[lang] = name
+    ratings = {
+        r["target_id"]: (r["avg"], r["n"])
+        for r in Comment.objects.using(db).filter(target_type="place")
+        .values("target_id").annotate(avg=Avg("rating"), n=Count("rating"))
+    }
+    listings = []
+    for place in Place.objects.using(db).select_related("hotel_details", "restaurant_details"):
+        hotel = getattr(place, "hotel_details", None)
+        restaurant = getattr(place, "restaurant_details", None)
+        avg_rating, rating_count = ratings.get(place.place_id, (None, 0))
+        listings.append(PlaceListing(
+            place_id=place.place_id,
+            type=place.type,
+            city=place.city,
+            address=place.address,
+            latitude=place.latitude,
+            longitude=place.longitude,
+            name_fa=names.get(place.place_id, {}).get("fa", ""),
+            name_en=names.get(place.place_id, {}).get("en", ""),
+            price_level=price_level_for(
+                place.type,
+                stars=hotel.stars if hotel else None,
+                avg_price=restaurant.avg_price if restaurant else None,
+            ),
+            avg_rating=avg_rating,
+            rating_count=rating_count,
+        ))
+    PlaceListing.objects.using(db).bulk_create(listings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team13', '0007_comment_is_approved_image_is_approved'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceListing',
+            fields=[
+                ('place', models.OneToOneField(db_column='place_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='team13.place')),
+                ('type', models.CharField(choices=[('entertainment', 'تفریحی'), ('food', 'غذا'), ('hospital', 'بیمارستان'), ('museum', 'موزه'), ('hotel', 'هتل'), ('fire_station', 'آتش\u200cنشانی'), ('pharmacy', 'داروخانه'), ('clinic', 'کلینیک')], max_length=32)),
+                ('city', models.CharField(blank=True, max_length=255)),
+                ('address', models.TextField(blank=True)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('name_fa', models.CharField(blank=True, max_length=255)),
+                ('name_en', models.CharField(blank=True, max_length=255)),
+                ('price_level', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('avg_rating', models.FloatField(blank=True, null=True)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'team13_place_listings',
+                'indexes': [models.Index(fields=['type', 'city', 'place'], name='team13_listing_type_city'), models.Index(fields=['-avg_rating'], name='team13_listing_rating')],
+            },
+        ),
+        migrations.RunPython(backfill_place_listings, migrations.RunPython.noop),
+    ]
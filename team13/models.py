@@ -40,6 +40,40 @@ class Place(models.Model):
         return f"{self.get_type_display()} — {self.city or 'بدون شهر'}"
 
 
+class PlaceListing(models.Model):
+    """
+    مدل خواندنی تخت برای لیست مکان‌ها و نقشه: نام fa/en، نوع، شهر، مختصات، سطح قیمت و میانگین امتیاز
+    در یک ردیف. با تغییر Place، ترجمه، جزئیات هتل/رستوران یا نظر به‌صورت افزایشی به‌روز می‌شود
+    (team13/place_listing.py)؛ بازسازی کامل: manage.py rebuild_place_listings
+    """
+
+    place = models.OneToOneField(
+        Place, on_delete=models.CASCADE, primary_key=True, related_name="listing", db_column="place_id"
+    )
+    type = models.CharField(max_length=32, choices=Place.PlaceType.choices)
+    city = models.CharField(max_length=255, blank=True)
+    address = models.TextField(blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    name_fa = models.CharField(max_length=255, blank=True)
+    name_en = models.CharField(max_length=255, blank=True)
+    # ۱=اقتصادی، ۲=متوسط، ۳=گران (فقط هتل بر اساس ستاره و رستوران بر اساس قیمت میانگین)؛ برای بقیه خالی
+    price_level = models.PositiveSmallIntegerField(null=True, blank=True)
+    avg_rating = models.FloatField(null=True, blank=True)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        app_label = "team13"
+        db_table = "team13_place_listings"
+        indexes = [
+            models.Index(fields=["type", "city", "place"], name="team13_listing_type_city"),
+            models.Index(fields=["-avg_rating"], name="team13_listing_rating"),
+        ]
+
+    def __str__(self):
+        return f"{self.name_fa or self.place_id} ({self.type})"
+
+
 class PlaceTranslation(models.Model):
     """ترجمه نام و توضیح مکان (چندزبانگی)."""
 
@@ -3,6 +3,7 @@
 from django.db import transaction
 
 from .models import Image, Place, PlaceContribution, PlaceTranslation, RouteContribution, RouteLog
+from .spatial_index import index_place
 
 TEAM13_DB = "team13"
 
@@ -48,6 +49,8 @@ def approve_route_contribution(route_contribution_id):
             name="مقصد: " + (rc.destination_address[:200] if rc.destination_address else "مسیر پیشنهادی"),
             description="",
         )
+        # پس از commit، دو مکان جدید به ایندکس مکانی همین worker اضافه می‌شوند
+        transaction.on_commit(lambda: (index_place(source_place), index_place(dest_place)), using=TEAM13_DB)
         route_log = RouteLog.objects.using(TEAM13_DB).create(
             user_id=rc.user_id,
             source_place=source_place,
@@ -65,6 +68,7 @@ def approve_contribution(contribution_id):
     - ایجاد رکورد Place و PlaceTranslation در همان دیتابیس
     - انتقال تصاویر پیشنهاد به Image با target_type=place و is_approved=True
     - حذف پیشنهاد (PlaceContribution)
+    - افزودن مکان جدید به ایندکس مکانی (spatial_index) پس از commit
 
     Args:
         contribution_id: UUID (یا str) شناسه PlaceContribution.
@@ -107,4 +111,6 @@ def approve_contribution(contribution_id):
             is_approved=True,
         )
         contribution.delete()
+        # پس از commit، مکان جدید به ایندکس مکانی همین worker اضافه می‌شود (بدون بازسازی کامل)
+        transaction.on_commit(lambda: index_place(place), using=TEAM13_DB)
     return place
@@ -9,6 +9,7 @@ from .tsp import fetch_tsp
 from .distance_matrix import fetch_distance_matrix
 from .isochrone import fetch_isochrone
 from .map_matching import fetch_map_matching
+from .transport import transport_stats
 
 __all__ = [
     "get_api_key",
@@ -26,4 +27,5 @@ __all__ = [
     "search_autocomplete",
     "search_count",
     "search_response",
+    "transport_stats",
 ]
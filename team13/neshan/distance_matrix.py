@@ -7,10 +7,10 @@ import logging
 from .config import (
     get_api_key,
     is_configured,
-    NESHAN_API_BASE,
     NESHAN_DISTANCE_MATRIX_PATH,
     NESHAN_DISTANCE_MATRIX_NO_TRAFFIC_PATH,
 )
+from .transport import neshan_get
 
 logger = logging.getLogger(__name__)
 
@@ -56,16 +56,15 @@ def fetch_distance_matrix(origins, destinations, vehicle_type=TYPE_CAR, no_traff
     if not origins_str or not destinations_str:
         return None
     try:
-        import requests
         path = NESHAN_DISTANCE_MATRIX_NO_TRAFFIC_PATH if no_traffic else NESHAN_DISTANCE_MATRIX_PATH
-        url = f"{NESHAN_API_BASE.rstrip('/')}{path}"
         params = {
             "type": vehicle_type,
             "origins": origins_str,
             "destinations": destinations_str,
         }
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=20)
+        resp = neshan_get("distance_matrix", path, api_key, params=params)
+        if resp is None:
+            return None
         if resp.status_code != 200:
             logger.debug("Neshan distance-matrix HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
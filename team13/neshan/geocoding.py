@@ -7,13 +7,13 @@ import logging
 from urllib.parse import quote
 
 from .config import (
-    NESHAN_API_BASE,
     NESHAN_GEOCODING_PATH,
     NESHAN_GEOCODING_PLUS_PATH,
     NESHAN_REVERSE_PATH,
     get_api_key,
     is_configured,
 )
+from .transport import neshan_get
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,7 @@ def reverse_geocode(lat, lng):
     خروجی: دیکشنری کامل پاسخ شامل status، formatted_address، route_name، route_type،
     neighbourhood، city، state، place، municipality_zone، in_traffic_zone، in_odd_even_zone،
     village، county، district؛ در صورت خطا None.
+    نتیجه با مختصات گردشده در core.geo_cache نگه داشته می‌شود (address_from_coords هم از همین مسیر می‌گذرد).
     """
     if not is_configured():
         return None
@@ -32,13 +33,19 @@ def reverse_geocode(lat, lng):
         lng_f = float(lng)
     except (TypeError, ValueError):
         return None
+    from core.geo_cache import get_geo_cache
+
+    cache = get_geo_cache()
+    return cache.get_or_fetch(cache.key("neshan/reverse", [(lat_f, lng_f)]), lambda: _fetch_reverse(lat_f, lng_f))
+
+
+def _fetch_reverse(lat_f, lng_f):
     api_key = get_api_key()
     try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_REVERSE_PATH}"
         params = {"lat": lat_f, "lng": lng_f}
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
+        resp = neshan_get("reverse", NESHAN_REVERSE_PATH, api_key, params=params)
+        if resp is None:
+            return None
         if resp.status_code != 200:
             logger.debug("Neshan reverse HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
@@ -118,14 +125,13 @@ def geocode(
             except (TypeError, ValueError, AttributeError):
                 pass
     path = NESHAN_GEOCODING_PLUS_PATH if plus else NESHAN_GEOCODING_PATH
-    base = NESHAN_API_BASE.rstrip("/")
     json_str = json.dumps(payload, ensure_ascii=False)
-    url = f"{base}{path}?json={quote(json_str)}"
     api_key = get_api_key()
     try:
-        import requests
-        headers = {"Api-Key": api_key, "Content-Type": "application/json"}
-        resp = requests.get(url, headers=headers, timeout=10)
+        headers = {"Content-Type": "application/json"}
+        resp = neshan_get("geocoding", f"{path}?json={quote(json_str)}", api_key, headers=headers)
+        if resp is None:
+            return None
         if resp.status_code != 200:
             logger.debug("Neshan geocode HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
@@ -3,7 +3,8 @@
 # Endpoint: GET https://api.neshan.org/v1/isochrone
 
 import logging
-from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_ISOCHRONE_PATH
+from .config import get_api_key, is_configured, NESHAN_ISOCHRONE_PATH
+from .transport import neshan_get
 
 logger = logging.getLogger(__name__)
 
@@ -49,10 +50,9 @@ def fetch_isochrone(lat, lng, distance_km=None, time_minutes=None, polygon=False
     if denoise is not None and 0 <= denoise <= 1:
         params["denoise"] = denoise
     try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_ISOCHRONE_PATH}"
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=20)
+        resp = neshan_get("isochrone", NESHAN_ISOCHRONE_PATH, api_key, params=params)
+        if resp is None:
+            return None
         if resp.status_code != 200:
             logger.debug("Neshan isochrone HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
@@ -4,7 +4,8 @@
 # Body: JSON { "path": "lat1,lng1|lat2,lng2|..." } — حداقل ۲، حداکثر ۱۰۰۰ نقطه.
 
 import logging
-from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_MAP_MATCHING_PATH
+from .config import get_api_key, is_configured, NESHAN_MAP_MATCHING_PATH
+from .transport import neshan_post
 
 logger = logging.getLogger(__name__)
 
@@ -43,11 +44,10 @@ def fetch_map_matching(path):
         path_str = "|".join(parts[:1000])
     api_key = get_api_key()
     try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_MAP_MATCHING_PATH}"
-        headers = {"Api-Key": api_key, "Content-Type": "application/json"}
         payload = {"path": path_str}
-        resp = requests.post(url, json=payload, headers=headers, timeout=30)
+        resp = neshan_post("map_matching", NESHAN_MAP_MATCHING_PATH, api_key, json=payload)
+        if resp is None:
+            return None
         if resp.status_code == 404:
             logger.debug("Neshan map-matching 404: no route found for path")
             return None
@@ -7,10 +7,10 @@ import logging
 from .config import (
     get_api_key,
     is_configured,
-    NESHAN_API_BASE,
     NESHAN_DIRECTION_PATH,
     NESHAN_DIRECTION_NO_TRAFFIC_PATH,
 )
+from .transport import neshan_get
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +20,57 @@ VEHICLE_MOTORCYCLE = "motorcycle"
 VEHICLE_PEDESTRIAN = "pedestrian"
 
 
-def _request_direction(url_path, params, api_key, timeout=15):
-    """درخواست GET به یک endpoint مسیریابی نشان؛ خروجی (distance_km, duration_seconds, route_geometry)."""
+def _points(value):
+    """«lat,lng|lat,lng» → [(lat, lng), ...] برای ساخت کلید کش."""
+    return [tuple(part.split(",", 1)) for part in str(value).split("|") if "," in part]
+
+
+def _request_direction(url_path, params, api_key, timeout=None):
+    """
+    مسیر بین مبدأ و مقصد از کش مختصات (core.geo_cache) یا API نشان؛ خروجی (distance_km, duration_seconds, route_geometry).
+    کلید: مختصات گردشده + مسیر endpoint + نوع وسیله و گزینه‌ها؛ پاسخ‌های ناموفق ذخیره نمی‌شوند.
+    پاسخ ناقص (بدون فاصله یا زمان) مثل قبل به فراخواننده برمی‌گردد ولی در کش نمی‌ماند.
+    """
+    from core.geo_cache import get_geo_cache
+
+    cache = get_geo_cache()
+    points = _points(params["origin"]) + _points(params.get("waypoints", "")) + _points(params["destination"])
+    options = {k: v for k, v in params.items() if k not in ("origin", "destination", "waypoints", "type")}
     try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{url_path}"
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
+        key = cache.key("neshan" + url_path, points, params.get("type", ""), **options)
+    except (TypeError, ValueError):
+        key = None
+    if key is None:
+        result = _fetch_direction(url_path, params, api_key, timeout)
+    else:
+        partial = []
+
+        def fetch_complete():
+            fetched = _fetch_direction(url_path, params, api_key, timeout)
+            if fetched is not None and None in fetched[:2]:
+                partial.append(fetched)
+                return None
+            return fetched
+
+        result = cache.get_or_fetch(key, fetch_complete)
+        if result is None and partial:
+            result = partial[0]
+    return tuple(result) if result is not None else (None, None, None)
+
+
+def _fetch_direction(url_path, params, api_key, timeout=None):
+    """درخواست GET به endpoint مسیریابی؛ [distance_km, duration_seconds, route] (هر کدام ممکن است None باشد) یا None در صورت خطا."""
+    try:
+        resp = neshan_get("direction", url_path, api_key, params=params, timeout=timeout)
+        if resp is None:
+            return None
         if resp.status_code != 200:
             logger.debug("Neshan direction HTTP %s: %s", resp.status_code, resp.text[:200])
-            return None, None, None
+            return None
         data = resp.json()
         routes = data.get("routes") or []
         if not routes:
-            return None, None, None
+            return None
         first = routes[0]
         legs = first.get("legs") or []
         distance_m = None
@@ -46,10 +83,10 @@ def _request_direction(url_path, params, api_key, timeout=15):
             if t is not None:
                 duration_s = (duration_s or 0) + t
         dist_km = (distance_m / 1000.0) if distance_m is not None else None
-        return dist_km, duration_s, first
+        return [dist_km, duration_s, first]
     except Exception as e:
         logger.debug("Neshan direction failed: %s", e)
-        return None, None, None
+        return None
 
 
 def _build_direction_params(lat_origin, lng_origin, lat_dest, lng_dest, vehicle_type,
@@ -4,7 +4,8 @@
 # پارامترهای اجباری: term، lat، lng. حداکثر ۳۰ نتیجه در هر درخواست.
 
 import logging
-from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_SEARCH_PATH
+from .config import get_api_key, is_configured, NESHAN_SEARCH_PATH
+from .transport import neshan_get
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +20,10 @@ def _search_raw(term, lat_f, lng_f):
         return None
     api_key = get_api_key()
     try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_SEARCH_PATH}"
         params = {"term": term, "lat": lat_f, "lng": lng_f}
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
+        resp = neshan_get("search", NESHAN_SEARCH_PATH, api_key, params=params)
+        if resp is None:
+            return None
         if resp.status_code != 200:
             logger.debug("Neshan search HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
@@ -0,0 +1,126 @@
+# سرور HTTP محلی که نقش API نشان را بازی می‌کند — برای تست‌ها و بنچمارک transport.
+# روی پورت آزاد 127.0.0.1 اجرا می‌شود؛ برای هر مسیر پاسخ JSON ثابت برمی‌گرداند و می‌توان
+# تأخیر و چند پاسخ خطای پیاپی (مثلاً 503) را برای شبیه‌سازی کندی/قطعی تنظیم کرد.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .config import (
+    NESHAN_DIRECTION_NO_TRAFFIC_PATH,
+    NESHAN_DIRECTION_PATH,
+    NESHAN_DISTANCE_MATRIX_NO_TRAFFIC_PATH,
+    NESHAN_DISTANCE_MATRIX_PATH,
+    NESHAN_GEOCODING_PATH,
+    NESHAN_ISOCHRONE_PATH,
+    NESHAN_MAP_MATCHING_PATH,
+    NESHAN_REVERSE_PATH,
+    NESHAN_SEARCH_PATH,
+    NESHAN_TSP_PATH,
+)
+
+_DIRECTION = {"routes": [{"legs": [{"distance": {"value": 12500}, "duration": {"value": 900}}], "overview_polyline": {"points": ""}}]}
+_MATRIX = {"status": "Ok", "rows": [{"elements": [{"status": "Ok", "distance": {"value": 1000}, "duration": {"value": 120}}]}]}
+
+DEFAULT_RESPONSES = {
+    NESHAN_DIRECTION_PATH: _DIRECTION,
+    NESHAN_DIRECTION_NO_TRAFFIC_PATH: _DIRECTION,
+    NESHAN_DISTANCE_MATRIX_PATH: _MATRIX,
+    NESHAN_DISTANCE_MATRIX_NO_TRAFFIC_PATH: _MATRIX,
+    NESHAN_REVERSE_PATH: {"status": "OK", "formatted_address": "تهران، خیابان آزادی"},
+    NESHAN_GEOCODING_PATH: {"items": [{"location": {"x": 51.39, "y": 35.69}}]},
+    NESHAN_SEARCH_PATH: {"count": 1, "items": [{"title": "میدان آزادی", "location": {"x": 51.33, "y": 35.70}}]},
+    NESHAN_TSP_PATH: {"points": [{"index": 0}, {"index": 1}]},
+    NESHAN_ISOCHRONE_PATH: {"type": "FeatureCollection", "features": []},
+    NESHAN_MAP_MATCHING_PATH: {"snappedPoints": []},
+}
+
+
+class StubNeshanServer:
+    """
+    with StubNeshanServer(delay=0.02) as stub:
+        set_transport(NeshanTransport(base_url=stub.url))
+    stub.fail_next(3, status=503) سه پاسخ بعدی را خطا می‌کند؛ stub.requests تعداد درخواست‌ها و
+    stub.connections تعداد اتصال‌های TCP باز شده است (برای سنجش استفادهٔ دوباره از اتصال).
+    """
+
+    def __init__(self, delay=0.0, responses=None):
+        self.delay = delay
+        self.responses = {**DEFAULT_RESPONSES, **(responses or {})}
+        self.requests = 0
+        self.connections = 0
+        self._failures = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    def fail_next(self, count, status=503):
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def _next_status(self):
+        with self._lock:
+            self.requests += 1
+            return self._failures.pop(0) if self._failures else 200
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # سرآیندها و بدنه جدا نوشته می‌شوند؛ بدون این، Nagle روی اتصال keep-alive تأخیر ~۴۰ms می‌سازد
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status = stub._next_status()
+                body = stub.responses.get(urlsplit(self.path).path) if status == 200 else {"status": "ERROR"}
+                if body is None:
+                    status, body = 404, {"status": "NOT_FOUND"}
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,331 @@
+# لایهٔ انتقال HTTP مشترک برای همهٔ ماژول‌های نشان.
+# به‌جای requests.get بدون Session در هر ماژول، همهٔ درخواست‌ها از یک Session با استخر اتصال
+# (keep-alive، بدون دست‌دادن TLS تازه در هر درخواست) عبور می‌کنند و:
+#   - هر endpoint timeout مخصوص خود را دارد (همان مقادیر قبلی ماژول‌ها)؛
+#   - خطای اتصال/timeout و پاسخ‌های 429/5xx با تعداد محدود و تأخیر تصادفی (jitter) دوباره تلاش می‌شوند؛
+#   - پس از چند شکست پیاپی، مدارشکن (circuit breaker) آن endpoint باز می‌شود و درخواست‌ها
+#     بدون تماس با نشان None برمی‌گردانند تا viewها فوراً به مسیر جایگزین (haversine) بروند؛
+#   - زمان پاسخ هر endpoint در هیستوگرام ثبت می‌شود (transport_stats و /team13/neshan-metrics/).
+# آدرس پایه با NESHAN_API_BASE در settings قابل تغییر است (برای سرور آزمایشی محلی).
+
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .config import NESHAN_API_BASE
+
+logger = logging.getLogger(__name__)
+
+# timeout خواندن (ثانیه) برای هر endpoint؛ timeout اتصال جداگانه و کوتاه است.
+ENDPOINT_TIMEOUTS = {
+    "direction": 15,
+    "reverse": 10,
+    "geocoding": 10,
+    "search": 10,
+    "tsp": 15,
+    "distance_matrix": 20,
+    "isochrone": 20,
+    "map_matching": 30,
+}
+DEFAULT_TIMEOUT = 15
+CONNECT_TIMEOUT = 3.05
+
+# کدهایی که نشانهٔ مشکل موقت سمت نشان هستند (تلاش دوباره + شمارش برای مدارشکن)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# مرزهای هیستوگرام زمان پاسخ (میلی‌ثانیه)
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class CircuitBreaker:
+    """
+    مدارشکن ساده برای یک endpoint.
+    closed: همهٔ درخواست‌ها مجازند. پس از failure_threshold شکست پیاپی → open.
+    open: تا reset_timeout ثانیه همه رد می‌شوند؛ سپس half_open و فقط یک درخواست آزمایشی.
+    موفقیت آزمایشی مدار را می‌بندد و شکست آن دوباره بازش می‌کند.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class LatencyHistogram:
+    """شمارش تجمعی زمان پاسخ یک endpoint؛ صدک‌ها از روی مرز سطل‌ها تخمین زده می‌شوند."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self.retries = 0
+        self.short_circuited = 0
+
+    def observe(self, elapsed_ms, error=False):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, elapsed_ms)] += 1
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            if error:
+                self.errors += 1
+
+    def incr(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _percentile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "retries": self.retries,
+                "short_circuited": self.short_circuited,
+                "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+                "max_ms": round(self.max_ms, 2),
+                "p50_ms": self._percentile(0.5),
+                "p95_ms": self._percentile(0.95),
+                "p99_ms": self._percentile(0.99),
+                "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self._counts)),
+            }
+
+
+class NeshanTransport:
+    """
+    Session مشترک + تلاش دوباره + مدارشکن + اندازه‌گیری زمان برای همهٔ endpointهای نشان.
+    request() پاسخ requests را برمی‌گرداند (هر status که پس از تلاش‌ها رسید) یا None اگر
+    مدار باز باشد یا اتصال برقرار نشود؛ ماژول‌ها در هر دو حالت به مسیر جایگزین خود می‌روند.
+    """
+
+    def __init__(
+        self,
+        base_url=None,
+        timeouts=None,
+        retries=2,
+        backoff=0.2,
+        max_backoff=2.0,
+        failure_threshold=5,
+        reset_timeout=30,
+        pool_size=20,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        self.base_url = base_url
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.pool_size = pool_size
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._session = None
+        self._breakers = {}
+        self._histograms = {}
+
+    # -- اجزای داخلی ---------------------------------------------------------
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    # تلاش دوباره را خودمان انجام می‌دهیم تا jitter و مدارشکن روی آن اعمال شود
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def breaker(self, endpoint):
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout, self._clock)
+            return self._breakers[endpoint]
+
+    def histogram(self, endpoint):
+        with self._lock:
+            if endpoint not in self._histograms:
+                self._histograms[endpoint] = LatencyHistogram()
+            return self._histograms[endpoint]
+
+    def url(self, path):
+        base = self.base_url or getattr(settings, "NESHAN_API_BASE", "") or NESHAN_API_BASE
+        return f"{base.rstrip('/')}{path}"
+
+    def _backoff_delay(self, attempt):
+        # full jitter: عدد تصادفی بین صفر و سقف نمایی، تا کارگرها هم‌زمان دوباره نزنند
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    # -- API ---------------------------------------------------------------
+
+    def request(self, method, endpoint, path, api_key, params=None, json=None, headers=None, timeout=None):
+        import requests
+
+        breaker = self.breaker(endpoint)
+        histogram = self.histogram(endpoint)
+        if not breaker.allow():
+            histogram.incr("short_circuited")
+            logger.debug("Neshan %s: circuit open, skipping request", endpoint)
+            return None
+
+        url = self.url(path)
+        all_headers = {"Api-Key": api_key, **(headers or {})}
+        read_timeout = timeout or self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        # POST (map-matching) فقط وقتی دوباره فرستاده می‌شود که اتصال اصلاً برقرار نشده باشد
+        idempotent = method.upper() == "GET"
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            resp = None
+            error = None
+            try:
+                resp = self.session.request(
+                    method, url, params=params, json=json, headers=all_headers,
+                    timeout=(CONNECT_TIMEOUT, read_timeout),
+                )
+            except requests.RequestException as e:
+                error = e
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            failed = error is not None or resp.status_code in RETRY_STATUSES
+            histogram.observe(elapsed_ms, error=failed)
+
+            if not failed:
+                breaker.record_success()
+                return resp
+
+            retryable = idempotent or isinstance(error, requests.ConnectionError)
+            if attempt >= self.retries or not retryable:
+                breaker.record_failure()
+                if error is not None:
+                    logger.debug("Neshan %s failed: %s", endpoint, error)
+                    return None
+                return resp
+            attempt += 1
+            histogram.incr("retries")
+            self._sleep(self._backoff_delay(attempt - 1))
+
+    def get(self, endpoint, path, api_key, params=None, headers=None, timeout=None):
+        return self.request("GET", endpoint, path, api_key, params=params, headers=headers, timeout=timeout)
+
+    def post(self, endpoint, path, api_key, json=None, headers=None, timeout=None):
+        return self.request("POST", endpoint, path, api_key, json=json, headers=headers, timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            endpoints = sorted(set(self._histograms) | set(self._breakers))
+        return {
+            endpoint: {**self.histogram(endpoint).snapshot(), "circuit": self.breaker(endpoint).state}
+            for endpoint in endpoints
+        }
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """transport مشترک پروسه؛ تنظیمات از NESHAN_HTTP در settings (در صورت وجود) خوانده می‌شود."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = NeshanTransport(**getattr(settings, "NESHAN_HTTP", {}))
+    return _transport
+
+
+def set_transport(transport):
+    """جایگزینی transport مشترک (تست و بنچمارک)؛ None یعنی ساخت دوباره از روی settings."""
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    if previous is not None and previous is not transport:
+        previous.close()
+
+
+def neshan_get(endpoint, path, api_key, params=None, headers=None, timeout=None):
+    return get_transport().get(endpoint, path, api_key, params=params, headers=headers, timeout=timeout)
+
+
+def neshan_post(endpoint, path, api_key, json=None, headers=None, timeout=None):
+    return get_transport().post(endpoint, path, api_key, json=json, headers=headers, timeout=timeout)
+
+
+def transport_stats():
+    return get_transport().stats()
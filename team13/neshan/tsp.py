@@ -3,7 +3,8 @@
 # Endpoint: GET https://api.neshan.org/v3/trip
 
 import logging
-from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_TSP_PATH
+from .config import get_api_key, is_configured, NESHAN_TSP_PATH
+from .transport import neshan_get
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +45,6 @@ def fetch_tsp(waypoints, round_trip=True, source_is_any_point=True, last_is_any_
             return None
         waypoints_str = "|".join(parts)
     try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_TSP_PATH}"
         params = {"waypoints": waypoints_str}
         if round_trip is not None:
             params["roundTrip"] = "true" if round_trip else "false"
@@ -53,8 +52,9 @@ def fetch_tsp(waypoints, round_trip=True, source_is_any_point=True, last_is_any_
             params["sourceIsAnyPoint"] = "true" if source_is_any_point else "false"
         if last_is_any_point is not None:
             params["lastIsAnyPoint"] = "true" if last_is_any_point else "false"
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=15)
+        resp = neshan_get("tsp", NESHAN_TSP_PATH, api_key, params=params)
+        if resp is None:
+            return None
         if resp.status_code != 200:
             logger.debug("Neshan TSP HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
@@ -0,0 +1,143 @@
+# مدل خواندنی PlaceListing برای لیست مکان‌ها و نقشه (place_list)
+# به‌جای join با ترجمه‌ها، زیرپرس‌وجوی میانگین امتیاز و جزئیات هتل/رستوران در هر درخواست،
+# هر مکان یک ردیف تخت در team13_place_listings دارد. با تغییر Place / PlaceTranslation /
+# HotelDetails / RestaurantDetails / Comment همان یک ردیف پس از commit بازسازی می‌شود.
+# نوشتن‌های انبوه (اسکریپت‌های بارگذاری) سیگنال‌ها را با suspend_listing_updates متوقف می‌کنند و
+# در پایان rebuild_place_listings را صدا می‌زنند.
+
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Avg, Count
+
+TEAM13_DB = "team13"
+
+_state = threading.local()
+
+
+def price_level_for(place_type, stars=None, avg_price=None):
+    """سطح قیمت همان قواعد فیلتر قبلی: هتل بر اساس ستاره، رستوران بر اساس قیمت میانگین؛ بقیه None."""
+    from .models import Place
+
+    if place_type == Place.PlaceType.HOTEL and stars is not None:
+        return 1 if stars <= 2 else 2 if stars == 3 else 3
+    if place_type == Place.PlaceType.FOOD and avg_price is not None:
+        return 1 if avg_price <= 200000 else 2 if avg_price <= 500000 else 3
+    return None
+
+
+def _listing_for(place, names, rating):
+    from .models import PlaceListing
+
+    hotel = getattr(place, "hotel_details", None)
+    restaurant = getattr(place, "restaurant_details", None)
+    avg_rating, rating_count = rating
+    return PlaceListing(
+        place_id=place.place_id,
+        type=place.type,
+        city=place.city,
+        address=place.address,
+        latitude=place.latitude,
+        longitude=place.longitude,
+        name_fa=names.get("fa", ""),
+        name_en=names.get("en", ""),
+        price_level=price_level_for(
+            place.type,
+            stars=hotel.stars if hotel else None,
+            avg_price=restaurant.avg_price if restaurant else None,
+        ),
+        avg_rating=avg_rating,
+        rating_count=rating_count,
+    )
+
+
+def _places(using):
+    from .models import Place
+    return Place.objects.using(using).select_related("hotel_details", "restaurant_details")
+
+
+def _ratings(using, place_ids=None):
+    from .models import Comment
+
+    qs = Comment.objects.using(using).filter(target_type=Comment.TargetType.PLACE)
+    if place_ids is not None:
+        qs = qs.filter(target_id__in=place_ids)
+    rows = qs.values("target_id").annotate(avg=Avg("rating"), n=Count("rating"))
+    return {r["target_id"]: (r["avg"], r["n"]) for r in rows}
+
+
+def refresh_place_listing(place_id, using=TEAM13_DB):
+    """بازسازی ردیف یک مکان (یا حذف آن اگر مکان دیگر وجود ندارد)."""
+    from .models import PlaceListing, PlaceTranslation
+
+    place = _places(using).filter(place_id=place_id).first()
+    if place is None:
+        PlaceListing.objects.using(using).filter(place_id=place_id).delete()
+        return None
+    names = dict(PlaceTranslation.objects.using(using).filter(place_id=place_id).values_list("lang", "name"))
+    listing = _listing_for(place, names, _ratings(using, [place_id]).get(place.place_id, (None, 0)))
+    listing.save(using=using)
+    return listing
+
+
+def rebuild_place_listings(using=TEAM13_DB, batch_size=1000):
+    """بازسازی کامل جدول از روی Place/ترجمه/نظرها در یک تراکنش؛ تعداد ردیف‌ها را برمی‌گرداند."""
+    from .models import PlaceListing, PlaceTranslation
+
+    names = {}
+    for place_id, lang, name in PlaceTranslation.objects.using(using).values_list("place_id", "lang", "name"):
+        names.setdefault(place_id, {})[lang] = name
+    ratings = _ratings(using)
+
+    listings = [
+        _listing_for(place, names.get(place.place_id, {}), ratings.get(place.place_id, (None, 0)))
+        for place in _places(using).iterator(chunk_size=batch_size)
+    ]
+    with transaction.atomic(using=using):
+        PlaceListing.objects.using(using).all().delete()
+        PlaceListing.objects.using(using).bulk_create(listings, batch_size=batch_size)
+    return len(listings)
+
+
+@contextmanager
+def suspend_listing_updates():
+    """برای بارگذاری انبوه: به‌روزرسانی ردیف‌به‌ردیف خاموش؛ پس از آن rebuild_place_listings را صدا بزنید."""
+    previous = getattr(_state, "suspended", False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def schedule_refresh(place_id, using=TEAM13_DB):
+    """بازسازی ردیف مکان پس از commit تراکنش جاری (یا فوراً در حالت autocommit)."""
+    if getattr(_state, "suspended", False) or place_id is None:
+        return
+    transaction.on_commit(lambda: refresh_place_listing(place_id, using), using=using)
+
+
+# ---------------------------------------------------------------------------
+# سیگنال‌ها (در Team13Config.ready وصل می‌شوند)
+# ---------------------------------------------------------------------------
+
+def _on_place_change(sender, instance, using, **kwargs):
+    schedule_refresh(instance.place_id, using)
+
+
+def _on_comment_change(sender, instance, using, **kwargs):
+    if instance.target_type == instance.TargetType.PLACE:
+        schedule_refresh(instance.target_id, using)
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    from .models import Comment, HotelDetails, Place, PlaceTranslation, RestaurantDetails
+
+    for model in (Place, PlaceTranslation, HotelDetails, RestaurantDetails):
+        post_save.connect(_on_place_change, sender=model, dispatch_uid=f"team13_listing_{model.__name__}_save")
+        post_delete.connect(_on_place_change, sender=model, dispatch_uid=f"team13_listing_{model.__name__}_delete")
+    post_save.connect(_on_comment_change, sender=Comment, dispatch_uid="team13_listing_comment_save")
+    post_delete.connect(_on_comment_change, sender=Comment, dispatch_uid="team13_listing_comment_delete")
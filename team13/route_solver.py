@@ -0,0 +1,291 @@
+# حل‌کنندهٔ محلی ماتریس فاصله و ترتیب بازدید (TSP) برای tsp_request و distance_matrix_request.
+# وقتی API نشان در دسترس نیست، محدودیت نرخ خورده یا تعداد نقاط زیاد است، ماتریس فاصله با
+# Haversine برداری (NumPy) ضرب‌در ضریب جاده ساخته می‌شود و ترتیب بازدید با نزدیک‌ترین همسایه
+# و سپس بهبود 2-opt و Or-opt در یک بودجهٔ زمانی محدود به دست می‌آید.
+# انتخاب مسیر: TEAM13_ROUTE_SOLVER_MODE = "fallback" (نشان، در صورت شکست محلی) | "local" | "neshan"
+# و برای بیش از TEAM13_ROUTE_SOLVER_LOCAL_ABOVE نقطه در حالت fallback مستقیماً حل محلی.
+
+import itertools
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .spatial_index import EARTH_RADIUS_KM
+
+# نسبت تقریبی طول مسیر جاده‌ای به فاصلهٔ مستقیم در شهرهای ایران
+DEFAULT_ROAD_FACTOR = 1.3
+# سرعت میانگین شهری (کیلومتر بر ساعت) برای تخمین زمان
+SPEED_KMH = {"car": 30.0, "motorcycle": 35.0}
+DEFAULT_TIME_BUDGET = 0.5
+DEFAULT_LOCAL_ABOVE = 25
+# حل دقیق (Held-Karp) فقط برای مقایسه و تعداد کم نقاط
+EXACT_MAX_POINTS = 12
+
+_EPS = 1e-9
+
+
+def parse_points(raw):
+    """«lat,lng|lat,lng|...» → [(lat, lng), ...]؛ نقطهٔ نامعتبر ValueError می‌دهد."""
+    points = []
+    for part in str(raw or "").split("|"):
+        part = part.strip()
+        if not part:
+            continue
+        lat, lng = part.split(",", 1)
+        points.append((float(lat), float(lng)))
+    return points
+
+
+def distance_matrix_km(origins, destinations=None, road_factor=1.0):
+    """ماتریس فاصلهٔ Haversine (کیلومتر) بین همهٔ مبدأها و مقصدها به‌صورت برداری؛ destinations=None یعنی خود origins."""
+    a = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    b = a if destinations is None else np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+    lat1, lng1 = a[:, 0][:, None], a[:, 1][:, None]
+    lat2, lng2 = b[:, 0][None, :], b[:, 1][None, :]
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0))) * road_factor
+
+
+def tour_length(dist, order, round_trip=True):
+    order = np.asarray(order)
+    total = dist[order[:-1], order[1:]].sum()
+    if round_trip and len(order) > 1:
+        total += dist[order[-1], order[0]]
+    return float(total)
+
+
+# ---------------------------------------------------------------------------
+# بهبود تور (چرخه روی همهٔ گره‌ها)
+# ---------------------------------------------------------------------------
+
+def _nearest_neighbour(dist, start=0):
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    tour = np.empty(n, dtype=int)
+    tour[0] = start
+    visited[start] = True
+    for k in range(1, n):
+        row = np.where(visited, np.inf, dist[tour[k - 1]])
+        tour[k] = int(np.argmin(row))
+        visited[tour[k]] = True
+    return tour
+
+
+def _two_opt_pass(dist, tour, deadline):
+    n = len(tour)
+    improved = False
+    for i in range(n - 2):
+        if time.perf_counter() > deadline:
+            break
+        a, b = tour[i], tour[i + 1]
+        js = np.arange(i + 2, n if i > 0 else n - 1)
+        if not len(js):
+            continue
+        c, d = tour[js], tour[(js + 1) % n]
+        delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+        k = int(np.argmin(delta))
+        if delta[k] < -_EPS:
+            j = js[k]
+            tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def _or_opt_pass(dist, tour, deadline):
+    """جابه‌جایی قطعه‌های ۱ تا ۳ گره‌ای (مستقیم یا معکوس) به بهترین جای دیگر تور."""
+    n = len(tour)
+    improved = False
+    for length in (1, 2, 3):
+        if n < length + 3:
+            break
+        i = 1
+        while i + length <= n:
+            if time.perf_counter() > deadline:
+                return improved
+            seg = tour[i:i + length]
+            p, q = tour[i - 1], tour[(i + length) % n]
+            gain = dist[p, seg[0]] + dist[seg[-1], q] - dist[p, q]
+            rest = np.concatenate((tour[:i], tour[i + length:]))
+            r0, r1 = rest, np.roll(rest, -1)
+            base = dist[r0, r1]
+            forward = dist[r0, seg[0]] + dist[seg[-1], r1] - base
+            backward = dist[r0, seg[-1]] + dist[seg[0], r1] - base
+            kf, kb = int(np.argmin(forward)), int(np.argmin(backward))
+            reverse = backward[kb] < forward[kf]
+            k, cost = (kb, backward[kb]) if reverse else (kf, forward[kf])
+            if cost < gain - _EPS:
+                piece = seg[::-1] if reverse else seg
+                tour[:] = np.concatenate((rest[:k + 1], piece, rest[k + 1:]))
+                improved = True
+            else:
+                i += 1
+    return improved
+
+
+def _improve(dist, tour, deadline):
+    while time.perf_counter() < deadline:
+        improved = _two_opt_pass(dist, tour, deadline)
+        improved = _or_opt_pass(dist, tour, deadline) or improved
+        if not improved:
+            break
+    return tour
+
+
+def _solve_cycle(dist, first, deadline, max_starts=16):
+    """نزدیک‌ترین همسایه از چند نقطهٔ شروع + بهبود؛ بهترین تور تا پایان بودجه (حداقل یک تور کامل)."""
+    n = len(dist)
+    starts = [first] + [v for v in range(n) if v != first][: max_starts - 1]
+    best, best_len = None, float("inf")
+    for s in starts:
+        if best is not None and time.perf_counter() > deadline:
+            break
+        tour = _improve(dist, _nearest_neighbour(dist, s), deadline)
+        length = tour_length(dist, tour)
+        if length < best_len - _EPS:
+            best, best_len = tour, length
+    return best
+
+
+def _with_endpoints(dist, start, end):
+    """
+    مسیر باز با مبدأ/مقصد ثابت یا آزاد به تور بسته تبدیل می‌شود: یک گره مجازی با فاصلهٔ ۰ تا
+    نقطه‌های مجاز ابتدا/انتها و فاصلهٔ بزرگ M تا بقیه. چون همهٔ تورهای معتبر دقیقاً یک یا دو
+    یال M دارند، هزینهٔ ثابتی اضافه می‌شود و بهینه عوض نمی‌شود.
+    """
+    n = len(dist)
+    big = float(dist.max()) * n + 1.0
+    edge = np.full(n, big)
+    if start is None and end is None:
+        edge[:] = 0.0
+    else:
+        for node in (start, end):
+            if node is not None:
+                edge[node] = 0.0
+    extended = np.zeros((n + 1, n + 1))
+    extended[:n, :n] = dist
+    extended[n, :n] = edge
+    extended[:n, n] = edge
+    return extended
+
+
+def _open_path(tour, dummy, start, end):
+    k = int(np.where(tour == dummy)[0][0])
+    path = np.concatenate((tour[k + 1:], tour[:k]))
+    if (start is not None and path[0] != start) or (start is None and end is not None and path[-1] != end):
+        path = path[::-1]
+    return path
+
+
+def solve_tsp(dist, round_trip=True, start=None, end=None, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    ترتیب بازدید برای ماتریس فاصلهٔ متقارن dist.
+    round_trip: تور بسته (start در صورت تعیین اولین نقطه است)؛ وگرنه مسیر باز با start/end ثابت یا آزاد.
+    خروجی: لیست اندیس نقاط.
+    """
+    dist = np.asarray(dist, dtype=float)
+    n = len(dist)
+    if n <= 2:
+        order = list(range(n))
+        if n == 2 and (start == 1 or end == 0):
+            order.reverse()
+        return order
+    deadline = time.perf_counter() + time_budget
+
+    if round_trip:
+        tour = _solve_cycle(dist, start or 0, deadline)
+        k = int(np.where(tour == (start or 0))[0][0])
+        return [int(x) for x in np.roll(tour, -k)]
+
+    extended = _with_endpoints(dist, start, end)
+    tour = _solve_cycle(extended, n, deadline)
+    return [int(x) for x in _open_path(tour, n, start, end)]
+
+
+def solve_exact(dist, round_trip=True, start=None, end=None):
+    """حل دقیق با برنامه‌ریزی پویا (Held-Karp)؛ فقط برای n ≤ EXACT_MAX_POINTS (مقایسهٔ کیفیت در تست/بنچمارک)."""
+    dist = np.asarray(dist, dtype=float)
+    n = len(dist)
+    if n > EXACT_MAX_POINTS:
+        raise ValueError(f"exact TSP is limited to {EXACT_MAX_POINTS} points")
+    if n <= 2:
+        return solve_tsp(dist, round_trip, start, end)
+    if not round_trip:
+        extended = _with_endpoints(dist, start, end)
+        tour = solve_exact(extended, round_trip=True, start=n)
+        return [int(x) for x in _open_path(np.asarray(tour), n, start, end)]
+
+    origin = start or 0
+    others = [v for v in range(n) if v != origin]
+    best = {(1 << i, i): (dist[origin, v], None) for i, v in enumerate(others)}
+    for size in range(2, len(others) + 1):
+        for subset in itertools.combinations(range(len(others)), size):
+            mask = sum(1 << i for i in subset)
+            for last in subset:
+                prev_mask = mask & ~(1 << last)
+                best[(mask, last)] = min(
+                    (best[(prev_mask, p)][0] + dist[others[p], others[last]], p)
+                    for p in subset if p != last
+                )
+    full = (1 << len(others)) - 1
+    _, last = min((best[(full, i)][0] + dist[others[i], origin], i) for i in range(len(others)))
+    order, mask = [], full
+    while last is not None:
+        order.append(others[last])
+        _, prev = best[(mask, last)]
+        mask &= ~(1 << last)
+        last = prev
+    return [origin] + order[::-1]
+
+
+# ---------------------------------------------------------------------------
+# خروجی هم‌شکل با پاسخ نشان
+# ---------------------------------------------------------------------------
+
+def solver_mode():
+    return getattr(settings, "TEAM13_ROUTE_SOLVER_MODE", "fallback")
+
+
+def use_local_first(point_count, mode=None):
+    """آیا بدون تماس با نشان مستقیماً حل محلی انجام شود؟"""
+    mode = mode or solver_mode()
+    if mode == "local":
+        return True
+    if mode == "neshan":
+        return False
+    return point_count > getattr(settings, "TEAM13_ROUTE_SOLVER_LOCAL_ABOVE", DEFAULT_LOCAL_ABOVE)
+
+
+def local_tsp(points, round_trip=True, source_is_any_point=True, last_is_any_point=True, time_budget=None):
+    """
+    معادل محلی fetch_tsp: لیست {"name", "location": [lng, lat], "index"} به ترتیب بازدید.
+    source_is_any_point=False یعنی نقطهٔ اول مبدأ است؛ last_is_any_point=False یعنی نقطهٔ آخر مقصد (فقط مسیر باز).
+    """
+    road_factor = getattr(settings, "TEAM13_ROAD_FACTOR", DEFAULT_ROAD_FACTOR)
+    budget = time_budget if time_budget is not None else getattr(settings, "TEAM13_ROUTE_SOLVER_TIME_BUDGET", DEFAULT_TIME_BUDGET)
+    dist = distance_matrix_km(points, road_factor=road_factor)
+    start = None if source_is_any_point else 0
+    end = None if (last_is_any_point or round_trip) else len(points) - 1
+    order = solve_tsp(dist, round_trip=round_trip, start=start, end=end, time_budget=budget)
+    return [{"name": "", "location": [points[i][1], points[i][0]], "index": i} for i in order]
+
+
+def _element(km, speed_kmh):
+    seconds = int(round(km / speed_kmh * 3600))
+    return {
+        "status": "Ok",
+        "distance": {"value": int(round(km * 1000)), "text": f"{km:.1f} کیلومتر"},
+        "duration": {"value": seconds, "text": f"{max(1, round(seconds / 60))} دقیقه"},
+    }
+
+
+def local_distance_matrix(origins, destinations, vehicle_type="car"):
+    """معادل محلی fetch_distance_matrix با همان ساختار rows[i].elements[j] (فاصلهٔ تخمینی)."""
+    km = distance_matrix_km(origins, destinations, getattr(settings, "TEAM13_ROAD_FACTOR", DEFAULT_ROAD_FACTOR))
+    speed = SPEED_KMH.get(vehicle_type, SPEED_KMH["car"])
+    return {
+        "status": "Ok",
+        "rows": [{"elements": [_element(float(v), speed) for v in row]} for row in km],
+        "origin_addresses": [f"{lat},{lng}" for lat, lng in origins],
+        "destination_addresses": [f"{lat},{lng}" for lat, lng in destinations],
+    }
@@ -0,0 +1,212 @@
+# ایندکس مکانی درون‌پردازه‌ای برای مکان‌های team13 (جدول team13_places)
+# به‌جای اسکن کامل جدول و محاسبهٔ Haversine روی همهٔ ردیف‌ها، مکان‌ها در یک شبکهٔ سلولی
+# (grid) بر اساس عرض/طول نگه داشته می‌شوند و جستجوی شعاعی/نزدیک‌ترین فقط سلول‌های نامزد را می‌بیند.
+# هر worker یک نمونهٔ گرم از ایندکس دارد؛ پس از تأیید پیشنهاد مکان، مکان جدید به‌صورت افزایشی اضافه می‌شود.
+
+import math
+import threading
+import time
+
+from django.conf import settings
+
+TEAM13_DB = "team13"
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LAT = 111.32
+
+# اندازهٔ پیش‌فرض هر سلول (درجه)؛ ۰٫۱ درجه ≈ ۱۱ کیلومتر در عرض جغرافیایی
+DEFAULT_CELL_DEG = 0.1
+# پس از این مدت (ثانیه) ایندکس از دیتابیس بازسازی می‌شود تا نوشتن‌های خارج از moderation هم دیده شوند
+DEFAULT_REFRESH_SECONDS = 300
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """فاصله تقریبی به کیلومتر (Haversine)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlam = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+class PlaceGridIndex:
+    """
+    شبکهٔ سلولی ساده روی (lat, lng).
+    هر ورودی: (place_id, type, latitude, longitude). کلید سلول: (iy, ix).
+    """
+
+    def __init__(self, cell_deg=DEFAULT_CELL_DEG):
+        self.cell_deg = float(cell_deg)
+        self._n_x = int(math.ceil(360.0 / self.cell_deg))
+        self._cells = {}
+        self._cell_of = {}
+        self._lock = threading.RLock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def _cell_key(self, lat, lng):
+        iy = int(math.floor((lat + 90.0) / self.cell_deg))
+        ix = int(math.floor((lng + 180.0) / self.cell_deg)) % self._n_x
+        return iy, ix
+
+    def add(self, place_id, place_type, latitude, longitude):
+        """افزودن یا جایگزینی یک مکان در ایندکس."""
+        try:
+            lat = float(latitude)
+            lng = float(longitude)
+        except (TypeError, ValueError):
+            return
+        key = str(place_id)
+        with self._lock:
+            self.remove(key)
+            cell = self._cell_key(lat, lng)
+            self._cells.setdefault(cell, []).append((key, place_type, lat, lng))
+            self._cell_of[key] = cell
+
+    def remove(self, place_id):
+        """حذف یک مکان از ایندکس (اگر وجود داشته باشد)."""
+        key = str(place_id)
+        with self._lock:
+            cell = self._cell_of.pop(key, None)
+            if cell is None:
+                return
+            entries = [e for e in self._cells.get(cell, []) if e[0] != key]
+            if entries:
+                self._cells[cell] = entries
+            else:
+                self._cells.pop(cell, None)
+
+    def load(self, rows):
+        """بارگذاری کامل از ردیف‌های (place_id, type, latitude, longitude)؛ ایندکس قبلی جایگزین می‌شود."""
+        cells = {}
+        cell_of = {}
+        for place_id, place_type, latitude, longitude in rows:
+            try:
+                lat = float(latitude)
+                lng = float(longitude)
+            except (TypeError, ValueError):
+                continue
+            key = str(place_id)
+            cell = self._cell_key(lat, lng)
+            cells.setdefault(cell, []).append((key, place_type, lat, lng))
+            cell_of[key] = cell
+        with self._lock:
+            self._cells = cells
+            self._cell_of = cell_of
+            self.built_at = time.monotonic()
+
+    def _candidate_cells(self, lat, lng, radius_km):
+        """سلول‌هایی که جعبهٔ محصورکنندهٔ دایره (lat, lng, radius_km) را می‌پوشانند."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        iy_min = int(math.floor((max(-90.0, lat - dlat) + 90.0) / self.cell_deg))
+        iy_max = int(math.floor((min(90.0, lat + dlat) + 90.0) / self.cell_deg))
+        cos_lat = min(
+            math.cos(math.radians(max(-90.0, lat - dlat))),
+            math.cos(math.radians(min(90.0, lat + dlat))),
+        )
+        if cos_lat <= 1e-6:
+            x_range = range(self._n_x)
+        else:
+            dlng = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+            if 2 * dlng >= 360.0:
+                x_range = range(self._n_x)
+            else:
+                ix_min = int(math.floor((lng - dlng + 180.0) / self.cell_deg))
+                ix_max = int(math.floor((lng + dlng + 180.0) / self.cell_deg))
+                x_range = [ix % self._n_x for ix in range(ix_min, ix_max + 1)]
+        for iy in range(iy_min, iy_max + 1):
+            for ix in x_range:
+                yield iy, ix
+
+    def query_radius(self, lat, lng, radius_km, types=None):
+        """
+        همهٔ مکان‌های داخل شعاع radius_km از (lat, lng).
+        خروجی: لیست (place_id, type, distance_km) مرتب بر اساس فاصله.
+        """
+        type_set = set(types) if types else None
+        found = []
+        with self._lock:
+            cells = self._cells
+            for cell in self._candidate_cells(lat, lng, radius_km):
+                entries = cells.get(cell)
+                if not entries:
+                    continue
+                for place_id, place_type, p_lat, p_lng in entries:
+                    if type_set is not None and place_type not in type_set:
+                        continue
+                    d = haversine_km(lat, lng, p_lat, p_lng)
+                    if d <= radius_km:
+                        found.append((place_id, place_type, d))
+        found.sort(key=lambda item: item[2])
+        return found
+
+    def nearest(self, lat, lng, k=1, max_km=None, types=None):
+        """
+        k نزدیک‌ترین مکان به (lat, lng)، حداکثر در فاصلهٔ max_km.
+        شعاع جستجو از اندازهٔ یک سلول شروع و دو برابر می‌شود تا k نتیجه پیدا شود.
+        """
+        if not self._cell_of:
+            return []
+        radius = self.cell_deg * KM_PER_DEGREE_LAT
+        if max_km is not None:
+            radius = min(radius, max_km)
+        # بزرگ‌ترین فاصلهٔ ممکن روی کرهٔ زمین
+        limit = max_km if max_km is not None else math.pi * EARTH_RADIUS_KM
+        while True:
+            found = self.query_radius(lat, lng, radius, types=types)
+            if len(found) >= k or radius >= limit:
+                return found[:k]
+            radius = min(radius * 2, limit)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _refresh_seconds():
+    return getattr(settings, "TEAM13_PLACE_INDEX_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS)
+
+
+def _load_rows():
+    from .models import Place
+    return Place.objects.using(TEAM13_DB).values_list("place_id", "type", "latitude", "longitude").iterator()
+
+
+def get_place_index():
+    """ایندکس گرم همین worker؛ در اولین فراخوانی یا پس از انقضا از دیتابیس ساخته می‌شود."""
+    global _index
+    index = _index
+    refresh = _refresh_seconds()
+    if index is not None and (not refresh or time.monotonic() - index.built_at < refresh):
+        return index
+    with _index_lock:
+        index = _index
+        if index is None or (refresh and time.monotonic() - index.built_at >= refresh):
+            new_index = PlaceGridIndex(getattr(settings, "TEAM13_PLACE_INDEX_CELL_DEG", DEFAULT_CELL_DEG))
+            new_index.load(_load_rows())
+            _index = index = new_index
+    return index
+
+
+def index_place(place):
+    """افزودن افزایشی یک Place به ایندکس (در صورت ساخته‌شدن ایندکس)."""
+    index = _index
+    if index is not None:
+        index.add(place.place_id, place.type, place.latitude, place.longitude)
+
+
+def unindex_place(place_id):
+    """حذف یک مکان از ایندکس (در صورت ساخته‌شدن ایندکس)."""
+    index = _index
+    if index is not None:
+        index.remove(place_id)
+
+
+def reset_place_index():
+    """دور انداختن ایندکس فعلی؛ فراخوانی بعدی get_place_index آن را از نو می‌سازد."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -1,6 +1,487 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team13/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+class PlaceGridIndexTests(TestCase):
+    def test_query_radius_matches_full_scan(self):
+        import random
+        from .spatial_index import PlaceGridIndex, haversine_km
+
+        rng = random.Random(1)
+        rows = [(str(i), "hospital" if i % 2 else "food", rng.uniform(35, 36), rng.uniform(51, 52)) for i in range(2000)]
+        index = PlaceGridIndex(cell_deg=0.05)
+        index.load(rows)
+        expected = sorted(
+            (r[0] for r in rows if haversine_km(35.5, 51.5, r[2], r[3]) <= 7),
+            key=lambda pid: haversine_km(35.5, 51.5, rows[int(pid)][2], rows[int(pid)][3]),
+        )
+        self.assertEqual([h[0] for h in index.query_radius(35.5, 51.5, 7)], expected)
+        self.assertTrue(all(h[1] == "hospital" for h in index.query_radius(35.5, 51.5, 7, types=["hospital"])))
+
+    def test_nearest_and_incremental_updates(self):
+        from .spatial_index import PlaceGridIndex
+
+        index = PlaceGridIndex()
+        index.load([("a", "food", 35.70, 51.40), ("b", "food", 35.80, 51.40)])
+        self.assertEqual(index.nearest(35.71, 51.40)[0][0], "a")
+        index.add("c", "food", 35.705, 51.40)
+        self.assertEqual(index.nearest(35.71, 51.40)[0][0], "c")
+        index.remove("c")
+        index.remove("a")
+        self.assertEqual(index.nearest(35.71, 51.40)[0][0], "b")
+        self.assertEqual(index.nearest(35.71, 51.40, max_km=1), [])
+
+
+class PlacesInRadiusViewTests(TestCase):
+    databases = {"default", "team13"}
+
+    def setUp(self):
+        from .spatial_index import reset_place_index
+        reset_place_index()
+        self.addCleanup(reset_place_index)
+
+    def test_places_in_radius_uses_index_and_sees_approved_contribution(self):
+        from .models import Place, PlaceContribution, PlaceTranslation
+        from .moderation import approve_contribution
+
+        near = Place.objects.using("team13").create(type="hospital", city="تهران", latitude=35.70, longitude=51.40)
+        PlaceTranslation.objects.using("team13").create(place=near, lang="fa", name="بیمارستان")
+        Place.objects.using("team13").create(type="food", city="مشهد", latitude=36.30, longitude=59.60)
+
+        res = self.client.get("/team13/places-in-radius/", {"lat": 35.70, "lng": 51.40, "radius_km": 5})
+        self.assertEqual([p["place_id"] for p in res.json()["places"]], [str(near.place_id)])
+        self.assertEqual(res.json()["places"][0]["name_fa"], "بیمارستان")
+
+        contribution = PlaceContribution.objects.using("team13").create(
+            name_fa="داروخانه", type="pharmacy", address="تهران", latitude=35.701, longitude=51.401
+        )
+        with self.captureOnCommitCallbacks(using="team13", execute=True):
+            approve_contribution(contribution.contribution_id)
+        res = self.client.get("/team13/places-in-radius/", {"lat": 35.70, "lng": 51.40, "radius_km": 5})
+        self.assertEqual(len(res.json()["places"]), 2)
+
+        res = self.client.get("/team13/nearest-place/", {"lat": 35.7009, "lng": 51.4009, "radius_km": 1})
+        self.assertEqual(res.json()["place"]["name_fa"], "داروخانه")
+
+
+class PlaceListingTests(TestCase):
+    databases = {"default", "team13"}
+
+    def _create_places(self, count, place_type="hotel", city="اصفهان"):
+        from .models import Comment, HotelDetails, Place, PlaceTranslation
+
+        with self.captureOnCommitCallbacks(using="team13", execute=True):
+            for i in range(count):
+                place = Place.objects.using("team13").create(
+                    type=place_type, city=city, latitude=32.6 + i * 0.001, longitude=51.6
+                )
+                PlaceTranslation.objects.using("team13").create(place=place, lang="fa", name=f"مکان {i}")
+                PlaceTranslation.objects.using("team13").create(place=place, lang="en", name=f"Place {i}")
+                if place_type == "hotel":
+                    HotelDetails.objects.using("team13").create(place=place, stars=1 + i % 5)
+                Comment.objects.using("team13").create(target_type="place", target_id=place.place_id, rating=1 + i % 5)
+
+    def _count_queries(self, params):
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connections["team13"]) as ctx:
+            res = self.client.get("/team13/places/", {"format": "json", **params})
+        self.assertEqual(res.status_code, 200)
+        return len(ctx.captured_queries), res.json()
+
+    def test_listing_follows_place_translation_and_comment_changes(self):
+        from .models import Comment, Place, PlaceListing, PlaceTranslation
+
+        with self.captureOnCommitCallbacks(using="team13", execute=True):
+            place = Place.objects.using("team13").create(type="museum", city="شیراز", latitude=29.6, longitude=52.5)
+            translation = PlaceTranslation.objects.using("team13").create(place=place, lang="fa", name="موزه")
+        listing = PlaceListing.objects.using("team13").get(place_id=place.place_id)
+        self.assertEqual((listing.name_fa, listing.avg_rating, listing.rating_count), ("موزه", None, 0))
+
+        with self.captureOnCommitCallbacks(using="team13", execute=True):
+            Comment.objects.using("team13").create(target_type="place", target_id=place.place_id, rating=4)
+            Comment.objects.using("team13").create(target_type="place", target_id=place.place_id, rating=5)
+            translation.name = "موزهٔ پارس"
+            translation.save(using="team13")
+        listing.refresh_from_db(using="team13")
+        self.assertEqual((listing.name_fa, listing.avg_rating, listing.rating_count), ("موزهٔ پارس", 4.5, 2))
+
+        with self.captureOnCommitCallbacks(using="team13", execute=True):
+            place.delete(using="team13")
+        self.assertFalse(PlaceListing.objects.using("team13").exists())
+
+    def test_map_payload_query_count_is_constant(self):
+        self._create_places(40)
+        self._create_places(40, place_type="hospital", city="تهران")
+
+        small, payload = self._count_queries({"page_size": 100})
+        large, _ = self._count_queries({"page_size": 500})
+        self.assertEqual(small, large)
+        self.assertLessEqual(small, 2)
+        self.assertEqual(payload["total"], 80)
+        self.assertEqual({p["type"] for p in payload["places"]}, {"hotel", "hospital"})
+        self.assertEqual(len(payload["places"]), 24)  # 100 // 8 types = 12 per type
+
+    def test_filtered_list_uses_listing_rows(self):
+        self._create_places(10)
+
+        queries, payload = self._count_queries({"type": "hotel", "price_level": "3", "min_rating": 4})
+        self.assertEqual(queries, 1)
+        # stars 4-5 -> price level 3; rating == stars here
+        self.assertEqual(sorted(p["rating"] for p in payload["places"]), [4.0, 4.0, 5.0, 5.0])
+        self.assertTrue(all(p["name_fa"].startswith("مکان") and p["name_en"] for p in payload["places"]))
+
+
+class NeshanTransportTests(SimpleTestCase):
+    def setUp(self):
+        from .neshan.stub_server import StubNeshanServer
+        from .neshan.transport import set_transport
+
+        from core.geo_cache import GeoResultCache, set_geo_cache
+
+        self.stub = StubNeshanServer().start()
+        self.addCleanup(self.stub.stop)
+        self.addCleanup(set_transport, None)
+        # هر فراخوانی باید به سرور برسد؛ کش مختصات در NeshanGeoCacheTests بررسی می‌شود
+        set_geo_cache(GeoResultCache(ttl=0))
+        self.addCleanup(set_geo_cache, None)
+        settings_override = override_settings(NESHAN_API_KEY_SERVICE="test-key")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _use_transport(self, **kwargs):
+        from .neshan.transport import NeshanTransport, set_transport
+
+        self.now = 0.0
+        transport = NeshanTransport(base_url=self.stub.url, sleep=lambda s: None, clock=lambda: self.now, **kwargs)
+        set_transport(transport)
+        return transport
+
+    def test_requests_share_one_keep_alive_connection(self):
+        from .neshan import fetch_route_eta, reverse_geocode_address, search_autocomplete
+
+        transport = self._use_transport()
+        for _ in range(10):
+            self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8)[:2], (12.5, 900))
+        self.assertEqual(reverse_geocode_address(35.7, 51.4), "تهران، خیابان آزادی")
+        self.assertEqual(search_autocomplete("آزادی")[0]["lat"], 35.70)
+        self.assertEqual(self.stub.requests, 12)
+        self.assertEqual(self.stub.connections, 1)
+        self.assertEqual(transport.stats()["direction"]["count"], 10)
+
+    def test_transient_errors_are_retried(self):
+        from .neshan import fetch_route_eta
+
+        transport = self._use_transport(retries=2)
+        self.stub.fail_next(2, status=503)
+        self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8)[0], 12.5)
+        stats = transport.stats()["direction"]
+        self.assertEqual((self.stub.requests, stats["retries"], stats["errors"]), (3, 2, 2))
+        self.assertEqual(stats["circuit"], "closed")
+
+    def test_open_circuit_fails_fast_until_reset_timeout(self):
+        from .neshan import fetch_route_eta
+
+        transport = self._use_transport(retries=0, failure_threshold=2, reset_timeout=30)
+        self.stub.fail_next(2, status=503)
+        for _ in range(2):
+            self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8), (None, None, None))
+        # مدار باز است: درخواست به سرور نمی‌رسد و view به haversine برمی‌گردد
+        self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8), (None, None, None))
+        self.assertEqual(self.stub.requests, 2)
+        self.assertEqual(transport.stats()["direction"]["short_circuited"], 1)
+        self.assertEqual(transport.stats()["direction"]["circuit"], "open")
+
+        self.now += 31
+        self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8)[0], 12.5)
+        self.assertEqual(transport.stats()["direction"]["circuit"], "closed")
+
+    def test_post_is_not_retried_after_an_http_error(self):
+        from .neshan import fetch_map_matching
+
+        self._use_transport(retries=2)
+        self.stub.fail_next(1, status=502)
+        self.assertIsNone(fetch_map_matching([(35.7, 51.4), (35.71, 51.41)]))
+        self.assertEqual(self.stub.requests, 1)
+
+
+class NeshanGeoCacheTests(SimpleTestCase):
+    def setUp(self):
+        from core.geo_cache import GeoResultCache, set_geo_cache
+        from .neshan.stub_server import StubNeshanServer
+        from .neshan.transport import NeshanTransport, set_transport
+
+        self.stub = StubNeshanServer().start()
+        self.addCleanup(self.stub.stop)
+        set_transport(NeshanTransport(base_url=self.stub.url, sleep=lambda s: None))
+        self.addCleanup(set_transport, None)
+        self.cache = GeoResultCache(precision=4)
+        set_geo_cache(self.cache)
+        self.addCleanup(set_geo_cache, None)
+        settings_override = override_settings(NESHAN_API_KEY_SERVICE="test-key")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_nearby_route_requests_reuse_one_upstream_call(self):
+        from .neshan import fetch_route_eta, fetch_route_eta_pedestrian
+
+        for jitter in (0, 0.00002, -0.00003):
+            self.assertEqual(fetch_route_eta(51.4 + jitter, 35.7, 51.5, 35.8 - jitter)[:2], (12.5, 900))
+        self.assertEqual(self.stub.requests, 1)
+        # نوع وسیلهٔ دیگر کلید جدا دارد
+        fetch_route_eta_pedestrian(51.4, 35.7, 51.5, 35.8)
+        fetch_route_eta(51.4, 35.7, 51.5, 35.8, vehicle_type="motorcycle")
+        self.assertEqual(self.stub.requests, 3)
+        self.assertEqual(self.cache.stats()["memory_hits"], 2)
+
+    def test_reverse_geocode_and_address_from_coords_share_cache(self):
+        from .geo_utils import address_from_coords
+        from .neshan import reverse_geocode
+
+        self.assertEqual(reverse_geocode(35.70001, 51.4)["formatted_address"], "تهران، خیابان آزادی")
+        self.assertEqual(address_from_coords(35.7, 51.40001), "تهران، خیابان آزادی")
+        self.assertEqual(self.stub.requests, 1)
+
+    def test_failed_lookups_fall_back_and_are_retried_later(self):
+        from .neshan import fetch_route_eta
+
+        self.stub.fail_next(3, status=503)
+        self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8), (None, None, None))
+        self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8)[0], 12.5)
+
+
+    def test_partial_route_is_returned_but_not_cached(self):
+        from .neshan import fetch_route_eta
+        from .neshan.config import NESHAN_DIRECTION_PATH
+
+        # نشان زمان را نداده: فاصله مثل قبل برمی‌گردد و درخواست بعدی دوباره به نشان می‌رود
+        self.stub.responses[NESHAN_DIRECTION_PATH] = {"routes": [{"legs": [{"distance": {"value": 12500}}]}]}
+        self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8)[:2], (12.5, None))
+        self.assertEqual(fetch_route_eta(51.4, 35.7, 51.5, 35.8)[:2], (12.5, None))
+        self.assertEqual(self.stub.requests, 2)
+        self.assertEqual(self.cache.stats()["stored"], 0)
+
+class RouteSolverTests(SimpleTestCase):
+    def _points(self, n, seed=3):
+        import random
+
+        rng = random.Random(seed)
+        return [(rng.uniform(35.6, 35.8), rng.uniform(51.2, 51.6)) for _ in range(n)]
+
+    def test_matrix_matches_scalar_haversine(self):
+        from .route_solver import distance_matrix_km
+        from .spatial_index import haversine_km
+
+        a, b = self._points(4), self._points(3, seed=4)
+        matrix = distance_matrix_km(a, b, road_factor=1.3)
+        self.assertEqual(matrix.shape, (4, 3))
+        self.assertAlmostEqual(matrix[2, 1], haversine_km(*a[2], *b[1]) * 1.3, places=6)
+
+    def test_heuristic_matches_exact_solution_for_small_n(self):
+        from .route_solver import distance_matrix_km, solve_exact, solve_tsp, tour_length
+
+        for seed in range(5):
+            dist = distance_matrix_km(self._points(9, seed))
+            for round_trip, start, end in ((True, None, None), (True, 0, None), (False, None, None), (False, 0, 8)):
+                order = solve_tsp(dist, round_trip, start, end)
+                exact = solve_exact(dist, round_trip, start, end)
+                self.assertEqual(sorted(order), list(range(9)))
+                if start is not None:
+                    self.assertEqual(order[0], start)
+                if end is not None:
+                    self.assertEqual(order[-1], end)
+                self.assertAlmostEqual(tour_length(dist, order, round_trip), tour_length(dist, exact, round_trip), places=6)
+
+    def test_views_fall_back_to_local_solver(self):
+        from unittest.mock import patch
+
+        waypoints = "|".join(f"{lat},{lng}" for lat, lng in self._points(6))
+        with patch("team13.neshan.fetch_tsp", return_value=None) as fetch_tsp:
+            res = self.client.get("/team13/tsp/", {"waypoints": waypoints, "source_is_any_point": "false"})
+        fetch_tsp.assert_called_once()
+        body = res.json()
+        self.assertEqual(body["source"], "local")
+        self.assertEqual(body["points"][0]["index"], 0)
+        self.assertEqual(sorted(p["index"] for p in body["points"]), list(range(6)))
+
+        res = self.client.get("/team13/distance-matrix/", {"origins": "35.7,51.4", "destinations": "35.7,51.4|35.8,51.5", "solver": "local"})
+        rows = res.json()["rows"]
+        self.assertEqual(rows[0]["elements"][0]["distance"]["value"], 0)
+        self.assertGreater(rows[0]["elements"][1]["duration"]["value"], 0)
+
+    @override_settings(TEAM13_ROUTE_SOLVER_LOCAL_ABOVE=10)
+    def test_large_inputs_skip_neshan(self):
+        from unittest.mock import patch
+
+        waypoints = "|".join(f"{lat},{lng}" for lat, lng in self._points(40))
+        with patch("team13.neshan.fetch_tsp") as fetch_tsp:
+            res = self.client.get("/team13/tsp/", {"waypoints": waypoints})
+        fetch_tsp.assert_not_called()
+        self.assertEqual(len(res.json()["points"]), 40)
+
+
+class BulkImportTests(TestCase):
+    databases = {"default", "team13"}
+
+    PLACE_IDS = [f"00000000-0000-0000-0000-{i:012d}" for i in range(1, 6)]
+
+    def setUp(self):
+        import tempfile
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write(self, name, header, rows):
+        import csv
+        import os
+
+        with open(os.path.join(self.tmp.name, name), "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def _write_places(self, name_suffix=""):
+        self._write(
+            "places.csv",
+            ["place_id", "type", "city", "address", "latitude", "longitude"],
+            [[pid, "hotel", "یزد", "", 31.9 + i * 0.01, 54.3] for i, pid in enumerate(self.PLACE_IDS)],
+        )
+        self._write(
+            "place_translations.csv",
+            ["place_id", "lang", "name", "description"],
+            [[pid, "fa", f"هتل {i}{name_suffix}", ""] for i, pid in enumerate(self.PLACE_IDS)],
+        )
+        self._write("hotel_details.csv", ["place_id", "stars", "price_range"], [[self.PLACE_IDS[0], 4, "mid"]])
+        self._write(
+            "comments.csv",
+            ["comment_id", "target_type", "target_id", "rating", "created_at"],
+            [["10000000-0000-0000-0000-000000000001", "place", self.PLACE_IDS[0], 5, "2024-03-01T10:00:00"]],
+        )
+
+    def _importer(self, **kwargs):
+        from .bulk_import import BulkImporter
+
+        return BulkImporter(db="team13", **kwargs)
+
+    def test_reimport_upserts_without_duplicates(self):
+        from .models import Comment, HotelDetails, PlaceListing, PlaceTranslation
+
+        self._write_places()
+        report = self._importer(chunk_size=2).import_csv_dir(self.tmp.name)
+        self.assertEqual(report["tables"]["places"], {"created": 5, "updated": 0, "invalid": 0})
+
+        self._write_places(name_suffix=" (نو)")
+        importer = self._importer(chunk_size=2)
+        report = importer.import_csv_dir(self.tmp.name)
+        self.assertEqual(report["tables"]["place_translations"], {"created": 0, "updated": 5, "invalid": 0})
+        self.assertEqual(importer.finish(), 5)
+
+        self.assertEqual(PlaceTranslation.objects.using("team13").count(), 5)
+        self.assertEqual(PlaceTranslation.objects.using("team13").get(place_id=self.PLACE_IDS[2]).name, "هتل 2 (نو)")
+        self.assertEqual(HotelDetails.objects.using("team13").get().stars, 4)
+        self.assertEqual(Comment.objects.using("team13").get().created_at.year, 2024)
+        listing = PlaceListing.objects.using("team13").get(place_id=self.PLACE_IDS[0])
+        self.assertEqual((listing.name_fa, listing.rating_count), ("هتل 0 (نو)", 1))
+
+    def test_reimport_keeps_columns_the_csv_does_not_carry(self):
+        from .models import Comment, Image
+
+        self._write_places()
+        self._write(
+            "images.csv",
+            ["image_id", "target_type", "target_id", "image_url"],
+            [["20000000-0000-0000-0000-000000000001", "place", self.PLACE_IDS[0], "https://example.com/a.jpg"]],
+        )
+        self._importer().import_csv_dir(self.tmp.name)
+        Comment.objects.using("team13").update(body="عالی بود", is_approved=False)
+        Image.objects.using("team13").update(is_approved=True)
+
+        self._importer().import_csv_dir(self.tmp.name)
+
+        comment = Comment.objects.using("team13").get()
+        self.assertEqual((comment.body, comment.is_approved, comment.rating), ("عالی بود", False, 5))
+        self.assertTrue(Image.objects.using("team13").get().is_approved)
+
+    def test_dry_run_validates_without_writing(self):
+        from .models import Place, PlaceTranslation
+
+        self._write_places()
+        self._write(
+            "place_amenities.csv",
+            ["place_id", "amenity_name"],
+            [[self.PLACE_IDS[0], "پارکینگ"], ["99999999-0000-0000-0000-000000000000", "استخر"]],
+        )
+        with open(f"{self.tmp.name}/places.csv", "a", encoding="utf-8") as f:
+            f.write("not-a-uuid,hotel,یزد,,31.9,54.3\n")
+
+        importer = self._importer(dry_run=True)
+        report = importer.import_csv_dir(self.tmp.name)
+        self.assertEqual(report["tables"]["places"]["created"], 5)
+        self.assertEqual(report["tables"]["place_translations"]["created"], 5)
+        self.assertEqual(report["tables"]["place_amenities"], {"created": 1, "updated": 0, "invalid": 1})
+        self.assertEqual(report["errors"], 2)
+        self.assertIn("places.csv:7", report["first_errors"][0])
+        self.assertEqual(importer.finish(), 0)
+        self.assertFalse(Place.objects.using("team13").exists())
+        self.assertFalse(PlaceTranslation.objects.using("team13").exists())
+
+    def test_resume_from_checkpoint_after_failed_chunk(self):
+        import json
+        from unittest.mock import patch
+
+        from .bulk_import import BulkImporter
+        from .models import Place
+
+        self._write_places()
+        checkpoint = f"{self.tmp.name}/progress.json"
+        original = BulkImporter._write_chunk
+        calls = []
+
+        def fail_second_chunk(importer, source, grouped):
+            calls.append(source)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return original(importer, source, grouped)
+
+        with patch.object(BulkImporter, "_write_chunk", fail_second_chunk), self.assertRaises(RuntimeError):
+            self._importer(chunk_size=2, checkpoint_path=checkpoint).import_csv_dir(self.tmp.name)
+        self.assertEqual(Place.objects.using("team13").count(), 2)
+        with open(checkpoint, encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)["sources"].values()), [{"rows": 2, "done": False}])
+
+        report = self._importer(chunk_size=2, checkpoint_path=checkpoint).import_csv_dir(self.tmp.name)
+        self.assertEqual(report["tables"]["places"], {"created": 3, "updated": 0, "invalid": 0})
+        self.assertEqual(Place.objects.using("team13").count(), 5)
+
+        # اجرای سوم: همهٔ منابع done هستند و چیزی خوانده نمی‌شود
+        self.assertEqual(self._importer(checkpoint_path=checkpoint).import_csv_dir(self.tmp.name)["tables"], {})
+
+    def test_streamed_hotels_json_matches_legacy_mapping(self):
+        import json
+        import uuid
+
+        from .bulk_import import NAMESPACE_HOTEL
+        from .models import HotelDetails, PlaceAmenity, PlaceTranslation
+
+        hotels = [
+            {"hotel_id": 7, "name_fa": "هتل سنتی", "stars": "3", "price_tier": "mid", "amenities": [1, 9, 11],
+             "location": {"latitude": 31.9, "longitude": 54.36}},
+            {"hotel_id": 8, "location": {}},
+        ]
+        path = f"{self.tmp.name}/hotels.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(hotels, f, ensure_ascii=False)
+
+        report = self._importer().import_json(path, "hotels")
+        place_id = uuid.uuid5(NAMESPACE_HOTEL, "7")
+        self.assertEqual(report["errors"], 1)
+        self.assertEqual(HotelDetails.objects.using("team13").get(place_id=place_id).stars, 3)
+        self.assertEqual(PlaceTranslation.objects.using("team13").get(place_id=place_id, lang="en").name, "Hotel")
+        self.assertEqual(
+            sorted(PlaceAmenity.objects.using("team13").values_list("amenity_name", flat=True)), ["صبحانه", "پارکینگ"]
+        )
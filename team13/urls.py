@@ -24,6 +24,7 @@ urlpatterns = [
     path("neshan-search/", views.neshan_search, name="neshan_search"),
     path("reverse-geocode/", views.reverse_geocode_view, name="reverse_geocode"),
     path("geocode/", views.geocode_view, name="geocode"),
+    path("neshan-metrics/", views.neshan_metrics, name="neshan_metrics"),
     path("places-in-radius/", views.places_in_radius, name="places_in_radius"),
     path("emergency/", views.emergency_nearby, name="emergency"),
     path("contribution/", views.submit_contribution, name="submit_contribution"),
@@ -1,6 +1,5 @@
 # مطابق فاز ۳، ۵، ۷ — سرویس امکانات و حمل‌ونقل (گروه Axiom)
 import base64
-import math
 import re
 import uuid
 from pathlib import Path
@@ -11,16 +10,18 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 from urllib.parse import quote
-from django.db.models import Avg, Count, F, Q, Subquery, OuterRef
-from django.db.models.functions import Coalesce
+from django.db.models import Avg, Count, F, Q, Subquery, OuterRef, Window
+from django.db.models.functions import Coalesce, RowNumber
 from django.views.decorators.http import require_GET, require_POST
 from core.auth import api_login_required
 
 from .context_processors import team13_user_context
 from .neshan.config import get_web_key
+from .spatial_index import get_place_index, haversine_km
 from .models import (
     Place,
     PlaceTranslation,
+    PlaceListing,
     Event,
     EventTranslation,
     RouteLog,
@@ -69,13 +70,37 @@ def _login_required_team13(view_func):
 
 def _distance_km(lat1, lon1, lat2, lon2):
     """فاصله تقریبی به کیلومتر (Haversine)."""
-    R = 6371
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+    return haversine_km(lat1, lon1, lat2, lon2)
+
+
+def _places_near(lat, lng, radius_km, types=None, limit=None):
+    """
+    مکان‌های داخل شعاع با کمک ایندکس مکانی همین worker (فقط سلول‌های نامزد بررسی می‌شوند).
+    خروجی: لیست (place, distance_km) مرتب بر اساس (فاصلهٔ گردشده، نوع)؛ ترجمه‌ها prefetch شده‌اند.
+    """
+    hits = get_place_index().query_radius(lat, lng, radius_km, types=types)
+    hits.sort(key=lambda h: (round(h[2], 2), h[1]))
+    if limit is not None:
+        hits = hits[:limit]
+    if not hits:
+        return []
+    places_by_id = {
+        str(p.place_id): p
+        for p in Place.objects.using(TEAM13_DB)
+        .filter(place_id__in=[h[0] for h in hits])
+        .prefetch_related("translations")
+    }
+    result = []
+    for place_id, _type, _d in hits:
+        p = places_by_id.get(place_id)
+        if p is None:
+            # از زمان ساخت ایندکس حذف شده است
+            continue
+        d = _distance_km(lat, lng, float(p.latitude), float(p.longitude))
+        if d > radius_km:
+            continue
+        result.append((p, d))
+    return result
 
 
 def _team13_context(request, extra=None):
@@ -116,34 +141,14 @@ def _parse_lat_lng(request):
 
 
 def _apply_price_level_filter(qs, price_level):
-    """Filter queryset by price_level (Pricing): 1=budget, 2=mid, 3=high. Applies to hotels (stars) and restaurants (avg_price); other types are included."""
+    """Filter PlaceListing queryset by price_level (Pricing): 1=budget, 2=mid, 3=high. Applies to hotels (stars) and restaurants (avg_price); other types are included."""
     if not price_level:
         return qs
     level = str(price_level).strip()
+    if level not in ("1", "2", "3"):
+        return qs
     other_types = [Place.PlaceType.MUSEUM, Place.PlaceType.ENTERTAINMENT, Place.PlaceType.HOSPITAL, Place.PlaceType.FIRE_STATION, Place.PlaceType.PHARMACY, Place.PlaceType.CLINIC]
-    if level == "1":
-        qs = qs.filter(
-            Q(type=Place.PlaceType.HOTEL, hotel_details__stars__lte=2)
-            | Q(type=Place.PlaceType.FOOD, restaurant_details__avg_price__lte=200000)
-            | Q(type__in=other_types)
-        )
-    elif level == "2":
-        qs = qs.filter(
-            Q(type=Place.PlaceType.HOTEL, hotel_details__stars=3)
-            | Q(
-                type=Place.PlaceType.FOOD,
-                restaurant_details__avg_price__gt=200000,
-                restaurant_details__avg_price__lte=500000,
-            )
-            | Q(type__in=other_types)
-        )
-    elif level == "3":
-        qs = qs.filter(
-            Q(type=Place.PlaceType.HOTEL, hotel_details__stars__gte=4)
-            | Q(type=Place.PlaceType.FOOD, restaurant_details__avg_price__gt=500000)
-            | Q(type__in=other_types)
-        )
-    return qs
+    return qs.filter(Q(price_level=int(level)) | Q(type__in=other_types))
 
 
 @require_GET
@@ -154,24 +159,8 @@ def place_list(request):
     تا پس از تأیید ادمین در این API و نقشه نمایش داده نمی‌شوند.
     فیلتر: نوع/شهر/قیمت؛ فاصله Haversine در صورت ارسال lat/lng.
     """
-    # Subquery: average rating (stars) per place from Comment
-    rating_subq = (
-        Comment.objects.using(TEAM13_DB)
-        .filter(
-            target_type=Comment.TargetType.PLACE,
-            target_id=OuterRef("place_id"),
-        )
-        .values("target_id")
-        .annotate(avg_rating=Avg("rating"))
-        .values("avg_rating")
-    )
-    qs = (
-        Place.objects.using(TEAM13_DB)
-        .all()
-        .select_related("hotel_details", "restaurant_details")
-        .prefetch_related("translations")
-        .annotate(avg_stars=Coalesce(Subquery(rating_subq), 0.0))
-    )
+    # همه‌چیز از مدل خواندنی PlaceListing (یک ردیف تخت برای هر مکان؛ team13/place_listing.py)
+    qs = PlaceListing.objects.using(TEAM13_DB).all()
     # Category (Type): type or category GET param
     place_type = request.GET.get("type") or request.GET.get("category")
     if place_type and place_type in dict(Place.PlaceType.choices):
@@ -188,7 +177,7 @@ def place_list(request):
         try:
             r = float(min_rating)
             if 1 <= r <= 5:
-                qs = qs.filter(avg_stars__gte=r)
+                qs = qs.filter(avg_rating__gte=r)
         except (TypeError, ValueError):
             pass
     # برای نقشه (format=json): صفحه‌بندی و مرتب‌سازی بر اساس نوع و شهر تا بیمارستان/کلینیک/سیرجان و غیره در صفحات اول بیایند.
@@ -199,52 +188,38 @@ def place_list(request):
         max_dist_km = None
     want_all_for_map = _wants_json(request) and not place_type and not city and not price_level and not min_rating
     if want_all_for_map:
-        # هر صفحه به‌صورت متناسب از همهٔ انواع مکان (بیمارستان، هتل، غذا، موزه، ...) پر شود
+        # هر صفحه به‌صورت متناسب از همهٔ انواع مکان (بیمارستان، هتل، غذا، موزه، ...) پر شود:
+        # شمارهٔ ردیف در هر نوع (ROW_NUMBER روی ایندکس type, city, place) و برش همهٔ انواع در یک پرس‌وجو
         all_types = [c[0] for c in Place.PlaceType.choices]
         page = max(1, int(request.GET.get("page", 1)))
         page_size = min(500, max(100, int(request.GET.get("page_size", 300))))
         limit_per_type = max(1, page_size // len(all_types))
         start_offset = (page - 1) * limit_per_type
-        places_qs = []
-        for ptype in all_types:
-            type_places = list(
-                qs.filter(type=ptype).order_by("city", "place_id")[
-                    start_offset : start_offset + limit_per_type
-                ]
+        places_qs = list(
+            qs.annotate(
+                type_row=Window(
+                    expression=RowNumber(),
+                    partition_by=[F("type")],
+                    order_by=[F("city").asc(), F("place_id").asc()],
+                )
             )
-            places_qs.extend(type_places)
-        places_qs.sort(key=lambda p: (p.type, p.city or "", str(p.place_id)))
-        places_qs = places_qs[:page_size]
+            .filter(type_row__gt=start_offset, type_row__lte=start_offset + limit_per_type)
+            .order_by("type", "city", "place_id")[:page_size]
+        )
         total_count = qs.count()
         start = (page - 1) * page_size
     else:
-        qs = qs.order_by("-avg_stars")
+        qs = qs.order_by(F("avg_rating").desc(nulls_last=True))
         if max_dist_km is not None:
             places_qs = list(qs[:50])
             total_count = None
         else:
             places_qs = list(qs[:10])
             total_count = None
-    place_ids = [p.place_id for p in places_qs]
-    rating_rows = (
-        Comment.objects.using(TEAM13_DB)
-        .filter(
-            target_type=Comment.TargetType.PLACE,
-            target_id__in=place_ids,
-        )
-        .values("target_id")
-        .annotate(avg_rating=Avg("rating"))
-    )
-    rating_by_place = {
-        str(r["target_id"]): round(float(r["avg_rating"] or 0), 1)
-        for r in rating_rows
-    }
 
     user_lat, user_lng = _parse_lat_lng(request)
     places = []
     for p in places_qs:
-        trans_fa = p.translations.filter(lang="fa").first()
-        trans_en = p.translations.filter(lang="en").first()
         item = {
             "place_id": str(p.place_id),
             "type": p.type,
@@ -253,9 +228,9 @@ def place_list(request):
             "address": p.address,
             "latitude": p.latitude,
             "longitude": p.longitude,
-            "name_fa": trans_fa.name if trans_fa else "",
-            "name_en": trans_en.name if trans_en else "",
-            "rating": rating_by_place.get(str(p.place_id)),
+            "name_fa": p.name_fa,
+            "name_en": p.name_en,
+            "rating": round(p.avg_rating, 1) if p.avg_rating is not None else None,
         }
         if user_lat is not None and user_lng is not None:
             item["distance_km"] = round(_distance_km(user_lat, user_lng, p.latitude, p.longitude), 2)
@@ -397,18 +372,20 @@ def nearest_place(request):
             radius_km = 0.05
     except (TypeError, ValueError):
         radius_km = 0.05
-    places = list(Place.objects.using(TEAM13_DB).all())
+    hits = get_place_index().nearest(lat, lng, k=1, max_km=radius_km)
     best = None
-    best_d = float("inf")
-    for p in places:
-        d = _distance_km(lat, lng, p.latitude, p.longitude)
-        if d <= radius_km and d < best_d:
-            best_d = d
-            best = p
+    if hits:
+        best = (
+            Place.objects.using(TEAM13_DB)
+            .prefetch_related("translations")
+            .filter(place_id=hits[0][0])
+            .first()
+        )
     if best is None:
         return JsonResponse({"place": None})
-    trans_fa = best.translations.filter(lang="fa").first()
-    trans_en = best.translations.filter(lang="en").first()
+    best_d = _distance_km(lat, lng, best.latitude, best.longitude)
+    trans_fa = next((t for t in best.translations.all() if t.lang == "fa"), None)
+    trans_en = next((t for t in best.translations.all() if t.lang == "en"), None)
     payload = {
         "place_id": str(best.place_id),
         "name_fa": trans_fa.name if trans_fa else "",
@@ -723,6 +700,18 @@ def _is_team13_admin(user):
     return is_team13_admin(user)
 
 
+@require_GET
+def neshan_metrics(request):
+    """زمان پاسخ، تلاش‌های دوباره و وضعیت مدارشکن هر endpoint نشان و آمار کش مختصات در همین پروسه — فقط ادمین تیم ۱۳."""
+    if not getattr(request.user, "is_authenticated", False):
+        return JsonResponse({"detail": "Authentication required"}, status=401)
+    if not is_team13_admin(request.user):
+        return JsonResponse({"detail": "Forbidden"}, status=403)
+    from core.geo_cache import get_geo_cache
+    from .neshan import transport_stats
+    return JsonResponse({"endpoints": transport_stats(), "geo_cache": get_geo_cache().stats()})
+
+
 def team13_admin_dashboard(request):
     """داشبورد ادمین: لیست پیشنهادهای در انتظار تأیید و مدیریت ادمین‌ها."""
     if not getattr(request.user, "is_authenticated", False):
@@ -1361,7 +1350,9 @@ def tsp_request(request):
     بهینه‌سازی ترتیب بازدید از چند نقطه (TSP).
     GET: waypoints (اجباری) = lat1,lng1|lat2,lng2|... یا چند waypoints=lat,lng
          round_trip، source_is_any_point، last_is_any_point (اختیاری، true/false).
-    پاسخ JSON: { "points": [ { "name", "location": [lng, lat], "index" }, ... ] } یا { "error": "..." }.
+         solver = neshan | local | fallback (اختیاری؛ پیش‌فرض TEAM13_ROUTE_SOLVER_MODE).
+    پاسخ JSON: { "points": [ { "name", "location": [lng, lat], "index" }, ... ], "source": "neshan" | "local" } یا { "error": "..." }.
+    در حالت fallback اگر نشان پاسخ ندهد یا تعداد نقاط زیاد باشد، ترتیب با route_solver به‌صورت محلی حل می‌شود.
     """
     waypoints_raw = request.GET.get("waypoints", "").strip()
     if not waypoints_raw:
@@ -1377,27 +1368,34 @@ def tsp_request(request):
     source_is_any = request.GET.get("source_is_any_point", "true").lower() in ("1", "true", "yes")
     last_is_any = request.GET.get("last_is_any_point", "true").lower() in ("1", "true", "yes")
 
+    from .route_solver import local_tsp, parse_points, solver_mode, use_local_first
     try:
-        from .neshan import fetch_tsp
-        points = fetch_tsp(
-            waypoints_raw,
-            round_trip=round_trip,
-            source_is_any_point=source_is_any,
-            last_is_any_point=last_is_any,
-        )
-    except Exception as e:
-        if _wants_json(request):
-            return JsonResponse({"error": "خطا در فراخوانی سرویس بهینه‌سازی مسیر"}, status=500)
-        return JsonResponse({"error": "خطا در فراخوانی سرویس بهینه‌سازی مسیر"}, status=500)
+        waypoints = parse_points(waypoints_raw)
+    except ValueError:
+        return JsonResponse({"error": "مختصات waypoints نامعتبر است (فرمت lat,lng|lat,lng)"}, status=400)
+    mode = request.GET.get("solver") or solver_mode()
 
-    if points is None:
-        if _wants_json(request):
+    points = None
+    if not use_local_first(len(waypoints), mode):
+        try:
+            from .neshan import fetch_tsp
+            points = fetch_tsp(
+                waypoints_raw,
+                round_trip=round_trip,
+                source_is_any_point=source_is_any,
+                last_is_any_point=last_is_any,
+            )
+        except Exception:
+            if mode == "neshan":
+                return JsonResponse({"error": "خطا در فراخوانی سرویس بهینه‌سازی مسیر"}, status=500)
+        if points is not None:
+            return JsonResponse({"points": points, "source": "neshan"})
+        if mode == "neshan":
             return JsonResponse({"error": "سرویس بهینه‌سازی مسیر در دسترس نیست یا پاسخ نامعتبر"}, status=502)
-        return JsonResponse({"error": "سرویس بهینه‌سازی مسیر در دسترس نیست یا پاسخ نامعتبر"}, status=502)
 
-    if _wants_json(request):
-        return JsonResponse({"points": points})
-    return JsonResponse({"points": points})
+    # حل محلی: نشان در دسترس نیست یا تعداد نقاط زیاد است (route_solver)
+    points = local_tsp(waypoints, round_trip=round_trip, source_is_any_point=source_is_any, last_is_any_point=last_is_any)
+    return JsonResponse({"points": points, "source": "local"})
 
 
 # -----------------------------------------------------------------------------
@@ -1410,8 +1408,9 @@ def distance_matrix_request(request):
     """
     ماتریس فاصله و زمان بین نقاط مبدأ و مقصد.
     GET: origins (اجباری) = lat1,lng1|lat2,lng2|... ، destinations (اجباری) همان فرمت.
-         type = car | motorcycle (اختیاری)، no_traffic = 0|1|true|false (اختیاری).
-    پاسخ JSON: { status, rows, origin_addresses, destination_addresses } یا { "error": "..." }.
+         type = car | motorcycle (اختیاری)، no_traffic = 0|1|true|false (اختیاری)، solver مانند tsp_request.
+    پاسخ JSON: { status, rows, origin_addresses, destination_addresses, source } یا { "error": "..." }.
+    پاسخ محلی (source=local) فاصلهٔ تخمینی Haversine × ضریب جاده و زمان با سرعت میانگین است.
     """
     origins_raw = request.GET.get("origins", "").strip()
     destinations_raw = request.GET.get("destinations", "").strip()
@@ -1430,19 +1429,35 @@ def distance_matrix_request(request):
     if vehicle_type not in ("car", "motorcycle"):
         vehicle_type = "car"
     no_traffic = request.GET.get("no_traffic", "").lower() in ("1", "true", "yes")
+
+    from .route_solver import local_distance_matrix, parse_points, solver_mode, use_local_first
     try:
-        from .neshan import fetch_distance_matrix
-        data = fetch_distance_matrix(
-            origins_raw,
-            destinations_raw,
-            vehicle_type=vehicle_type,
-            no_traffic=no_traffic,
-        )
-    except Exception:
-        return JsonResponse({"error": "خطا در فراخوانی سرویس ماتریس فاصله"}, status=500)
-    if data is None:
-        return JsonResponse({"error": "سرویس ماتریس فاصله در دسترس نیست یا پاسخ نامعتبر"}, status=502)
-    return JsonResponse(data)
+        origins = parse_points(origins_raw)
+        destinations = parse_points(destinations_raw)
+    except ValueError:
+        return JsonResponse({"error": "مختصات origins یا destinations نامعتبر است (فرمت lat,lng|lat,lng)"}, status=400)
+    mode = request.GET.get("solver") or solver_mode()
+
+    if not use_local_first(max(len(origins), len(destinations)), mode):
+        data = None
+        try:
+            from .neshan import fetch_distance_matrix
+            data = fetch_distance_matrix(
+                origins_raw,
+                destinations_raw,
+                vehicle_type=vehicle_type,
+                no_traffic=no_traffic,
+            )
+        except Exception:
+            if mode == "neshan":
+                return JsonResponse({"error": "خطا در فراخوانی سرویس ماتریس فاصله"}, status=500)
+        if data is not None:
+            return JsonResponse({**data, "source": "neshan"})
+        if mode == "neshan":
+            return JsonResponse({"error": "سرویس ماتریس فاصله در دسترس نیست یا پاسخ نامعتبر"}, status=502)
+
+    # تخمین محلی (Haversine × ضریب جاده، سرعت میانگین شهری)
+    return JsonResponse({**local_distance_matrix(origins, destinations, vehicle_type), "source": "local"})
 
 
 # -----------------------------------------------------------------------------
@@ -1836,23 +1851,8 @@ def places_in_radius(request):
             if t and t in dict(Place.PlaceType.choices):
                 filter_types.append(t)
 
-    try:
-        if filter_types:
-            qs = Place.objects.using(TEAM13_DB).filter(type__in=filter_types).prefetch_related("translations")
-        else:
-            qs = Place.objects.using(TEAM13_DB).prefetch_related("translations")
-        all_places = list(qs)
-    except Exception:
-        all_places = list(Place.objects.using(TEAM13_DB).prefetch_related("translations"))
-
     with_dist = []
-    for p in all_places:
-        try:
-            d = _distance_km(lat, lon, float(p.latitude), float(p.longitude))
-        except (TypeError, ValueError):
-            continue
-        if d > radius_km:
-            continue
+    for p, d in _places_near(lat, lon, radius_km, types=filter_types or None, limit=limit):
         trans_fa = next((t for t in p.translations.all() if t.lang == "fa"), None)
         trans_en = next((t for t in p.translations.all() if t.lang == "en"), None)
         name_fa = (trans_fa.name if trans_fa else "").strip()
@@ -1869,8 +1869,7 @@ def places_in_radius(request):
             "name_en": name_en or name_fa or p.get_type_display(),
             "distance_km": round(d, 2),
         })
-    with_dist.sort(key=lambda x: (x["distance_km"], x["type"]))
-    places = with_dist[:limit]
+    places = with_dist
 
     return JsonResponse({"places": places, "total": len(places), "radius_km": radius_km})
 
@@ -1903,19 +1902,8 @@ def emergency_nearby(request):
 
     emergency_places = []
     try:
-        all_emergency = list(
-            Place.objects.using(TEAM13_DB)
-            .filter(type__in=EMERGENCY_PLACE_TYPES)
-            .prefetch_related("translations")
-        )
         with_dist = []
-        for p in all_emergency:
-            try:
-                d = _distance_km(lat, lon, float(p.latitude), float(p.longitude))
-            except (TypeError, ValueError):
-                continue
-            if d > radius_km:
-                continue
+        for p, d in _places_near(lat, lon, radius_km, types=EMERGENCY_PLACE_TYPES, limit=limit):
             trans_fa = next((t for t in p.translations.all() if t.lang == "fa"), None)
             trans_en = next((t for t in p.translations.all() if t.lang == "en"), None)
             name_fa = (trans_fa.name if trans_fa else "").strip()
@@ -1934,8 +1922,7 @@ def emergency_nearby(request):
                 "eta_minutes": max(1, round(d / 0.5)),
                 "source": "db",
             })
-        with_dist.sort(key=lambda x: (x["distance_km"], x["type"]))
-        emergency_places = with_dist[:limit]
+        emergency_places = with_dist
     except Exception:
         emergency_places = []
 
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Article, Version, Tag, Vote
+from .models import Article, ArticleScoreShard, Version, Tag, Vote
 
 admin.site.register(Article)
 admin.site.register(Version)
 admin.site.register(Tag)
 admin.site.register(Vote) 
+admin.site.register(ArticleScoreShard)
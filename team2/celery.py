@@ -6,7 +6,19 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app404.settings')
 app = Celery('team2')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks(['team2.tasks'])
+# LLM tasks are rate limited; fetch one task at a time so the backlog stays in the broker
+app.conf.worker_prefetch_multiplier = 1
 app.conf.include = [
     'team2.tasks.tasks',
     'team2.tasks.indexing',
 ]
+app.conf.beat_schedule = {
+    'team2-fold-score-shards': {
+        'task': 'team2.tasks.tasks.fold_article_score_shards',
+        'schedule': 30.0,
+    },
+    'team2-enrich-pending-versions': {
+        'task': 'team2.tasks.tasks.enrich_pending_versions',
+        'schedule': 15 * 60.0,
+    },
+}
@@ -0,0 +1,265 @@
+"""
+Batched, cached LLM enrichment (tags + summary) of article versions.
+
+- Results are stored in LLMResult under a hash of (prompt version, model,
+  content); versions whose content was already enriched never reach the model.
+- Cache misses are packed several to a prompt (bounded by item count and
+  prompt size), and tags and summary come back from the same call.
+- Each article only sees the existing tags that match its text (keyword
+  match weighted by how specific the tag words are) instead of every Tag.
+- Every model call is recorded in LLMCall for token/call reporting.
+"""
+import hashlib
+import json
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+
+from team2.llm import get_llm
+from team2.models import LLMCall, LLMResult, Tag, Version
+from team2.rankings import invalidate_top_articles
+
+logger = logging.getLogger(__name__)
+
+KIND = "enrich"
+# bump when the prompt or the expected output changes, so cached results are not reused
+PROMPT_VERSION = 1
+BATCH_SIZE = 8
+MAX_BATCH_CHARS = 24_000
+MAX_CANDIDATE_TAGS = 25
+MAX_TAGS = 5
+
+_CHAR_MAP = str.maketrans({"ي": "ی", "ك": "ک", "‌": " ", "ة": "ه"})
+_SUFFIXES = ("هایی", "های", "ها", "ات", "ان", "ی")
+
+PROMPT_HEADER = """You are a content classification and summarization assistant. Your ONLY output must be a single valid JSON object with no extra text, no markdown fences, no explanation.
+
+For EACH article below:
+- Select relevant tags from its CANDIDATE TAGS. Only suggest NEW tags if absolutely necessary. Maximum 5 total tags. Use concise Farsi tags. Prefer candidate tags.
+- Summarize it in 3–6 sentences in FARSI. Do not add information that is not present. Be factual and clear.
+
+Output format (respond with ONLY this JSON, one key per article id, nothing else):
+{"<article id>": {"selected_existing_tags": ["tag1"], "new_tags": ["new_tag1"], "summary": "..."}}
+"""
+
+ARTICLE_TEMPLATE = """
+ARTICLE id={key}
+CANDIDATE TAGS: {candidates}
+\"\"\"
+{content}
+\"\"\"
+"""
+
+
+class EnrichmentIncomplete(Exception):
+    """The model answer did not cover a version (unparseable or truncated); the task retries it."""
+
+
+@dataclass
+class EnrichmentStats:
+    versions: int = 0
+    cache_hits: int = 0
+    calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    failed: list = field(default_factory=list)
+    results: dict = field(default_factory=dict)
+
+
+def content_hash(content, model_name):
+    payload = f"{PROMPT_VERSION}\n{model_name}\n{content}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _tokens(text):
+    words = re.findall(r"\w+", text.translate(_CHAR_MAP).lower())
+    stemmed = []
+    for word in words:
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[: -len(suffix)]
+                break
+        stemmed.append(word)
+    return stemmed
+
+
+class TagIndex:
+    """Existing tag names, indexed by their (normalized) words for candidate lookup."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.words = {name: set(_tokens(name)) for name in self.names}
+        df = Counter(word for words in self.words.values() for word in words)
+        total = max(len(self.names), 1)
+        # words shared by many tags ("تاریخ" in "تاریخ ایران", "تاریخ معاصر", ...) say less about a match
+        self.idf = {word: math.log(1 + total / count) for word, count in df.items()}
+
+    def candidates(self, content, limit=MAX_CANDIDATE_TAGS):
+        tf = Counter(_tokens(content))
+        scored = []
+        for name, words in self.words.items():
+            matched = [word for word in words if word in tf]
+            if not matched:
+                continue
+            coverage = len(matched) / len(words)
+            score = coverage * sum(math.log(1 + tf[word]) * self.idf[word] for word in matched)
+            scored.append((-score, name))
+        scored.sort()
+        return [name for _, name in scored[:limit]]
+
+
+def build_prompt(items):
+    """items: [(key, content, candidate tag names)]"""
+    parts = [PROMPT_HEADER]
+    for key, content, candidates in items:
+        parts.append(ARTICLE_TEMPLATE.format(
+            key=key, candidates=json.dumps(candidates, ensure_ascii=False), content=content,
+        ))
+    return "".join(parts)
+
+
+def parse_response(text):
+    text = text.strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```(?:json)?\s*", "", text)
+        text = re.sub(r"```\s*$", "", text)
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("no JSON object in model response")
+    data = json.loads(text[start:end + 1])
+    if not isinstance(data, dict):
+        raise ValueError("model response is not a JSON object")
+    return data
+
+
+def _normalize_result(raw):
+    raw = raw if isinstance(raw, dict) else {}
+    return {
+        "selected_existing_tags": [str(t) for t in raw.get("selected_existing_tags") or []][:MAX_TAGS],
+        "new_tags": [str(t) for t in raw.get("new_tags") or []][:MAX_TAGS],
+        "summary": str(raw.get("summary") or "").strip(),
+    }
+
+
+def _batches(items, batch_size, max_chars):
+    batch, size = [], 0
+    for item in items:
+        length = len(item[1])
+        if batch and (len(batch) >= batch_size or size + length > max_chars):
+            yield batch
+            batch, size = [], 0
+        batch.append(item)
+        size += length
+    if batch:
+        yield batch
+
+
+def _store(hash_, model_name, result, call):
+    try:
+        with transaction.atomic(using=router.db_for_write(LLMResult)):
+            LLMResult.objects.create(kind=KIND, content_hash=hash_, model=model_name, result=result, call=call)
+    except IntegrityError:
+        # another worker stored the same content first; keep its result
+        pass
+
+
+def apply_result(version, result, existing_tags):
+    """Attach the selected/new tags and write the summary, as tag_article/summarize_article did."""
+    tags = [existing_tags[name] for name in result["selected_existing_tags"] if name in existing_tags]
+    for name in result["new_tags"]:
+        name = name.strip().lower()
+        if not name:
+            continue
+        tag = existing_tags.get(name)
+        if tag is None:
+            tag, _ = Tag.objects.get_or_create(name=name)
+            existing_tags[name] = tag
+        tags.append(tag)
+    if tags:
+        version.tags.add(*tags)
+    if result["summary"] and result["summary"] != version.summary:
+        version.summary = result["summary"]
+        version.save(update_fields=["summary"])
+    invalidate_top_articles()
+
+
+def enrich_versions(versions, llm=None, batch_size=BATCH_SIZE, max_batch_chars=MAX_BATCH_CHARS):
+    """
+    Enrich the given versions: cached results are applied directly, the rest go to
+    the model in batches. Versions missing from an (unparseable or truncated)
+    answer are listed in stats.failed; provider errors, including
+    LLMRateLimited, propagate so the calling task can back off and retry.
+    """
+    llm = llm or get_llm()
+    stats = EnrichmentStats()
+    by_hash = {}
+    for version in versions:
+        if version.content.strip():
+            by_hash.setdefault(content_hash(version.content, llm.name), []).append(version)
+    stats.versions = sum(len(group) for group in by_hash.values())
+    if not by_hash:
+        return stats
+
+    existing_tags = {tag.name: tag for tag in Tag.objects.all()}
+
+    cached = {
+        row.content_hash: row
+        for row in LLMResult.objects.filter(kind=KIND, content_hash__in=list(by_hash))
+    }
+    if cached:
+        LLMResult.objects.filter(pk__in=[row.pk for row in cached.values()]).update(hits=F("hits") + 1)
+    for hash_, row in cached.items():
+        for version in by_hash[hash_]:
+            apply_result(version, row.result, existing_tags)
+            stats.results[version.name] = row.result
+            stats.cache_hits += 1
+
+    missing = [hash_ for hash_ in by_hash if hash_ not in cached]
+    if not missing:
+        return stats
+
+    tag_index = TagIndex(existing_tags)
+    items = [
+        (hash_, by_hash[hash_][0].content, tag_index.candidates(by_hash[hash_][0].content))
+        for hash_ in missing
+    ]
+    for batch in _batches(items, batch_size, max_batch_chars):
+        keys = {f"a{i}": hash_ for i, (hash_, _, _) in enumerate(batch, 1)}
+        prompt = build_prompt([(key, content, candidates) for key, (_, content, candidates) in zip(keys, batch)])
+        response = llm.generate(prompt)
+        call = LLMCall.objects.create(
+            model=llm.name, items=len(batch), prompt_chars=len(prompt),
+            prompt_tokens=response.prompt_tokens, output_tokens=response.output_tokens,
+        )
+        stats.calls += 1
+        stats.prompt_tokens += response.prompt_tokens
+        stats.output_tokens += response.output_tokens
+
+        try:
+            data = parse_response(response.text)
+        except ValueError:
+            logger.exception("Unparseable enrichment response for %d version(s)", len(batch))
+            data = {}
+        for key, hash_ in keys.items():
+            if key not in data:
+                stats.failed.extend(version.name for version in by_hash[hash_])
+                continue
+            result = _normalize_result(data[key])
+            _store(hash_, llm.name, result, call)
+            for version in by_hash[hash_]:
+                apply_result(version, result, existing_tags)
+                stats.results[version.name] = result
+    return stats
+
+
+def pending_versions(exclude=(), limit=None):
+    """Published versions that have not been summarized yet."""
+    queryset = Version.objects.filter(current_of__isnull=False, summary="").exclude(
+        name__in=list(exclude)
+    ).order_by("updated_at")
+    return list(queryset[:limit]) if limit is not None else list(queryset)
@@ -0,0 +1,228 @@
+"""
+In-process fake Elasticsearch cluster for tests and the indexing benchmark.
+
+FakeCluster.client() returns a real `elasticsearch.Elasticsearch` client whose
+transport node answers from memory, so the client's serialization, the bulk
+helpers and error handling all run unchanged. Only the endpoints the article
+indexer uses are implemented: index create/exists/delete, settings, refresh,
+aliases, _bulk, single-document index and a simple multi_match _search.
+"""
+import json
+import re
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+from elastic_transport._node._base import NodeApiResponse
+from elasticsearch import Elasticsearch
+
+DEFAULT_REFRESH_INTERVAL = "1s"
+
+
+class FakeCluster:
+    def __init__(self, latency=0.0):
+        # latency: simulated network round trip per request (seconds), used by the benchmark
+        self.latency = latency
+        self.indices = {}
+        self.aliases = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def client(self):
+        cluster = self
+
+        class Node(FakeNode):
+            pass
+
+        Node.cluster = cluster
+        return Elasticsearch(hosts=["http://fake-es:9200"], node_class=Node)
+
+    # -- state helpers -------------------------------------------------------
+
+    def resolve(self, name):
+        if name in self.indices:
+            return [name]
+        return sorted(index for index, aliases in self.aliases.items() if name in aliases)
+
+    def documents(self, name):
+        docs = {}
+        for index in self.resolve(name):
+            docs.update(self.indices[index]["docs"])
+        return docs
+
+    def refresh_interval(self, index):
+        return self.indices[index]["settings"].get("refresh_interval", DEFAULT_REFRESH_INTERVAL)
+
+    def count(self, method, path_prefix=""):
+        return sum(1 for m, path in self.requests if m == method and path.startswith(path_prefix))
+
+    # -- request handling ----------------------------------------------------
+
+    def handle(self, method, target, body):
+        path = unquote(urlsplit(target).path).strip("/")
+        parts = path.split("/") if path else []
+        with self._lock:
+            self.requests.append((method, "/" + path))
+            if parts[:1] == ["_bulk"] or parts[1:2] == ["_bulk"]:
+                return self._bulk(parts[0] if len(parts) == 2 else None, body)
+            if parts[:1] == ["_aliases"]:
+                return self._update_aliases(json.loads(body))
+            if parts[:1] == ["_alias"]:
+                return self._get_alias(parts[1])
+            if len(parts) == 1:
+                return self._index_admin(method, parts[0], body)
+            if parts[1] == "_settings":
+                return self._put_settings(parts[0], json.loads(body))
+            if parts[1] == "_refresh":
+                return self._refresh(parts[0])
+            if parts[1] == "_doc" and method in ("PUT", "POST"):
+                return self._index_doc(parts[0], parts[2], json.loads(body))
+            if parts[1] == "_search":
+                return self._search(parts[0], json.loads(body) if body else {})
+        return 400, _error("illegal_argument_exception", f"unsupported request {method} /{path}")
+
+    def _index_admin(self, method, name, body):
+        if method == "HEAD":
+            return (200 if self.resolve(name) else 404), {}
+        if method == "PUT":
+            if name in self.indices or self.resolve(name):
+                return 400, _error("resource_already_exists_exception", f"index [{name}] already exists")
+            settings = (json.loads(body) if body else {}).get("settings", {})
+            self.indices[name] = {"settings": dict(settings.get("index", settings)), "docs": {}}
+            self.aliases[name] = set()
+            return 200, {"acknowledged": True, "index": name}
+        if method == "DELETE":
+            indices = self.resolve(name)
+            if not indices:
+                return 404, _error("index_not_found_exception", f"no such index [{name}]")
+            for index in indices:
+                del self.indices[index]
+                del self.aliases[index]
+            return 200, {"acknowledged": True}
+        return 400, _error("illegal_argument_exception", f"unsupported method {method}")
+
+    def _get_alias(self, name):
+        found = {index: {"aliases": {name: {}}} for index, aliases in self.aliases.items() if name in aliases}
+        if not found:
+            return 404, {"error": f"alias [{name}] missing", "status": 404}
+        return 200, found
+
+    def _update_aliases(self, body):
+        # Apply all actions to a copy: like ES, either every action succeeds or none does
+        indices, aliases = dict(self.indices), {k: set(v) for k, v in self.aliases.items()}
+        for action in body["actions"]:
+            (kind, args), = action.items()
+            index = args["index"]
+            if index not in indices:
+                return 404, _error("index_not_found_exception", f"no such index [{index}]")
+            if kind == "add":
+                if args["alias"] in indices:
+                    return 400, _error("invalid_alias_name_exception", f"an index exists with the same name as the alias [{args['alias']}]")
+                aliases[index].add(args["alias"])
+            elif kind == "remove":
+                if args["alias"] not in aliases[index] and args.get("must_exist", True):
+                    return 404, _error("aliases_not_found_exception", f"aliases [{args['alias']}] missing")
+                aliases[index].discard(args["alias"])
+            elif kind == "remove_index":
+                del indices[index]
+                del aliases[index]
+        self.indices, self.aliases = indices, aliases
+        return 200, {"acknowledged": True}
+
+    def _put_settings(self, name, body):
+        indices = self.resolve(name)
+        if not indices:
+            return 404, _error("index_not_found_exception", f"no such index [{name}]")
+        settings = body.get("index", body)
+        for index in indices:
+            for key, value in settings.items():
+                if value is None:
+                    self.indices[index]["settings"].pop(key, None)
+                else:
+                    self.indices[index]["settings"][key] = value
+        return 200, {"acknowledged": True}
+
+    def _refresh(self, name):
+        if not self.resolve(name):
+            return 404, _error("index_not_found_exception", f"no such index [{name}]")
+        return 200, {"_shards": {"total": 1, "successful": 1, "failed": 0}}
+
+    def _write_target(self, name):
+        indices = self.resolve(name)
+        if len(indices) != 1:
+            return None
+        return indices[0]
+
+    def _index_doc(self, name, doc_id, source):
+        index = self._write_target(name)
+        if index is None:
+            # Like ES, writing to an unknown name auto-creates a concrete index
+            self.indices[name] = {"settings": {}, "docs": {}}
+            self.aliases[name] = set()
+            index = name
+        result = "updated" if doc_id in self.indices[index]["docs"] else "created"
+        self.indices[index]["docs"][doc_id] = source
+        return 200 if result == "updated" else 201, {"_index": index, "_id": doc_id, "result": result}
+
+    def _bulk(self, default_index, body):
+        lines = [line for line in body.split(b"\n") if line.strip()]
+        items, errors = [], False
+        i = 0
+        while i < len(lines):
+            (op, meta), = json.loads(lines[i]).items()
+            source = json.loads(lines[i + 1]) if op in ("index", "create") else None
+            i += 2 if source is not None else 1
+            name = meta.get("_index", default_index)
+            index = self._write_target(name)
+            if op not in ("index", "create") or index is None:
+                errors = True
+                items.append({op: {"_index": name, "_id": meta.get("_id"), "status": 404,
+                                   "error": {"type": "index_not_found_exception", "reason": f"no such index [{name}]"}}})
+                continue
+            docs = self.indices[index]["docs"]
+            result = "updated" if meta["_id"] in docs else "created"
+            docs[meta["_id"]] = source
+            items.append({op: {"_index": index, "_id": meta["_id"], "result": result,
+                               "status": 200 if result == "updated" else 201}})
+        return 200, {"took": 1, "errors": errors, "items": items}
+
+    def _search(self, name, body):
+        if not self.resolve(name):
+            return 404, _error("index_not_found_exception", f"no such index [{name}]")
+        query = body.get("query", {}).get("multi_match", {})
+        terms = [t for t in re.split(r"\W+", str(query.get("query", "")).lower()) if t]
+        fields = [f.split("^")[0] for f in query.get("fields", [])]
+        hits = []
+        for doc_id, source in self.documents(name).items():
+            text = " ".join(
+                " ".join(v) if isinstance(v, list) else str(v)
+                for k, v in source.items() if k in fields
+            ).lower()
+            score = float(sum(text.count(t) for t in terms))
+            if score:
+                hits.append({"_index": name, "_id": doc_id, "_score": score, "_source": source})
+        hits.sort(key=lambda hit: (-hit["_score"], hit["_id"]))
+        hits = hits[: body.get("size", 10)]
+        return 200, {"took": 1, "timed_out": False, "hits": {"total": {"value": len(hits), "relation": "eq"}, "hits": hits}}
+
+
+class FakeNode(BaseNode):
+    cluster = None
+
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=None):
+        if self.cluster.latency:
+            time.sleep(self.cluster.latency)
+        status, payload = self.cluster.handle(method, target, body)
+        meta = ApiResponseMeta(
+            status=status,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json", "x-elastic-product": "Elasticsearch"}),
+            duration=0.0,
+            node=self.config,
+        )
+        return NodeApiResponse(meta, b"" if method == "HEAD" else json.dumps(payload).encode())
+
+
+def _error(kind, reason):
+    return {"error": {"type": kind, "reason": reason, "root_cause": [{"type": kind, "reason": reason}]}}
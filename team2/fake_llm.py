@@ -0,0 +1,53 @@
+"""
+Deterministic stand-in for the Gemini client in tests.
+
+FakeLLM reads the batch prompt built by team2.enrichment, picks the first
+candidate tags of each article and uses its first sentence as the summary.
+Token counts are estimated at ~4 characters per token. Every prompt is kept
+in `prompts` so tests can assert on call counts and prompt contents.
+"""
+import json
+import re
+
+from team2.llm import LLMRateLimited, LLMResponse
+
+ARTICLE_RE = re.compile(r'ARTICLE id=(\w+)\nCANDIDATE TAGS: ([^\n]*)\n"""\n(.*?)\n"""', re.DOTALL)
+
+
+class FakeLLM:
+    def __init__(self, name="fake-llm", tags_per_article=2, new_tags=(), rate_limited=0, drop=(), truncated=0):
+        self.name = name
+        self.tags_per_article = tags_per_article
+        self.new_tags = list(new_tags)
+        # number of upcoming calls that fail with LLMRateLimited
+        self.rate_limited = rate_limited
+        # article ids left out of the response (simulates a truncated answer)
+        self.drop = set(drop)
+        # number of upcoming calls whose answer is cut off after the opening brace
+        self.truncated = truncated
+        self.prompts = []
+
+    @property
+    def calls(self):
+        return len(self.prompts)
+
+    def generate(self, prompt):
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise LLMRateLimited("429 RESOURCE_EXHAUSTED (fake)")
+        self.prompts.append(prompt)
+
+        answer = {}
+        for key, candidates, content in ARTICLE_RE.findall(prompt):
+            if key in self.drop:
+                continue
+            answer[key] = {
+                "selected_existing_tags": json.loads(candidates)[: self.tags_per_article],
+                "new_tags": self.new_tags,
+                "summary": re.split(r"(?<=[.!؟?])\s", content.strip(), maxsplit=1)[0],
+            }
+        text = json.dumps(answer, ensure_ascii=False)
+        if self.truncated:
+            self.truncated -= 1
+            text = text[:1]
+        return LLMResponse(text=text, prompt_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
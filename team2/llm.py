@@ -0,0 +1,62 @@
+"""
+Thin LLM client interface used by the enrichment tasks.
+
+Anything with `name` and `generate(prompt) -> LLMResponse` works as a client;
+GeminiLLM talks to Gemini, team2.fake_llm.FakeLLM stands in for tests.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+
+MODEL_NAME = "gemini-2.5-flash"
+
+
+class LLMRateLimited(Exception):
+    """The provider rejected the request for quota/rate reasons; retry later."""
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+class GeminiLLM:
+    def __init__(self, model=MODEL_NAME, api_key=None):
+        self.name = model
+        self._api_key = api_key
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self._api_key or settings.GEMINI_API_KEY)
+        return self._client
+
+    def generate(self, prompt):
+        from google.genai import errors
+
+        try:
+            response = self._get_client().models.generate_content(model=self.name, contents=prompt)
+        except errors.ClientError as exc:
+            if exc.code == 429:
+                raise LLMRateLimited(str(exc)) from exc
+            raise
+
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=response.text or "",
+            prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", None) or 0,
+        )
+
+
+_LLM = None
+
+
+def get_llm():
+    global _LLM
+    if _LLM is None:
+        _LLM = GeminiLLM()
+    return _LLM
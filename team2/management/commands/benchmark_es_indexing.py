@@ -0,0 +1,116 @@
+"""
+Throughput benchmark for article indexing: one request per document (the old
+index_all_articles loop) vs streaming_bulk vs parallel_bulk.
+
+Synthetic articles are written to a temporary SQLite database, not the team2
+database. By default documents go to the in-process fake cluster with a
+simulated round trip (--latency); pass --url to benchmark a real cluster
+(the benchmark index is deleted afterwards).
+"""
+import os
+import tempfile
+import time
+import uuid
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from team2.fake_es import FakeCluster
+from team2.tasks.indexing import BULK_CHUNK_SIZE, bulk_index_articles, iter_article_actions
+
+BENCH_DB = "team2_es_benchmark"
+BENCH_INDEX = "articles-benchmark"
+
+
+class Command(BaseCommand):
+    help = "Measure docs/sec of per-document vs bulk Elasticsearch indexing of team2 articles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=20_000)
+        parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+        parser.add_argument("--threads", type=int, default=4, help="parallel_bulk worker threads.")
+        parser.add_argument("--single-docs", type=int, default=1000, help="Documents to send one request at a time.")
+        parser.add_argument("--latency", type=float, default=0.002, help="Fake cluster round trip in seconds.")
+        parser.add_argument("--url", help="Benchmark a real cluster instead of the fake one.")
+
+    def _setup_db(self, path, count):
+        conf = dict(connections.settings["team2"])
+        conf.update(ENGINE="django.db.backends.sqlite3", NAME=path)
+        connections.settings[BENCH_DB] = conf
+        with connections[BENCH_DB].schema_editor() as editor:
+            for model in apps.get_app_config("team2").get_models():
+                editor.create_model(model)
+
+        Article = apps.get_model("team2", "Article")
+        Version = apps.get_model("team2", "Version")
+        Tag = apps.get_model("team2", "Tag")
+        user = uuid.uuid4()
+        tags = Tag.objects.using(BENCH_DB).bulk_create([Tag(name=f"tag-{i}") for i in range(50)])
+        articles = Article.objects.using(BENCH_DB).bulk_create(
+            [Article(name=f"article-{i}", creator_id=user) for i in range(count)], batch_size=2000
+        )
+        versions = Version.objects.using(BENCH_DB).bulk_create([
+            Version(
+                name=f"article-{i}-v1", article_id=article.name, editor_id=user,
+                summary=f"summary of article {i}", content=f"article {i} body " * 40,
+            )
+            for i, article in enumerate(articles)
+        ], batch_size=2000)
+        for article, version in zip(articles, versions):
+            article.current_version_id = version.name
+        Article.objects.using(BENCH_DB).bulk_update(articles, ["current_version"], batch_size=2000)
+        Through = Version.tags.through
+        Through.objects.using(BENCH_DB).bulk_create([
+            Through(version_id=version.name, tag_id=tags[(i + k) % len(tags)].name)
+            for i, version in enumerate(versions) for k in range(3)
+        ], batch_size=5000)
+
+    def _teardown_db(self):
+        connections[BENCH_DB].close()
+        del connections[BENCH_DB]
+        del connections.settings[BENCH_DB]
+
+    def _client(self, options):
+        if options["url"]:
+            from elasticsearch import Elasticsearch
+            return Elasticsearch(hosts=[options["url"]])
+        return FakeCluster(latency=options["latency"]).client()
+
+    def _fresh_index(self, es):
+        es.options(ignore_status=404).indices.delete(index=BENCH_INDEX)
+        es.indices.create(index=BENCH_INDEX, settings={"refresh_interval": "-1"})
+
+    def handle(self, *args, **options):
+        Article = apps.get_model("team2", "Article")
+        count = options["articles"]
+        with tempfile.TemporaryDirectory() as tmp:
+            self._setup_db(os.path.join(tmp, "bench.sqlite3"), count)
+            es = self._client(options)
+            articles = Article.objects.using(BENCH_DB).filter(current_version__isnull=False)
+            try:
+                self.stdout.write(f"{'mode':>22} {'docs':>8} {'seconds':>8} {'docs/s':>9}")
+
+                self._fresh_index(es)
+                single = min(options["single_docs"], count)
+                started = time.perf_counter()
+                actions = iter_article_actions(BENCH_INDEX, articles, options["chunk_size"])
+                for _, action in zip(range(single), actions):
+                    es.index(index=BENCH_INDEX, id=action["_id"], document=action["_source"])
+                actions.close()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{'one request per doc':>22} {single:>8} {elapsed:>8.2f} {single / elapsed:>9.0f}")
+
+                for label, threads in (("streaming_bulk", 1), (f"parallel_bulk x{options['threads']}", options["threads"])):
+                    self._fresh_index(es)
+                    started = time.perf_counter()
+                    indexed, errors = bulk_index_articles(
+                        BENCH_INDEX, es=es, articles=articles, chunk_size=options["chunk_size"], threads=threads
+                    )
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"{label:>22} {indexed:>8} {elapsed:>8.2f} {indexed / elapsed:>9.0f}")
+                    if errors:
+                        self.stdout.write(self.style.WARNING(f"{len(errors)} document(s) failed"))
+            finally:
+                es.options(ignore_status=404).indices.delete(index=BENCH_INDEX)
+                self._teardown_db()
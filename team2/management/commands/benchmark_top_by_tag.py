@@ -0,0 +1,107 @@
+"""
+Latency benchmark for the top-articles-per-tag ranking: one ordered article
+query per tag (the old view loop) vs the single window-function query in
+team2.rankings.
+
+Synthetic tags and articles are written to a temporary SQLite database, not
+the team2 database.
+"""
+import os
+import tempfile
+import time
+import uuid
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from team2.rankings import TOP_PER_TAG, compute_top_articles_by_tag
+
+BENCH_DB = "team2_rank_benchmark"
+
+
+def per_tag_queries(using):
+    """The previous implementation of the endpoint, kept for comparison."""
+    Article = apps.get_model("team2", "Article")
+    Tag = apps.get_model("team2", "Tag")
+    result = []
+    for tag in Tag.objects.using(using).all():
+        articles = Article.objects.using(using).filter(
+            current_version__isnull=False, current_version__tags=tag,
+        ).select_related("current_version").order_by("-score")[:TOP_PER_TAG]
+        items = [{"name": a.name, "summary": a.current_version.summary, "score": a.score} for a in articles]
+        if items:
+            result.append({"tag": tag.name, "articles": items})
+    return result
+
+
+class Command(BaseCommand):
+    help = "Compare round trips and latency of per-tag queries vs the window-function ranking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tags", type=int, default=1000)
+        parser.add_argument("--articles", type=int, default=20_000)
+        parser.add_argument("--tags-per-article", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def _setup_db(self, path, options):
+        conf = dict(connections.settings["team2"])
+        conf.update(ENGINE="django.db.backends.sqlite3", NAME=path)
+        connections.settings[BENCH_DB] = conf
+        with connections[BENCH_DB].schema_editor() as editor:
+            for model in apps.get_app_config("team2").get_models():
+                editor.create_model(model)
+
+        Article = apps.get_model("team2", "Article")
+        Version = apps.get_model("team2", "Version")
+        Tag = apps.get_model("team2", "Tag")
+        user = uuid.uuid4()
+        tags = Tag.objects.using(BENCH_DB).bulk_create([Tag(name=f"tag-{i:05}") for i in range(options["tags"])])
+        articles = Article.objects.using(BENCH_DB).bulk_create([
+            Article(name=f"article-{i}", creator_id=user, score=(i * 7919) % 1000)
+            for i in range(options["articles"])
+        ], batch_size=2000)
+        versions = Version.objects.using(BENCH_DB).bulk_create([
+            Version(name=f"article-{i}-v1", article_id=article.name, editor_id=user, summary=f"summary {i}")
+            for i, article in enumerate(articles)
+        ], batch_size=2000)
+        for article, version in zip(articles, versions):
+            article.current_version_id = version.name
+        Article.objects.using(BENCH_DB).bulk_update(articles, ["current_version"], batch_size=2000)
+        Through = Version.tags.through
+        Through.objects.using(BENCH_DB).bulk_create([
+            Through(version_id=version.name, tag_id=tags[(i * 31 + k) % len(tags)].name)
+            for i, version in enumerate(versions) for k in range(options["tags_per_article"])
+        ], batch_size=5000, ignore_conflicts=True)
+
+    def _teardown_db(self):
+        connections[BENCH_DB].close()
+        del connections[BENCH_DB]
+        del connections.settings[BENCH_DB]
+
+    def _measure(self, label, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connections[BENCH_DB]) as queries:
+                started = time.perf_counter()
+                result = func(BENCH_DB)
+                timings.append(time.perf_counter() - started)
+        best = min(timings) * 1000
+        self.stdout.write(f"{label:>16} {len(queries):>8} {best:>10.1f} {len(result):>6}")
+        return result
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._setup_db(os.path.join(tmp, "bench.sqlite3"), options)
+            try:
+                self.stdout.write(f"{'mode':>16} {'queries':>8} {'best ms':>10} {'tags':>6}")
+                old = self._measure("query per tag", per_tag_queries, options["repeat"])
+                new = self._measure("window function", compute_top_articles_by_tag, options["repeat"])
+                # ties on score may be ordered differently, so compare tags and scores only
+                def scores(rows):
+                    return [(row["tag"], [a["score"] for a in row["articles"]]) for row in rows]
+                if scores(old) != scores(new):
+                    self.stdout.write(self.style.WARNING("the two rankings differ"))
+            finally:
+                self._teardown_db()
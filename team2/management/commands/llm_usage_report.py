@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from team2.models import LLMCall, LLMResult
+
+
+class Command(BaseCommand):
+    help = "Report LLM enrichment calls, tokens and result-cache reuse per day."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        calls = LLMCall.objects.filter(created_at__gte=since)
+
+        rows = (
+            calls.annotate(day=TruncDate("created_at"))
+            .values("day", "model")
+            .annotate(
+                calls=Count("id"), items=Sum("items"), prompt_tokens=Sum("prompt_tokens"),
+                output_tokens=Sum("output_tokens"), prompt_chars=Sum("prompt_chars"),
+            )
+            .order_by("day", "model")
+        )
+        self.stdout.write(
+            f"{'day':10} {'model':20} {'calls':>6} {'items':>6} {'items/call':>10} "
+            f"{'prompt tok':>11} {'output tok':>11} {'tok/item':>9}"
+        )
+        for row in rows:
+            tokens = row["prompt_tokens"] + row["output_tokens"]
+            self.stdout.write(
+                f"{row['day']!s:10} {row['model'][:20]:20} {row['calls']:>6} {row['items']:>6} "
+                f"{row['items'] / row['calls']:>10.1f} {row['prompt_tokens']:>11} {row['output_tokens']:>11} "
+                f"{tokens / max(row['items'], 1):>9.0f}"
+            )
+
+        totals = calls.aggregate(
+            calls=Count("id"), items=Sum("items"), prompt_tokens=Sum("prompt_tokens"), output_tokens=Sum("output_tokens"),
+        )
+        hits = LLMResult.objects.aggregate(hits=Sum("hits"))["hits"] or 0
+        items = totals["items"] or 0
+        self.stdout.write(
+            f"total: {totals['calls']} call(s) for {items} version(s), "
+            f"{totals['prompt_tokens'] or 0} prompt + {totals['output_tokens'] or 0} output tokens "
+            f"(separate tag and summary calls per version would have been {2 * items})."
+        )
+        self.stdout.write(f"cache: {hits} enrichment(s) served from stored results without a model call (all time).")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from team2.models import Article
+from team2.scoring import fold_score_shards, set_score_shards
+
+
+class Command(BaseCommand):
+    help = "Spread a hot article's votes over sharded score counters, or fold pending shard deltas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("article", nargs="?", help="Article name.")
+        parser.add_argument("--shards", type=int, help="Number of counter rows; 0 turns sharding off.")
+        parser.add_argument("--fold", action="store_true", help="Fold pending deltas into Article.score now.")
+
+    def handle(self, *args, **options):
+        if options["shards"] is not None:
+            if not options["article"]:
+                raise CommandError("--shards needs an article name.")
+            if not 0 <= options["shards"] <= 64:
+                raise CommandError("--shards must be between 0 and 64.")
+            try:
+                article = Article.objects.get(name=options["article"])
+            except Article.DoesNotExist:
+                raise CommandError(f"Article {options['article']!r} does not exist.")
+            set_score_shards(article, options["shards"])
+            self.stdout.write(f"{article.name}: {options['shards']} score shard(s).")
+
+        if options["fold"]:
+            names = [options["article"]] if options["article"] else None
+            folded = fold_score_shards(article_names=names)
+            self.stdout.write(f"Folded pending votes of {folded} article(s).")
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.27 on 2026-10-17 00:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team2', '0004_llm_result_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleScoreShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('delta', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='vote',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='score_shards',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('user_id', 'article'), name='team2_vote_user_article'),
+        ),
+        migrations.AddField(
+            model_name='articlescoreshard',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_shard_rows', to='team2.article'),
+        ),
+        migrations.AddConstraint(
+            model_name='articlescoreshard',
+            constraint=models.UniqueConstraint(fields=('article', 'shard'), name='team2_score_shard_unique'),
+        ),
+    ]
@@ -16,6 +16,8 @@ class Article(models.Model):
     creator_id = models.UUIDField()
     current_version = models.OneToOneField('Version', on_delete=models.SET_NULL, null=True, blank=True, related_name='current_of')
     score = models.IntegerField(default=0)
+    # >0: votes go to this many ArticleScoreShard rows, folded into score periodically
+    score_shards = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
@@ -24,6 +26,21 @@ class Article(models.Model):
         return self.name
 
 
+class ArticleScoreShard(models.Model):
+    """Not-yet-folded score delta of a hot article, spread over several rows to avoid one contended row."""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='score_shard_rows')
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'shard'], name='team2_score_shard_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id}#{self.shard}: {self.delta}"
+
+
 class Version(models.Model):
     name = models.CharField(max_length=255, primary_key=True)
     article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='versions')
@@ -70,7 +87,41 @@ class Vote(models.Model):
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        unique_together = ('user_id', 'article')
+        constraints = [
+            # one vote per user and article; apply_vote relies on it for insert-or-flip
+            models.UniqueConstraint(fields=['user_id', 'article'], name='team2_vote_user_article'),
+        ]
 
     def __str__(self):
         return f"{self.user_id} -> {self.article_id}: {self.value}"
+
+
+class LLMCall(models.Model):
+    """One model request (possibly covering several versions), kept for token/call reporting."""
+    model = models.CharField(max_length=64)
+    items = models.PositiveIntegerField(default=0)
+    prompt_chars = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    output_tokens = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model}: {self.items} item(s), {self.prompt_tokens}+{self.output_tokens} tokens"
+
+
+class LLMResult(models.Model):
+    """Model output for a piece of content, keyed by a hash of the content and prompt version."""
+    kind = models.CharField(max_length=32)
+    content_hash = models.CharField(max_length=64)
+    model = models.CharField(max_length=64)
+    result = models.JSONField()
+    call = models.ForeignKey(LLMCall, on_delete=models.SET_NULL, null=True, blank=True, related_name='results')
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'content_hash')
+
+    def __str__(self):
+        return f"{self.kind}:{self.content_hash[:12]}"
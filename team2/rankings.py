@@ -0,0 +1,60 @@
+"""
+Top articles per tag, ranked in a single window-function query and cached.
+
+The cached list is dropped whenever scores, published versions or their tags
+change (votes, publishing, enrichment); see invalidate_top_articles. Votes are
+handled by the web workers and enrichment by Celery, so this relies on the
+shared default cache (settings.CACHES / CACHE_URL).
+"""
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from team2.models import Article, Version
+from team2.scoring import live_score
+
+TOP_PER_TAG = 3
+CACHE_KEY = "team2:top-articles-by-tag"
+CACHE_TIMEOUT = 600
+
+
+def ranked_tag_articles(using=None, per_tag=TOP_PER_TAG):
+    """(tag, article, summary, score) rows, best `per_tag` published articles of every tag, in tag order."""
+    Through = Version.tags.through
+    using = using or router.db_for_read(Through)
+    return (
+        Through.objects.using(using)
+        .filter(version__current_of__isnull=False)
+        .annotate(score=live_score("version__current_of__"))
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=F("tag_id"),
+            order_by=[F("score").desc(), F("version__current_of__name").asc()],
+        ))
+        .filter(rank__lte=per_tag)
+        .order_by("tag_id", "rank")
+        .values_list("tag_id", "version__current_of__name", "version__summary", "score")
+    )
+
+
+def compute_top_articles_by_tag(using=None, per_tag=TOP_PER_TAG):
+    result = []
+    for tag, name, summary, score in ranked_tag_articles(using, per_tag):
+        if not result or result[-1]["tag"] != tag:
+            result.append({"tag": tag, "articles": []})
+        result[-1]["articles"].append({"name": name, "summary": summary, "score": score})
+    return result
+
+
+def top_articles_by_tag():
+    result = cache.get(CACHE_KEY)
+    if result is None:
+        result = compute_top_articles_by_tag()
+        cache.set(CACHE_KEY, result, CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_top_articles():
+    """Drop the cached ranking once the current team2 transaction commits."""
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY), using=router.db_for_write(Article))
@@ -0,0 +1,109 @@
+"""
+Article vote scoring without read-modify-write.
+
+- A vote is an insert, or a conditional flip of the user's existing vote;
+  the (user_id, article) unique constraint decides which one applies.
+- Score changes are single `score = score + delta` UPDATEs.
+- Hot articles (Article.score_shards > 0) spread their deltas over that many
+  ArticleScoreShard rows instead of one contended Article row;
+  fold_score_shards moves them into Article.score periodically. Reads that
+  order or show scores use live_score(), which adds the unfolded deltas.
+"""
+import random
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from team2.models import Article, ArticleScoreShard, Vote
+
+
+def pending_score(outer="pk"):
+    """Sum of the unfolded shard deltas of the article referenced by `outer`."""
+    shards = (
+        ArticleScoreShard.objects.filter(article=OuterRef(outer))
+        .values("article").annotate(total=Sum("delta")).values("total")
+    )
+    return Coalesce(Subquery(shards), Value(0))
+
+
+def live_score(prefix=""):
+    """Article score including unfolded shard deltas (`prefix` is a lookup path to the article, e.g. "article__")."""
+    return F(f"{prefix}score") + pending_score(f"{prefix}pk")
+
+
+def add_score(article, delta, using=None):
+    using = using or router.db_for_write(Article)
+    if article.score_shards:
+        shard = random.randrange(article.score_shards)
+        updated = ArticleScoreShard.objects.using(using).filter(
+            article_id=article.pk, shard=shard,
+        ).update(delta=F("delta") + delta)
+        if updated:
+            return
+    Article.objects.using(using).filter(pk=article.pk).update(score=F("score") + delta)
+
+
+def apply_vote(article, user_id, value):
+    """
+    Record `value` (1 or -1) as the user's vote on the article and return the
+    score delta, or None when the user already voted this way.
+    """
+    using = router.db_for_write(Vote)
+    votes = Vote.objects.using(using).filter(user_id=user_id, article_id=article.pk)
+    with transaction.atomic(using=using):
+        for _ in range(2):
+            if votes.filter(value=-value).update(value=value, updated_at=timezone.now()):
+                delta = 2 * value
+                break
+            try:
+                with transaction.atomic(using=using):
+                    Vote.objects.using(using).create(user_id=user_id, article_id=article.pk, value=value)
+                delta = value
+                break
+            except IntegrityError:
+                # a vote exists: either this same value, or a concurrent opposite one to flip next round
+                continue
+        else:
+            return None
+        add_score(article, delta, using)
+    return delta
+
+
+def set_score_shards(article, shards, using=None):
+    """
+    Spread the article's votes over `shards` counter rows (0 turns sharding off).
+    Rows are never deleted here: rows beyond the new count stop receiving votes
+    and are still folded, so no delta is lost to a vote racing the switch.
+    """
+    using = using or router.db_for_write(Article)
+    ArticleScoreShard.objects.using(using).bulk_create(
+        [ArticleScoreShard(article_id=article.pk, shard=i) for i in range(shards)], ignore_conflicts=True,
+    )
+    Article.objects.using(using).filter(pk=article.pk).update(score_shards=shards)
+    article.score_shards = shards
+
+
+def fold_score_shards(article_names=None, using=None):
+    """
+    Move pending shard deltas into Article.score. Each shard is decremented by
+    the amount read (not reset), so votes landing meanwhile are kept. Returns
+    the number of articles folded.
+    """
+    using = using or router.db_for_write(Article)
+    shards = ArticleScoreShard.objects.using(using).exclude(delta=0)
+    if article_names is not None:
+        shards = shards.filter(article_id__in=article_names)
+
+    pending = {}
+    for pk, article_id, delta in shards.order_by("article_id", "shard").values_list("pk", "article_id", "delta"):
+        pending.setdefault(article_id, []).append((pk, delta))
+
+    for article_id, rows in pending.items():
+        with transaction.atomic(using=using):
+            for pk, delta in rows:
+                ArticleScoreShard.objects.using(using).filter(pk=pk).update(delta=F("delta") - delta)
+            total = sum(delta for _, delta in rows)
+            Article.objects.using(using).filter(pk=article_id).update(score=F("score") + total)
+    return len(pending)
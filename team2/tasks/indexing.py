@@ -1,12 +1,25 @@
 import logging
+import uuid
+from itertools import islice
 
 from celery import shared_task
 from django.conf import settings
-from team2.models import Article, Version
+from django.core.cache import cache
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from team2.models import Article, Tag, Version
 
 logger = logging.getLogger(__name__)
 
+# Alias that search and single-document updates go through; full reindexes
+# build a fresh "articles-<timestamp>" index behind it and swap atomically.
 INDEX_NAME = "articles"
+BULK_CHUNK_SIZE = 500
+BULK_REQUEST_TIMEOUT = 120
+# one full reindex at a time across processes (every process queues one at startup)
+REINDEX_LOCK_KEY = "team2:reindex-articles"
+REINDEX_LOCK_TIMEOUT = 30 * 60
+ALIAS_SWAP_ATTEMPTS = 3
 _ES = None
 
 
@@ -18,17 +31,158 @@ def _get_es():
     return _ES
 
 
-@shared_task(bind=True, max_retries=2, default_retry_delay=10)
-def index_article_version(self, results, version_name):
-    version = Version.objects.get(name=version_name)
-    body = {
-        "article_name": version.article.name,
+def article_document(article_name, version):
+    return {
+        "article_name": article_name,
         "version_name": version.name,
         "content": version.content,
         "summary": version.summary,
         "tags": [tag.name for tag in version.tags.all()],
     }
 
+
+def iter_article_actions(index, articles=None, chunk_size=BULK_CHUNK_SIZE):
+    """Bulk actions for every published article, read in chunk_size batches (tags prefetched per batch)."""
+    if articles is None:
+        articles = Article.objects.filter(current_version__isnull=False)
+    articles = articles.select_related('current_version').prefetch_related(
+        Prefetch('current_version__tags', queryset=Tag.objects.using(articles.db))
+    ).order_by('name')
+    for article in articles.iterator(chunk_size=chunk_size):
+        yield {
+            "_index": index,
+            "_id": article.name,
+            "_source": article_document(article.name, article.current_version),
+        }
+
+
+def bulk_index_articles(index=INDEX_NAME, es=None, articles=None, chunk_size=BULK_CHUNK_SIZE, threads=1):
+    """
+    Index articles with the bulk helpers: streaming_bulk on one connection, or
+    parallel_bulk with `threads` workers. Returns (indexed, errors).
+    """
+    from elasticsearch.helpers import streaming_bulk
+
+    es = (es or _get_es()).options(request_timeout=BULK_REQUEST_TIMEOUT)
+    actions = iter_article_actions(index, articles, chunk_size)
+    if threads > 1:
+        results = _parallel_bulk_batches(es, actions, threads, chunk_size)
+    else:
+        # retries 429 (cluster busy) chunks with backoff
+        results = streaming_bulk(es, actions, chunk_size=chunk_size, max_retries=3, raise_on_error=False)
+
+    indexed, errors = 0, []
+    for ok, item in results:
+        if ok:
+            indexed += 1
+        else:
+            errors.append(item)
+    return indexed, errors
+
+
+def _parallel_bulk_batches(es, actions, threads, chunk_size):
+    # parallel_bulk consumes its input from a pool thread; reading the queryset
+    # here keeps the database work on the caller's connection.
+    from elasticsearch.helpers import parallel_bulk
+
+    while True:
+        batch = list(islice(actions, threads * chunk_size))
+        if not batch:
+            return
+        yield from parallel_bulk(es, batch, thread_count=threads, chunk_size=chunk_size, raise_on_error=False)
+
+
+def _aliased_indices(es, alias):
+    from elasticsearch import NotFoundError
+
+    try:
+        return sorted(es.indices.get_alias(name=alias).body)
+    except NotFoundError:
+        return []
+
+
+def _swap_alias(es, alias, new_index):
+    """
+    Point `alias` at new_index only, in one update_aliases call. The current
+    targets are re-read right before each attempt, and the call is retried if
+    one of them was deleted in between. Returns the indices the alias left.
+    """
+    from elasticsearch import NotFoundError
+
+    for attempt in range(ALIAS_SWAP_ATTEMPTS):
+        old_indices = [index for index in _aliased_indices(es, alias) if index != new_index]
+        actions = [{"remove": {"index": index, "alias": alias, "must_exist": False}} for index in old_indices]
+        if not old_indices and es.indices.exists(index=alias):
+            # a concrete index from before aliases were used; dropped atomically with the swap
+            actions.append({"remove_index": {"index": alias}})
+        actions.append({"add": {"index": new_index, "alias": alias}})
+        try:
+            es.indices.update_aliases(actions=actions)
+            return old_indices
+        except NotFoundError:
+            if attempt == ALIAS_SWAP_ATTEMPTS - 1:
+                raise
+
+
+def reindex_articles(es=None, alias=INDEX_NAME, chunk_size=BULK_CHUNK_SIZE, threads=1):
+    """
+    Zero-downtime full reindex: load a new index with refresh disabled, restore
+    refresh, then move the alias to it in one update_aliases call and drop the
+    old indices. Searches keep hitting the old index until the swap. Returns
+    the number of indexed articles, or None when another reindex holds the lock.
+    """
+    token = uuid.uuid4().hex
+    if not cache.add(REINDEX_LOCK_KEY, token, REINDEX_LOCK_TIMEOUT):
+        logger.info("Reindex of %s skipped: another one is running.", alias)
+        return None
+    try:
+        return _reindex(es or _get_es(), alias, chunk_size, threads)
+    finally:
+        if cache.get(REINDEX_LOCK_KEY) == token:
+            cache.delete(REINDEX_LOCK_KEY)
+
+
+def _reindex(es, alias, chunk_size, threads):
+    from elasticsearch.helpers import BulkIndexError
+
+    started = timezone.now()
+    new_index = f"{alias}-{started:%Y%m%d%H%M%S%f}"
+
+    es.indices.create(index=new_index, settings={"refresh_interval": "-1"})
+    try:
+        indexed, errors = bulk_index_articles(new_index, es=es, chunk_size=chunk_size, threads=threads)
+        if errors:
+            raise BulkIndexError(f"{len(errors)} document(s) failed to index into {new_index}", errors)
+        # null resets refresh_interval to the cluster default
+        es.indices.put_settings(index=new_index, settings={"refresh_interval": None})
+        es.indices.refresh(index=new_index)
+        old_indices = _swap_alias(es, alias, new_index)
+    except Exception:
+        es.options(ignore_status=404).indices.delete(index=new_index)
+        raise
+
+    # the alias has moved; an index already dropped by an overlapping run is not an error
+    for index in old_indices:
+        es.options(ignore_status=404).indices.delete(index=index)
+
+    # single-document updates made during the load went to the old index; replay them
+    changed = Article.objects.filter(current_version__isnull=False).filter(
+        Q(updated_at__gte=started) | Q(current_version__updated_at__gte=started)
+    )
+    caught_up, _ = bulk_index_articles(alias, es=es, articles=changed, chunk_size=chunk_size)
+
+    logger.info(
+        "Reindexed %d articles into %s (%d caught up, replaced %s).",
+        indexed, new_index, caught_up, ", ".join(old_indices) or alias,
+    )
+    return indexed
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=10)
+def index_article_version(self, results, version_name):
+    version = Version.objects.get(name=version_name)
+    body = article_document(version.article.name, version)
+
     try:
         _get_es().index(index=INDEX_NAME, id=version.article.name, document=body)
     except Exception as exc:
@@ -37,28 +191,14 @@ def index_article_version(self, results, version_name):
 
 @shared_task(bind=True, max_retries=1, default_retry_delay=30)
 def index_all_articles(self):
-    es = _get_es()
-    articles = Article.objects.filter(
-        current_version__isnull=False
-    ).select_related('current_version')
-
-    indexed = 0
-    for article in articles:
-        version = article.current_version
-        body = {
-            "article_name": article.name,
-            "version_name": version.name,
-            "content": version.content,
-            "summary": version.summary,
-            "tags": [tag.name for tag in version.tags.all()],
-        }
-        try:
-            es.index(index=INDEX_NAME, id=article.name, document=body)
-            indexed += 1
-        except Exception:
-            logger.exception("Failed to index article %s", article.name)
+    try:
+        indexed = reindex_articles()
+    except Exception as exc:
+        logger.exception("Startup indexing failed")
+        raise self.retry(exc=exc)
 
-    logger.info("Startup indexing complete: %d articles indexed.", indexed)
+    if indexed is not None:
+        logger.info("Startup indexing complete: %d articles indexed.", indexed)
     return indexed
 
 
@@ -1,116 +1,101 @@
-import copy
-import json
 import logging
-import re
-import sys
 
 from celery import shared_task
-from django.conf import settings
-from team2.models import Article, Tag, Version
-from team2.models import Article, Version
-
-MODEL_NAME = "gemini-2.5-flash"
-_CLIENT = None
-
-
-def _get_client():
-    global _CLIENT
-    if _CLIENT is None:
-        from google import genai
-        _CLIENT = genai.Client(api_key=settings.GEMINI_API_KEY)
-    return _CLIENT
-
-
-@shared_task(bind=True, max_retries=2, default_retry_delay=10)
-def tag_article(self, article_name):
-    article = Article.objects.get(name=article_name)
-    version_name = article.current_version
-    if version_name is None:
+from team2.enrichment import BATCH_SIZE, EnrichmentIncomplete, enrich_versions, pending_versions
+from team2.llm import LLMRateLimited
+from team2.models import Article
+from team2.scoring import fold_score_shards
+
+logger = logging.getLogger(__name__)
+
+# Model-bound tasks are rate limited per worker and back off exponentially on
+# provider 429s; with worker_prefetch_multiplier=1 (team2/celery.py) the
+# backlog waits in the broker instead of piling up inside a worker.
+LLM_RATE_LIMIT = "12/m"
+LLM_TASK_OPTIONS = {
+    "bind": True,
+    "rate_limit": LLM_RATE_LIMIT,
+    "acks_late": True,
+    "autoretry_for": (LLMRateLimited,),
+    "retry_backoff": 15,
+    "retry_backoff_max": 600,
+    "retry_jitter": True,
+    "max_retries": 5,
+}
+
+
+def _enrich_article(task, article_name):
+    try:
+        article = Article.objects.select_related('current_version').get(name=article_name)
+    except Article.DoesNotExist:
+        return None
+    version = article.current_version
+    if version is None:
         return None
 
-    version = Version.objects.get(name=version_name)
-    content = version.content
-
-    existing_tags = list(Tag.objects.values_list("name", flat=True))
-
-    prompt = f"""You are a content classification assistant. Your ONLY output must be a single valid JSON object with no extra text, no markdown fences, no explanation.
-
-Select relevant tags from EXISTING TAGS. Only suggest NEW tags if absolutely necessary. Maximum 5 total tags. Use concise Farsi tags. Prefer existing tags.
-
-Output format (respond with ONLY this JSON, nothing else):
-{{"selected_existing_tags": ["tag1"], "new_tags": ["new_tag1"]}}
-
-EXISTING TAGS: {existing_tags}
-
-ARTICLE:
-{content}"""
-
+    # other published-but-unsummarized versions ride along in the same prompt
+    batch = [version] + pending_versions(exclude=[version.name], limit=BATCH_SIZE - 1)
     try:
-        response = _get_client().models.generate_content(model=MODEL_NAME, contents=prompt)
-        
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = re.sub(r'^```(?:json)?\s*', '', text)
-            text = re.sub(r'```\s*$', '', text)
-        match = re.search(r'\{[^{}]*\}', text, re.DOTALL)
-        if match:
-            text = match.group(0)
-        data = json.loads(text)
-
-        selected_existing = data.get("selected_existing_tags", [])
-        new_tags = data.get("new_tags", [])
+        stats = enrich_versions(batch)
+    except LLMRateLimited:
+        raise
     except Exception as exc:
-        raise self.retry(exc=exc)
+        raise task.retry(exc=exc, max_retries=2, countdown=10)
+    if version.name in stats.failed:
+        # the answer missed this version; enrich_pending_versions (beat) picks it up if the retries run out
+        exc = EnrichmentIncomplete(f"no enrichment for {version.name} in the model answer")
+        raise task.retry(exc=exc, max_retries=2, countdown=10)
 
-    for tag_name in selected_existing:
-        try:
-            tag = Tag.objects.get(name=tag_name)
-            version.tags.add(tag)
-        except Tag.DoesNotExist:
-            continue
+    logger.info(
+        "Enriched %d version(s) for %s: %d cached, %d call(s), %d+%d tokens.",
+        stats.versions, article_name, stats.cache_hits, stats.calls, stats.prompt_tokens, stats.output_tokens,
+    )
+    return stats.results.get(version.name)
 
-    for tag_name in new_tags:
-        tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-        version.tags.add(tag)
 
+@shared_task(**LLM_TASK_OPTIONS)
+def enrich_article(self, article_name):
+    """Tags and summary of the article's current version from one cached, batched model call."""
+    return _enrich_article(self, article_name)
+
+
+@shared_task(**LLM_TASK_OPTIONS)
+def tag_article(self, article_name):
+    result = _enrich_article(self, article_name)
+    if result is None:
+        return None
     return {
-        "selected_existing_tags": selected_existing,
-        "new_tags": new_tags,
+        "selected_existing_tags": result["selected_existing_tags"],
+        "new_tags": result["new_tags"],
     }
 
 
-@shared_task(bind=True, max_retries=2, default_retry_delay=10)
+@shared_task(**LLM_TASK_OPTIONS)
 def summarize_article(self, article_name):
-    article = Article.objects.get(name=article_name)
-    version_name = article.current_version
-
-    if version_name is None:
-        return
-
-    version = Version.objects.get(name=version_name)
-    content = version.content
-
-    prompt = f"""
-You are an assistant that writes concise, neutral summaries.
-
-Summarize the following article in 3–6 sentences in FARSI.
-Do not add information that is not present.
-Be factual and clear.
+    result = _enrich_article(self, article_name)
+    if result is None:
+        return None
+    return result["summary"]
 
-ARTICLE:
-\"\"\"
-{content}
-\"\"\"
-"""
 
-    try:
-        response = _get_client().models.generate_content(model=MODEL_NAME, contents=prompt)
-    except Exception as exc:
-        raise self.retry(exc=exc)
-
-    summary = response.text.strip()
+@shared_task(**LLM_TASK_OPTIONS)
+def enrich_pending_versions(self, limit=200):
+    """
+    Backfill: enrich up to `limit` published versions that have no summary yet.
+    Periodic (see beat_schedule in team2/celery.py) so versions whose task gave up are retried.
+    """
+    stats = enrich_versions(pending_versions(limit=limit))
+    return {
+        "versions": stats.versions,
+        "cache_hits": stats.cache_hits,
+        "calls": stats.calls,
+        "prompt_tokens": stats.prompt_tokens,
+        "output_tokens": stats.output_tokens,
+        "failed": stats.failed,
+    }
 
-    version.summary = summary
-    version.save(update_fields=["summary"])
 
-    return summary
+@shared_task
+def fold_article_score_shards():
+    """Periodic (see beat_schedule in team2/celery.py): move sharded vote deltas into Article.score."""
+    return fold_score_shards()
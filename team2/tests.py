@@ -1,6 +1,447 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from elasticsearch import ApiError
+from elasticsearch.helpers import BulkIndexError
+
+from team2.enrichment import EnrichmentIncomplete, TagIndex, enrich_versions, pending_versions
+from team2.fake_es import FakeCluster
+from team2.fake_llm import FakeLLM
+from team2.models import Article, ArticleScoreShard, LLMCall, LLMResult, Tag, Version, Vote
+from team2.scoring import apply_vote, fold_score_shards, live_score, set_score_shards
+from team2.rankings import CACHE_KEY, compute_top_articles_by_tag, invalidate_top_articles, top_articles_by_tag
+from team2.tasks import indexing
+from team2.tasks.indexing import INDEX_NAME, reindex_articles, search_articles_semantic
+from team2.tasks.tasks import enrich_article, summarize_article, tag_article
+
 
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team2/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+class BulkIndexingTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        self.cluster = FakeCluster()
+        self.es = self.cluster.client()
+        user = uuid.uuid4()
+        tag = Tag.objects.create(name="history")
+        for i in range(5):
+            article = Article.objects.create(name=f"article-{i}", creator_id=user)
+            version = Version.objects.create(
+                name=f"article-{i}-v1", article=article, editor_id=user,
+                content=f"persian history part {i}", summary=f"summary {i}",
+            )
+            version.tags.add(tag)
+            if i < 4:
+                article.current_version = version
+                article.save()
+
+    def _aliased(self):
+        return sorted(index for index, aliases in self.cluster.aliases.items() if INDEX_NAME in aliases)
+
+    def test_reindex_loads_new_index_with_refresh_disabled_then_swaps_alias(self):
+        indexed = reindex_articles(es=self.es, chunk_size=3)
+
+        self.assertEqual(indexed, 4)
+        [index] = self._aliased()
+        docs = self.cluster.documents(INDEX_NAME)
+        self.assertEqual(sorted(docs), ["article-0", "article-1", "article-2", "article-3"])
+        self.assertEqual(docs["article-2"]["tags"], ["history"])
+        self.assertEqual(self.cluster.count("PUT", "/_bulk") + self.cluster.count("POST", "/_bulk"), 2)
+
+        # refresh stays off until every bulk chunk is in, and the alias moves last
+        paths = [path for _, path in self.cluster.requests]
+        last_bulk = max(i for i, path in enumerate(paths) if path == "/_bulk")
+        self.assertLess(last_bulk, paths.index(f"/{index}/_settings"))
+        self.assertLess(paths.index(f"/{index}/_refresh"), paths.index("/_aliases"))
+        self.assertEqual(self.cluster.refresh_interval(index), "1s")
+
+    def test_reindex_replaces_legacy_index_and_previous_generation(self):
+        self.es.index(index=INDEX_NAME, id="stale", document={"article_name": "stale"})
+        reindex_articles(es=self.es)
+        first = self._aliased()
+        self.assertNotIn(INDEX_NAME, self.cluster.indices)
+        self.assertNotIn("stale", self.cluster.documents(INDEX_NAME))
+
+        Article.objects.filter(name="article-0").update(current_version=None)
+        reindex_articles(es=self.es)
+        second = self._aliased()
+        self.assertNotEqual(first, second)
+        self.assertEqual(sorted(self.cluster.indices), second)
+        self.assertEqual(len(self.cluster.documents(INDEX_NAME)), 3)
+
+    def test_failed_load_keeps_serving_the_old_index(self):
+        reindex_articles(es=self.es)
+        before = self._aliased()
+
+        with mock.patch.object(FakeCluster, "_write_target", return_value=None):
+            with self.assertRaises(BulkIndexError):
+                reindex_articles(es=self.es)
+
+        self.assertEqual(self._aliased(), before)
+        self.assertEqual(sorted(self.cluster.indices), before)
+
+    def test_failed_swap_drops_the_new_index(self):
+        reindex_articles(es=self.es)
+        before = self._aliased()
+
+        with mock.patch.object(FakeCluster, "_update_aliases", return_value=(500, {"error": "boom", "status": 500})):
+            with self.assertRaises(ApiError):
+                reindex_articles(es=self.es)
+
+        self.assertEqual(sorted(self.cluster.indices), before)
+        self.assertEqual(self._aliased(), before)
+
+    def test_swap_rereads_the_alias_when_an_old_index_is_gone(self):
+        reindex_articles(es=self.es)
+        [first] = self._aliased()
+
+        # an overlapping run already dropped the index this run read as current
+        real = indexing._aliased_indices
+        stale = iter([["articles-deleted"]])
+        with mock.patch.object(indexing, "_aliased_indices", side_effect=lambda *a: next(stale, None) or real(*a)):
+            self.assertEqual(reindex_articles(es=self.es), 4)
+
+        [second] = self._aliased()
+        self.assertNotEqual(first, second)
+        self.assertEqual(sorted(self.cluster.indices), [second])
+
+    def test_only_one_reindex_runs_at_a_time(self):
+        cache.add(indexing.REINDEX_LOCK_KEY, "other-run")
+        self.addCleanup(cache.delete, indexing.REINDEX_LOCK_KEY)
+
+        self.assertIsNone(reindex_articles(es=self.es))
+        self.assertEqual(self.cluster.indices, {})
+
+        cache.delete(indexing.REINDEX_LOCK_KEY)
+        self.assertEqual(reindex_articles(es=self.es), 4)
+        self.assertIsNone(cache.get(indexing.REINDEX_LOCK_KEY))
+
+    def test_search_goes_through_the_alias(self):
+        reindex_articles(es=self.es, threads=2, chunk_size=2)
+        with mock.patch("team2.tasks.indexing._get_es", return_value=self.es):
+            results = search_articles_semantic("part 3")
+        self.assertEqual(results[0]["article_name"], "article-3")
+        self.assertEqual(results[0]["tags"], ["history"])
+
+
+class EnrichmentTests(TestCase):
+    databases = {"default", "team2"}
+
+    CONTENTS = {
+        "football": "تیم ملی فوتبال ایران در جام جهانی بازی کرد. هواداران فوتبال خوشحال شدند.",
+        "poetry": "حافظ از بزرگترین شاعران ادبیات فارسی است. دیوان او بارها چاپ شده است.",
+        "history": "تاریخ ایران باستان با هخامنشیان آغاز می‌شود. کوروش بنیان‌گذار آن بود.",
+    }
+
+    def setUp(self):
+        self.user = uuid.uuid4()
+        for name in ["فوتبال", "ادبیات فارسی", "تاریخ ایران", "تاریخ معاصر", "سینما"]:
+            Tag.objects.create(name=name)
+        for name, content in self.CONTENTS.items():
+            self._publish(name, content)
+        Article.objects.create(name="draft", creator_id=self.user)
+
+    def _publish(self, name, content):
+        article = Article.objects.create(name=name, creator_id=self.user)
+        version = Version.objects.create(name=f"{name}-v1", article=article, editor_id=self.user, content=content)
+        article.current_version = version
+        article.save()
+        return version
+
+    def test_pending_versions_share_one_call_with_prefiltered_tags(self):
+        llm = FakeLLM(tags_per_article=1)
+        stats = enrich_versions(pending_versions(), llm=llm)
+
+        self.assertEqual((stats.versions, stats.calls, stats.cache_hits), (3, 1, 0))
+        self.assertEqual(LLMCall.objects.get().items, 3)
+        self.assertEqual(list(Version.objects.get(name="football-v1").tags.values_list("name", flat=True)), ["فوتبال"])
+        self.assertEqual(list(Version.objects.get(name="history-v1").tags.values_list("name", flat=True)), ["تاریخ ایران"])
+        self.assertEqual(Version.objects.get(name="poetry-v1").summary, "حافظ از بزرگترین شاعران ادبیات فارسی است.")
+        # only tags matching some article are sent
+        self.assertNotIn("سینما", llm.prompts[0])
+        self.assertEqual(pending_versions(), [])
+
+    def test_unchanged_content_skips_the_model(self):
+        llm = FakeLLM()
+        enrich_versions(pending_versions(), llm=llm)
+        copy = self._publish("football-copy", self.CONTENTS["football"])
+
+        stats = enrich_versions([copy, Version.objects.get(name="poetry-v1")], llm=llm)
+        self.assertEqual((stats.calls, stats.cache_hits), (0, 2))
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual(Version.objects.get(name="football-copy-v1").summary, Version.objects.get(name="football-v1").summary)
+        self.assertEqual(sum(LLMResult.objects.values_list("hits", flat=True)), 2)
+
+        edited = Version.objects.get(name="poetry-v1")
+        edited.content += " سعدی نیز شاعر بزرگی است."
+        stats = enrich_versions([edited], llm=llm)
+        self.assertEqual((stats.calls, llm.calls), (1, 2))
+
+    def test_batches_respect_size_and_missing_answers_are_not_cached(self):
+        llm = FakeLLM(drop={"a2"})
+        stats = enrich_versions(pending_versions(), llm=llm, batch_size=2)
+        self.assertEqual(stats.calls, 2)
+        self.assertEqual(len(stats.failed), 1)
+        self.assertEqual(LLMResult.objects.count(), 2)
+
+    def test_tag_index_prefers_specific_matches(self):
+        index = TagIndex(["تاریخ ایران", "تاریخ معاصر", "فوتبال", "ادبیات فارسی"])
+        self.assertEqual(index.candidates(self.CONTENTS["history"])[0], "تاریخ ایران")
+        # a partial match ("ایران") ranks below a full one
+        self.assertEqual(index.candidates(self.CONTENTS["football"]), ["فوتبال", "تاریخ ایران"])
+        self.assertEqual(index.candidates("متنی بی‌ربط"), [])
+
+    def test_tasks_share_one_call_and_retry_after_rate_limit(self):
+        llm = FakeLLM(tags_per_article=1, rate_limited=1)
+        with mock.patch("team2.enrichment.get_llm", return_value=llm):
+            tags = tag_article.apply(args=["football"]).get()
+            summary = summarize_article.apply(args=["football"]).get()
+            self.assertIsNone(enrich_article.apply(args=["draft"]).get())
+
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual(tags["selected_existing_tags"], ["فوتبال"])
+        self.assertEqual(summary, "تیم ملی فوتبال ایران در جام جهانی بازی کرد.")
+        self.assertEqual(LLMCall.objects.get().items, 3)
+
+    def test_task_retries_an_incomplete_answer(self):
+        llm = FakeLLM(tags_per_article=1, truncated=1)
+        with mock.patch("team2.enrichment.get_llm", return_value=llm), self.assertLogs("team2.enrichment", "ERROR"):
+            tags = tag_article.apply(args=["football"]).get()
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(tags["selected_existing_tags"], ["فوتبال"])
+
+        # retries are bounded; the version stays pending for the periodic backfill
+        self._publish("cinema", "فیلم تازه‌ای در جشنواره فجر نمایش داده شد.")
+        llm = FakeLLM(truncated=3)
+        with mock.patch("team2.enrichment.get_llm", return_value=llm), self.assertLogs("team2.enrichment", "ERROR"):
+            with self.assertRaises(EnrichmentIncomplete):
+                enrich_article.apply(args=["cinema"]).get()
+        self.assertEqual(llm.calls, 3)
+        self.assertEqual([version.name for version in pending_versions()], ["cinema-v1"])
+
+    def test_usage_report(self):
+        llm = FakeLLM()
+        enrich_versions(pending_versions(), llm=llm)
+        enrich_versions([self._publish("poetry-copy", self.CONTENTS["poetry"])], llm=llm)
+
+        out = StringIO()
+        call_command("llm_usage_report", stdout=out)
+        report = out.getvalue()
+        self.assertIn("total: 1 call(s) for 3 version(s)", report)
+        self.assertIn("would have been 6", report)
+        self.assertIn("cache: 1 enrichment(s)", report)
+
+
+class TopArticlesByTagTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        cache.delete(CACHE_KEY)
+        user = uuid.uuid4()
+        self.tags = [Tag.objects.create(name=f"tag-{i:02}") for i in range(20)]
+        for i in range(30):
+            article = Article.objects.create(name=f"article-{i:02}", creator_id=user, score=i % 7)
+            version = Version.objects.create(
+                name=f"article-{i:02}-v1", article=article, editor_id=user, summary=f"summary {i}",
+            )
+            version.tags.add(self.tags[i % 20], self.tags[(i + 3) % 20])
+            if i != 29:
+                article.current_version = version
+                article.save()
+
+    def test_ranks_every_tag_in_one_query(self):
+        with self.assertNumQueries(1, using="team2"):
+            result = compute_top_articles_by_tag()
+
+        self.assertEqual(len(result), 20)
+        by_tag = {row["tag"]: row["articles"] for row in result}
+        # tag-03 is on articles 3, 23 (itself) and 0, 20 (the +3 tag)
+        self.assertEqual(
+            by_tag["tag-03"],
+            [
+                {"name": "article-20", "summary": "summary 20", "score": 6},
+                {"name": "article-03", "summary": "summary 3", "score": 3},
+                {"name": "article-23", "summary": "summary 23", "score": 2},
+            ],
+        )
+        # article-29 is not published
+        self.assertNotIn("article-29", [a["name"] for a in by_tag["tag-09"]])
+
+    def test_query_count_does_not_grow_with_tags(self):
+        Tag.objects.bulk_create([Tag(name=f"extra-{i}") for i in range(200)])
+        with self.assertNumQueries(1, using="team2"):
+            compute_top_articles_by_tag()
+
+    def test_cached_until_invalidated(self):
+        first = top_articles_by_tag()
+        Article.objects.filter(name="article-03").update(score=100)
+        with self.assertNumQueries(0, using="team2"):
+            self.assertEqual(top_articles_by_tag(), first)
+
+        with self.captureOnCommitCallbacks(using="team2", execute=True):
+            invalidate_top_articles()
+        by_tag = {row["tag"]: row["articles"] for row in top_articles_by_tag()}
+        self.assertEqual(by_tag["tag-03"][0]["name"], "article-03")
+
+    def test_endpoint(self):
+        res = self.client.get("/team2/api/articles/top-by-tag/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), compute_top_articles_by_tag())
+
+
+class VoteScoringTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        self.article = Article.objects.create(name="article", creator_id=uuid.uuid4())
+
+    def _score(self, article=None):
+        return Article.objects.filter(pk=(article or self.article).pk).values_list(live_score(), flat=True).get()
+
+    def test_insert_flip_and_repeat(self):
+        user = uuid.uuid4()
+        self.assertEqual(apply_vote(self.article, user, 1), 1)
+        self.assertIsNone(apply_vote(self.article, user, 1))
+        self.assertEqual(apply_vote(self.article, user, -1), -2)
+        self.assertEqual(apply_vote(self.article, uuid.uuid4(), -1), -1)
+        self.assertEqual(self._score(), -2)
+        self.assertEqual(Vote.objects.count(), 2)
+
+    def test_sharded_votes_are_live_before_folding(self):
+        set_score_shards(self.article, 4)
+        for _ in range(5):
+            apply_vote(self.article, uuid.uuid4(), 1)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.score, self._score()), (0, 5))
+
+        other = Article.objects.create(name="other", creator_id=uuid.uuid4(), score=3)
+        ordered = Article.objects.annotate(live=live_score()).order_by("-live").values_list("name", flat=True)
+        self.assertEqual(list(ordered), ["article", "other"])
+
+        self.assertEqual(fold_score_shards(), 1)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.score, self._score()), (5, 5))
+        self.assertFalse(ArticleScoreShard.objects.exclude(delta=0).exists())
+        self.assertEqual(fold_score_shards(), 0)
+
+        # turning sharding off keeps unfolded deltas until the next fold
+        apply_vote(self.article, uuid.uuid4(), -1)
+        set_score_shards(self.article, 0)
+        apply_vote(self.article, uuid.uuid4(), -1)
+        self.assertEqual(self._score(), 3)
+        fold_score_shards()
+        self.assertEqual(Article.objects.get(pk=self.article.pk).score, 3)
+        self.assertEqual(other.score, 3)
+
+
+SCRATCH_DB = "team2_votes_scratch"
+
+
+class ScratchRouter:
+    """Sends every team2 query to a file-backed SQLite database so threads see each other's commits."""
+
+    def db_for_read(self, model, **hints):
+        return SCRATCH_DB
+
+    def db_for_write(self, model, **hints):
+        return SCRATCH_DB
+
+
+@override_settings(DATABASE_ROUTERS=["team2.tests.ScratchRouter"])
+class ConcurrentVoteTests(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        conf = dict(connections.settings["team2"])
+        conf.update(ENGINE="django.db.backends.sqlite3", NAME=os.path.join(tmp.name, "votes.sqlite3"), OPTIONS={"timeout": 30})
+        connections.settings[SCRATCH_DB] = conf
+        self.addCleanup(self._drop_scratch_db)
+        with connections[SCRATCH_DB].schema_editor() as editor:
+            for model in apps.get_app_config("team2").get_models():
+                editor.create_model(model)
+
+    def _drop_scratch_db(self):
+        connections[SCRATCH_DB].close()
+        del connections[SCRATCH_DB]
+        del connections.settings[SCRATCH_DB]
+
+    def _run(self, targets):
+        errors = []
+
+        def run(target):
+            try:
+                target()
+            except Exception as exc:  # surfaced in the main thread
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_votes_keep_exact_scores(self):
+        plain = Article.objects.create(name="plain", creator_id=uuid.uuid4())
+        hot = Article.objects.create(name="hot", creator_id=uuid.uuid4())
+        set_score_shards(hot, 4)
+        users = [uuid.uuid4() for _ in range(8 * 10)]
+        expected = {"plain": 0, "hot": 0}
+        plans = []
+        for i in range(8):
+            plan = []
+            for j, user in enumerate(users[i * 10:(i + 1) * 10]):
+                for article in (plain, hot):
+                    # every user votes, repeats, and half of them change their mind
+                    values = [1, 1, -1] if j % 2 else [-1, 1]
+                    plan.extend((article, user, value) for value in values)
+                    expected[article.name] += values[-1]
+            plans.append(plan)
+
+        done = threading.Event()
+
+        def voter(plan):
+            # like the view: every vote loads the article afresh
+            return lambda: [apply_vote(Article.objects.get(pk=article.pk), user, value) for article, user, value in plan]
+
+        def folder():
+            while not done.is_set():
+                fold_score_shards()
+
+        fold_thread = threading.Thread(target=lambda: self._run([folder]))
+        fold_thread.start()
+        try:
+            self._run([voter(plan) for plan in plans])
+        finally:
+            done.set()
+            fold_thread.join()
+
+        live = dict(Article.objects.annotate(live=live_score()).values_list("name", "live"))
+        self.assertEqual(live, expected)
+        fold_score_shards()
+        self.assertEqual(dict(Article.objects.values_list("name", "score")), expected)
+        self.assertEqual(Vote.objects.count(), 2 * len(users))
+
+    def test_duplicate_votes_count_once(self):
+        article = Article.objects.create(name="article", creator_id=uuid.uuid4())
+        user = uuid.uuid4()
+        results = []
+        self._run([lambda: results.append(apply_vote(article, user, 1)) for _ in range(8)])
+        self.assertEqual(sorted(results, key=str), [1] + [None] * 7)
+        self.assertEqual(Article.objects.get().score, 1)
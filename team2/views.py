@@ -5,7 +5,6 @@ import logging
 from django.conf import settings
 from django.http import JsonResponse
 from django.shortcuts import redirect, get_object_or_404
-from django.db import transaction
 from rest_framework import status
 
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
@@ -14,14 +13,15 @@ from rest_framework.response import Response
 from core.auth import api_login_required
 from .authentication import JWTMiddlewareAuthentication
 from django.db.models import Prefetch
-from .models import Article, Version, Vote, PublishRequest, Tag
-from celery import chord
+from .models import Article, Version, PublishRequest
+from celery import chain
 from .serializers import (
     ArticleSerializer, VersionSerializer, CreateArticleSerializer,
     CreateVersionFromVersionSerializer, CreateEmptyVersionSerializer, VoteSerializer,
     PublishRequestSerializer, CreatePublishRequestSerializer,
 )
-from .tasks.tasks import summarize_article, tag_article
+from . import rankings, scoring
+from .tasks.tasks import enrich_article
 from .tasks.indexing import index_article_version, search_articles_semantic
 
 TEAM_NAME = "team2"
@@ -131,28 +131,16 @@ def vote(request):
     value = serializer.validated_data['value']
 
     article = get_object_or_404(Article, name=article_name)
-    user_id = request.user.id
 
-    with transaction.atomic():
-        existing_vote = Vote.objects.filter(user_id=user_id, article=article).first()
-
-        if existing_vote:
-            if existing_vote.value == value:
-                return Response(
-                    {"detail": "You have already voted this way."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            old_value = existing_vote.value
-            existing_vote.value = value
-            existing_vote.save()
-            article.score += value - old_value
-        else:
-            Vote.objects.create(user_id=user_id, article=article, value=value)
-            article.score += value
-
-        article.save()
+    if scoring.apply_vote(article, request.user.id, value) is None:
+        return Response(
+            {"detail": "You have already voted this way."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    rankings.invalidate_top_articles()
 
-    return Response({"article": article.name, "score": article.score, "your_vote": value})
+    score = Article.objects.filter(pk=article.pk).values_list(scoring.live_score(), flat=True).get()
+    return Response({"article": article.name, "score": score, "your_vote": value})
 
 
 @api_view(['PATCH'])
@@ -181,10 +169,11 @@ def publish_version(request, version_name):
 
     article.current_version = version
     article.save()
+    rankings.invalidate_top_articles()
 
-    chord(
-        [tag_article.s(article.name), summarize_article.s(article.name)]
-    )(index_article_version.s(version.name))
+    chain(
+        enrich_article.s(article.name), index_article_version.s(version.name)
+    ).apply_async()
 
     return Response(ArticleSerializer(article).data)
 
@@ -382,10 +371,11 @@ def approve_publish_request(request, pk):
     version = pub_request.version
     article.current_version = version
     article.save()
+    rankings.invalidate_top_articles()
 
-    chord(
-        [tag_article.s(article.name), summarize_article.s(article.name)]
-    )(index_article_version.s(version.name))
+    chain(
+        enrich_article.s(article.name), index_article_version.s(version.name)
+    ).apply_async()
 
     return Response(PublishRequestSerializer(pub_request).data)
 
@@ -421,7 +411,9 @@ def reject_publish_request(request, pk):
 def newest_articles(request):
     articles = Article.objects.filter(
         current_version__isnull=False
-    ).select_related('current_version').order_by('-updated_at')[:10]
+    ).select_related('current_version').annotate(
+        live_score=scoring.live_score()
+    ).order_by('-updated_at')[:10]
 
     data = []
     for a in articles:
@@ -429,7 +421,7 @@ def newest_articles(request):
         data.append({
             "name": a.name,
             "summary": v.summary if v else "",
-            "score": a.score,
+            "score": a.live_score,
         })
     return Response(data)
 
@@ -440,7 +432,9 @@ def newest_articles(request):
 def top_rated_articles(request):
     articles = Article.objects.filter(
         current_version__isnull=False
-    ).select_related('current_version').order_by('-score')[:10]
+    ).select_related('current_version').annotate(
+        live_score=scoring.live_score()
+    ).order_by('-live_score', 'name')[:10]
 
     data = []
     for a in articles:
@@ -448,7 +442,7 @@ def top_rated_articles(request):
         data.append({
             "name": a.name,
             "summary": v.summary if v else "",
-            "score": a.score,
+            "score": a.live_score,
         })
     return Response(data)
 
@@ -457,30 +451,4 @@ def top_rated_articles(request):
 @authentication_classes(AUTH_CLASSES)
 @permission_classes([AllowAny])
 def top_articles_by_tag(request):
-    tags = Tag.objects.all()
-    result = []
-
-    for tag in tags:
-        articles = Article.objects.filter(
-            current_version__isnull=False,
-            current_version__tags=tag,
-        ).select_related('current_version').order_by('-score')[:3]
-
-        if not articles:
-            continue
-
-        items = []
-        for a in articles:
-            v = a.current_version
-            items.append({
-                "name": a.name,
-                "summary": v.summary if v else "",
-                "score": a.score,
-            })
-
-        result.append({
-            "tag": tag.name,
-            "articles": items,
-        })
-
-    return Response(result)
+    return Response(rankings.top_articles_by_tag())
@@ -4,6 +4,7 @@ from team4.models import (
     Facility, FacilityAmenity, Pricing, Image,
     Favorite, Review
 )
+from team4.services import RatingService
 
 
 # =====================================================
@@ -96,7 +97,8 @@ class FacilityAdmin(admin.ModelAdmin):
             'fields': ('description_fa', 'description_en')
         }),
         ('امتیاز و نظرات', {
-            'fields': ('avg_rating', 'review_count')
+            # شمارنده‌ها توسط RatingService نگهداری می‌شوند (reconcile_ratings برای اصلاح)
+            'fields': ('avg_rating', 'review_count', 'rating_histogram')
         }),
         ('وضعیت', {
             'fields': ('status', 'is_24_hour')
@@ -105,7 +107,7 @@ class FacilityAdmin(admin.ModelAdmin):
     
     inlines = [PricingInline, ImageInline, FacilityAmenityInline]
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['avg_rating', 'review_count', 'rating_histogram', 'created_at', 'updated_at']
 
 
 @admin.register(Pricing)
@@ -162,14 +164,14 @@ class ReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'disapprove_reviews']
     
     def approve_reviews(self, request, queryset):
+        facility_ids = list(queryset.values_list('facility_id', flat=True).distinct())
         queryset.update(is_approved=True)
-        for review in queryset:
-            review.update_facility_rating()
+        RatingService.recalculate(facility_ids, using=queryset.db)
     approve_reviews.short_description = "تایید نظرات انتخاب شده"
     
     def disapprove_reviews(self, request, queryset):
+        facility_ids = list(queryset.values_list('facility_id', flat=True).distinct())
         queryset.update(is_approved=False)
-        for review in queryset:
-            review.update_facility_rating()
+        RatingService.recalculate(facility_ids, using=queryset.db)
     disapprove_reviews.short_description = "رد نظرات انتخاب شده"
 
@@ -6,9 +6,10 @@ import math
 
 class Point:
     """Simple Point class to hold longitude and latitude"""
-    def __init__(self, longitude, latitude):
+    def __init__(self, longitude, latitude, srid=4326):
         self.longitude = float(longitude)
         self.latitude = float(latitude)
+        self.srid = srid
     
     def __repr__(self):
         return f"Point({self.longitude}, {self.latitude})"
@@ -65,7 +66,10 @@ class PointField(models.Field):
         super().__init__(*args, **kwargs)
     
     def db_type(self, connection):
-        return 'POINT'
+        if connection.vendor == 'mysql':
+            return 'POINT'
+        # Other backends (SQLite in development/tests) keep the WKT text
+        return 'text'
     
     def from_db_value(self, value, expression, connection):
         """Convert from MySQL POINT to Python Point object"""
@@ -134,6 +138,9 @@ class PointField(models.Field):
         """Prepare value for saving to database - return raw SQL expression"""
         if value is None:
             return None
+        # Expressions (e.g. the Case() built by bulk_update) are compiled by Django itself
+        if hasattr(value, 'as_sql'):
+            return value
             
         # Prepare the value first
         value = self.get_prep_value(value)
@@ -158,13 +165,18 @@ class PointField(models.Field):
     def get_placeholder(self, value, compiler, connection):
         """Return placeholder for SQL query"""
         # For MySQL/MariaDB POINT type, use ST_GeomFromText
-        return "ST_GeomFromText(%s)"
+        # (expressions already wrap each value through Value(output_field=self))
+        if connection.vendor == 'mysql' and not hasattr(value, 'as_sql'):
+            return "ST_GeomFromText(%s)"
+        return "%s"
     
     def select_format(self, compiler, sql, params):
         """Format SELECT to return location as binary data that can be parsed"""
         # Return as-is, MySQL will return as WKB binary
         # Or use ST_AsText for text format
-        return f"ST_AsText({sql})", params
+        if compiler.connection.vendor == 'mysql':
+            return f"ST_AsText({sql})", params
+        return sql, params
     
     def value_to_string(self, obj):
         """Serialize for fixtures"""
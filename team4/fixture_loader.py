@@ -0,0 +1,711 @@
+"""
+بارگذاری انبوه fixtureهای team4 (استان، شهر، روستا، دسته‌بندی، امکانات و مکان‌ها)
+
+هر مرحله (Stage) فایل JSON را به‌صورت جریانی می‌خواند (core.json_stream)، کلیدهای خارجی را با
+نگاشت‌های id→pk که یک‌بار در هر اجرا ساخته می‌شوند (LookupMaps) حل می‌کند و ردیف‌ها را در دسته‌های
+batch_size تایی با یک کوئری IN برای رکوردهای موجود، bulk_create و bulk_update می‌نویسد.
+اگر نوشتن یک دسته خطای دیتابیس بدهد، همان دسته ردیف‌به‌ردیف (هر ردیف در savepoint) تکرار می‌شود
+تا فقط ردیف خراب پرش شود.
+
+run_stages مراحل را به ترتیب وابستگی اجرا می‌کند؛ با workers > 1 مراحل مستقل هم‌زمان اجرا می‌شوند و
+مراحلی که یک group دارند (همهٔ مکان‌ها روی جدول Facility) پشت سر هم.
+"""
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from core.json_stream import iter_json_array
+
+from .fields import Point
+from .models import Amenity, Category, City, Facility, FacilityAmenity, Province, Village
+from .services.rating_service import RatingService
+
+DEFAULT_DB = 'team4'
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 20
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture_path(filename):
+    """مسیر fixture در پوشهٔ اپ؛ در غیر این صورت مسیر نسبی team4/fixtures (مثل دستورات قبلی)"""
+    path = os.path.join(FIXTURES_DIR, filename)
+    if not os.path.exists(path):
+        path = os.path.join('team4', 'fixtures', filename)
+    return path
+
+
+def _point(loc_data):
+    loc_data = loc_data or {}
+    if loc_data.get('latitude') and loc_data.get('longitude'):
+        return Point(float(loc_data['longitude']), float(loc_data['latitude']))
+    return None
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StageResult:
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.missing = False
+        self.seconds = 0.0
+        self.peak_kb = None
+        self.failed = None
+        self.errors = []
+
+    def skip(self, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.skipped
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'missing': self.missing,
+            'failed': self.failed,
+            'seconds': round(self.seconds, 3),
+            'peak_kb': self.peak_kb,
+        }
+
+
+class LookupMaps:
+    """نگاشت‌های id→pk مشترک بین مراحل؛ هر نگاشت یک‌بار ساخته و پس از نوشتن مرحلهٔ مربوط باطل می‌شود"""
+
+    def __init__(self, db=DEFAULT_DB):
+        self.db = db
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, build):
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = build()
+            return self._cache[name]
+
+    def invalidate(self, *names):
+        with self._lock:
+            for name in names:
+                self._cache.pop(name, None)
+
+    def province_ids(self):
+        return self._get('provinces', lambda: set(
+            Province.objects.using(self.db).values_list('province_id', flat=True)
+        ))
+
+    def city_ids(self):
+        return self._get('cities', lambda: set(City.objects.using(self.db).values_list('city_id', flat=True)))
+
+    def city_by_name_fa(self):
+        # مثل filter(name_fa=...).first(): کوچک‌ترین pk برای هر نام
+        def build():
+            by_name = {}
+            for city_id, name_fa in City.objects.using(self.db).order_by('-city_id').values_list('city_id', 'name_fa'):
+                by_name[name_fa] = city_id
+            return by_name
+        return self._get('city_names', build)
+
+    def categories(self):
+        return self._get('categories', lambda: list(
+            Category.objects.using(self.db).order_by('category_id').values_list('category_id', 'name_fa')
+        ))
+
+    def category_ids(self):
+        return {category_id for category_id, _ in self.categories()}
+
+    def category_containing(self, fragment):
+        return next((category_id for category_id, name_fa in self.categories() if fragment in name_fa), None)
+
+    def amenity_ids(self):
+        return self._get('amenities', lambda: set(
+            Amenity.objects.using(self.db).values_list('amenity_id', flat=True)
+        ))
+
+    def resolve_city(self, city_id, city_name):
+        """اول با شناسه، اگر نبود با نام فارسی شهر"""
+        if city_id and city_id in self.city_ids():
+            return city_id
+        if city_name:
+            return self.city_by_name_fa().get(city_name)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# نوشتن دسته‌ای
+# ---------------------------------------------------------------------------
+
+def _update_existing(model, db, objs, fields):
+    """
+    به‌روزرسانی رکوردهای موجود (pk معلوم). bulk_update برای هر فیلد یک CASE روی همهٔ ردیف‌ها می‌سازد و
+    با ۲۳ ستون Facility کند است؛ جایی که دیتابیس upsert دارد، INSERT ... ON CONFLICT(pk) DO UPDATE.
+    """
+    features = connections[db].features
+    if features.supports_update_conflicts:
+        kwargs = {'update_conflicts': True, 'update_fields': fields}
+        if features.supports_update_conflicts_with_target:
+            kwargs['unique_fields'] = [model._meta.pk.name]
+        model.objects.using(db).bulk_create(objs, batch_size=len(objs), **kwargs)
+    else:
+        model.objects.using(db).bulk_update(objs, fields, batch_size=len(objs))
+
+
+def _write(model, db, new, existing, update_fields, result, label):
+    """bulk_create + به‌روزرسانی دسته‌ای در یک تراکنش؛ در صورت خطا ردیف‌به‌ردیف تا ردیف خراب پیدا و پرش شود"""
+    now = timezone.now()
+    for obj in existing:
+        obj.updated_at = now
+    fields = list(update_fields) + ['updated_at']
+    manager = model.objects.using(db)
+    try:
+        with transaction.atomic(using=db):
+            if new:
+                manager.bulk_create(new, batch_size=len(new))
+            if existing:
+                _update_existing(model, db, existing, fields)
+        result.created += len(new)
+        result.updated += len(existing)
+        return new + existing
+    except DatabaseError:
+        pass
+
+    written = []
+    for obj, is_new in [(o, True) for o in new] + [(o, False) for o in existing]:
+        try:
+            with transaction.atomic(using=db):
+                if is_new:
+                    manager.bulk_create([obj])
+                else:
+                    _update_existing(model, db, [obj], fields)
+        except DatabaseError as e:
+            result.skip(f'{label(obj)}: {e}')
+            continue
+        written.append(obj)
+        if is_new:
+            result.created += 1
+        else:
+            result.updated += 1
+    return written
+
+
+def _upsert(model, db, objs_by_key, key_fields, update_fields, result, label):
+    """objs_by_key: {کلید: شیء ذخیره‌نشده}؛ رکوردهای موجود با یک کوئری IN روی اولین فیلد کلید پیدا می‌شوند"""
+    if not objs_by_key:
+        return []
+    first = key_fields[0]
+    lookup = model.objects.using(db).filter(**{f'{first}__in': {key[0] for key in objs_by_key}})
+    existing_pks = {}
+    for row in lookup.values_list(*key_fields, 'pk'):
+        existing_pks.setdefault(tuple(row[:-1]), row[-1])
+    new, existing = [], []
+    for key, obj in objs_by_key.items():
+        if key in existing_pks:
+            obj.pk = existing_pks[key]
+            existing.append(obj)
+        else:
+            new.append(obj)
+    return _write(model, db, new, existing, update_fields, result, label)
+
+
+# ---------------------------------------------------------------------------
+# مراحل جغرافیا و پایه
+# ---------------------------------------------------------------------------
+
+def load_provinces(path, db, maps, result, batch_size):
+    for batch in _batches(iter_json_array(path), batch_size):
+        objs = {}
+        for _, item in batch:
+            objs[(item['province_id'],)] = Province(
+                province_id=item['province_id'],
+                name_fa=item['name_fa'],
+                name_en=item['name_en'],
+                location=_point(item.get('location')),
+            )
+        _upsert(Province, db, objs, ('province_id',), ('name_fa', 'name_en', 'location'), result,
+                lambda o: o.name_en)
+    maps.invalidate('provinces')
+
+
+def load_cities(path, db, maps, result, batch_size):
+    # شهر با (name_en, province) شناخته می‌شود؛ city_id فقط برای ردیف‌های جدید از fixture گرفته می‌شود
+    province_ids = maps.province_ids()
+    for batch in _batches(iter_json_array(path), batch_size):
+        objs = {}
+        for n, item in batch:
+            p_id = (item.get('province') or {}).get('province_id')
+            location = _point(item.get('location'))
+            if p_id not in province_ids:
+                result.skip(f"{item.get('name_en')}: province {p_id} not found")
+                continue
+            if location is None:
+                result.skip(f"{item.get('name_en')}: missing location")
+                continue
+            objs[(item['name_en'], p_id)] = City(
+                city_id=item['city_id'],
+                province_id=p_id,
+                name_en=item['name_en'],
+                name_fa=item['name_fa'],
+                location=location,
+            )
+        # شناسه‌ای که قبلاً برای شهر دیگری ثبت شده باشد درج نمی‌شود
+        taken = dict(
+            City.objects.using(db)
+            .filter(city_id__in=[o.city_id for o in objs.values()])
+            .values_list('city_id', 'name_en')
+        )
+        for key, obj in list(objs.items()):
+            if obj.city_id in taken and taken[obj.city_id] != obj.name_en:
+                exists = City.objects.using(db).filter(name_en=key[0], province_id=key[1]).exists()
+                if not exists:
+                    result.skip(f'{obj.name_en}: city_id {obj.city_id} already used by {taken[obj.city_id]}')
+                    del objs[key]
+        _upsert(City, db, objs, ('name_en', 'province_id'), ('name_fa', 'location'), result,
+                lambda o: o.name_en)
+    maps.invalidate('cities', 'city_names')
+
+
+def load_villages(path, db, maps, result, batch_size):
+    # مثل دستور قبلی: روستاها هر بار از نو ساخته می‌شوند
+    Village.objects.using(db).all().delete()
+    city_ids = maps.city_ids()
+    seen = set()
+    for batch in _batches(iter_json_array(path), batch_size):
+        new = []
+        for _, item in batch:
+            city_id = (item.get('city') or {}).get('city_id')
+            if city_id not in city_ids:
+                result.skip(f"{item.get('name_fa')}: city {city_id} not found")
+                continue
+            if (city_id, item['name_en']) in seen:
+                result.skip(f"{item.get('name_fa')}: duplicate name_en in city {city_id}")
+                continue
+            seen.add((city_id, item['name_en']))
+            new.append(Village(
+                village_id=item['village_id'],
+                name_fa=item['name_fa'],
+                name_en=item['name_en'],
+                city_id=city_id,
+                location=_point(item.get('location')),
+            ))
+        _write(Village, db, new, [], (), result, lambda o: o.name_fa)
+
+
+def load_categories(path, db, maps, result, batch_size):
+    # name_en یکتاست؛ category_id فقط برای ردیف‌های جدید از pk فیکسچر گرفته می‌شود
+    for batch in _batches(iter_json_array(path), batch_size):
+        objs = {}
+        for _, item in batch:
+            fields = item.get('fields', {})
+            objs[(fields.get('name_en'),)] = Category(
+                category_id=item.get('pk'),
+                name_en=fields.get('name_en'),
+                name_fa=fields.get('name_fa'),
+                is_emergency=fields.get('is_emergency', False),
+                marker_color=fields.get('marker_color', 'blue'),
+            )
+        _upsert(Category, db, objs, ('name_en',), ('name_fa', 'is_emergency', 'marker_color'), result,
+                lambda o: o.name_en)
+    maps.invalidate('categories')
+
+
+def load_amenities(path, db, maps, result, batch_size):
+    for batch in _batches(iter_json_array(path), batch_size):
+        objs = {}
+        for _, item in batch:
+            fields = item.get('fields', {})
+            objs[(item.get('pk'),)] = Amenity(
+                amenity_id=item.get('pk'),
+                name_fa=fields.get('name_fa'),
+                name_en=fields.get('name_en'),
+                icon=fields.get('icon', ''),
+            )
+        _upsert(Amenity, db, objs, ('amenity_id',), ('name_fa', 'name_en', 'icon'), result,
+                lambda o: o.name_en)
+    maps.invalidate('amenities')
+
+
+# ---------------------------------------------------------------------------
+# مکان‌ها (هتل، بیمارستان، رستوران، موزه)
+# ---------------------------------------------------------------------------
+
+class FacilityKind:
+    """
+    تنظیمات هر نوع مکان، مطابق دستورات بارگذاری قبلی.
+    category_id: دسته‌بندی ثابت (موزه)؛ در غیر این صورت category_id خود رکورد و در نبود آن
+    اولین دسته‌بندی‌ای که نامش شامل category_fragment است.
+    rename_duplicates: اگر name_en در همان شهر تکراری بود، شناسهٔ رکورد به آن اضافه شود (موزه)؛
+    در غیر این صورت ردیف پرش می‌شود.
+    """
+
+    def __init__(self, category_fragment, is_24_hour, price_tier, category_id=None,
+                 force_status=False, rename_duplicates=False, fixed_24_hour=False):
+        self.category_fragment = category_fragment
+        self.is_24_hour = is_24_hour
+        self.price_tier = price_tier
+        self.category_id = category_id
+        self.force_status = force_status
+        self.rename_duplicates = rename_duplicates
+        self.fixed_24_hour = fixed_24_hour
+
+
+FACILITY_KINDS = {
+    'hotels': FacilityKind('هتل', is_24_hour=False, price_tier='unknown', force_status=True),
+    'hospitals': FacilityKind('بیمارستان', is_24_hour=True, price_tier='low', force_status=True),
+    'restaurants': FacilityKind('رستوران', is_24_hour=False, price_tier='moderate'),
+    'museums': FacilityKind('موزه', is_24_hour=False, price_tier='moderate', category_id=5,
+                            rename_duplicates=True, fixed_24_hour=True),
+}
+
+# avg_rating و review_count از fixture می‌آیند؛ rating_sum و rating_count_1..5 با RatingService.seeded_counters
+# از روی همان‌ها ساخته می‌شوند تا نظر بعدی روی شمارنده‌های سازگار اعمال شود
+FACILITY_UPDATE_FIELDS = (
+    'name_en', 'category', 'address', 'location', 'location_lat', 'location_lng', 'phone', 'email',
+    'website', 'description_fa', 'description_en', 'avg_rating', 'review_count', 'status',
+    'is_24_hour', 'price_tier',
+) + tuple(RatingService.seeded_counters(0, 0))
+
+
+def _facility(item, kind, city_id, category_id):
+    def text(key):
+        return item.get(key) or ''
+
+    avg_rating = item.get('avg_rating')
+    review_count = item.get('review_count')
+    avg_rating = avg_rating if avg_rating is not None else 0.0
+    review_count = review_count if review_count is not None else 0
+    obj = Facility(
+        name_fa=item['name_fa'],
+        name_en=text('name_en'),
+        city_id=city_id,
+        category_id=category_id,
+        address=text('address'),
+        location=_point(item.get('location')),
+        phone=text('phone'),
+        email=text('email'),
+        website=text('website'),
+        description_fa=text('description_fa'),
+        description_en=text('description_en'),
+        avg_rating=avg_rating,
+        review_count=review_count,
+        **RatingService.seeded_counters(avg_rating, review_count),
+        status=True if kind.force_status else item.get('status', True),
+        is_24_hour=kind.is_24_hour if kind.fixed_24_hour else item.get('is_24_hour', kind.is_24_hour),
+        price_tier=item.get('price_tier') or kind.price_tier,
+    )
+    # bulk_create متد save را صدا نمی‌زند
+    obj.sync_location_columns()
+    return obj
+
+
+def _set_amenities(db, amenities_by_pk):
+    """معادل obj.amenities.set(...) برای یک دسته: یک کوئری خواندن، یک حذف و یک bulk_create"""
+    if not amenities_by_pk:
+        return
+    current = {}
+    for row_id, fac_id, amenity_id in (
+        FacilityAmenity.objects.using(db)
+        .filter(facility_id__in=list(amenities_by_pk))
+        .values_list('id', 'facility_id', 'amenity_id')
+    ):
+        current.setdefault(fac_id, {})[amenity_id] = row_id
+    stale, missing = [], []
+    for fac_id, wanted in amenities_by_pk.items():
+        have = current.get(fac_id, {})
+        stale.extend(row_id for amenity_id, row_id in have.items() if amenity_id not in wanted)
+        missing.extend(
+            FacilityAmenity(facility_id=fac_id, amenity_id=amenity_id) for amenity_id in wanted if amenity_id not in have
+        )
+    if stale:
+        FacilityAmenity.objects.using(db).filter(id__in=stale).delete()
+    if missing:
+        FacilityAmenity.objects.using(db).bulk_create(missing, batch_size=DEFAULT_BATCH_SIZE)
+
+
+def load_facilities(kind_name, path, db, maps, result, batch_size):
+    kind = FACILITY_KINDS[kind_name]
+    valid_amenities = maps.amenity_ids()
+    category_ids = maps.category_ids()
+    default_category = (
+        kind.category_id if kind.category_id in category_ids else maps.category_containing(kind.category_fragment)
+    )
+
+    for batch in _batches(iter_json_array(path), batch_size):
+        rows = []
+        for _, item in batch:
+            name_fa = item.get('name_fa')
+            if not name_fa:
+                continue
+            city_id = maps.resolve_city(item.get('city_id'), item.get('city_name_fa'))
+            if not city_id:
+                result.skip(f"{name_fa}: city not found ({item.get('city_name_fa')}, ID: {item.get('city_id')})")
+                continue
+            if kind.category_id is None and item.get('category_id') in category_ids:
+                category_id = item.get('category_id')
+            else:
+                category_id = default_category
+            if not category_id:
+                result.skip(f'{name_fa}: no category')
+                continue
+            rows.append((item, city_id, category_id))
+        if not rows:
+            continue
+
+        # رکوردهای موجود این شهرها: (name_fa, city) برای update_or_create و (name_en, city) برای قید یکتایی
+        by_name_fa, by_name_en = {}, {}
+        for pk, name_fa, name_en, city_id in (
+            Facility.objects.using(db).filter(city_id__in={r[1] for r in rows}).order_by('-fac_id')
+            .values_list('fac_id', 'name_fa', 'name_en', 'city_id')
+        ):
+            by_name_fa[(name_fa, city_id)] = pk
+            by_name_en[(name_en, city_id)] = pk
+
+        objs, amenities = {}, {}
+        for item, city_id, category_id in rows:
+            key = (item['name_fa'], city_id)
+            obj = _facility(item, kind, city_id, category_id)
+            owner = by_name_fa.get(key, key)
+            holder = by_name_en.get((obj.name_en, city_id))
+            if holder is not None and holder != owner:
+                if kind.rename_duplicates:
+                    obj.name_en += f" ({item.get('id')})"
+                    holder = by_name_en.get((obj.name_en, city_id))
+                if holder is not None and holder != owner:
+                    result.skip(f"{item['name_fa']}: duplicate name_en {obj.name_en!r} in city {city_id}")
+                    continue
+            if key in objs:
+                # تکرار در همان دسته: مثل update_or_create دوم، به‌روزرسانی حساب می‌شود
+                result.updated += 1
+            objs[key] = obj
+            by_name_en[(obj.name_en, city_id)] = owner
+            item_amenities = item.get('amenities')
+            if item_amenities or (kind_name == 'hotels' and item_amenities is not None):
+                amenities[key] = [a for a in item_amenities if a in valid_amenities]
+
+        new, existing = [], []
+        for key, obj in objs.items():
+            if key in by_name_fa:
+                obj.pk = by_name_fa[key]
+                existing.append(obj)
+            else:
+                new.append(obj)
+        written = _write(Facility, db, new, existing, FACILITY_UPDATE_FIELDS, result, lambda o: o.name_fa)
+
+        # روی MySQL bulk_create کلید اصلی را برنمی‌گرداند: شناسه‌ها با یک کوئری خوانده می‌شوند
+        if any(obj.pk is None for obj in written):
+            pks = dict(
+                ((name_fa, city_id), pk) for pk, name_fa, city_id in
+                Facility.objects.using(db).filter(city_id__in={o.city_id for o in written},
+                                                  name_fa__in={o.name_fa for o in written})
+                .values_list('fac_id', 'name_fa', 'city_id')
+            )
+            for obj in written:
+                if obj.pk is None:
+                    obj.pk = pks.get((obj.name_fa, obj.city_id))
+        _set_amenities(db, {
+            obj.pk: set(amenities[(obj.name_fa, obj.city_id)])
+            for obj in written if obj.pk is not None and (obj.name_fa, obj.city_id) in amenities
+        })
+
+
+# ---------------------------------------------------------------------------
+# اجرای مراحل
+# ---------------------------------------------------------------------------
+
+class Stage:
+    def __init__(self, name, filename, load, depends=(), group=None):
+        self.name = name
+        self.filename = filename
+        self.load = load
+        self.depends = depends
+        self.group = group
+
+
+def _facility_stage(kind_name, filename):
+    return Stage(
+        kind_name,
+        filename,
+        lambda path, db, maps, result, batch_size: load_facilities(kind_name, path, db, maps, result, batch_size),
+        depends=('cities', 'categories', 'amenities'),
+        group='facilities',
+    )
+
+
+# ترتیب تعریف = یک ترتیب معتبر وابستگی
+STAGES = {
+    stage.name: stage for stage in [
+        Stage('provinces', 'province.json', load_provinces),
+        Stage('cities', 'cities.json', load_cities, depends=('provinces',)),
+        Stage('villages', 'villages.json', load_villages, depends=('cities',)),
+        Stage('categories', 'categories.json', load_categories),
+        Stage('amenities', 'amenities.json', load_amenities),
+        _facility_stage('hospitals', 'hospitals.json'),
+        _facility_stage('hotels', 'hotels.json'),
+        _facility_stage('restaurants', 'restaurants.json'),
+        _facility_stage('museums', 'museums.json'),
+    ]
+}
+
+
+def run_stage(name, db=DEFAULT_DB, maps=None, filename=None, batch_size=DEFAULT_BATCH_SIZE, track_memory=False):
+    stage = STAGES[name]
+    path = fixture_path(filename or stage.filename)
+    result = StageResult(name, path)
+    if not os.path.exists(path):
+        result.missing = True
+        return result
+    maps = maps or LookupMaps(db)
+    if track_memory and tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    stage.load(path, db, maps, result, batch_size)
+    result.seconds = time.perf_counter() - started
+    if track_memory and tracemalloc.is_tracing():
+        result.peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+    return result
+
+
+def _run_guarded(name, db, maps, batch_size, track_memory=False):
+    # مثل load_all_data قبلی: خطای یک مرحله بقیه را متوقف نمی‌کند
+    try:
+        return run_stage(name, db, maps, batch_size=batch_size, track_memory=track_memory)
+    except Exception as e:
+        result = StageResult(name)
+        result.failed = f'{type(e).__name__}: {e}'
+        return result
+
+
+def default_workers(db=DEFAULT_DB):
+    # SQLite یک نویسنده دارد؛ اجرای هم‌زمان فقط قفل می‌سازد
+    return 1 if connections[db].vendor == 'sqlite' else 4
+
+
+def _max_rss_kb():
+    """بیشینهٔ RSS پروسه؛ ماژول resource فقط روی POSIX هست (روی ویندوز None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_stages(names=None, db=DEFAULT_DB, workers=1, batch_size=DEFAULT_BATCH_SIZE, track_memory=False,
+               on_result=None):
+    """
+    اجرای مراحل به ترتیب وابستگی؛ وابستگی‌هایی که در names نیستند موجود فرض می‌شوند.
+    خروجی: (لیست StageResult به ترتیب پایان، گزارش کلی با زمان و حافظهٔ اوج)
+    """
+    names = [name for name in STAGES if names is None or name in names]
+    maps = LookupMaps(db)
+    results = []
+    started = time.perf_counter()
+    if track_memory:
+        tracemalloc.start()
+
+    def finished(result):
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    try:
+        if workers <= 1:
+            for name in names:
+                finished(_run_guarded(name, db, maps, batch_size, track_memory))
+        else:
+            _run_parallel(names, db, maps, workers, batch_size, finished)
+    finally:
+        peak_kb = None
+        if track_memory:
+            # در حالت ترتیبی peak پیش از هر مرحله صفر می‌شود؛ اوج کل = بیشینهٔ مراحل
+            peak_kb = max([tracemalloc.get_traced_memory()[1] // 1024] + [r.peak_kb or 0 for r in results])
+            tracemalloc.stop()
+
+    summary = {
+        'seconds': round(time.perf_counter() - started, 3),
+        'rows': sum(r.rows for r in results),
+        'peak_kb': peak_kb,
+        'max_rss_kb': _max_rss_kb(),
+        'workers': workers,
+    }
+    return results, summary
+
+
+def _run_parallel(names, db, maps, workers, batch_size, finished):
+    group_locks = {STAGES[n].group: threading.Lock() for n in names if STAGES[n].group}
+
+    def work(name):
+        lock = group_locks.get(STAGES[name].group)
+        try:
+            if lock:
+                with lock:
+                    return _run_guarded(name, db, maps, batch_size)
+            return _run_guarded(name, db, maps, batch_size)
+        finally:
+            # اتصال‌های دیتابیس هر thread جداست
+            connections.close_all()
+
+    pending = list(names)
+    done = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in list(pending):
+                if all(dep in done or dep not in names for dep in STAGES[name].depends):
+                    pending.remove(name)
+                    running[pool.submit(work, name)] = name
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                done.add(running.pop(future))
+                finished(future.result())
+
+
+# ---------------------------------------------------------------------------
+# دستورات مدیریتی load_*
+# ---------------------------------------------------------------------------
+
+def add_stage_arguments(parser, stage_name):
+    parser.add_argument('--database', type=str, default=DEFAULT_DB, help='The database to use')
+    parser.add_argument('--file', type=str, default=STAGES[stage_name].filename, help='Fixture file name')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+
+def run_stage_command(command, stage_name, options):
+    """اجرای یک مرحله از دستور load_* و چاپ خلاصه"""
+    result = run_stage(
+        stage_name,
+        db=options['database'],
+        filename=options['file'],
+        batch_size=options['batch_size'],
+    )
+    if result.missing:
+        command.stdout.write(command.style.ERROR(f'❌ File not found: {result.path}'))
+        return result
+    for message in result.errors:
+        command.stdout.write(command.style.WARNING(f'⚠ {message}'))
+    command.stdout.write(command.style.SUCCESS(
+        f'\n✅ {stage_name}: {result.created} created, {result.updated} updated, '
+        f'{result.skipped} skipped in {result.seconds:.2f}s on database "{options["database"]}"'
+    ))
+    return result
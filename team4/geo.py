@@ -0,0 +1,120 @@
+"""
+Geo query layer on top of PointField.
+
+Narrows candidates in the database before computing distances:
+- MySQL/MariaDB: MBRContains on the spatial index of `location`, then ST_Distance_Sphere
+- Other backends (SQLite): bounding box on the denormalized `location_lat`/`location_lng`
+  columns, then haversine computed in SQL
+
+In both cases the result is a lazy queryset annotated with `distance_km` and ordered by it,
+so pagination only fetches the rows of the requested page.
+"""
+import math
+
+from django.db import connections, models
+from django.db.models import F, FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+from .fields import Point
+
+EARTH_RADIUS_KM = 6371
+
+
+def bounding_box(point, radius_km):
+    """
+    Bounding box (min_lng, min_lat, max_lng, max_lat) that contains every point
+    within radius_km of the given point.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat = max(-90.0, point.latitude - dlat)
+    max_lat = min(90.0, point.latitude + dlat)
+
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return -180.0, min_lat, 180.0, max_lat
+
+    dlng = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(point.latitude)))))
+    if dlng >= 180.0:
+        return -180.0, min_lat, 180.0, max_lat
+    return (
+        max(-180.0, point.longitude - dlng),
+        min_lat,
+        min(180.0, point.longitude + dlng),
+        max_lat,
+    )
+
+
+def _haversine_km(lat_field, lng_field, point):
+    """Haversine distance (km) between two columns and a fixed point, as an ORM expression."""
+    lat = Value(point.latitude, output_field=FloatField())
+    lng = Value(point.longitude, output_field=FloatField())
+    a = (
+        Power(Sin((Radians(F(lat_field)) - Radians(lat)) / 2), 2)
+        + Cos(Radians(lat)) * Cos(Radians(F(lat_field)))
+        * Power(Sin((Radians(F(lng_field)) - Radians(lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM, output_field=FloatField()) * ASin(Sqrt(a))
+
+
+class GeoQuerySet(models.QuerySet):
+    """QuerySet for models with a `location` PointField and denormalized lat/lng columns."""
+
+    location_field = 'location'
+    lat_field = 'location_lat'
+    lng_field = 'location_lng'
+
+    def _is_mysql(self):
+        return connections[self.db].vendor == 'mysql'
+
+    def _location_column(self):
+        column = self.model._meta.get_field(self.location_field).column
+        return f'{self.model._meta.db_table}.{column}'
+
+    def within_bbox(self, point, radius_km):
+        """Facilities inside the bounding box of the search circle (index-assisted)."""
+        if isinstance(point, (tuple, list)):
+            point = Point(point[0], point[1])
+        min_lng, min_lat, max_lng, max_lat = bounding_box(point, radius_km)
+
+        if self._is_mysql():
+            polygon = (
+                f'POLYGON(({min_lng} {min_lat}, {max_lng} {min_lat}, {max_lng} {max_lat}, '
+                f'{min_lng} {max_lat}, {min_lng} {min_lat}))'
+            )
+            return self.alias(
+                in_bbox=RawSQL(
+                    f'MBRContains(ST_GeomFromText(%s), {self._location_column()})',
+                    (polygon,),
+                    output_field=models.BooleanField(),
+                )
+            ).filter(in_bbox=True)
+
+        return self.filter(**{
+            f'{self.lat_field}__range': (min_lat, max_lat),
+            f'{self.lng_field}__range': (min_lng, max_lng),
+        })
+
+    def within_radius(self, point, radius_km):
+        """
+        Facilities within radius_km of the point, annotated with `distance_km`
+        and ordered by distance (nearest first).
+        """
+        if isinstance(point, (tuple, list)):
+            point = Point(point[0], point[1])
+        queryset = self.within_bbox(point, radius_km)
+
+        if self._is_mysql():
+            distance = RawSQL(
+                f'ST_Distance_Sphere({self._location_column()}, ST_GeomFromText(%s)) / 1000',
+                (f'POINT({point.longitude} {point.latitude})',),
+                output_field=FloatField(),
+            )
+        else:
+            distance = _haversine_km(self.lat_field, self.lng_field, point)
+
+        return (
+            queryset.annotate(distance_km=distance)
+            .filter(distance_km__lte=radius_km)
+            .order_by('distance_km', 'pk')
+        )
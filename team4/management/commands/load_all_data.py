@@ -1,43 +1,65 @@
-import os
 from django.core.management import BaseCommand, call_command
+from team4.fixture_loader import DEFAULT_BATCH_SIZE, STAGES, default_workers, run_stages
 from team4.models import Facility
 
 class Command(BaseCommand):
-    help = 'Cleans the DB and runs all load commands, showing only final counts'
+    help = 'Cleans the DB and runs all load stages in dependency order, with timing and peak-memory report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, default='team4')
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Parallel stages (default: 1 on SQLite, 4 otherwise). Facility stages always run one at a time.',
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--only', nargs='*', choices=list(STAGES), help='Run only these stages.')
+        parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc peak-memory tracking (faster).')
 
     def handle(self, *args, **options):
-        db = 'team4'
+        db = options['database']
+        workers = options['workers'] or default_workers(db)
 
         # ۱. پاکسازی Facility
         self.stdout.write(self.style.WARNING('🗑️  In progress: Clearing Facility table...'))
         Facility.objects.using(db).all().delete()
         self.stdout.write(self.style.SUCCESS('✅ Facility table cleared.'))
 
-        # ۲. لیست دستورات بارگذاری
-        commands_to_run = [
-            'load_provinces',
-            'load_cities',
-            'load_villages',
-            'load_category',
-            'load_amenity',
-            'load_hospitals',
-            'load_hotels',
-            'load_restaurants',
-            'load_museums',
-        ]
-
-        self.stdout.write(self.style.MIGRATE_HEADING('\n🚀 Starting Data Import...'))
-
-        for cmd in commands_to_run:
-            try:
-                # اجرای دستور بدون چاپ جزییات داخلی (Silent execution)
-                call_command(cmd, database=db)
-                self.stdout.write(self.style.SUCCESS(f'✔ {cmd}: Completed successfully.'))
-            except Exception:
-                # در صورت بروز خطا فقط نام دستور را نمایش می‌دهد
-                self.stdout.write(self.style.ERROR(f'✘ {cmd}: Encountered some issues during import.'))
-
-        # ۳. نمایش آمار نهایی
+        # ۲. اجرای مراحل به ترتیب وابستگی (استان ← شهر ← روستا/مکان‌ها)
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n🚀 Starting Data Import ({workers} worker(s))...'))
+
+        def report(result):
+            if result.failed:
+                self.stdout.write(self.style.ERROR(f'✘ {result.name}: {result.failed}'))
+            elif result.missing:
+                self.stdout.write(self.style.WARNING(f'⚠ {result.name}: fixture not found ({result.path})'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✔ {result.name}: Completed successfully.'))
+
+        results, summary = run_stages(
+            options['only'],
+            db=db,
+            workers=workers,
+            batch_size=options['batch_size'],
+            track_memory=not options['no_memory'],
+            on_result=report,
+        )
+
+        # ۳. گزارش زمان و حافظه
+        self.stdout.write(self.style.MIGRATE_HEADING('\n⏱️  TIMING / MEMORY:'))
+        self.stdout.write(f" {'stage':12} | {'created':>7} | {'updated':>7} | {'skipped':>7} | {'seconds':>7} | {'peak MB':>7}")
+        for r in results:
+            peak = f'{r.peak_kb / 1024:7.1f}' if r.peak_kb is not None else f"{'-':>7}"
+            self.stdout.write(
+                f' {r.name:12} | {r.created:7} | {r.updated:7} | {r.skipped:7} | {r.seconds:7.2f} | {peak}'
+            )
+        peak = f"{summary['peak_kb'] / 1024:.1f} MB" if summary['peak_kb'] is not None else '-'
+        rss = f"{summary['max_rss_kb'] / 1024:.1f} MB" if summary['max_rss_kb'] is not None else '-'
+        self.stdout.write(
+            f" total: {summary['rows']} rows in {summary['seconds']:.2f}s, "
+            f"python peak {peak}, process max RSS {rss}"
+        )
+
+        # ۴. نمایش آمار نهایی
         self.stdout.write(self.style.MIGRATE_HEADING('\n📊 FINAL IMPORT SUMMARY:'))
         try:
             # فراخوانی show_stats برای نمایش تعداد دقیق رکوردهای وارد شده
@@ -45,4 +67,4 @@ class Command(BaseCommand):
         except Exception:
             self.stdout.write(self.style.ERROR('Could not retrieve final stats.'))
 
-        self.stdout.write(self.style.SUCCESS('\n✨ Full process finished.'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('\n✨ Full process finished.'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from team4.services import RatingService
+
+
+class Command(BaseCommand):
+    help = 'Compares facility rating counters with the real review aggregates and optionally fixes drifted rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, default='team4')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--fix', action='store_true', help='Recalculate counters of drifted facilities.')
+        parser.add_argument('--show', type=int, default=20, help='How many drifted facilities to print.')
+
+    def handle(self, *args, **options):
+        db = options['database']
+
+        # ۱. پیدا کردن مکان‌هایی که شمارنده‌هایشان با نظرات واقعی نمی‌خواند
+        drift = RatingService.find_drift(using=db, batch_size=options['batch_size'])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('✅ Rating counters are in sync.'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'⚠ {len(drift)} facility(ies) with drifted rating counters:'))
+        for fac_id, stored, expected in drift[:options['show']]:
+            diff = ', '.join(
+                f'{field}: {stored[field]} → {expected[field]}'
+                for field in expected if stored[field] != expected[field]
+            )
+            self.stdout.write(f' #{fac_id} | {diff}')
+        if len(drift) > options['show']:
+            self.stdout.write(f' ... and {len(drift) - options["show"]} more')
+
+        # ۲. اصلاح (هر مکان در تراکنش خودش و با قفل ردیف)
+        if options['fix']:
+            fixed = RatingService.recalculate([fac_id for fac_id, _, _ in drift], using=db)
+            self.stdout.write(self.style.SUCCESS(f'✅ Recalculated {fixed} facility(ies).'))
+        else:
+            self.stdout.write('Run again with --fix to recalculate them.')
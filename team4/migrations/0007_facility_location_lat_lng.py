@@ -0,0 +1,64 @@
+# Generated by Django 4.2.27 on 2026-10-16 22:53
+
+from django.db import migrations, models
+
+
+def backfill_location_columns(apps, schema_editor):
+    """پر کردن location_lat/location_lng از روی location برای رکوردهای موجود"""
+    Facility = apps.get_model('team4', 'Facility')
+    db = schema_editor.connection.alias
+    batch = []
+    for facility in Facility.objects.using(db).only('fac_id', 'location').iterator(chunk_size=2000):
+        if facility.location is None:
+            continue
+        facility.location_lat = facility.location.latitude
+        facility.location_lng = facility.location.longitude
+        batch.append(facility)
+        if len(batch) >= 2000:
+            Facility.objects.using(db).bulk_update(batch, ['location_lat', 'location_lng'])
+            batch = []
+    if batch:
+        Facility.objects.using(db).bulk_update(batch, ['location_lat', 'location_lng'])
+
+
+def create_spatial_index(apps, schema_editor):
+    """SPATIAL INDEX روی location (فقط MySQL/MariaDB) برای MBRContains"""
+    connection = schema_editor.connection
+    if connection.vendor != 'mysql':
+        return
+    if not connection.mysql_is_mariadb:
+        # MySQL 8 فقط از spatial index ستون‌های دارای SRID استفاده می‌کند
+        schema_editor.execute('ALTER TABLE facilities_facility MODIFY location POINT NOT NULL SRID 0')
+    schema_editor.execute('CREATE SPATIAL INDEX idx_facility_location ON facilities_facility (location)')
+
+
+def drop_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('DROP INDEX idx_facility_location ON facilities_facility')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team4', '0006_facility_price_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='location_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='location_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['location_lat', 'location_lng'], name='idx_facility_lat_lng'),
+        ),
+        migrations.RunPython(backfill_location_columns, migrations.RunPython.noop),
+        migrations.RunPython(create_spatial_index, drop_spatial_index),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.27 on 2026-10-16 23:49
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def _seeded_counters(avg_rating, review_count):
+    """نسخه ثابت RatingService.seeded_counters برای این مایگریشن"""
+    if not review_count:
+        return {'rating_sum': 0, **{f'rating_count_{star}': 0 for star in range(1, 6)}}
+    rating_sum = int((Decimal(avg_rating or 0) * review_count).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    rating_sum = min(max(rating_sum, review_count), 5 * review_count)
+    base, extra = divmod(rating_sum, review_count)
+    histogram = dict.fromkeys(range(1, 6), 0)
+    histogram[base] += review_count - extra
+    if extra:
+        histogram[base + 1] += extra
+    return {'rating_sum': rating_sum, **{f'rating_count_{star}': histogram[star] for star in range(1, 6)}}
+
+
+def backfill_rating_counters(apps, schema_editor):
+    """
+    مکان‌هایی که نظر دارند از روی نظرات تایید شده دوباره محاسبه می‌شوند (همان کاری که قبلاً با ذخیره هر نظر انجام می‌شد)؛
+    برای مکان‌های بدون نظر، avg_rating و review_count بارگذاری شده از fixture دست نمی‌خورند و شمارنده‌ها
+    با آن‌ها سازگار مقداردهی می‌شوند. صفر کردن آن‌ها فقط با reconcile_ratings --fix انجام می‌شود.
+    """
+    Facility = apps.get_model('team4', 'Facility')
+    Review = apps.get_model('team4', 'Review')
+    db = schema_editor.connection.alias
+
+    reviewed = Review.objects.using(db).values('facility_id')
+    seeds = {}
+    for fac_id, avg_rating, review_count in (
+        Facility.objects.using(db).filter(review_count__gt=0).exclude(pk__in=reviewed)
+        .values_list('fac_id', 'avg_rating', 'review_count').iterator(chunk_size=2000)
+    ):
+        seeds.setdefault((avg_rating, review_count), []).append(fac_id)
+    for (avg_rating, review_count), fac_ids in seeds.items():
+        counters = _seeded_counters(avg_rating, review_count)
+        for start in range(0, len(fac_ids), 500):
+            Facility.objects.using(db).filter(pk__in=fac_ids[start:start + 500]).update(**counters)
+
+    counters = ['review_count', 'rating_sum'] + [f'rating_count_{star}' for star in range(1, 6)]
+    Facility.objects.using(db).filter(pk__in=reviewed).update(avg_rating=Decimal('0.00'), **dict.fromkeys(counters, 0))
+    annotations = {'review_count': Count('review_id'), 'rating_sum': Sum('rating')}
+    for star in range(1, 6):
+        annotations[f'rating_count_{star}'] = Count('review_id', filter=Q(rating=star))
+    rows = Review.objects.using(db).filter(is_approved=True).order_by().values('facility_id').annotate(**annotations)
+    for row in rows.iterator(chunk_size=2000):
+        facility_id = row.pop('facility_id')
+        row['rating_sum'] = row['rating_sum'] or 0
+        avg_rating = (Decimal(row['rating_sum']) / row['review_count']).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP
+        )
+        Facility.objects.using(db).filter(pk=facility_id).update(avg_rating=avg_rating, **row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team4', '0007_facility_location_lat_lng'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='rating_count_1',
+            field=models.IntegerField(default=0, editable=False, verbose_name='تعداد امتیاز ۱'),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_count_2',
+            field=models.IntegerField(default=0, editable=False, verbose_name='تعداد امتیاز ۲'),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_count_3',
+            field=models.IntegerField(default=0, editable=False, verbose_name='تعداد امتیاز ۳'),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_count_4',
+            field=models.IntegerField(default=0, editable=False, verbose_name='تعداد امتیاز ۴'),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_count_5',
+            field=models.IntegerField(default=0, editable=False, verbose_name='تعداد امتیاز ۵'),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_sum',
+            field=models.IntegerField(default=0, editable=False, verbose_name='مجموع امتیازها'),
+        ),
+        migrations.RunPython(backfill_rating_counters, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator, EmailVa
 from django.core.exceptions import ValidationError
 from django.conf import settings
 from .fields import PointField, Point
+from .geo import GeoQuerySet
 import math
 
 
@@ -213,6 +214,9 @@ class Facility(models.Model):
     
     address = models.TextField(verbose_name="آدرس")
     location = PointField(verbose_name="موقعیت جغرافیایی") 
+    # نسخه denormalized از location برای فیلتر bbox روی دیتابیس‌های بدون spatial index (SQLite)
+    location_lat = models.FloatField(null=True, blank=True, editable=False)
+    location_lng = models.FloatField(null=True, blank=True, editable=False)
     phone = models.CharField(max_length=20, blank=True, verbose_name="تلفن")
     email = models.EmailField(blank=True, validators=[EmailValidator()], verbose_name="ایمیل")
     website = models.URLField(max_length=200, blank=True, verbose_name="وبسایت")
@@ -230,7 +234,15 @@ class Facility(models.Model):
         validators=[MinValueValidator(0)],
         verbose_name="تعداد نظرات"
     )
-    
+    # شمارنده‌های تجمعی نظرات تایید شده؛ با F() و در همان تراکنش نوشتن نظر بروزرسانی می‌شوند
+    # (RatingService) و avg_rating = rating_sum / review_count از روی آن‌ها محاسبه می‌شود.
+    rating_sum = models.IntegerField(default=0, editable=False, verbose_name="مجموع امتیازها")
+    rating_count_1 = models.IntegerField(default=0, editable=False, verbose_name="تعداد امتیاز ۱")
+    rating_count_2 = models.IntegerField(default=0, editable=False, verbose_name="تعداد امتیاز ۲")
+    rating_count_3 = models.IntegerField(default=0, editable=False, verbose_name="تعداد امتیاز ۳")
+    rating_count_4 = models.IntegerField(default=0, editable=False, verbose_name="تعداد امتیاز ۴")
+    rating_count_5 = models.IntegerField(default=0, editable=False, verbose_name="تعداد امتیاز ۵")
+
     status = models.BooleanField(default=True, verbose_name="وضعیت فعال")
     is_24_hour = models.BooleanField(default=False, verbose_name="24 ساعته")
     
@@ -252,6 +264,8 @@ class Facility(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = GeoQuerySet.as_manager()
+
     class Meta:
         db_table = 'facilities_facility'
         verbose_name = "مکان"
@@ -261,11 +275,30 @@ class Facility(models.Model):
             models.Index(fields=['category'], name='idx_facility_category'),
             models.Index(fields=['city'], name='idx_facility_city'),
             models.Index(fields=['status'], name='idx_facility_status'),
+            models.Index(fields=['location_lat', 'location_lng'], name='idx_facility_lat_lng'),
         ]
 
     def __str__(self):
         return f"{self.name_fa} - {self.city.name_fa}"
 
+    def save(self, *args, **kwargs):
+        # همگام نگه داشتن ستون‌های lat/lng با location
+        self.sync_location_columns()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'location_lat', 'location_lng'}
+        super().save(*args, **kwargs)
+
+    def sync_location_columns(self):
+        """کپی مختصات location در ستون‌های location_lat/location_lng"""
+        location = self._meta.get_field('location').to_python(self.location)
+        if isinstance(location, Point):
+            self.location_lat = location.latitude
+            self.location_lng = location.longitude
+        else:
+            self.location_lat = None
+            self.location_lng = None
+
     def get_coordinates(self):
         if self.location:
             return (self.location.longitude, self.location.latitude)
@@ -279,6 +312,11 @@ class Facility(models.Model):
     def longitude(self):
         return self.location.longitude if self.location else None
 
+    @property
+    def rating_histogram(self):
+        """تعداد نظرات تایید شده به تفکیک ستاره: {1: n1, ..., 5: n5}"""
+        return {star: getattr(self, f'rating_count_{star}') for star in range(1, 6)}
+
     def calculate_distance_to(self, point):
         """محاسبه فاصله تا یک نقطه - برحسب کیلومتر
         
@@ -299,10 +337,16 @@ class Facility(models.Model):
         return self.location.distance(point)
 
     def get_primary_image(self):
+        # Prefetch شده توسط FacilityService.with_list_data (بدون کوئری اضافه)
+        if hasattr(self, 'primary_images'):
+            return self.primary_images[0] if self.primary_images else None
         return self.images.filter(is_primary=True).first()
 
     def get_min_price(self):
         """دریافت کمترین قیمت - اگر قیمت دقیق نداشت، بر اساس tier تخمین میزنه"""
+        # annotate شده توسط FacilityService.with_list_data (بدون کوئری اضافه)
+        if hasattr(self, 'min_active_price'):
+            return self.min_active_price
         pricing = self.pricing_set.filter(status=True).order_by('price').first()
         if pricing:
             return pricing.price
@@ -505,30 +549,39 @@ class Review(models.Model):
             raise ValidationError("امتیاز باید بین 1 تا 5 باشد")
 
     def save(self, *args, **kwargs):
+        from django.db import router, transaction
+        from .services.rating_service import RatingService
+
         self.full_clean()
-        super().save(*args, **kwargs)
-        # بروزرسانی امتیاز میانگین و تعداد نظرات مکان
-        self.update_facility_rating()
+        using = kwargs.get('using') or router.db_for_write(Review, instance=self)
+        with transaction.atomic(using=using):
+            # وضعیت قبلی نظر (مکان، امتیاز، تایید) با قفل ردیف، برای محاسبه تفاضل شمارنده‌ها
+            old = None
+            if self.pk is not None:
+                old = Review.objects.using(using).select_for_update().filter(pk=self.pk).values_list(
+                    'facility_id', 'rating', 'is_approved'
+                ).first()
+            super().save(*args, **kwargs)
+            # بروزرسانی افزایشی امتیاز میانگین و تعداد نظرات مکان
+            RatingService.review_changed(old, (self.facility_id, self.rating, self.is_approved), using=using)
 
     def delete(self, *args, **kwargs):
-        super().delete(*args, **kwargs)
-        # بروزرسانی امتیاز میانگین و تعداد نظرات مکان
-        self.update_facility_rating()
+        from django.db import router, transaction
+        from .services.rating_service import RatingService
+
+        using = kwargs.get('using') or router.db_for_write(Review, instance=self)
+        with transaction.atomic(using=using):
+            old = Review.objects.using(using).select_for_update().filter(pk=self.pk).values_list(
+                'facility_id', 'rating', 'is_approved'
+            ).first()
+            result = super().delete(*args, **kwargs)
+            # بروزرسانی افزایشی امتیاز میانگین و تعداد نظرات مکان
+            RatingService.review_changed(old, None, using=using)
+        return result
 
     def update_facility_rating(self):
-        """بروزرسانی امتیاز میانگین و تعداد نظرات مکان"""
-        from django.db.models import Avg, Count
-        
-        # محاسبه امتیاز میانگین و تعداد نظرات تایید شده
-        stats = Review.objects.filter(
-            facility=self.facility,
-            is_approved=True
-        ).aggregate(
-            avg_rating=Avg('rating'),
-            review_count=Count('review_id')
-        )
-        
-        # بروزرسانی مکان
-        self.facility.avg_rating = stats['avg_rating'] or 0.00
-        self.facility.review_count = stats['review_count'] or 0
-        self.facility.save(update_fields=['avg_rating', 'review_count'])
+        """محاسبه دوباره کامل امتیاز میانگین و شمارنده‌های مکان از روی نظرات تایید شده"""
+        from django.db import router
+        from .services.rating_service import RatingService
+
+        RatingService.recalculate([self.facility_id], using=router.db_for_write(Review, instance=self))
@@ -74,6 +74,10 @@ class ImageSerializer(serializers.ModelSerializer):
 
 
 class FacilityListSerializer(serializers.ModelSerializer):
+    """
+    Reads only preloaded data when the queryset comes from FacilityService.with_list_data
+    (min_active_price, primary_images, prefetched amenities, joined city/province/category).
+    """
     category = serializers.CharField(source='category.name_en', read_only=True)
     city = serializers.CharField(source='city.name_fa', read_only=True)
     province = serializers.CharField(source='city.province.name_fa', read_only=True)
@@ -140,6 +144,7 @@ class FacilityDetailSerializer(serializers.ModelSerializer):
     images = ImageSerializer(many=True, read_only=True)
     price_tier = serializers.CharField(read_only=True)
     price_tier_display = serializers.CharField(source='get_price_tier_display', read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     
     class Meta:
         model = Facility
@@ -148,7 +153,7 @@ class FacilityDetailSerializer(serializers.ModelSerializer):
             'category', 'city', 'address', 'location',
             'phone', 'email', 'website',
             'description_fa', 'description_en',
-            'avg_rating', 'review_count',
+            'avg_rating', 'review_count', 'rating_histogram',
             'status', 'is_24_hour', 'price_tier', 'price_tier_display',
             'amenities', 'pricing', 'images',
             'created_at', 'updated_at'
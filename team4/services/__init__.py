@@ -2,5 +2,6 @@
 Services Layer - Business Logic
 """
 from .facility_service import FacilityService
+from .rating_service import RatingService
 
-__all__ = ['FacilityService']
+__all__ = ['FacilityService', 'RatingService']
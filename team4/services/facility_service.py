@@ -1,11 +1,34 @@
-from django.db.models import Q, F, Count, Min, Avg
+from django.db.models import Q, F, Count, Min, Avg, OuterRef, Prefetch, Subquery
 from django.core.exceptions import ObjectDoesNotExist
 from ..fields import Point
-from team4.models import Facility, City, Category, Amenity, Pricing
+from team4.models import Facility, City, Category, Amenity, Pricing, Image
 
 
 class FacilityService:
     
+    @staticmethod
+    def with_list_data(queryset):
+        """
+        بارگذاری همه داده‌های FacilityListSerializer با تعداد کوئری ثابت (مستقل از اندازه صفحه):
+        شهر/استان/دسته با JOIN، کمترین قیمت فعال با Subquery (min_active_price)،
+        تصویر اصلی (primary_images) و امکانات با Prefetch.
+        """
+        min_price = Pricing.objects.filter(
+            facility=OuterRef('pk'), status=True
+        ).order_by('price').values('price')[:1]
+        return queryset.select_related(
+            'city', 'city__province', 'category'
+        ).annotate(
+            min_active_price=Subquery(min_price)
+        ).prefetch_related(
+            Prefetch(
+                'images',
+                queryset=Image.objects.filter(is_primary=True).order_by('image_id'),
+                to_attr='primary_images',
+            ),
+            Prefetch('amenities', queryset=Amenity.objects.only('amenity_id', 'name_fa', 'name_en')),
+        )
+    
     @staticmethod
     def search_facilities(city_name=None, category_name=None, **filters):
         queryset = Facility.objects.filter(status=True)
@@ -115,9 +138,7 @@ class FacilityService:
                    اگر location نداشت: (center_facility, [])
         """
         try:
-            center_facility = Facility.objects.select_related(
-                'city', 'category'
-            ).prefetch_related('amenities').get(fac_id=fac_id)
+            center_facility = FacilityService.with_list_data(Facility.objects.all()).get(fac_id=fac_id)
         except Facility.DoesNotExist:
             return None, []
         
@@ -134,30 +155,23 @@ class FacilityService:
                 Q(category__name_en__icontains=category_name)
             )
         
-        nearby = nearby.select_related('city', 'category').prefetch_related('amenities')
+        # فیلتر شعاع و مرتب‌سازی بر اساس فاصله در خود دیتابیس (bbox + فاصله دقیق)
+        nearby = nearby.within_radius(center_facility.location, radius_km)
+        nearby = FacilityService.with_list_data(nearby)
         
-        # محاسبه فاصله و فیلتر
         nearby_with_distance = []
         
         for facility in nearby:
-            if not facility.location:
-                continue
-                
-            distance = facility.calculate_distance_to(center_facility.location)
+            distance = facility.distance_km
+            # محاسبه زمان پیاده‌روی (فرض: 5 km/h)
+            walking_time = round((distance / 5) * 60)  # دقیقه
             
-            if distance and distance <= radius_km:
-                # محاسبه زمان پیاده‌روی (فرض: 5 km/h)
-                walking_time = round((distance / 5) * 60)  # دقیقه
-                
-                nearby_with_distance.append({
-                    'facility': facility,
-                    'distance_km': round(distance, 2),
-                    'walking_time_minutes': walking_time,
-                    'driving_time_minutes': None  # باید از Neshan API بگیریم
-                })
-        
-        # مرتب‌سازی بر اساس فاصله
-        nearby_with_distance.sort(key=lambda x: x['distance_km'])
+            nearby_with_distance.append({
+                'facility': facility,
+                'distance_km': round(distance, 2),
+                'walking_time_minutes': walking_time,
+                'driving_time_minutes': None  # باید از Neshan API بگیریم
+            })
         
         return center_facility, nearby_with_distance
     
@@ -0,0 +1,146 @@
+"""
+شمارنده‌های امتیاز مکان‌ها
+
+به جای Aggregate دوباره روی همه نظرات مکان در هر نوشتن، Facility شمارنده‌های
+review_count، rating_sum و rating_count_1..5 را نگه می‌دارد که در همان تراکنش
+نوشتن نظر با F() (و بدون خواندن/نوشتن در پایتون) بروزرسانی می‌شوند.
+find_drift/recalculate برای دستور reconcile_ratings و اکشن‌های ادمین است.
+"""
+from collections import Counter
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Round
+
+from team4.models import Facility, Review
+
+STARS = range(1, 6)
+STAR_FIELDS = {star: f'rating_count_{star}' for star in STARS}
+COUNTER_FIELDS = ['review_count', 'rating_sum'] + list(STAR_FIELDS.values())
+
+
+def _average(rating_sum, review_count):
+    if not review_count:
+        return Decimal('0.00')
+    return (Decimal(rating_sum) / review_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+class RatingService:
+
+    @staticmethod
+    def average_expression():
+        """avg_rating از روی شمارنده‌های همان ردیف (صفر برای مکان بدون نظر)"""
+        return Case(
+            When(review_count__gt=0, then=Round(Cast('rating_sum', FloatField()) / F('review_count'), 2)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+    @staticmethod
+    def apply_delta(facility_id, count=0, total=0, stars=None, using='team4'):
+        """افزودن تفاضل به شمارنده‌های یک مکان؛ باید داخل تراکنش نوشتن نظر صدا زده شود"""
+        updates = {}
+        if count:
+            updates['review_count'] = F('review_count') + count
+        if total:
+            updates['rating_sum'] = F('rating_sum') + total
+        for star, delta in (stars or {}).items():
+            if delta:
+                updates[STAR_FIELDS[star]] = F(STAR_FIELDS[star]) + delta
+        if not updates:
+            return
+        queryset = Facility.objects.using(using).filter(pk=facility_id)
+        queryset.update(**updates)
+        # MySQL مقادیر SET را به ترتیب و با مقدار جدید ارزیابی می‌کند؛ میانگین در UPDATE جدا محاسبه می‌شود
+        queryset.update(avg_rating=RatingService.average_expression())
+
+    @staticmethod
+    def review_changed(old, new, using='team4'):
+        """اعمال تغییر یک نظر؛ old/new به شکل (facility_id, rating, is_approved) یا None"""
+        deltas = {}
+        for state, sign in ((old, -1), (new, 1)):
+            if not state or not state[2]:
+                continue
+            facility_id, rating = state[0], state[1]
+            delta = deltas.setdefault(facility_id, {'count': 0, 'total': 0, 'stars': Counter()})
+            delta['count'] += sign
+            delta['total'] += sign * rating
+            delta['stars'][rating] += sign
+        # ترتیب ثابت قفل ردیف‌ها وقتی نظر بین دو مکان جابجا می‌شود
+        for facility_id in sorted(deltas):
+            RatingService.apply_delta(facility_id, using=using, **deltas[facility_id])
+
+    @staticmethod
+    def seeded_counters(avg_rating, review_count):
+        """
+        rating_sum و rating_count_1..5 سازگار با میانگین و تعداد نظر بیرونی (fixture) که نظراتش
+        در دیتابیس نیست: مجموع = round(avg_rating * review_count) و امتیازها بین دو ستاره مجاور پخش می‌شوند
+        """
+        if not review_count:
+            return {'rating_sum': 0, **dict.fromkeys(STAR_FIELDS.values(), 0)}
+        rating_sum = int((Decimal(str(avg_rating or 0)) * review_count).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+        rating_sum = min(max(rating_sum, review_count), 5 * review_count)
+        base, extra = divmod(rating_sum, review_count)
+        histogram = Counter({base: review_count - extra})
+        if extra:
+            histogram[base + 1] += extra
+        return {'rating_sum': rating_sum, **{field: histogram[star] for star, field in STAR_FIELDS.items()}}
+
+    @staticmethod
+    def _aggregate(facility_ids, using):
+        annotations = {
+            'review_count': Count('review_id'),
+            'rating_sum': Sum('rating'),
+        }
+        for star, field in STAR_FIELDS.items():
+            annotations[field] = Count('review_id', filter=Q(rating=star))
+        rows = Review.objects.using(using).filter(
+            facility_id__in=facility_ids, is_approved=True
+        ).order_by().values('facility_id').annotate(**annotations)
+        stats = {}
+        for row in rows:
+            facility_id = row.pop('facility_id')
+            row['rating_sum'] = row['rating_sum'] or 0
+            stats[facility_id] = row
+        return stats
+
+    @staticmethod
+    def find_drift(using='team4', batch_size=1000):
+        """
+        مقایسه شمارنده‌های ذخیره شده با Aggregate واقعی نظرات، دسته به دسته.
+        خروجی: لیست (fac_id, stored, expected) برای مکان‌هایی که اختلاف دارند.
+        """
+        drift = []
+        empty = dict.fromkeys(COUNTER_FIELDS, 0)
+        facilities = Facility.objects.using(using).order_by('pk').values_list('pk', 'avg_rating', *COUNTER_FIELDS)
+        last_pk = None
+        while True:
+            page = facilities if last_pk is None else facilities.filter(pk__gt=last_pk)
+            batch = list(page[:batch_size])
+            if not batch:
+                return drift
+            last_pk = batch[-1][0]
+            stats = RatingService._aggregate([row[0] for row in batch], using)
+            for fac_id, avg_rating, *counters in batch:
+                stored = dict(zip(COUNTER_FIELDS, counters), avg_rating=Decimal(avg_rating or 0).quantize(Decimal('0.01')))
+                expected = dict(stats.get(fac_id, empty))
+                expected['avg_rating'] = _average(expected['rating_sum'], expected['review_count'])
+                if stored != expected:
+                    drift.append((fac_id, stored, expected))
+
+    @staticmethod
+    def recalculate(facility_ids, using='team4'):
+        """محاسبه دوباره کامل شمارنده‌ها؛ هر مکان در تراکنش خودش و با قفل ردیف مکان"""
+        updated = 0
+        for facility_id in sorted(set(facility_ids)):
+            with transaction.atomic(using=using):
+                # قفل ردیف مکان: نوشتن همزمان نظر تا پایان این تراکنش منتظر می‌ماند
+                locked = Facility.objects.using(using).select_for_update().filter(pk=facility_id)
+                if not locked.exists():
+                    continue
+                stats = RatingService._aggregate([facility_id], using).get(facility_id)
+                stats = stats or dict.fromkeys(COUNTER_FIELDS, 0)
+                locked.update(avg_rating=_average(stats['rating_sum'], stats['review_count']), **stats)
+                updated += 1
+        return updated
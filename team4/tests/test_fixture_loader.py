@@ -0,0 +1,124 @@
+"""
+Tests for the bulk fixture loader
+"""
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.test import TestCase
+
+from team4.fields import Point
+from team4.fixture_loader import LookupMaps, run_stage
+from team4.models import Amenity, Category, City, Facility, Province
+
+
+class FixtureLoaderTest(TestCase):
+    """بارگذاری جریانی و دسته‌ای fixtureها"""
+
+    databases = {'default', 'team4'}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.province = Province.objects.using('team4').create(province_id=1, name_fa='یزد', name_en='Yazd')
+        self.city = City.objects.using('team4').create(
+            city_id=10, province=self.province, name_fa='یزد', name_en='Yazd', location=Point(54.36, 31.89)
+        )
+        Category.objects.using('team4').create(category_id=1, name_fa='هتل', name_en='Hotel')
+        Category.objects.using('team4').create(category_id=5, name_fa='موزه', name_en='Museum')
+        Amenity.objects.using('team4').create(amenity_id=1, name_fa='وای‌فای', name_en='WiFi')
+        Amenity.objects.using('team4').create(amenity_id=2, name_fa='پارکینگ', name_en='Parking')
+
+    def _fixture(self, name, items):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False)
+        return path
+
+    def _hotel(self, name_fa, name_en, **extra):
+        item = {
+            'name_fa': name_fa, 'name_en': name_en, 'city_id': 10, 'category_id': 1,
+            'location': {'latitude': 31.9, 'longitude': 54.37}, 'amenities': [1],
+        }
+        item.update(extra)
+        return item
+
+    def test_cities_resolve_provinces_from_lookup_map(self):
+        path = self._fixture('cities.json', [
+            {'city_id': 11, 'name_fa': 'میبد', 'name_en': 'Meybod', 'province': {'province_id': 1},
+             'location': {'latitude': 32.25, 'longitude': 54.01}},
+            {'city_id': 12, 'name_fa': 'گم', 'name_en': 'Lost', 'province': {'province_id': 99},
+             'location': {'latitude': 32.0, 'longitude': 54.0}},
+            {'city_id': 99, 'name_fa': 'یزد', 'name_en': 'Yazd', 'province': {'province_id': 1},
+             'location': {'latitude': 31.9, 'longitude': 54.4}},
+        ])
+        result = run_stage('cities', filename=path, batch_size=2)
+        self.assertEqual((result.created, result.updated, result.skipped), (1, 1, 1))
+        # شهر موجود با (name_en, province) پیدا می‌شود و شناسه‌اش عوض نمی‌شود
+        self.assertEqual(City.objects.using('team4').get(name_en='Yazd').city_id, 10)
+        self.assertEqual(City.objects.using('team4').get(name_en='Meybod').city_id, 11)
+
+    def test_hotels_upsert_and_replace_amenities(self):
+        path = self._fixture('hotels.json', [
+            self._hotel('هتل داد', 'Dad Hotel', amenities=[1, 2, 404]),
+            self._hotel('هتل موزه', 'Museum Hotel', city_id=0, city_name_fa='یزد'),
+            self._hotel('هتل داد', 'Dad Hotel', address='خیابان امام', amenities=[1, 2]),
+            self._hotel('بی‌شهر', 'Nowhere', city_id=777, city_name_fa='ناکجا'),
+        ])
+        result = run_stage('hotels', filename=path, batch_size=2)
+        self.assertEqual((result.created, result.updated, result.skipped), (2, 1, 1))
+
+        dad = Facility.objects.using('team4').get(name_fa='هتل داد')
+        self.assertEqual(dad.address, 'خیابان امام')
+        self.assertEqual((dad.location_lat, dad.location_lng), (31.9, 54.37))
+        self.assertEqual(sorted(dad.amenities.using('team4').values_list('amenity_id', flat=True)), [1, 2])
+
+        path = self._fixture('hotels.json', [self._hotel('هتل داد', 'Dad Hotel', amenities=[2], stars=4)])
+        result = run_stage('hotels', filename=path)
+        self.assertEqual((result.created, result.updated), (0, 1))
+        self.assertEqual(Facility.objects.using('team4').count(), 2)
+        self.assertEqual(list(dad.amenities.using('team4').values_list('amenity_id', flat=True)), [2])
+
+    def test_fixture_ratings_seed_consistent_counters(self):
+        """میانگین و تعداد نظر fixture بارگذاری و شمارنده‌های امتیاز با آن‌ها سازگار ساخته می‌شوند"""
+        Facility.objects.using('team4').create(
+            name_fa='هتل داد', name_en='Dad Hotel', city=self.city, address='', location=Point(54.37, 31.9),
+            review_count=2, rating_sum=9, rating_count_4=1, rating_count_5=1, avg_rating=4.5,
+        )
+        path = self._fixture('hotels.json', [
+            self._hotel('هتل داد', 'Dad Hotel', avg_rating=3.1, review_count=80),
+            self._hotel('هتل نو', 'New Hotel', avg_rating=4.4, review_count=104),
+            self._hotel('هتل خالی', 'Empty Hotel'),
+        ])
+        run_stage('hotels', filename=path)
+
+        def counters(name_fa):
+            facility = Facility.objects.using('team4').get(name_fa=name_fa)
+            return facility.avg_rating, facility.review_count, facility.rating_sum, facility.rating_histogram
+
+        self.assertEqual(counters('هتل داد'), (Decimal('3.10'), 80, 248, {1: 0, 2: 0, 3: 72, 4: 8, 5: 0}))
+        self.assertEqual(counters('هتل نو'), (Decimal('4.40'), 104, 458, {1: 0, 2: 0, 3: 0, 4: 62, 5: 42}))
+        self.assertEqual(counters('هتل خالی'), (Decimal('0.00'), 0, 0, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}))
+
+    def test_museum_duplicate_name_en_is_renamed(self):
+        Facility.objects.using('team4').create(
+            name_fa='هتل قدیمی', name_en='Old House', city=self.city, address='', location=Point(54.3, 31.8)
+        )
+        path = self._fixture('museums.json', [
+            {'id': 7, 'name_fa': 'خانه قدیمی', 'name_en': 'Old House', 'city_id': 10,
+             'location': {'latitude': 31.8, 'longitude': 54.3}},
+        ])
+        result = run_stage('museums', filename=path, maps=LookupMaps('team4'))
+        self.assertEqual(result.created, 1)
+        museum = Facility.objects.using('team4').get(name_fa='خانه قدیمی')
+        self.assertEqual((museum.name_en, museum.category_id), ('Old House (7)', 5))
+
+    def test_point_field_accepts_bulk_update_expressions(self):
+        facility = Facility.objects.using('team4').create(
+            name_fa='موزه', name_en='Museum', city=self.city, address='', location=Point(54.3, 31.8)
+        )
+        facility.location = Point(54.5, 31.5)
+        Facility.objects.using('team4').bulk_update([facility], ['location'])
+        facility.refresh_from_db(using='team4')
+        self.assertEqual((facility.location.longitude, facility.location.latitude), (54.5, 31.5))
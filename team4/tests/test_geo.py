@@ -0,0 +1,93 @@
+"""
+Tests for the geo query layer (bbox prefilter + distance in SQL)
+"""
+import random
+
+from django.test import TestCase
+
+from team4.fields import Point
+from team4.geo import bounding_box
+from team4.models import Province, City, Category, Facility
+from team4.services.facility_service import FacilityService
+
+
+class GeoQueryTest(TestCase):
+    """تست جستجوی مکانی"""
+    databases = {'default', 'team4'}
+
+    def setUp(self):
+        self.center = Point(52.583698, 29.591768)
+        self.province = Province.objects.create(name_fa="فارس", name_en="Fars")
+        self.city = City.objects.create(
+            province=self.province, name_fa="شیراز", name_en="Shiraz", location=self.center
+        )
+        self.hotel = Category.objects.create(name_fa="هتل", name_en="Hotel")
+        self.hospital = Category.objects.create(name_fa="بیمارستان", name_en="Hospital", is_emergency=True)
+
+        rng = random.Random(4)
+        self.facilities = []
+        for i in range(60):
+            self.facilities.append(Facility.objects.create(
+                name_fa=f"مکان {i}",
+                name_en=f"Place {i}",
+                category=self.hospital if i % 3 == 0 else self.hotel,
+                city=self.city,
+                address="آدرس",
+                location=Point(self.center.longitude + rng.uniform(-0.3, 0.3),
+                               self.center.latitude + rng.uniform(-0.3, 0.3)),
+            ))
+
+    def _expected(self, radius_km, queryset=None):
+        facilities = queryset if queryset is not None else self.facilities
+        within = [(f.location.distance(self.center), f.fac_id) for f in facilities]
+        return [fac_id for d, fac_id in sorted(within) if d <= radius_km]
+
+    def test_location_columns_are_denormalized(self):
+        facility = Facility.objects.get(fac_id=self.facilities[0].fac_id)
+        self.assertAlmostEqual(facility.location_lat, facility.location.latitude)
+        self.assertAlmostEqual(facility.location_lng, facility.location.longitude)
+
+    def test_bounding_box_contains_circle(self):
+        min_lng, min_lat, max_lng, max_lat = bounding_box(self.center, 10)
+        for f in self.facilities:
+            if f.location.distance(self.center) <= 10:
+                self.assertTrue(min_lng <= f.location.longitude <= max_lng)
+                self.assertTrue(min_lat <= f.location.latitude <= max_lat)
+
+    def test_within_radius_matches_haversine(self):
+        result = list(Facility.objects.within_radius(self.center, 15))
+        self.assertEqual([f.fac_id for f in result], self._expected(15))
+        for f in result:
+            self.assertAlmostEqual(f.distance_km, f.location.distance(self.center), places=6)
+
+    def test_get_nearby_facilities(self):
+        center = self.facilities[0]
+        _, nearby = FacilityService.get_nearby_facilities(center.fac_id, radius_km=10)
+        expected = [
+            fac_id for d, fac_id in sorted(
+                (f.location.distance(center.location), f.fac_id) for f in self.facilities[1:]
+            ) if d <= 10
+        ]
+        self.assertEqual([item['facility'].fac_id for item in nearby], expected)
+
+    def test_nearby_search_pages_are_sorted_by_distance(self):
+        expected = self._expected(20)
+        res = self.client.get('/team4/api/facilities/nearby/', {
+            'lat': self.center.latitude, 'lng': self.center.longitude,
+            'radius': 20000, 'page_size': 5, 'page': 2,
+        })
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual(body['count'], len(expected))
+        self.assertEqual([item['place']['fac_id'] for item in body['results']], expected[5:10])
+
+    def test_emergency_with_location(self):
+        hospitals = [f for f in self.facilities if f.category_id == self.hospital.category_id]
+        res = self.client.get('/team4/api/facilities/emergency/', {
+            'lat': self.center.latitude, 'lng': self.center.longitude, 'radius': 15,
+        })
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        expected = self._expected(15, hospitals)
+        self.assertEqual([item['fac_id'] for item in body['results']], expected[:10])
+        self.assertEqual(body['count'], len(expected))
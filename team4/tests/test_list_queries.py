@@ -0,0 +1,77 @@
+"""
+Tests that facility list endpoints run a constant number of queries per page
+"""
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from team4.fields import Point
+from team4.models import Amenity, Category, City, Facility, Image, Pricing, Province
+from team4.serializers import FacilityListSerializer
+from team4.services.facility_service import FacilityService
+
+
+class ListQueryCountTest(TestCase):
+    """تعداد کوئری‌های لیست مکان‌ها نباید با اندازه صفحه رشد کند"""
+    databases = {'default', 'team4'}
+
+    def setUp(self):
+        self.center = Point(52.583698, 29.591768)
+        province = Province.objects.create(name_fa="فارس", name_en="Fars")
+        self.city = City.objects.create(province=province, name_fa="شیراز", name_en="Shiraz", location=self.center)
+        category = Category.objects.create(name_fa="هتل", name_en="Hotel")
+        amenities = [
+            Amenity.objects.create(name_fa="وای‌فای", name_en="WiFi"),
+            Amenity.objects.create(name_fa="پارکینگ", name_en="Parking"),
+        ]
+        for i in range(30):
+            facility = Facility.objects.create(
+                name_fa=f"هتل {i}", name_en=f"Hotel {i}", category=category, city=self.city, address="آدرس",
+                location=Point(self.center.longitude + i * 0.001, self.center.latitude),
+            )
+            facility.amenities.set(amenities[: i % 3])
+            Image.objects.create(facility=facility, image_url=f"https://example.com/{i}/side.jpg")
+            if i % 2:
+                Image.objects.create(facility=facility, image_url=f"https://example.com/{i}/main.jpg", is_primary=True)
+                Pricing.objects.create(facility=facility, price_type='Per Night', price=900 + i)
+                Pricing.objects.create(facility=facility, price_type='Per Night', price=500 + i)
+                Pricing.objects.create(facility=facility, price_type='Per Night', price=100, status=False)
+
+    def _count_queries(self, request):
+        with CaptureQueriesContext(connections['team4']) as team4, CaptureQueriesContext(connections['default']) as default:
+            res = request()
+        self.assertEqual(res.status_code, 200)
+        return len(team4) + len(default)
+
+    def _assert_constant(self, request_for_page_size):
+        small = self._count_queries(lambda: request_for_page_size(5))
+        large = self._count_queries(lambda: request_for_page_size(25))
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 6)
+
+    def test_list_and_search_query_count_is_independent_of_page_size(self):
+        self._assert_constant(lambda size: self.client.get('/team4/api/facilities/', {'page_size': size}))
+        self._assert_constant(lambda size: self.client.post(
+            f'/team4/api/facilities/search/?page_size={size}', {'city': 'شیراز'}, content_type='application/json'
+        ))
+
+    def test_nearby_query_count_is_independent_of_page_size(self):
+        self._assert_constant(lambda size: self.client.get('/team4/api/facilities/nearby/', {
+            'lat': self.center.latitude, 'lng': self.center.longitude, 'radius': 20000, 'page_size': size,
+        }))
+
+    def test_preloaded_data_matches_per_object_queries(self):
+        preloaded = FacilityListSerializer(
+            FacilityService.with_list_data(Facility.objects.order_by('fac_id')), many=True
+        ).data
+        with CaptureQueriesContext(connections['team4']) as queries:
+            FacilityListSerializer(FacilityService.with_list_data(Facility.objects.all()), many=True).data
+        self.assertEqual(len(queries), 3)
+
+        # مسیر قدیمی (بدون preload) باید همان خروجی را بدهد
+        plain = FacilityListSerializer(Facility.objects.order_by('fac_id'), many=True).data
+        self.assertEqual(preloaded, plain)
+        self.assertEqual(preloaded[1]['primary_image'], 'https://example.com/1/main.jpg')
+        self.assertIsNone(preloaded[0]['primary_image'])
+        self.assertEqual(preloaded[1]['price_from'], {'type': 'exact', 'value': 501.0})
+        self.assertEqual([a['name_en'] for a in preloaded[2]['amenities']], ['WiFi', 'Parking'])
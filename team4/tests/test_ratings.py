@@ -0,0 +1,197 @@
+"""
+Tests for the incremental facility rating counters
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase, override_settings
+
+from team4.fields import Point
+from team4.models import Category, City, Facility, Province, Review
+from team4.services import RatingService
+
+SCRATCH_DB = 'team4_ratings_scratch'
+
+
+class ScratchRouter:
+    """
+    Review به کاربر core (دیتابیس default) کلید خارجی دارد و روی SQLiteهای جدا قابل نوشتن نیست؛
+    در این تست‌ها هر دو اپ روی یک فایل SQLite موقت نوشته می‌شوند.
+    """
+
+    def db_for_read(self, model, **hints):
+        return SCRATCH_DB
+
+    def db_for_write(self, model, **hints):
+        return SCRATCH_DB
+
+
+def _retry(action, attempts=100):
+    # SQLite قفل ردیف ندارد و تراکنش نویسنده دوم را با "database is locked" رد می‌کند؛ تراکنش کامل rollback شده و تکرار می‌شود
+    for attempt in range(attempts):
+        try:
+            return action()
+        except OperationalError as exc:
+            if 'locked' not in str(exc) or attempt == attempts - 1:
+                raise
+            time.sleep(random.uniform(0.001, 0.01))
+
+
+@override_settings(DATABASE_ROUTERS=['team4.tests.test_ratings.ScratchRouter'])
+class RatingCountersTest(TransactionTestCase):
+    """شمارنده‌های امتیاز مکان با F() در همان تراکنش نوشتن نظر"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        conf = dict(connections.settings['default'])
+        conf.update(ENGINE='django.db.backends.sqlite3', NAME=os.path.join(tmp.name, 'ratings.sqlite3'), OPTIONS={'timeout': 30})
+        connections.settings[SCRATCH_DB] = conf
+        self.addCleanup(self._drop_scratch_db)
+        with connections[SCRATCH_DB].schema_editor() as editor:
+            editor.create_model(get_user_model())
+            for model in apps.get_app_config('team4').get_models():
+                editor.create_model(model)
+
+        province = Province.objects.create(province_id=1, name_fa='یزد', name_en='Yazd')
+        city = City.objects.create(city_id=1, province=province, name_fa='یزد', name_en='Yazd', location=Point(54.36, 31.89))
+        category = Category.objects.create(category_id=1, name_fa='هتل', name_en='Hotel')
+        self.facility = Facility.objects.create(
+            name_fa='هتل داد', name_en='Dad Hotel', city=city, category=category, address='', location=Point(54.3, 31.8)
+        )
+        self.other = Facility.objects.create(
+            name_fa='هتل موزه', name_en='Museum Hotel', city=city, category=category, address='', location=Point(54.4, 31.9)
+        )
+        self.users = [
+            get_user_model().objects.create_user(email=f'user{i}@example.com') for i in range(40)
+        ]
+
+    def _drop_scratch_db(self):
+        connections[SCRATCH_DB].close()
+        del connections[SCRATCH_DB]
+        del connections.settings[SCRATCH_DB]
+
+    def _counters(self, facility):
+        facility.refresh_from_db()
+        return facility.review_count, facility.rating_sum, facility.rating_histogram, facility.avg_rating
+
+    def test_create_update_delete_apply_deltas(self):
+        reviews = [
+            Review.objects.create(user=user, facility=self.facility, rating=rating)
+            for user, rating in zip(self.users, [5, 4, 2])
+        ]
+        self.assertEqual(self._counters(self.facility), (3, 11, {1: 0, 2: 1, 3: 0, 4: 1, 5: 1}, Decimal('3.67')))
+
+        reviews[2].rating = 5
+        reviews[2].save()
+        self.assertEqual(self._counters(self.facility), (3, 14, {1: 0, 2: 0, 3: 0, 4: 1, 5: 2}, Decimal('4.67')))
+
+        # رد شدن نظر و جابجایی نظر به مکان دیگر
+        reviews[0].is_approved = False
+        reviews[0].save()
+        reviews[1].facility = self.other
+        reviews[1].save()
+        self.assertEqual(self._counters(self.facility), (1, 5, {1: 0, 2: 0, 3: 0, 4: 0, 5: 1}, Decimal('5.00')))
+        self.assertEqual(self._counters(self.other), (1, 4, {1: 0, 2: 0, 3: 0, 4: 1, 5: 0}, Decimal('4.00')))
+
+        reviews[2].delete()
+        reviews[0].delete()
+        self.assertEqual(self._counters(self.facility), (0, 0, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}, Decimal('0.00')))
+        self.assertEqual(RatingService.find_drift(using=SCRATCH_DB), [])
+
+    def test_reconcile_command_detects_and_fixes_drift(self):
+        for user, rating in zip(self.users, [3, 4]):
+            Review.objects.create(user=user, facility=self.facility, rating=rating)
+        # تغییرات دسته‌ای (queryset.update) از کنار شمارنده‌ها رد می‌شوند
+        Review.objects.filter(rating=3).update(rating=1)
+        Facility.objects.filter(pk=self.other.pk).update(review_count=7)
+
+        out = StringIO()
+        call_command('reconcile_ratings', database=SCRATCH_DB, stdout=out)
+        self.assertIn('2 facility(ies)', out.getvalue())
+        self.assertEqual(self._counters(self.facility)[:2], (2, 7))
+
+        call_command('reconcile_ratings', database=SCRATCH_DB, fix=True, stdout=StringIO())
+        self.assertEqual(RatingService.find_drift(using=SCRATCH_DB), [])
+        self.assertEqual(self._counters(self.facility), (2, 5, {1: 1, 2: 0, 3: 0, 4: 1, 5: 0}, Decimal('2.50')))
+        self.assertEqual(self._counters(self.other)[0], 0)
+
+    def test_migration_backfill_keeps_fixture_ratings(self):
+        backfill = import_module('team4.migrations.0008_facility_rating_counters').backfill_rating_counters
+        for user, rating in zip(self.users, [5, 4, 1]):
+            Review.objects.create(user=user, facility=self.facility, rating=rating, is_approved=rating > 1)
+        # مقادیر fixture پیش از وجود شمارنده‌ها
+        Facility.objects.update(
+            review_count=104, avg_rating=Decimal('4.40'), rating_sum=0,
+            **{f'rating_count_{star}': 0 for star in range(1, 6)}
+        )
+
+        with connections[SCRATCH_DB].schema_editor() as editor:
+            backfill(apps, editor)
+        # مکان دارای نظر از روی نظرات تایید شده؛ مکان بدون نظر امتیاز fixture را نگه می‌دارد
+        self.assertEqual(self._counters(self.facility), (2, 9, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}, Decimal('4.50')))
+        self.assertEqual(self._counters(self.other), (104, 458, {1: 0, 2: 0, 3: 0, 4: 62, 5: 42}, Decimal('4.40')))
+        self.assertEqual(
+            RatingService.seeded_counters(Decimal('4.40'), 104),
+            {'rating_sum': 458, 'rating_count_1': 0, 'rating_count_2': 0, 'rating_count_3': 0,
+             'rating_count_4': 62, 'rating_count_5': 42},
+        )
+
+        # نظر بعدی روی همان شمارنده‌ها اعمال می‌شود، نه از صفر
+        Review.objects.create(user=self.users[5], facility=self.other, rating=5)
+        review_count, rating_sum, _, avg_rating = self._counters(self.other)
+        self.assertEqual((review_count, rating_sum, avg_rating), (105, 463, Decimal('4.41')))
+        # صفر کردن امتیازهای fixture فقط با reconcile صریح
+        self.assertEqual([row[0] for row in RatingService.find_drift(using=SCRATCH_DB)], [self.other.pk])
+
+    def test_parallel_writers_keep_counters_exact(self):
+        errors = []
+
+        def writer(users, seed):
+            rng = random.Random(seed)
+            try:
+                for user in users:
+                    facility = rng.choice([self.facility, self.other])
+                    review = _retry(lambda: Review.objects.create(user=user, facility=facility, rating=rng.randint(1, 5)))
+                    action = rng.choice(['keep', 'rate', 'move', 'reject', 'delete'])
+                    if action == 'delete':
+                        _retry(lambda: Review.objects.get(pk=review.pk).delete())
+                        continue
+                    if action == 'keep':
+                        continue
+
+                    def change():
+                        current = Review.objects.get(pk=review.pk)
+                        if action == 'rate':
+                            current.rating = rng.randint(1, 5)
+                        elif action == 'move':
+                            current.facility_id = self.other.pk if current.facility_id == self.facility.pk else self.facility.pk
+                        else:
+                            current.is_approved = False
+                        current.save()
+                    _retry(change)
+            except Exception as exc:  # pragma: no cover - در صورت خطا تست شکست می‌خورد
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer, args=(self.users[i::8], i)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(RatingService.find_drift(using=SCRATCH_DB), [])
+        approved = Review.objects.filter(is_approved=True).count()
+        self.assertEqual(self._counters(self.facility)[0] + self._counters(self.other)[0], approved)
@@ -0,0 +1,42 @@
+"""
+Tests for RoutingView caching
+"""
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from core.geo_cache import GeoResultCache, set_geo_cache
+
+
+class RoutingViewCacheTest(TestCase):
+    """کش مسیر روی مختصات گردشده"""
+
+    def setUp(self):
+        set_geo_cache(GeoResultCache(precision=4))
+        self.addCleanup(set_geo_cache, None)
+
+    def _route(self, origin, destination, **extra):
+        return self.client.post(
+            "/team4/api/navigation/route/",
+            {"origin": origin, "destination": destination, **extra},
+            content_type="application/json",
+        )
+
+    def test_nearby_coordinates_reuse_cached_route(self):
+        upstream = Mock(status_code=200, json=Mock(return_value={"routes": [{"legs": []}]}))
+        with patch("team4.views.requests.get", return_value=upstream) as http_get:
+            first = self._route("35.70001,51.40001", "35.8,51.5")
+            second = self._route("35.69999,51.39999", "35.8,51.5")
+            self._route("35.7,51.4", "35.8,51.5", type="motorcycle")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json()["routes"], [{"legs": []}])
+        self.assertIn("internal_air_distance_km", second.json())
+        self.assertEqual(http_get.call_count, 2)
+
+    def test_error_responses_are_not_cached(self):
+        error = Mock(status_code=400, json=Mock(return_value={"message": "bad"}))
+        ok = Mock(status_code=200, json=Mock(return_value={"routes": []}))
+        with patch("team4.views.requests.get", side_effect=[error, ok]):
+            self.assertEqual(self._route("35.7,51.4", "35.8,51.5").status_code, 400)
+            self.assertEqual(self._route("35.7,51.4", "35.8,51.5").status_code, 200)
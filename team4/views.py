@@ -13,6 +13,7 @@ import requests
 from dotenv import load_dotenv
 
 from core.auth import api_login_required
+from core.geo_cache import get_geo_cache
 from team4.models import Facility, Category, City, Amenity, Province, Village, RegionType, Favorite, Review
 from team4.serializers import (
     FacilityListSerializer, FacilityDetailSerializer,
@@ -219,7 +220,8 @@ class FacilityViewSet(viewsets.ModelViewSet):
         if filters:
             facilities = FacilityService.filter_facilities(facilities, filters)
         
-        # Apply sorting
+        # Preload list data (constant query count per page) and apply sorting
+        facilities = FacilityService.with_list_data(facilities)
         sorted_result = self._apply_sorting(facilities, sort_by, region_name)
         
         # Handle distance sorting special case
@@ -339,7 +341,8 @@ class FacilityViewSet(viewsets.ModelViewSet):
         if filters:
             facilities = FacilityService.filter_facilities(facilities, filters)
         
-        # Apply sorting
+        # Preload list data (constant query count per page) and apply sorting
+        facilities = FacilityService.with_list_data(facilities)
         sorted_result = self._apply_sorting(facilities, sort_by, region_name)
         
         # Handle distance sorting special case
@@ -503,34 +506,28 @@ class FacilityViewSet(viewsets.ModelViewSet):
             tier_list = [t.strip() for t in price_tiers_param.split(',')]
             facilities = facilities.filter(price_tier__in=tier_list)
         
-        # Calculate distances and filter by radius
-        nearby_places = []
+        # Filter by radius and sort by distance in the database;
+        # pagination then only fetches the rows of the requested page
         radius_km = radius_meters / 1000.0
-        
-        for facility in facilities:
-            if facility.location:
-                try:
-                    distance_km = facility.calculate_distance_to(center_point)
-                    if distance_km and distance_km <= radius_km:
-                        nearby_places.append({
-                            'facility': facility,
-                            'distance_meters': distance_km * 1000  # Convert to meters
-                        })
-                except:
-                    continue
-        
-        # Sort by distance
-        nearby_places.sort(key=lambda x: x['distance_meters'])
+        nearby_places = FacilityService.with_list_data(facilities.within_radius(center_point, radius_km))
         
         # Paginate
         page = self.paginate_queryset(nearby_places)
         if page is not None:
-            serializer = NearbyPlaceSerializer(page, many=True)
+            serializer = NearbyPlaceSerializer(self._with_distance_meters(page), many=True)
             return self.get_paginated_response(serializer.data)
         
-        serializer = NearbyPlaceSerializer(nearby_places, many=True)
+        serializer = NearbyPlaceSerializer(self._with_distance_meters(nearby_places), many=True)
         return Response(serializer.data)
     
+    @staticmethod
+    def _with_distance_meters(facilities):
+        """Wrap facilities annotated with distance_km for NearbyPlaceSerializer"""
+        return [
+            {'facility': facility, 'distance_meters': facility.distance_km * 1000}
+            for facility in facilities
+        ]
+    
     @action(detail=True, methods=['get'])
     def reviews(self, request, pk=None):
         """
@@ -594,7 +591,9 @@ class FacilityViewSet(viewsets.ModelViewSet):
         When lat/lng provided, returns facilities sorted by distance.
         """
         # Filter emergency facilities
-        facilities = self.queryset.filter(category__is_emergency=True)
+        facilities = self.queryset.filter(category__is_emergency=True).select_related(
+            'city', 'city__province', 'category'
+        ).prefetch_related('amenities', 'pricing_set', 'images')
         
         # Filter by city
         city_name = request.query_params.get('city')
@@ -615,39 +614,25 @@ class FacilityViewSet(viewsets.ModelViewSet):
                 lng = float(lng)
                 radius = float(radius)
                 
-                from .fields import Point
                 user_location = Point(lng, lat, srid=4326)
                 
-                # Calculate distance and filter
-                facilities_with_distance = []
-                for facility in facilities:
-                    distance = facility.calculate_distance_to(user_location)
-                    if distance and distance <= radius:
-                        facilities_with_distance.append({
-                            'facility': facility,
-                            'distance_km': round(distance, 2)
-                        })
-                
-                # Sort by distance
-                facilities_with_distance.sort(key=lambda x: x['distance_km'])
+                # Filter by radius and sort by distance in the database
+                facilities_with_distance = facilities.within_radius(user_location, radius)
                 
                 # Pagination
-                page = self.paginate_queryset([f['facility'] for f in facilities_with_distance])
+                page = self.paginate_queryset(facilities_with_distance)
                 if page is not None:
                     # Add distance to serializer data
                     serializer = self.get_serializer(page, many=True)
                     data = serializer.data
-                    for i, item in enumerate(data):
-                        item['distance_km'] = facilities_with_distance[i]['distance_km']
+                    for facility, item in zip(page, data):
+                        item['distance_km'] = round(facility.distance_km, 2)
                     return self.get_paginated_response(data)
                 
-                serializer = self.get_serializer(
-                    [f['facility'] for f in facilities_with_distance],
-                    many=True
-                )
+                serializer = self.get_serializer(facilities_with_distance, many=True)
                 data = serializer.data
-                for i, item in enumerate(data):
-                    item['distance_km'] = facilities_with_distance[i]['distance_km']
+                for facility, item in zip(facilities_with_distance, data):
+                    item['distance_km'] = round(facility.distance_km, 2)
                 return Response({
                     'count': len(data),
                     'results': data
@@ -1024,20 +1009,45 @@ class RoutingView(APIView):
             'alternative': str(serializer.validated_data.get('alternative', False)).lower(),
         }
 
-        try:
+        # Successful responses are cached on rounded coordinates + options (core.geo_cache);
+        # errors are returned to the client and not cached.
+        failure = {}
+
+        def fetch():
             response = requests.get(service_url, headers={'Api-Key': api_key}, params=params, timeout=10)
             result = response.json()
-
             if response.status_code == 200:
-                result['internal_air_distance_km'] = round(origin_point.distance(dest_point), 3)
+                return result
+            failure.update(status=response.status_code, result=result)
+            return None
+
+        cache = get_geo_cache()
+        key = cache.key(
+            'team4/direction',
+            [(origin_point.latitude, origin_point.longitude), (dest_point.latitude, dest_point.longitude)],
+            params['type'],
+            **{k: v for k, v in params.items() if k not in ('type', 'origin', 'destination')},
+        )
+
+        try:
+            result = cache.get_or_fetch(key, fetch)
+
+            if result is not None:
+                result = {**result, 'internal_air_distance_km': round(origin_point.distance(dest_point), 3)}
                 return Response(result, status=status.HTTP_200_OK)
-            
+
+            if not failure:
+                # Another request for the same route failed while this one was waiting on it
+                return Response(
+                    {"detail": "خطا در دریافت اطلاعات از سرویس نقشه. لطفا ورودی‌ها را بررسی کنید."},
+                    status=status.HTTP_502_BAD_GATEWAY
+                )
             return Response(
                 {
                     "detail": "خطا در دریافت اطلاعات از سرویس نقشه. لطفا ورودی‌ها را بررسی کنید.",
-                    "service_response": result
+                    "service_response": failure['result']
                 }, 
-                status=response.status_code
+                status=failure['status']
             )
             
         except requests.exceptions.RequestException:
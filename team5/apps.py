@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class Team5Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'team5'
+
+    def ready(self):
+        from .models import Team5City, Team5Media, Team5MediaRating, Team5Place
+        from .services.snapshot import notify_catalog_changed, notify_ratings_changed
+
+        for model in (Team5City, Team5Place, Team5Media):
+            post_save.connect(notify_catalog_changed, sender=model, dispatch_uid=f"team5-snapshot-{model.__name__}-save")
+            post_delete.connect(notify_catalog_changed, sender=model, dispatch_uid=f"team5-snapshot-{model.__name__}-delete")
+        post_save.connect(notify_ratings_changed, sender=Team5MediaRating, dispatch_uid="team5-snapshot-rating-save")
+        post_delete.connect(notify_ratings_changed, sender=Team5MediaRating, dispatch_uid="team5-snapshot-rating-delete")
@@ -0,0 +1,142 @@
+"""
+Per-endpoint latency of RecommendationService with the data fetched on every
+call (DatabaseProvider) vs served from the shared snapshot (SnapshotProvider),
+plus the cost of folding a new rating into a warm snapshot.
+
+Synthetic cities, places, media and ratings are written to a temporary SQLite
+database that replaces the team5 connection for the duration of the command.
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from team5.models import Team5City, Team5Media, Team5MediaRating, Team5Place
+from team5.services.db_provider import DatabaseProvider
+from team5.services.recommendation_service import RecommendationService
+from team5.services.snapshot import SnapshotProvider
+
+TITLES = ["Azadi Tower", "Khaju Bridge", "Golestan Palace", "Imam Reza Shrine", "Naqsh-e Jahan Square",
+          "Persepolis ruins", "Hafez poetry night", "Bazaar walk", "Desert camp", "Mountain village"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark Team5 recommendation endpoints with and without the shared data snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--media", type=int, default=100_000)
+        parser.add_argument("--places", type=int, default=2_000)
+        parser.add_argument("--cities", type=int, default=30)
+        parser.add_argument("--ratings", type=int, default=200_000)
+        parser.add_argument("--users", type=int, default=5_000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=5)
+
+    def _use_scratch_db(self, path):
+        original = connections.settings["team5"]
+        conf = dict(original)
+        conf.update(ENGINE="django.db.backends.sqlite3", NAME=path)
+        connections["team5"].close()
+        del connections["team5"]
+        connections.settings["team5"] = conf
+        with connections["team5"].schema_editor() as editor:
+            for model in apps.get_app_config("team5").get_models():
+                editor.create_model(model)
+        return original
+
+    def _restore_db(self, original):
+        connections["team5"].close()
+        del connections["team5"]
+        connections.settings["team5"] = original
+
+    def _seed(self, options, rng):
+        Team5City.objects.bulk_create([
+            Team5City(city_id=f"city-{i}", city_name=f"City {i}", latitude=25 + i % 15, longitude=45 + i % 18)
+            for i in range(options["cities"])
+        ])
+        Team5Place.objects.bulk_create([
+            Team5Place(
+                place_id=f"place-{i}", city_id=f"city-{i % options['cities']}", place_name=f"Place {i}",
+                latitude=30.0, longitude=50.0,
+            )
+            for i in range(options["places"])
+        ], batch_size=2000)
+        Team5Media.objects.bulk_create([
+            Team5Media(
+                media_id=f"media-{i:06}", place_id=f"place-{rng.randrange(options['places'])}",
+                title=f"{rng.choice(TITLES)} #{i}", caption=rng.choice(["historical", "sunset", "", "night lights"]),
+            )
+            for i in range(options["media"])
+        ], batch_size=5000)
+        users = [uuid.uuid4() for _ in range(options["users"])]
+        pairs = set()
+        while len(pairs) < options["ratings"]:
+            pairs.add((rng.randrange(len(users)), rng.randrange(options["media"])))
+        Team5MediaRating.objects.bulk_create([
+            Team5MediaRating(user_id=users[u], media_id=f"media-{m:06}", rate=rng.choice([2.0, 3.0, 4.0, 4.5, 5.0]))
+            for u, m in pairs
+        ], batch_size=5000)
+        # the most active user, so personalized results are not empty
+        [(most_active, _)] = Counter(u for u, _ in pairs).most_common(1)
+        return str(users[most_active])
+
+    def _time(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with tempfile.TemporaryDirectory() as tmp:
+            original = self._use_scratch_db(os.path.join(tmp, "team5-bench.sqlite3"))
+            try:
+                started = time.perf_counter()
+                user_id = self._seed(options, rng)
+                self.stdout.write(f"seeded {options['media']} media / {options['ratings']} ratings "
+                                  f"in {time.perf_counter() - started:.1f}s")
+
+                uncached = RecommendationService(DatabaseProvider())
+                provider = SnapshotProvider(DatabaseProvider(), check_interval=60)
+                cached = RecommendationService(provider)
+                started = time.perf_counter()
+                provider.snapshot()
+                self.stdout.write(f"snapshot build: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+                endpoints = [
+                    ("popular", lambda s: s.get_popular(limit=20)),
+                    ("nearest", lambda s: s.get_nearest_by_city("city-3", limit=20)),
+                    ("personalized", lambda s: s.get_personalized(user_id, limit=20)),
+                    ("interests", lambda s: s.get_user_interest_distribution(user_id)),
+                    ("media feed", lambda s: s.get_media_feed(user_id)),
+                ]
+                self.stdout.write(f"{'endpoint':>14} {'per call ms':>12} {'snapshot ms':>12} {'speedup':>8}")
+                for name, call in endpoints:
+                    if call(uncached) != call(cached):
+                        self.stdout.write(self.style.WARNING(f"{name}: results differ"))
+                    before = self._time(lambda: call(uncached), options["repeat"])
+                    after = self._time(lambda: call(cached), max(options["repeat"], 20))
+                    self.stdout.write(f"{name:>14} {before:>12.1f} {after:>12.2f} {before / after:>7.0f}x")
+
+                def new_rating():
+                    Team5MediaRating.objects.create(
+                        user_id=uuid.uuid4(), media_id=f"media-{rng.randrange(options['media']):06}", rate=5.0
+                    )
+                    started = time.perf_counter()
+                    provider.snapshot()
+                    return (time.perf_counter() - started) * 1000
+
+                refresh = statistics.median(new_rating() for _ in range(options["repeat"]))
+                self.stdout.write(f"incremental refresh after a new rating: {refresh:.1f} ms")
+            finally:
+                self._restore_db(original)
@@ -23,3 +23,11 @@ class DataProvider(ABC):
     @abstractmethod
     def get_media(self) -> list[MediaRecord]:
         raise NotImplementedError
+
+    def get_ratings_version(self):
+        """Fingerprint that changes whenever ratings change; None for static sources."""
+        return None
+
+    def get_rating_stats(self, since=None) -> dict[str, dict]:
+        """{mediaId: {"overallRate", "ratingsCount"}}, limited to media rated after `since` when given."""
+        raise NotImplementedError
@@ -1,11 +1,12 @@
 """Database-backed provider for Team5 recommendation data."""
 
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Max
 
 from team5.models import Team5City, Team5Media, Team5MediaRating, Team5Place
 
 from .contracts import CityRecord, MediaRecord, PlaceRecord
 from .data_provider import DataProvider
+from .snapshot import RatingsVersion
 
 
 class DatabaseProvider(DataProvider):
@@ -28,13 +29,17 @@ class DatabaseProvider(DataProvider):
         rows = Team5Place.objects.select_related("city").all().order_by("place_name")
         return [self._place_to_record(row) for row in rows]
 
-    def get_media(self) -> list[MediaRecord]:
-        stats = (
-            Team5MediaRating.objects.values("media_id")
-            .annotate(avg_rate=Avg("rate"), count_rate=Count("id"))
-            .order_by()
-        )
-        stats_by_media = {
+    def get_ratings_version(self) -> RatingsVersion:
+        row = Team5MediaRating.objects.aggregate(count=Count("id"), last_updated=Max("updated_at"))
+        return RatingsVersion(row["count"], row["last_updated"])
+
+    def get_rating_stats(self, since: RatingsVersion | None = None) -> dict[str, dict]:
+        ratings = Team5MediaRating.objects.all()
+        if since is not None and since.last_updated is not None:
+            changed = Team5MediaRating.objects.filter(updated_at__gte=since.last_updated).values("media_id")
+            ratings = ratings.filter(media_id__in=changed)
+        stats = ratings.values("media_id").annotate(avg_rate=Avg("rate"), count_rate=Count("id")).order_by()
+        return {
             row["media_id"]: {
                 "overallRate": round(float(row["avg_rate"]), 2),
                 "ratingsCount": int(row["count_rate"]),
@@ -42,6 +47,9 @@ class DatabaseProvider(DataProvider):
             for row in stats
         }
 
+    def get_media(self) -> list[MediaRecord]:
+        stats_by_media = self.get_rating_stats()
+
         rows = Team5Media.objects.select_related("place").all().order_by("media_id")
         output: list[MediaRecord] = []
         for row in rows:
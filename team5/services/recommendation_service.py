@@ -12,6 +12,7 @@ from .contracts import (
     PlaceRecord,
 )
 from .data_provider import DataProvider
+from .snapshot import Snapshot, SnapshotProvider, extract_keywords, keyword_mask
 from team5.models import Team5MediaRating
 
 
@@ -30,43 +31,38 @@ class RecommendationService:
         self.personalized_min_user_rate = personalized_min_user_rate
 
     def get_popular(self, limit: int = DEFAULT_LIMIT) -> list[MediaRecord]:
-        media = [dict(item) for item in self.provider.get_media()]
-        filtered = [
-            item
-            for item in media
-            if float(item["overallRate"]) >= self.popular_min_overall_rate
-            and int(item["ratingsCount"]) >= self.popular_min_votes
-        ]
-        filtered.sort(key=lambda item: (float(item["overallRate"]), int(item["ratingsCount"])), reverse=True)
-        return filtered[:limit]
+        snapshot = self._snapshot()
+        output = []
+        for media_id in snapshot.popular.ids:
+            if len(output) >= limit:
+                break
+            item = snapshot.media_by_id[media_id]
+            if float(item["overallRate"]) < self.popular_min_overall_rate:
+                break
+            if int(item["ratingsCount"]) >= self.popular_min_votes:
+                output.append(dict(item))
+        return output
 
     def get_nearest_by_city(self, city_id: str, limit: int = DEFAULT_LIMIT) -> list[MediaRecord]:
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
-        items: list[dict] = []
-
-        for media in self.provider.get_media():
-            place = place_by_id.get(media["placeId"])
-            if not place or place["cityId"] != city_id:
-                continue
-            item = dict(media)
-            item["matchReason"] = "your_nearest"
-            items.append(item)
-
-        items.sort(key=lambda item: (float(item["overallRate"]), int(item["ratingsCount"])), reverse=True)
-        return items[:limit]
+        snapshot = self._snapshot()
+        ranking = snapshot.popular_by_city.get(city_id)
+        if ranking is None:
+            return []
+        return [
+            {**snapshot.media_by_id[media_id], "matchReason": "your_nearest"}
+            for media_id in ranking.ids[:limit]
+        ]
 
     def get_personalized(self, user_id: str, limit: int = DEFAULT_LIMIT) -> list[MediaRecord]:
-        media = [dict(item) for item in self.provider.get_media()]
-        media_by_id = {item["mediaId"]: item for item in media}
+        snapshot = self._snapshot()
         scored: list[tuple[float, float, int, dict]] = []
         ratings_by_media = self._get_db_ratings_by_media(user_id)
 
-        for item in media_by_id.values():
-            user_rate = ratings_by_media.get(item["mediaId"])
-            if user_rate is None or user_rate < self.personalized_min_user_rate:
+        for media_id in self._rated_media_ids(snapshot, ratings_by_media):
+            user_rate = ratings_by_media[media_id]
+            if user_rate < self.personalized_min_user_rate:
                 continue
-            item["userRate"] = user_rate
-            item["matchReason"] = "high_user_rating"
+            item = {**snapshot.media_by_id[media_id], "userRate": user_rate, "matchReason": "high_user_rating"}
             scored.append((user_rate, float(item["overallRate"]), int(item["ratingsCount"]), item))
 
         scored.sort(key=lambda data: (data[0], data[1], data[2]), reverse=True)
@@ -77,6 +73,7 @@ class RecommendationService:
             based_on_items=base_items,
             excluded_media_ids={item["mediaId"] for item in base_items},
             limit=max(1, min(limit, 10)),
+            snapshot=snapshot,
         )
 
         merged = list(base_items)
@@ -87,22 +84,20 @@ class RecommendationService:
         return merged[:limit]
 
     def get_user_interest_distribution(self, user_id: str) -> dict:
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
+        snapshot = self._snapshot()
         city_counts: dict[str, int] = defaultdict(int)
         place_counts: dict[str, int] = defaultdict(int)
         ratings_by_media = self._get_db_ratings_by_media(user_id)
         if not ratings_by_media:
             return {"userId": user_id, "cityInterests": [], "placeInterests": []}
 
-        for item in self.provider.get_media():
-            user_rate = ratings_by_media.get(item["mediaId"])
-            if user_rate is None or user_rate < self.personalized_min_user_rate:
+        for media_id in self._rated_media_ids(snapshot, ratings_by_media):
+            if ratings_by_media[media_id] < self.personalized_min_user_rate:
                 continue
-            place_id = item["placeId"]
-            place_counts[place_id] += 1
-            place = place_by_id.get(place_id)
-            if place:
-                city_counts[place["cityId"]] += 1
+            place_counts[snapshot.media_by_id[media_id]["placeId"]] += 1
+            city_id = snapshot.city_of.get(media_id)
+            if city_id is not None:
+                city_counts[city_id] += 1
 
         return {
             "userId": user_id,
@@ -117,10 +112,10 @@ class RecommendationService:
         }
 
     def get_place_lookup(self) -> dict[str, PlaceRecord]:
-        return {place["placeId"]: place for place in self.provider.get_all_places()}
+        return dict(self._snapshot().places_by_id)
 
     def get_user_ratings(self, user_id: str) -> list[dict]:
-        media_by_id = {item["mediaId"]: item for item in self.provider.get_media()}
+        media_by_id = self._snapshot().media_by_id
         user_uuid = _parse_uuid(user_id)
         if user_uuid is None:
             return []
@@ -133,32 +128,34 @@ class RecommendationService:
                 "mediaId": r.media_id,
                 "rate": float(r.rate),
                 "liked": bool(r.liked),
-                "media": media_by_id.get(r.media_id),
+                "media": dict(media_by_id[r.media_id]) if r.media_id in media_by_id else None,
                 "updatedAt": r.updated_at.isoformat(),
             }
             for r in ratings
         ]
 
     def get_media_feed(self, user_id: str | None = None) -> dict:
-        items = [dict(item) for item in self.provider.get_media()]
+        """All media by popularity; items the user has not rated are the snapshot's shared records."""
+        snapshot = self._snapshot()
+        user_ratings_map = self._get_db_ratings_by_media(user_id) if user_id else {}
 
+        rated: dict[str, dict] = {}
         rated_high: list[dict] = []
         rated_low: list[dict] = []
-        user_ratings_map = self._get_db_ratings_by_media(user_id) if user_id else {}
+        for media_id in self._rated_media_ids(snapshot, user_ratings_map):
+            user_rate = float(user_ratings_map[media_id])
+            item = {
+                **snapshot.media_by_id[media_id],
+                "userRate": user_rate,
+                "liked": user_rate >= self.personalized_min_user_rate,
+            }
+            rated[media_id] = item
+            if item["liked"]:
+                rated_high.append(item)
+            else:
+                rated_low.append(item)
 
-        for item in items:
-            user_rate = None
-            if user_id:
-                user_rate = user_ratings_map.get(item["mediaId"])
-            if user_rate is not None:
-                item["userRate"] = float(user_rate)
-                item["liked"] = float(user_rate) >= self.personalized_min_user_rate
-                if item["liked"]:
-                    rated_high.append(item)
-                else:
-                    rated_low.append(item)
-
-        items.sort(key=lambda data: (float(data["overallRate"]), int(data["ratingsCount"])), reverse=True)
+        items = [rated.get(media_id) or snapshot.media_by_id[media_id] for media_id in snapshot.popular.ids]
         rated_high.sort(key=lambda data: float(data["userRate"]), reverse=True)
         rated_low.sort(key=lambda data: float(data["userRate"]))
 
@@ -177,46 +174,54 @@ class RecommendationService:
         based_on_items: list[dict],
         excluded_media_ids: set[str],
         limit: int,
+        snapshot: Snapshot | None = None,
     ) -> list[dict]:
         if not based_on_items:
             return []
 
-        all_items = [dict(item) for item in self.provider.get_media()]
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
-        scores: dict[str, float] = defaultdict(float)
-        reasons: dict[str, str] = {}
-
+        snapshot = snapshot or self._snapshot()
         seed_keywords = set()
         seed_city_ids = set()
         for item in based_on_items:
-            seed_keywords |= _extract_keywords(item["title"] + " " + item.get("caption", ""))
-            place = place_by_id.get(item["placeId"])
+            seed_keywords |= extract_keywords(item["title"] + " " + item.get("caption", ""))
+            place = snapshot.places_by_id.get(item["placeId"])
             if place:
                 seed_city_ids.add(place["cityId"])
+        seed_topics = keyword_mask(seed_keywords)
 
-        for candidate in all_items:
-            media_id = candidate["mediaId"]
+        # Score is 2.5 for a shared topic + 1.5 for the same city + overallRate / 10 (at most 0.5),
+        # so the ranking is: topic and city, topic, city, neither; by rate within each group.
+        # Walking media by rate fills the groups in order and can stop once the best one is full.
+        groups: tuple[list[str], ...] = ([], [], [], [])
+        for media_id in snapshot.by_rate.ids:
             if media_id in excluded_media_ids:
                 continue
-            place = place_by_id.get(candidate["placeId"])
-            candidate_keywords = _extract_keywords(candidate["title"] + " " + candidate.get("caption", ""))
-            overlap = seed_keywords.intersection(candidate_keywords)
-            if overlap:
-                scores[media_id] += 2.5
-                reasons[media_id] = "similar_topic"
-            if place and place["cityId"] in seed_city_ids:
-                scores[media_id] += 1.5
-                reasons[media_id] = reasons.get(media_id, "same_city")
-            scores[media_id] += float(candidate.get("overallRate", 0)) / 10.0
-
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:limit]
-        media_by_id = {item["mediaId"]: item for item in all_items}
-        output = []
-        for media_id, _ in ranked:
-            item = media_by_id[media_id]
-            item["matchReason"] = reasons.get(media_id, "similar")
-            output.append(item)
-        return output
+            same_city = snapshot.city_of.get(media_id) in seed_city_ids
+            if snapshot.topics[media_id] & seed_topics:
+                group = groups[0] if same_city else groups[1]
+            else:
+                group = groups[2] if same_city else groups[3]
+            if len(group) < limit:
+                group.append(media_id)
+                if len(groups[0]) >= limit:
+                    break
+
+        reasons = ("similar_topic", "similar_topic", "same_city", "similar")
+        ranked = [(media_id, reason) for group, reason in zip(groups, reasons) for media_id in group][:limit]
+        return [{**snapshot.media_by_id[media_id], "matchReason": reason} for media_id, reason in ranked]
+
+    def _snapshot(self) -> Snapshot:
+        if isinstance(self.provider, SnapshotProvider):
+            return self.provider.snapshot()
+        return Snapshot(self.provider.get_cities(), self.provider.get_all_places(), self.provider.get_media())
+
+    @staticmethod
+    def _rated_media_ids(snapshot: Snapshot, ratings_by_media: dict[str, float]) -> list[str]:
+        """Rated media present in the snapshot, in catalogue order (keeps ties ordered as before)."""
+        return sorted(
+            (media_id for media_id in ratings_by_media if media_id in snapshot.position),
+            key=snapshot.position.__getitem__,
+        )
 
     def _get_db_ratings_by_media(self, user_id: str) -> dict[str, float]:
         user_uuid = _parse_uuid(user_id)
@@ -234,20 +239,3 @@ def _parse_uuid(value: str) -> UUID | None:
     except (ValueError, TypeError):
         return None
 
-
-def _extract_keywords(text: str) -> set[str]:
-    text = text.lower()
-    keywords = set()
-    mapping = {
-        "tower": ["tower", "برج"],
-        "bridge": ["bridge", "پل"],
-        "palace": ["palace", "کاخ"],
-        "shrine": ["shrine", "حرم"],
-        "square": ["square", "میدان"],
-        "heritage": ["historical", "history", "ancient", "ruins", "historical site", "تاریخی"],
-        "poetry": ["poetry", "verse", "hafez", "شعر"],
-    }
-    for canonical, tokens in mapping.items():
-        if any(token in text for token in tokens):
-            keywords.add(canonical)
-    return keywords
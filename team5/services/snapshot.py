@@ -0,0 +1,285 @@
+"""Versioned in-memory snapshot of Team5 media, places and rating stats, shared across requests."""
+
+import threading
+import time
+from bisect import bisect_left
+from itertools import count
+from typing import Iterable, NamedTuple
+
+from .contracts import CityRecord, MediaRecord, PlaceRecord
+from .data_provider import DataProvider
+
+# Bumped by model signals (see Team5Config.ready); providers that see a new
+# generation refresh on their next read instead of waiting for the interval.
+_generations = {"catalog": 0, "ratings": 0}
+_lock = threading.Lock()
+_snapshot_versions = count(1)
+
+
+def notify_catalog_changed(**kwargs) -> None:
+    with _lock:
+        _generations["catalog"] += 1
+
+
+def notify_ratings_changed(**kwargs) -> None:
+    with _lock:
+        _generations["ratings"] += 1
+
+
+class RatingsVersion(NamedTuple):
+    """Cheap fingerprint of the ratings table: row count and latest update."""
+
+    count: int
+    last_updated: object
+
+
+KEYWORD_TOKENS = {
+    "tower": ["tower", "برج"],
+    "bridge": ["bridge", "پل"],
+    "palace": ["palace", "کاخ"],
+    "shrine": ["shrine", "حرم"],
+    "square": ["square", "میدان"],
+    "heritage": ["historical", "history", "ancient", "ruins", "historical site", "تاریخی"],
+    "poetry": ["poetry", "verse", "hafez", "شعر"],
+}
+KEYWORD_BITS = {keyword: 1 << index for index, keyword in enumerate(KEYWORD_TOKENS)}
+
+
+def extract_keywords(text: str) -> set[str]:
+    text = text.lower()
+    keywords = set()
+    for canonical, tokens in KEYWORD_TOKENS.items():
+        if any(token in text for token in tokens):
+            keywords.add(canonical)
+    return keywords
+
+
+def keyword_mask(keywords: Iterable[str]) -> int:
+    mask = 0
+    for keyword in keywords:
+        mask |= KEYWORD_BITS[keyword]
+    return mask
+
+
+def popular_key(item: MediaRecord, position: int) -> tuple:
+    return (-float(item["overallRate"]), -int(item["ratingsCount"]), position)
+
+
+def rate_key(item: MediaRecord, position: int) -> tuple:
+    return (-float(item["overallRate"]), position)
+
+
+class Ranking:
+    """Media ids sorted by a unique key; single entries move with bisect instead of a full re-sort."""
+
+    __slots__ = ("keys", "ids")
+
+    def __init__(self, entries: Iterable[tuple[tuple, str]] = ()):
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.ids = [media_id for _, media_id in entries]
+
+    def copy(self) -> "Ranking":
+        ranking = Ranking()
+        ranking.keys = list(self.keys)
+        ranking.ids = list(self.ids)
+        return ranking
+
+    def move(self, old_key: tuple, new_key: tuple, media_id: str) -> None:
+        index = bisect_left(self.keys, old_key)
+        del self.keys[index], self.ids[index]
+        index = bisect_left(self.keys, new_key)
+        self.keys.insert(index, new_key)
+        self.ids.insert(index, media_id)
+
+
+class Snapshot:
+    """
+    One consistent view of the catalogue and rating stats plus the indices the
+    recommendation endpoints read. Snapshots are never modified once published;
+    records are shared between requests, so callers copy before annotating.
+    """
+
+    def __init__(
+        self,
+        cities: list[CityRecord],
+        places: list[PlaceRecord],
+        media: list[MediaRecord],
+        ratings_version: RatingsVersion | None = None,
+    ):
+        self.version = next(_snapshot_versions)
+        self.built_at = time.monotonic()
+        self.ratings_version = ratings_version
+        self.cities = cities
+        self.places = places
+        self.places_by_id = {place["placeId"]: place for place in places}
+        self.places_by_city: dict[str, list[PlaceRecord]] = {}
+        for place in places:
+            self.places_by_city.setdefault(place["cityId"], []).append(place)
+
+        # insertion order is the provider's media order and is kept by later updates
+        self.media_by_id = {item["mediaId"]: item for item in media}
+        self.position = {media_id: index for index, media_id in enumerate(self.media_by_id)}
+        self.city_of: dict[str, str] = {}
+        self.topics: dict[str, int] = {}
+        for media_id, item in self.media_by_id.items():
+            place = self.places_by_id.get(item["placeId"])
+            if place:
+                self.city_of[media_id] = place["cityId"]
+            self.topics[media_id] = keyword_mask(extract_keywords(item["title"] + " " + item.get("caption", "")))
+
+        self.popular = Ranking(
+            (popular_key(item, self.position[media_id]), media_id) for media_id, item in self.media_by_id.items()
+        )
+        self.by_rate = Ranking(
+            (rate_key(item, self.position[media_id]), media_id) for media_id, item in self.media_by_id.items()
+        )
+        by_city: dict[str, list] = {}
+        for key, media_id in zip(self.popular.keys, self.popular.ids):
+            city_id = self.city_of.get(media_id)
+            if city_id is not None:
+                by_city.setdefault(city_id, []).append((key, media_id))
+        self.popular_by_city = {city_id: Ranking(entries) for city_id, entries in by_city.items()}
+        self.ratings_total = sum(int(item["ratingsCount"]) for item in self.media_by_id.values())
+        # ratings of media that are not in the catalogue still count in the fingerprint
+        self.untracked_ratings = ratings_version.count - self.ratings_total if ratings_version else 0
+
+    @property
+    def media(self) -> list[MediaRecord]:
+        return list(self.media_by_id.values())
+
+    def with_rating_stats(
+        self, stats: dict[str, dict], ratings_version: RatingsVersion | None, complete: bool = False
+    ) -> "Snapshot":
+        """
+        New snapshot with `stats` ({mediaId: {"overallRate", "ratingsCount"}}) applied.
+        Only the changed media are re-ranked. With `complete`, media missing
+        from `stats` are reset to no ratings.
+        """
+        if complete:
+            stats = {
+                media_id: stats.get(media_id, {"overallRate": 0.0, "ratingsCount": 0})
+                for media_id, item in self.media_by_id.items()
+                if media_id in stats or item["ratingsCount"] or item["overallRate"]
+            }
+        changed = []
+        for media_id, item_stats in stats.items():
+            item = self.media_by_id.get(media_id)
+            if item is None:
+                continue
+            if (item["overallRate"], item["ratingsCount"]) != (item_stats["overallRate"], item_stats["ratingsCount"]):
+                changed.append((media_id, item, {**item, **item_stats}))
+
+        updated = object.__new__(Snapshot)
+        updated.__dict__.update(self.__dict__)
+        updated.version = next(_snapshot_versions)
+        updated.ratings_version = ratings_version
+        if not changed:
+            return updated
+
+        updated.media_by_id = dict(self.media_by_id)
+        updated.popular = self.popular.copy()
+        updated.by_rate = self.by_rate.copy()
+        updated.popular_by_city = dict(self.popular_by_city)
+        copied_cities = set()
+        for media_id, old, new in changed:
+            position = self.position[media_id]
+            updated.media_by_id[media_id] = new
+            updated.popular.move(popular_key(old, position), popular_key(new, position), media_id)
+            updated.by_rate.move(rate_key(old, position), rate_key(new, position), media_id)
+            city_id = self.city_of.get(media_id)
+            if city_id is not None:
+                if city_id not in copied_cities:
+                    updated.popular_by_city[city_id] = self.popular_by_city[city_id].copy()
+                    copied_cities.add(city_id)
+                updated.popular_by_city[city_id].move(popular_key(old, position), popular_key(new, position), media_id)
+            updated.ratings_total += int(new["ratingsCount"]) - int(old["ratingsCount"])
+        return updated
+
+
+class SnapshotProvider(DataProvider):
+    """
+    Serves a shared Snapshot built from `base`. At most every `check_interval`
+    seconds (or right away after a local model signal) the ratings fingerprint
+    is compared; new ratings are folded in for the affected media only.
+    Catalogue changes seen through signals, and snapshots older than
+    `max_age`, trigger a full rebuild. While one request refreshes, others keep
+    reading the current snapshot.
+    """
+
+    def __init__(self, base: DataProvider, *, check_interval: float = 1.0, max_age: float = 300.0):
+        self.base = base
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._snapshot: Snapshot | None = None
+        self._checked_at = 0.0
+        self._seen = dict(_generations)
+        self._refresh_lock = threading.Lock()
+
+    def snapshot(self) -> Snapshot:
+        current = self._snapshot
+        if current is not None and not self._is_due():
+            return current
+        if not self._refresh_lock.acquire(blocking=current is None):
+            return current
+        try:
+            if self._snapshot is None or self._is_due():
+                self._snapshot = self._refresh(self._snapshot)
+            return self._snapshot
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def _is_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_interval or self._seen != _generations
+
+    def _refresh(self, current: Snapshot | None) -> Snapshot:
+        seen = dict(_generations)
+        if (
+            current is None
+            or seen["catalog"] != self._seen["catalog"]
+            or time.monotonic() - current.built_at >= self.max_age
+        ):
+            snapshot = self._build()
+        else:
+            snapshot = self._update_ratings(current)
+        self._seen = seen
+        self._checked_at = time.monotonic()
+        return snapshot
+
+    def _build(self) -> Snapshot:
+        # fingerprint first: ratings written during the build are picked up by the next check
+        ratings_version = self.base.get_ratings_version()
+        return Snapshot(self.base.get_cities(), self.base.get_all_places(), self.base.get_media(), ratings_version)
+
+    def _update_ratings(self, current: Snapshot) -> Snapshot:
+        ratings_version = self.base.get_ratings_version()
+        if ratings_version == current.ratings_version:
+            return current
+        if ratings_version is None or current.ratings_version is None:
+            return self._build()
+        snapshot = current.with_rating_stats(
+            self.base.get_rating_stats(since=current.ratings_version), ratings_version
+        )
+        if snapshot.ratings_total + snapshot.untracked_ratings != ratings_version.count:
+            # ratings were deleted (or belong to unknown media): recount everything, still re-ranking only what moved
+            snapshot = current.with_rating_stats(self.base.get_rating_stats(), ratings_version, complete=True)
+            snapshot.untracked_ratings = ratings_version.count - snapshot.ratings_total
+        return snapshot
+
+    def get_cities(self) -> list[CityRecord]:
+        return list(self.snapshot().cities)
+
+    def get_city_places(self, city_id: str) -> list[PlaceRecord]:
+        return list(self.snapshot().places_by_city.get(city_id, []))
+
+    def get_all_places(self) -> list[PlaceRecord]:
+        return list(self.snapshot().places)
+
+    def get_media(self) -> list[MediaRecord]:
+        return self.snapshot().media
+
+    def get_ratings_version(self) -> RatingsVersion | None:
+        return self.snapshot().ratings_version
@@ -1,7 +1,13 @@
+import uuid
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
 from team5.models import Team5City, Team5Media, Team5MediaRating, Team5Place
+from team5.services.db_provider import DatabaseProvider
+from team5.services.recommendation_service import RecommendationService
+from team5.services.snapshot import SnapshotProvider
 
 User = get_user_model()
 
@@ -186,3 +192,87 @@ class Team5RecommendationApiTests(TestCase):
         payload = res.json()
         self.assertTrue(any(item["mediaId"] == "m3" for item in payload["highRatedItems"]))
         self.assertTrue(any(item["mediaId"] == "m9" for item in payload["similarItems"]))
+
+
+class Team5SnapshotProviderTests(TestCase):
+    databases = {"default", "team5"}
+
+    @classmethod
+    def setUpTestData(cls):
+        Team5City.objects.create(city_id="shiraz", city_name="Shiraz", latitude=29.59, longitude=52.58)
+        Team5City.objects.create(city_id="yazd", city_name="Yazd", latitude=31.89, longitude=54.36)
+        Team5Place.objects.create(place_id="hafezieh", city_id="shiraz", place_name="Hafezieh", latitude=29.62, longitude=52.55)
+        Team5Place.objects.create(place_id="dowlat-abad", city_id="yazd", place_name="Dowlat Abad", latitude=31.9, longitude=54.35)
+        Team5Media.objects.create(media_id="s1", place_id="hafezieh", title="Hafez tomb", caption="poetry night")
+        Team5Media.objects.create(media_id="s2", place_id="hafezieh", title="Garden walk", caption="")
+        Team5Media.objects.create(media_id="y1", place_id="dowlat-abad", title="Windcatcher", caption="historical garden")
+        for rate in (5.0, 4.0, 4.5, 5.0, 4.0):
+            cls._rate("s1", rate)
+        cls._rate("y1", 3.0)
+
+    @staticmethod
+    def _rate(media_id, rate, user_id=None):
+        return Team5MediaRating.objects.create(user_id=user_id or uuid.uuid4(), media_id=media_id, rate=rate)
+
+    def setUp(self):
+        self.provider = SnapshotProvider(DatabaseProvider(), check_interval=60)
+        self.service = RecommendationService(self.provider)
+
+    def test_snapshot_is_shared_between_calls(self):
+        self.assertEqual([item["mediaId"] for item in self.service.get_popular()], ["s1"])
+        version = self.provider.snapshot().version
+        with self.assertNumQueries(0, using="team5"):
+            self.service.get_popular()
+            self.service.get_nearest_by_city("shiraz")
+            self.service.get_media_feed()
+            self.provider.get_city_places("yazd")
+        self.assertEqual(self.provider.snapshot().version, version)
+
+    def test_new_ratings_update_indices_incrementally(self):
+        self.service.get_popular()
+        version = self.provider.snapshot().version
+        users = [uuid.uuid4() for _ in range(5)]
+        for user in users:
+            self._rate("y1", 5.0, user)
+
+        with mock.patch.object(DatabaseProvider, "get_media") as get_media:
+            # ratings fingerprint + stats of the changed media only
+            with self.assertNumQueries(2, using="team5"):
+                popular = self.service.get_popular()
+        get_media.assert_not_called()
+        self.assertGreater(self.provider.snapshot().version, version)
+        self.assertEqual([(item["mediaId"], item["ratingsCount"]) for item in popular], [("y1", 6), ("s1", 5)])
+        self.assertEqual(self.service.get_nearest_by_city("yazd")[0]["overallRate"], 4.67)
+
+        Team5MediaRating.objects.filter(user_id__in=users[:3]).delete()
+        self.assertEqual([item["mediaId"] for item in self.service.get_popular()], ["s1"])
+        self.assertEqual(self.provider.snapshot().media_by_id["y1"]["ratingsCount"], 3)
+
+    def test_ratings_from_other_processes_are_seen_after_the_interval(self):
+        provider = SnapshotProvider(DatabaseProvider(), check_interval=0)
+        provider.snapshot()
+        # bulk writes send no signals, like a rating stored by another worker
+        Team5MediaRating.objects.bulk_create([Team5MediaRating(user_id=uuid.uuid4(), media_id="s2", rate=4.5)])
+        self.assertEqual(provider.snapshot().media_by_id["s2"]["ratingsCount"], 1)
+
+    def test_catalogue_change_rebuilds(self):
+        self.service.get_popular()
+        Team5Media.objects.create(media_id="s3", place_id="hafezieh", title="Hafez poetry reading", caption="")
+        self.assertIn("s3", [item["mediaId"] for item in self.service.get_nearest_by_city("shiraz")])
+        similar = self.service.get_similar_items(
+            user_id="u", based_on_items=[self.provider.snapshot().media_by_id["s1"]], excluded_media_ids={"s1"}, limit=3,
+        )
+        self.assertEqual([(item["mediaId"], item["matchReason"]) for item in similar], [
+            ("s3", "similar_topic"), ("s2", "same_city"), ("y1", "similar"),
+        ])
+
+    def test_results_do_not_leak_into_the_snapshot(self):
+        user = uuid.uuid4()
+        self._rate("s1", 5.0, user)
+        self.service.get_personalized(str(user))
+        self.service.get_media_feed(str(user))
+        self.service.get_nearest_by_city("shiraz")[0]["title"] = "changed"
+        record = self.provider.snapshot().media_by_id["s1"]
+        self.assertNotIn("userRate", record)
+        self.assertNotIn("matchReason", record)
+        self.assertEqual(record["title"], "Hafez tomb")
@@ -8,10 +8,12 @@ from .services.contracts import DEFAULT_LIMIT
 from .services.db_provider import DatabaseProvider
 from .services.location_service import get_client_ip, resolve_client_city
 from .services.recommendation_service import RecommendationService
+from .services.snapshot import SnapshotProvider
 
 TEAM_NAME = "team5"
 User = get_user_model()
-provider = DatabaseProvider()
+# media, places and rating stats are served from a shared snapshot (services/snapshot.py)
+provider = SnapshotProvider(DatabaseProvider())
 recommendation_service = RecommendationService(provider)
 
 
@@ -1,35 +1,59 @@
 import requests
+from django.apps import apps
 from rest_framework.permissions import BasePermission
 from django.conf import settings
 
 
+def get_user_data(request):
+    """
+    Verified user info for this request (id, email, first_name, last_name), memoized on the request.
+
+    Inside the monolith (core installed) the JWT is checked in-process via core.identity;
+    as a standalone service it falls back to Core's /api/auth/verify/ endpoint.
+    """
+    http_request = getattr(request, "_request", request)
+    if not hasattr(http_request, "_team8_user_data"):
+        if apps.is_installed("core"):
+            from core.identity import verify_request
+            user_data = verify_request(http_request)
+        else:
+            user_data = _verify_via_core(http_request.COOKIES.get("access_token"))
+        http_request._team8_user_data = user_data
+    return http_request._team8_user_data
+
+
+def _verify_via_core(token):
+    if not token:
+        return None
+    try:
+        resp = requests.get(
+            f"{settings.CORE_BASE_URL}/api/auth/verify/",
+            cookies={"access_token": token},
+            timeout=2
+        )
+        if resp.status_code == 200:
+            return {
+                "id": resp.headers.get("X-User-Id"),
+                "email": resp.headers.get("X-User-Email"),
+                "first_name": resp.headers.get("X-User-First-Name", ""),
+                "last_name": resp.headers.get("X-User-Last-Name", ""),
+            }
+    except Exception:
+        pass
+    return None
+
+
 class IsAuthenticatedViaCookie(BasePermission):
-    """Verify auth via Core service, populate request.user_data"""
+    """Verify auth (locally or via Core service), populate request.user_data"""
     def has_permission(self, request, view):
         if request.method == "OPTIONS":
             return True
 
-        token = request.COOKIES.get("access_token")
-        if not token:
+        user_data = get_user_data(request)
+        if not user_data:
             return False
-
-        try:
-            resp = requests.get(
-                f"{settings.CORE_BASE_URL}/api/auth/verify/",
-                cookies={"access_token": token},
-                timeout=2
-            )
-            if resp.status_code == 200:
-                request.user_data = {
-                    "id": resp.headers.get("X-User-Id"),
-                    "email": resp.headers.get("X-User-Email"),
-                    "first_name": resp.headers.get("X-User-First-Name", ""),
-                    "last_name": resp.headers.get("X-User-Last-Name", ""),
-                }
-                return True
-        except Exception:
-            pass
-        return False
+        request.user_data = user_data
+        return True
 
 
 class IsOwnerOrReadOnly(BasePermission):